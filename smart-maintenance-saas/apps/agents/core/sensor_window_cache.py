@@ -0,0 +1,163 @@
+"""
+Per-sensor rolling windows of recent readings for ValidationAgent.
+
+Historical validation needs the last ``historical_check_limit`` readings at
+or before an anomalous reading. Keying a cache by ``(sensor, reading
+timestamp)`` only helps when the same reading is validated twice, so every
+anomaly still cost a database query. Instead each sensor gets one rolling
+window:
+
+- it is loaded once from the database (the newest ``window_size`` readings);
+- it is extended with readings from the live stream (``DataProcessedEvent``)
+  and trimmed to ``window_size`` so it tracks the sensor in steady state;
+- it is reloaded after ``refresh_seconds`` to pick up readings written by
+  other paths;
+- windows are kept for at most ``max_sensors`` sensors, least recently used
+  first out, which bounds memory at ``max_sensors * window_size`` readings.
+
+A lookup is only a hit when the window provably holds every requested
+reading: ``limit`` readings at or before the cutoff, or fewer when the window
+starts at the sensor's first reading. Anything else (e.g. an anomaly older
+than the window) is a miss and the caller queries the database.
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from core.database.crud.crud_sensor_reading import SensorHistory
+
+
+@dataclass
+class _SensorWindow:
+    history: SensorHistory
+    starts_at_first_reading: bool  # nothing older exists in the database
+    loaded_at: float
+
+
+def _comparable(reference: Optional[datetime], timestamp: datetime) -> datetime:
+    """``timestamp`` with the same awareness as ``reference`` (naive values are UTC)."""
+    if reference is None or (reference.tzinfo is None) == (timestamp.tzinfo is None):
+        return timestamp
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class SensorWindowCache:
+    """LRU of per-sensor rolling windows kept current by the live reading stream."""
+
+    def __init__(self, window_size: int = 100, max_sensors: int = 1024, refresh_seconds: float = 300.0):
+        self.window_size = max(1, int(window_size))
+        self.max_sensors = max(1, int(max_sensors))
+        self.refresh_seconds = float(refresh_seconds)
+        self._windows: "OrderedDict[str, _SensorWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "loads": 0, "appended": 0, "evictions": 0}
+
+    def lookup(self, sensor_id: str, end_time: datetime, limit: int) -> Optional[SensorHistory]:
+        """The last ``limit`` readings at or before ``end_time`` if the window holds all of them."""
+        with self._lock:
+            entry = self._windows.get(sensor_id)
+            if entry is not None and self.refresh_seconds > 0:
+                if time.monotonic() - entry.loaded_at > self.refresh_seconds:
+                    del self._windows[sensor_id]
+                    entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._windows.move_to_end(sensor_id)
+            try:
+                window = entry.history.window(end_time, limit)
+            except TypeError:  # incomparable timestamps
+                window = None
+            # A short window is exact only when nothing older than the cached window exists
+            if window is None or (len(window) < limit and not entry.starts_at_first_reading):
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return window
+
+    def store(self, sensor_id: str, history: SensorHistory, requested: int) -> None:
+        """Cache a freshly loaded window (the newest ``requested`` readings of the sensor)."""
+        with self._lock:
+            self._windows[sensor_id] = _SensorWindow(
+                history=self._trimmed(history),
+                starts_at_first_reading=len(history) < requested,
+                loaded_at=time.monotonic(),
+            )
+            self._windows.move_to_end(sensor_id)
+            self.stats["loads"] += 1
+            while len(self._windows) > self.max_sensors:
+                self._windows.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def append(self, sensor_id: str, timestamp: datetime, value: float, quality: Optional[float] = None) -> bool:
+        """Extend a cached window with a live reading; sensors without a window are ignored."""
+        with self._lock:
+            entry = self._windows.get(sensor_id)
+            if entry is None:
+                return False
+            history = entry.history
+            timestamp = _comparable(history.timestamps[-1] if len(history) else None, timestamp)
+            position = bisect.bisect_right(history.timestamps, timestamp)
+            if position and history.timestamps[position - 1] == timestamp:
+                return False  # already known (loaded from the database or seen before)
+            if position == 0 and len(history) and not entry.starts_at_first_reading:
+                return False  # older than the window; the database still has it
+            entry.history = self._trimmed(
+                SensorHistory(
+                    sensor_id=history.sensor_id,
+                    timestamps=history.timestamps[:position] + [timestamp] + history.timestamps[position:],
+                    values=np.insert(history.values, position, float(value)),
+                    quality=np.insert(history.quality, position, np.nan if quality is None else float(quality)),
+                    sensor_type=history.sensor_type,
+                    unit=history.unit,
+                )
+            )
+            if len(entry.history) == self.window_size and len(history) == self.window_size:
+                entry.starts_at_first_reading = False  # the oldest reading was trimmed off
+            self.stats["appended"] += 1
+            return True
+
+    def _trimmed(self, history: SensorHistory) -> SensorHistory:
+        if len(history) <= self.window_size:
+            return history
+        return SensorHistory(
+            sensor_id=history.sensor_id,
+            timestamps=history.timestamps[-self.window_size:],
+            values=history.values[-self.window_size:],
+            quality=history.quality[-self.window_size:],
+            sensor_type=history.sensor_type,
+            unit=history.unit,
+        )
+
+    def invalidate(self, sensor_id: Optional[str] = None) -> None:
+        with self._lock:
+            if sensor_id is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(sensor_id, None)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def __contains__(self, sensor_id: object) -> bool:
+        return sensor_id in self._windows
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["sensors"] = len(self._windows)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -7,12 +7,15 @@ from typing import Tuple, List, Any, Optional, Callable, Dict, Union, Set
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 # Core application imports - CRITICAL: Ensure these paths are correct for absolute imports
 from core.base_agent_abc import BaseAgent, AgentCapability
 from core.events.event_bus import EventBus
-from core.database.crud.crud_sensor_reading import CRUDSensorReading # Instance expected
+from core.database.crud.crud_sensor_reading import CRUDSensorReading, SensorHistory # Instance expected
 from apps.rules.validation_rules import RuleEngine # Instance expected
-from core.events.event_models import AnomalyDetectedEvent, AnomalyValidatedEvent
+from apps.agents.core.sensor_window_cache import SensorWindowCache
+from core.events.event_models import AnomalyDetectedEvent, AnomalyValidatedEvent, DataProcessedEvent
 from data.schemas import AnomalyAlert, SensorReading, ValidationStatus # Pydantic models for parsing, Added ValidationStatus
 from data.exceptions import (
     DataValidationException,
@@ -126,6 +129,8 @@ class ValidationAgent(BaseAgent):
         self.batch_timeout_seconds = settings_dict.pop('batch_timeout_seconds', 3.0)
         self.enable_caching = settings_dict.pop('enable_caching', True)
         self.cache_ttl_seconds = settings_dict.pop('cache_ttl_seconds', 300)  # 5 minutes
+        history_window_size = settings_dict.pop('history_window_size', 100)
+        history_cache_max_sensors = settings_dict.pop('history_cache_max_sensors', 1024)
         self.enable_learning = settings_dict.pop('enable_learning', True)
         self.enable_circuit_breaker = settings_dict.pop('enable_circuit_breaker', True)
         
@@ -134,8 +139,7 @@ class ValidationAgent(BaseAgent):
         self.sensor_profiles: Dict[str, SensorValidationProfile] = {}
         self.processing_times: deque = deque(maxlen=100)  # Keep last 100 processing times
         
-        # Caching system
-        self.historical_data_cache: Dict[str, Tuple[List[SensorReading], datetime]] = {}
+        # Caching system (the per-sensor history windows are created once settings are known)
         self.rule_results_cache: Dict[str, Tuple[float, List[str], datetime]] = {}
         
         # Circuit breaker for database operations
@@ -165,6 +169,13 @@ class ValidationAgent(BaseAgent):
             if not hasattr(self.settings, key):
                 setattr(self.settings, key, value)
         
+        # Rolling per-sensor history windows, refreshed from the database every cache_ttl_seconds
+        self.history_cache = SensorWindowCache(
+            window_size=max(history_window_size, self.historical_check_limit),
+            max_sensors=history_cache_max_sensors,
+            refresh_seconds=self.cache_ttl_seconds,
+        )
+
         # Event types
         self.input_event_type = AnomalyDetectedEvent.__name__
         self.output_event_type = AnomalyValidatedEvent.__name__
@@ -184,9 +195,9 @@ class ValidationAgent(BaseAgent):
             def orm_to_pydantic(self, orm_obj):
                 return orm_obj
             
-            async def get_sensor_readings_by_sensor_id(self, db, sensor_id, end_time, limit):
-                # Return empty list as fallback
-                return []
+            async def fetch_series(self, db, sensor_id, end_time=None, limit=100):
+                # Return an empty history as fallback
+                return SensorHistory(sensor_id=sensor_id)
         
         self.logger.warning("Using fallback CRUD implementation - historical data features disabled")
         return FallbackCRUD()
@@ -225,6 +236,12 @@ class ValidationAgent(BaseAgent):
                 event_type_name=self.input_event_type, handler=self.process
             )
             
+            if self.enable_caching:
+                # Live readings keep the cached history windows current
+                await self.event_bus.subscribe(
+                    event_type_name=DataProcessedEvent.__name__, handler=self._observe_reading
+                )
+            
             # Start batch processing timer if enabled
             if self.batch_processing_enabled:
                 self.batch_timer_task = asyncio.create_task(self._batch_timer())
@@ -260,6 +277,10 @@ class ValidationAgent(BaseAgent):
             await self.event_bus.unsubscribe(
                 event_type_name=self.input_event_type, handler=self.process
             )
+            if self.enable_caching:
+                await self.event_bus.unsubscribe(
+                    event_type_name=DataProcessedEvent.__name__, handler=self._observe_reading
+                )
             self.logger.info(f"Enhanced ValidationAgent {self.agent_id} stopped")
         else:
             self.logger.warning(f"Agent {self.agent_id} cannot stop gracefully: EventBus not provided")
@@ -275,6 +296,19 @@ class ValidationAgent(BaseAgent):
         else:
             await self._process_single_event(event)
 
+    async def _observe_reading(self, event: DataProcessedEvent) -> None:
+        """Extend the cached history window of the reading's sensor (if it has one)."""
+        data = getattr(event, "processed_data", None)
+        if not isinstance(data, dict) or data.get("sensor_id") not in self.history_cache:
+            return
+        try:
+            timestamp = data["timestamp"]
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            self.history_cache.append(data["sensor_id"], timestamp, float(data["value"]), data.get("quality"))
+        except Exception as e:  # noqa: BLE001 - a malformed reading only costs a cache refresh
+            self.logger.debug(f"Ignoring reading for history cache: {e}")
+
     async def _add_to_batch(self, event: AnomalyDetectedEvent) -> None:
         """Add event to batch processing queue."""
         self.batch_queue.append(event)
@@ -305,8 +339,19 @@ class ValidationAgent(BaseAgent):
         start_time = time.time()
         self.logger.info(f"Processing validation batch of {len(events)} events")
         
-        # Process events concurrently
-        tasks = [self._process_single_event(event) for event in events]
+        # One history query, one vectorized pattern analysis and one rule evaluation
+        # for the whole batch, then process events concurrently
+        prefetched = await self._prefetch_batch_histories(events)
+        historical_results = self._analyze_batch_histories(events, prefetched)
+        rule_results = await self._evaluate_batch_rules(events)
+        tasks = [
+            self._process_single_event(
+                event,
+                historical_result=historical_results.get(index),
+                rule_result=rule_results.get(index),
+            )
+            for index, event in enumerate(events)
+        ]
         await asyncio.gather(*tasks, return_exceptions=True)
         
         # Update batch metrics
@@ -315,7 +360,144 @@ class ValidationAgent(BaseAgent):
             f"Completed batch validation of {len(events)} events in {processing_time:.3f}s"
         )
 
-    async def _process_single_event(self, event: AnomalyDetectedEvent) -> None:
+    async def _prefetch_batch_histories(
+        self, events: List[AnomalyDetectedEvent]
+    ) -> Dict[int, SensorHistory]:
+        """
+        Fetch historical readings for every sensor in a batch with a single query.
+
+        Each sensor is fetched once, up to the latest cutoff among its events,
+        with room for ``historical_check_limit`` readings per event. Every
+        event's window (the readings at or before its own timestamp) is then
+        sliced locally. An event whose window may extend past the fetched rows
+        is left out and falls back to the per-event fetch path. Events the
+        sensor window cache already answers are not queried at all.
+
+        Returns histories keyed by event index.
+        """
+        bulk_fetch = getattr(self.crud_sensor_reading, "get_recent_readings_for_sensors", None)
+        can_query = (
+            bool(self.db_session_factory)
+            and asyncio.iscoroutinefunction(bulk_fetch)
+            and not self._is_db_circuit_breaker_open()
+        )
+        if not can_query and not self.enable_caching:
+            return {}
+
+        prefetched: Dict[int, SensorHistory] = {}
+        event_cutoffs: Dict[str, List[Tuple[int, datetime]]] = {}
+        for index, event in enumerate(events):
+            triggering_data = getattr(event, "triggering_data", None)
+            if not isinstance(triggering_data, dict):
+                continue
+            sensor_id = triggering_data.get("sensor_id")
+            if not sensor_id:
+                continue
+            try:
+                reading_timestamp = SensorReading(**triggering_data).timestamp
+            except Exception:  # noqa: BLE001 - invalid events are reported by the per-event path
+                continue
+            if self.enable_caching:
+                cached_history = self.history_cache.lookup(sensor_id, reading_timestamp, self.historical_check_limit)
+                if cached_history is not None:
+                    prefetched[index] = cached_history
+                    continue
+            event_cutoffs.setdefault(sensor_id, []).append((index, reading_timestamp))
+
+        if not event_cutoffs or not can_query:
+            return prefetched
+
+        limit_per_sensor = self.historical_check_limit * max(len(cutoffs) for cutoffs in event_cutoffs.values())
+        session: Optional[AsyncSession] = None
+        try:
+            session = self.db_session_factory()
+            histories = await bulk_fetch(
+                session,
+                sensor_ids=list(event_cutoffs),
+                limit_per_sensor=limit_per_sensor,
+                end_times={
+                    sensor_id: max(timestamp for _, timestamp in cutoffs)
+                    for sensor_id, cutoffs in event_cutoffs.items()
+                },
+            )
+        except Exception as e:
+            self.logger.warning(f"Batch historical prefetch failed, using per-event fetches: {e}")
+            return prefetched
+        finally:
+            if session and hasattr(session, 'close'):
+                if asyncio.iscoroutinefunction(session.close):
+                    await session.close()
+                else:
+                    session.close()
+
+        self._reset_db_circuit_breaker()
+        for sensor_id, history in histories.items():
+            # A full result may have cut off older rows that an early event still needs
+            truncated = len(history) >= limit_per_sensor
+            for index, cutoff in event_cutoffs.get(sensor_id, []):
+                try:
+                    window = history.window(cutoff, self.historical_check_limit)
+                except TypeError:  # incomparable timestamps; let the per-event path handle it
+                    continue
+                if truncated and len(window) < self.historical_check_limit:
+                    continue
+                prefetched[index] = window
+
+        self.logger.debug(
+            f"Prefetched historical data for {len(prefetched)}/{len(events)} events "
+            f"({len(histories)} sensors) in one query"
+        )
+        return prefetched
+
+    def _analyze_batch_histories(
+        self, events: List[AnomalyDetectedEvent], prefetched: Dict[int, SensorHistory]
+    ) -> Dict[int, Tuple[float, List[str]]]:
+        """Historical validation results for every prefetched event, computed in one pass."""
+        indices: List[int] = []
+        current_values: List[Any] = []
+        for index in prefetched:
+            try:
+                current_values.append(SensorReading(**events[index].triggering_data).value)
+            except Exception:  # noqa: BLE001 - invalid events are reported by the per-event path
+                continue
+            indices.append(index)
+        if not indices:
+            return {}
+        results = self._analyze_history_windows(current_values, [prefetched[index] for index in indices])
+        return dict(zip(indices, results))
+
+    async def _evaluate_batch_rules(
+        self, events: List[AnomalyDetectedEvent]
+    ) -> Dict[int, Tuple[float, List[str]]]:
+        """Rule results for every parsable event, from one batch evaluation when the engine supports it."""
+        evaluate_batch = getattr(self.rule_engine, "evaluate_rules_batch", None)
+        if not asyncio.iscoroutinefunction(evaluate_batch):
+            return {}
+        indices: List[int] = []
+        pairs: List[Tuple[AnomalyAlert, SensorReading]] = []
+        for index, event in enumerate(events):
+            try:
+                pairs.append((AnomalyAlert(**event.anomaly_details), SensorReading(**event.triggering_data)))
+            except Exception:  # noqa: BLE001 - invalid events are reported by the per-event path
+                continue
+            indices.append(index)
+        if not pairs:
+            return {}
+        try:
+            results = await evaluate_batch(pairs)
+        except Exception as e:
+            self.logger.warning(f"Batch rule evaluation failed, evaluating per event: {e}")
+            return {}
+        if not isinstance(results, list) or len(results) != len(pairs):
+            return {}
+        return dict(zip(indices, results))
+
+    async def _process_single_event(
+        self,
+        event: AnomalyDetectedEvent,
+        historical_result: Optional[Tuple[float, List[str]]] = None,
+        rule_result: Optional[Tuple[float, List[str]]] = None,
+    ) -> None:
         """Process a single anomaly validation event."""
         start_time = time.time()
         
@@ -340,12 +522,15 @@ class ValidationAgent(BaseAgent):
                 await self._update_sensor_profile(parsed_alert.sensor_id, log_correlation_id)
             
             # Perform validation steps
-            rule_adj, rule_reasons = await self._perform_rule_validation(
-                parsed_alert, parsed_reading, log_correlation_id
-            )
+            if rule_result is not None:
+                rule_adj, rule_reasons = rule_result
+            else:
+                rule_adj, rule_reasons = await self._perform_rule_validation(
+                    parsed_alert, parsed_reading, log_correlation_id
+                )
             
             hist_adj, hist_reasons = await self._perform_historical_validation(
-                parsed_alert, parsed_reading, log_correlation_id
+                parsed_alert, parsed_reading, log_correlation_id, precomputed=historical_result
             )
             
             # Calculate final confidence and status
@@ -445,23 +630,46 @@ class ValidationAgent(BaseAgent):
                               extra={"correlation_id": correlation_id})
             return 0.0, [f"Rule validation failed: {str(e)}"]
 
-    async def _perform_historical_validation(self, alert: AnomalyAlert, reading: SensorReading, correlation_id: str) -> Tuple[float, List[str]]:
+    async def _perform_historical_validation(self, alert: AnomalyAlert, reading: SensorReading, correlation_id: str,
+                                           precomputed: Optional[Tuple[float, List[str]]] = None) -> Tuple[float, List[str]]:
         """Perform historical validation with circuit breaker and caching."""
+        if precomputed is not None:
+            # Already analyzed together with the rest of its batch
+            return precomputed
+
+        # Served from the sensor's rolling window, so it also works while the database is unavailable
+        if self.enable_caching:
+            cached_history = self.history_cache.lookup(alert.sensor_id, reading.timestamp, self.historical_check_limit)
+            if cached_history is not None:
+                self.logger.debug(f"Historical data cache hit for {alert.sensor_id}",
+                                extra={"correlation_id": correlation_id})
+                return self._analyze_historical_patterns(alert, reading, cached_history, correlation_id)
+
         # Check circuit breaker
         if self._is_db_circuit_breaker_open():
             return 0.0, ["Historical validation unavailable: database circuit breaker open"]
-        
-        # Check cache
-        cache_key = f"hist_{alert.sensor_id}_{reading.timestamp.isoformat()}"
-        if self.enable_caching and cache_key in self.historical_data_cache:
-            cached_data, cached_time = self.historical_data_cache[cache_key]
-            if (datetime.utcnow() - cached_time).total_seconds() < self.cache_ttl_seconds:
-                self.logger.debug(f"Historical data cache hit for {alert.sensor_id}",
-                                extra={"correlation_id": correlation_id})
-                return self._analyze_historical_patterns(alert, reading, cached_data, correlation_id)
 
         try:
-            # Fetch historical data
+            if self.enable_caching:
+                # Load the sensor's newest window once; live readings keep it current afterwards
+                window, fetch_error = await self._fetch_historical_data(
+                    sensor_id=alert.sensor_id,
+                    before_timestamp=None,
+                    limit=self.history_cache.window_size,
+                    correlation_id=correlation_id
+                )
+                if fetch_error:
+                    self._increment_db_circuit_breaker()
+                    return 0.0, [fetch_error]
+                self._reset_db_circuit_breaker()
+                self.history_cache.store(alert.sensor_id, window, requested=self.history_cache.window_size)
+                cached_history = self.history_cache.lookup(
+                    alert.sensor_id, reading.timestamp, self.historical_check_limit
+                )
+                if cached_history is not None:
+                    return self._analyze_historical_patterns(alert, reading, cached_history, correlation_id)
+
+            # Not cacheable (e.g. a reading older than the sensor's window): query its own window
             historical_readings, fetch_error = await self._fetch_historical_data(
                 sensor_id=alert.sensor_id,
                 before_timestamp=reading.timestamp,
@@ -469,10 +677,6 @@ class ValidationAgent(BaseAgent):
                 correlation_id=correlation_id
             )
             
-            # Cache the historical data
-            if self.enable_caching and not fetch_error:
-                self.historical_data_cache[cache_key] = (historical_readings, datetime.utcnow())
-            
             # Analyze patterns
             if fetch_error:
                 self._increment_db_circuit_breaker()
@@ -488,32 +692,68 @@ class ValidationAgent(BaseAgent):
             return 0.0, [f"Historical validation error: {str(e)}"]
 
     def _analyze_historical_patterns(self, alert: AnomalyAlert, reading: SensorReading, 
-                                   historical_readings: List[SensorReading], correlation_id: str) -> Tuple[float, List[str]]:
+                                   historical_readings: Union[SensorHistory, List[SensorReading]],
+                                   correlation_id: str) -> Tuple[float, List[str]]:
         """Analyze historical patterns for validation (enhanced version of original logic)."""
-        if not historical_readings:
-            return 0.0, ["No historical readings available for context"]
-        
-        historical_confidence_adjustment = 0.0
-        historical_reasons = []
-        
-        # Enhanced stability analysis
-        window = getattr(self.settings, "recent_stability_window", 5)
-        if len(historical_readings) >= window:
-            recent_values = [r.value for r in historical_readings[:window]]
-            avg_recent_value = sum(recent_values) / len(recent_values)
-            variance = sum([(x - avg_recent_value) ** 2 for x in recent_values]) / len(recent_values)
-            std_dev_recent = variance ** 0.5
-            
-            # Stability assessment
-            stability_factor = getattr(self.settings, "recent_stability_factor", 0.1)
-            min_std_dev = getattr(self.settings, "recent_stability_min_std_dev", 0.05)
-            is_stable = std_dev_recent < (stability_factor * abs(avg_recent_value) + 1e-6) or std_dev_recent < min_std_dev
-            
-            current_value = reading.value
-            if isinstance(current_value, (int, float)):
+        return self._analyze_history_windows([reading.value], [historical_readings])[0]
+
+    def _analyze_history_windows(
+        self,
+        current_values: List[Any],
+        windows: List[Union[SensorHistory, List[SensorReading]]],
+    ) -> List[Tuple[float, List[str]]]:
+        """
+        Historical pattern analysis for many alerts at once.
+
+        Every window is right-aligned (newest reading last) in a NaN-padded
+        matrix, so the stability, pattern-frequency and quality metrics of all
+        alerts are computed with a handful of array operations instead of
+        per-alert Python loops.
+        """
+        columns = [self._history_columns(window) for window in windows]
+        counts = np.array([len(values) for values, _ in columns], dtype=int)
+        width = max(int(counts.max(initial=0)), 1)
+        values = np.full((len(columns), width), np.nan)
+        quality = np.full((len(columns), width), np.nan)
+        for row, (row_values, row_quality) in enumerate(columns):
+            if len(row_values):
+                values[row, width - len(row_values):] = row_values
+                quality[row, width - len(row_values):] = row_quality
+
+        stability_window = max(1, int(getattr(self.settings, "recent_stability_window", 5)))
+        anomaly_threshold = getattr(self.settings, "pattern_anomaly_threshold", 0.2)
+        with np.errstate(invalid="ignore"):
+            # Stability of the most recent readings (only meaningful for full windows)
+            recent = values[:, -stability_window:]
+            recent_mean = recent.mean(axis=1)
+            recent_std = recent.std(axis=1)
+            # Share of consecutive readings that jump by more than the threshold
+            previous = values[:, :-1]
+            jumps = np.abs(values[:, 1:] - previous) / (np.abs(previous) + 1e-6) > anomaly_threshold
+            pattern_frequency = jumps.sum(axis=1) / np.maximum(counts - 1, 1)
+            # Average quality over the readings that report one
+            has_quality = ~np.isnan(quality)
+            quality_counts = has_quality.sum(axis=1)
+            avg_quality = np.where(has_quality, quality, 0.0).sum(axis=1) / np.maximum(quality_counts, 1)
+
+        stability_factor = getattr(self.settings, "recent_stability_factor", 0.1)
+        min_std_dev = getattr(self.settings, "recent_stability_min_std_dev", 0.05)
+        results: List[Tuple[float, List[str]]] = []
+        for row, current_value in enumerate(current_values):
+            if not counts[row]:
+                results.append((0.0, ["No historical readings available for context"]))
+                continue
+            historical_confidence_adjustment = 0.0
+            historical_reasons = []
+
+            # Enhanced stability analysis
+            if counts[row] >= stability_window and isinstance(current_value, (int, float)):
+                avg_recent_value = float(recent_mean[row])
+                std_dev_recent = float(recent_std[row])
+                is_stable = std_dev_recent < (stability_factor * abs(avg_recent_value) + 1e-6) or std_dev_recent < min_std_dev
                 deviation = abs(current_value - avg_recent_value)
                 threshold = 3 * (std_dev_recent + 1e-3)
-                
+
                 if is_stable:
                     if deviation > threshold:
                         adjustment = getattr(self.settings, "recent_stability_jump_adjustment", 0.15)
@@ -529,38 +769,34 @@ class ValidationAgent(BaseAgent):
                     adjustment = getattr(self.settings, "volatile_baseline_adjustment", 0.05)
                     historical_confidence_adjustment += adjustment
                     historical_reasons.append(f"Anomaly during volatile period (std_dev: {std_dev_recent:.3f})")
-        
-        # Pattern frequency analysis
-        if len(historical_readings) >= 3:
-            similar_patterns = 0
-            anomaly_threshold = getattr(self.settings, "pattern_anomaly_threshold", 0.2)
-            
-            for i in range(len(historical_readings) - 1):
-                current_val = historical_readings[i].value
-                previous_val = historical_readings[i + 1].value
-                
-                if isinstance(current_val, (int, float)) and isinstance(previous_val, (int, float)):
-                    denominator = abs(previous_val) + 1e-6
-                    percentage_diff = abs(current_val - previous_val) / denominator
-                    if percentage_diff > anomaly_threshold:
-                        similar_patterns += 1
-            
-            pattern_frequency = similar_patterns / (len(historical_readings) - 1)
-            if pattern_frequency > 0.3:  # More than 30% of patterns are anomalous
+
+            # Pattern frequency analysis
+            if counts[row] >= 3 and pattern_frequency[row] > 0.3:  # More than 30% of patterns are anomalous
                 penalty = getattr(self.settings, "recurring_anomaly_penalty", -0.08)
                 historical_confidence_adjustment += penalty
-                historical_reasons.append(f"Recurring anomaly pattern detected ({pattern_frequency:.1%} frequency)")
-        
-        # Quality trend analysis
-        quality_scores = [r.quality_score for r in historical_readings if hasattr(r, 'quality_score') and r.quality_score is not None]
-        if quality_scores:
-            avg_quality = sum(quality_scores) / len(quality_scores)
-            if avg_quality < 0.7:
+                historical_reasons.append(f"Recurring anomaly pattern detected ({pattern_frequency[row]:.1%} frequency)")
+
+            # Quality trend analysis
+            if quality_counts[row] and avg_quality[row] < 0.7:
                 quality_penalty = getattr(self.settings, "low_quality_penalty", -0.03)
                 historical_confidence_adjustment += quality_penalty
-                historical_reasons.append(f"Low historical data quality (avg: {avg_quality:.2f})")
-        
-        return historical_confidence_adjustment, historical_reasons
+                historical_reasons.append(f"Low historical data quality (avg: {avg_quality[row]:.2f})")
+
+            results.append((historical_confidence_adjustment, historical_reasons))
+        return results
+
+    @staticmethod
+    def _history_columns(
+        historical_readings: Union[SensorHistory, List[SensorReading]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Values and quality scores (NaN when missing) of a history, oldest first."""
+        if isinstance(historical_readings, SensorHistory):
+            return historical_readings.values, historical_readings.quality
+        readings = historical_readings[::-1]  # reading lists are newest first
+        return (
+            np.array([reading.value for reading in readings], dtype=float),
+            np.array([np.nan if reading.quality is None else reading.quality for reading in readings], dtype=float),
+        )
 
     def _determine_validation_status(self, final_confidence: float) -> ValidationDecision:
         """Determine validation status based on confidence and thresholds."""
@@ -712,7 +948,8 @@ class ValidationAgent(BaseAgent):
             'sensor_count': len(self.sensor_profiles),
             'db_circuit_breaker_open': self.db_circuit_breaker_open,
             'db_circuit_breaker_failures': self.db_circuit_breaker_failures,
-            'cache_size': len(self.historical_data_cache) + len(self.rule_results_cache),
+            'cache_size': len(self.history_cache) + len(self.rule_results_cache),
+            'history_cache': self.history_cache.get_stats(),
             'batch_queue_size': len(self.batch_queue)
         }
 
@@ -738,13 +975,13 @@ class ValidationAgent(BaseAgent):
 
     async def clear_cache(self) -> None:
         """Clear validation caches."""
-        self.historical_data_cache.clear()
+        self.history_cache.clear()
         self.rule_results_cache.clear()
         self.logger.info("Validation caches cleared")
 
-    async def _fetch_historical_data(self, sensor_id: str, before_timestamp: datetime, 
-                                   limit: int = 20, correlation_id: Optional[str] = None) -> Tuple[List[SensorReading], Optional[str]]:
-        """Fetch historical sensor readings with enhanced error handling."""
+    async def _fetch_historical_data(self, sensor_id: str, before_timestamp: Optional[datetime], 
+                                   limit: int = 20, correlation_id: Optional[str] = None) -> Tuple[SensorHistory, Optional[str]]:
+        """Fetch historical sensor readings (columnar, oldest first) with enhanced error handling."""
         self.logger.debug(
             f"Fetching historical data for sensor {sensor_id} before {before_timestamp}",
             extra={"correlation_id": correlation_id}
@@ -753,24 +990,18 @@ class ValidationAgent(BaseAgent):
         if not self.db_session_factory:
             error_msg = "Cannot fetch historical data: Database session factory not provided"
             self.logger.warning(error_msg, extra={"correlation_id": correlation_id})
-            return [], error_msg
+            return SensorHistory(sensor_id=sensor_id), error_msg
 
         session: Optional[AsyncSession] = None
         try:
             session = self.db_session_factory()
-            historical_readings_orm = await self.crud_sensor_reading.get_sensor_readings_by_sensor_id(
+            historical_readings = await self.crud_sensor_reading.fetch_series(
                 db=session,
                 sensor_id=sensor_id,
                 end_time=before_timestamp,
                 limit=limit
             )
             
-            # Convert ORM objects to Pydantic schemas
-            historical_readings = [
-                self.crud_sensor_reading.orm_to_pydantic(orm_obj) 
-                for orm_obj in historical_readings_orm if orm_obj
-            ]
-            
             self.logger.debug(
                 f"Fetched {len(historical_readings)} historical readings for sensor {sensor_id}",
                 extra={"correlation_id": correlation_id}
@@ -784,7 +1015,7 @@ class ValidationAgent(BaseAgent):
                 exc_info=True,
                 extra={"correlation_id": correlation_id}
             )
-            return [], error_msg
+            return SensorHistory(sensor_id=sensor_id), error_msg
             
         finally:
             if session and hasattr(session, 'close'):
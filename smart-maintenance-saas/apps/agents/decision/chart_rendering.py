@@ -0,0 +1,284 @@
+"""
+Chart rendering for reports in worker processes, with a byte cache.
+
+``ReportingAgent`` used to draw charts with pyplot's global figure state from
+the API's report threads. That serialized on the GIL and was unsafe when two
+reports rendered at once. Charts are now rendered here:
+
+- ``render_chart`` draws with the object-oriented ``Figure`` API (no pyplot
+  state) and runs in a small pool of "spawn" worker processes, so concurrent
+  reports render in parallel;
+- rendered PNG/SVG bytes are cached in an LRU keyed by a hash of the chart
+  data, output format and style, so repeated dashboards skip rendering.
+  Identical charts requested while one is rendering share that render;
+- line series longer than ``REPORTING_CHART_MAX_POINTS`` are decimated with
+  largest-triangle-three-buckets before they are sent to a worker, which keeps
+  peaks and troughs while bounding pickling and drawing cost.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import math
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHART_STYLE: Dict[str, Any] = {
+    "figsize": (10, 6),
+    "dpi": 150,
+    "linewidth": 2,
+    "markersize": 4,
+    "max_markers": 100,  # longer series are drawn without point markers
+    "max_xticks": 12,
+    "title_fontsize": 14,
+    "label_fontsize": 12,
+}
+CHART_FORMATS = ("png", "svg")
+LINE_SERIES_KEYS = ("anomaly_counts", "uptime_percentages", "values")
+
+
+def decimate(values: Sequence[float], max_points: int) -> np.ndarray:
+    """
+    Indices of at most ``max_points`` points of ``values`` chosen by largest-triangle-three-buckets.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket.
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if max_points < 3 or n <= max_points:
+        return np.arange(n)
+    x = np.arange(n, dtype=float)
+    every = (n - 2) / (max_points - 2)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start = int(math.floor(bucket * every)) + 1
+        end = int(math.floor((bucket + 1) * every)) + 1
+        next_end = min(int(math.floor((bucket + 2) * every)) + 1, n)
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = np.nanmean(y[end:next_end]) if next_end > end else y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def prepare_chart_data(chart_data: Dict[str, Any], max_points: int) -> Dict[str, Any]:
+    """``chart_data`` with its line series decimated to ``max_points``."""
+    if chart_data.get("chart_type", "line") != "line":
+        return chart_data
+    dates = chart_data.get("dates") or []
+    for key in LINE_SERIES_KEYS:
+        values = chart_data.get(key)
+        if values and len(values) == len(dates) and len(values) > max_points:
+            keep = decimate(values, max_points)
+            return {**chart_data, "dates": [dates[i] for i in keep], key: [values[i] for i in keep]}
+    return chart_data
+
+
+def chart_cache_key(chart_data: Dict[str, Any], fmt: str, max_points: int) -> str:
+    """Hash of everything that determines the rendered bytes."""
+    payload = json.dumps(
+        {"data": chart_data, "format": fmt, "max_points": max_points, "style": CHART_STYLE},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_chart(chart_data: Dict[str, Any], fmt: str = "png") -> bytes:
+    """
+    Draw ``chart_data`` and return the image bytes.
+
+    Runs in pool workers (and in the calling thread when no pool is
+    configured); uses only the ``Figure`` API, so it is safe to run
+    concurrently.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import MaxNLocator
+
+    style = CHART_STYLE
+    fig = Figure(figsize=style["figsize"])
+    ax = fig.subplots()
+
+    chart_type = chart_data.get("chart_type", "line")
+    if chart_type == "line":
+        dates = chart_data.get("dates", [])
+        values = next((chart_data[key] for key in LINE_SERIES_KEYS if chart_data.get(key)), [])
+
+        if dates and values and len(dates) == len(values):
+            marker = "o" if len(values) <= style["max_markers"] else None
+            ax.plot(dates, values, marker=marker, linewidth=style["linewidth"], markersize=style["markersize"])
+            ax.xaxis.set_major_locator(MaxNLocator(style["max_xticks"]))
+            # Rotate x-axis labels for better readability
+            ax.tick_params(axis="x", labelrotation=45)
+        else:
+            # Fallback to simple plot if data doesn't match
+            ax.plot([1, 2, 3, 4, 5], [1, 4, 2, 3, 5], marker="o")
+
+    elif chart_type == "bar":
+        categories = chart_data.get("categories", ["A", "B", "C"])
+        values = chart_data.get("values", [1, 2, 3])
+
+        if len(categories) == len(values):
+            ax.bar(categories, values)
+        else:
+            # Fallback bar chart
+            ax.bar(["A", "B", "C"], [1, 2, 3])
+
+    ax.set_title(chart_data.get("title", "Chart"), fontsize=style["title_fontsize"], fontweight="bold")
+    ax.set_xlabel(chart_data.get("xlabel", "X"), fontsize=style["label_fontsize"])
+    ax.set_ylabel(chart_data.get("ylabel", "Y"), fontsize=style["label_fontsize"])
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=style["dpi"], bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _worker_ready() -> bool:
+    """Worker initializer: import matplotlib's Agg machinery before the first chart."""
+    from matplotlib.backends import backend_agg  # noqa: F401
+
+    return True
+
+
+class ChartRenderer:
+    """Renders report charts in worker processes and caches the bytes."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_max_entries: Optional[int] = None,
+        max_points: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+    ):
+        self.workers = max(0, workers if workers is not None else settings.REPORTING_CHART_WORKERS)
+        self.cache_max_entries = max(
+            0, cache_max_entries if cache_max_entries is not None else settings.REPORTING_CHART_CACHE_MAX_ENTRIES
+        )
+        self.max_points = max_points if max_points is not None else settings.REPORTING_CHART_MAX_POINTS
+        self.timeout_seconds = (
+            timeout_seconds if timeout_seconds is not None else settings.REPORTING_CHART_TIMEOUT_SECONDS
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "rendered": 0, "failed": 0, "decimated": 0, "evictions": 0}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_ready,
+            )
+        return self._executor
+
+    def render(self, chart_data: Dict[str, Any], fmt: str = "png") -> Optional[bytes]:
+        """
+        Image bytes of ``chart_data`` in ``fmt`` ("png" or "svg"), from the cache when possible.
+
+        Returns None when there is nothing to draw. Rendering errors and
+        timeouts are raised.
+        """
+        if not chart_data or chart_data.get("chart_type") == "none":
+            return None
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Unsupported chart format '{fmt}'; expected one of {CHART_FORMATS}")
+
+        timeout = self.timeout_seconds if self.timeout_seconds > 0 else None
+        key = chart_cache_key(chart_data, fmt, self.max_points)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached
+            pending = self._inflight.get(key)
+            if pending is None:
+                self.stats["misses"] += 1
+                # Later callers for the same chart wait on this instead of rendering again
+                self._inflight[key] = shared = Future()
+            else:
+                self.stats["shared"] += 1
+
+        if pending is not None:
+            return pending.result(timeout=timeout)
+
+        try:
+            prepared = prepare_chart_data(chart_data, self.max_points)
+            image = self._render(prepared, fmt, timeout)
+        except Exception as render_error:
+            with self._lock:
+                self.stats["failed"] += 1
+                self._inflight.pop(key, None)
+            shared.set_exception(render_error)
+            raise
+
+        with self._lock:
+            self.stats["rendered"] += 1
+            if prepared is not chart_data:
+                self.stats["decimated"] += 1
+            self._inflight.pop(key, None)
+            self._store(key, image)
+        shared.set_result(image)
+        return image
+
+    def _render(self, chart_data: Dict[str, Any], fmt: str, timeout: Optional[float]) -> bytes:
+        if self.workers == 0:
+            return render_chart(chart_data, fmt)
+        try:
+            future = self.executor.submit(render_chart, chart_data, fmt)
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; start a fresh one
+            logger.warning("Chart render pool is broken, starting a new one")
+            self._executor = None
+            future = self.executor.submit(render_chart, chart_data, fmt)
+        return future.result(timeout=timeout)
+
+    def _store(self, key: str, image: bytes) -> None:
+        if self.cache_max_entries == 0:
+            return
+        self._cache[key] = image
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "cached_charts": len(self._cache),
+                "cached_bytes": sum(len(image) for image in self._cache.values()),
+                "workers": self.workers,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -4,23 +4,44 @@ PredictionAgent: An AI agent responsible for generating time-to-failure predicti
 This agent subscribes to AnomalyValidatedEvent, analyzes historical sensor data,
 and uses the Prophet library to make maintenance predictions. It publishes
 MaintenancePredictedEvent containing predictions and recommendations.
+
+Prophet fits never run on the event loop: with a ``ProphetProcessPool`` they
+are submitted to pre-warmed worker processes, otherwise they run in a thread.
+Fits are cached per sensor (``ProphetFitCache``); a sensor is only refitted
+after enough new readings or time, starting from its previous parameters.
+
+Before fitting Prophet at all, a robust linear trend (``apps.ml.trend_forecast``)
+estimates the time to the failure threshold. Prophet is only fitted when that
+estimate is not confident enough or the threshold may be reached soon.
+
+Anomaly bursts produce many triggers for the same sensor. Triggers are
+coalesced per equipment/sensor: the first one schedules a background run that
+waits ``prediction_debounce_seconds`` and predicts from the latest trigger
+received by then, so the event handler returns at once and the publisher never
+waits out the window; at most one prediction per sensor is in flight, and
+triggers arriving during it share one follow-up run.
 """
 
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable, Tuple
+from typing import Any, Dict, List, Optional, Callable, Set, Tuple, Union
 
 try:
+    import numpy as np
     import pandas as pd
     from prophet import Prophet
 except ImportError as e:
     raise ImportError(f"Required dependencies not available: {e}. Please install Prophet and pandas.")
 
 # Core application imports
+from apps.ml import trend_forecast
+from apps.ml.prophet_cache import ProphetFitCache
+from apps.ml.prophet_pool import ProphetProcessPool, fit_and_forecast_warm
 from core.base_agent_abc import BaseAgent, AgentCapability
+from core.config.settings import settings as app_settings
 from core.events.event_bus import EventBus
-from core.database.crud.crud_sensor_reading import CRUDSensorReading
+from core.database.crud.crud_sensor_reading import CRUDSensorReading, SensorHistory
 from core.events.event_models import AnomalyValidatedEvent, MaintenancePredictedEvent
 from data.schemas import SensorReading
 
@@ -45,7 +66,9 @@ class PredictionAgent(BaseAgent):
         event_bus: EventBus,
         crud_sensor_reading: CRUDSensorReading,
         db_session_factory: Optional[Callable[[], AsyncSession]] = None,
-        specific_settings: Optional[Dict[str, Any]] = None
+        specific_settings: Optional[Dict[str, Any]] = None,
+        prophet_pool: Optional[ProphetProcessPool] = None,
+        fit_cache: Optional[ProphetFitCache] = None,
     ):
         """
         Initialize the PredictionAgent.
@@ -56,6 +79,8 @@ class PredictionAgent(BaseAgent):
             crud_sensor_reading: CRUD interface for sensor data access
             db_session_factory: Factory function to create database sessions
             specific_settings: Configuration settings specific to this agent
+            prophet_pool: Worker processes for Prophet fits (fits run in a thread when omitted)
+            fit_cache: Per-sensor cache of Prophet fits (built from settings when omitted)
         """
         super().__init__(agent_id=agent_id, event_bus=event_bus)
         self.logger = logging.getLogger(f"{__name__}.{self.agent_id}")
@@ -72,6 +97,38 @@ class PredictionAgent(BaseAgent):
         self.prediction_horizon_days = self.settings.get("prediction_horizon_days", 90)
         self.historical_data_limit = self.settings.get("historical_data_limit", 1000)
         self.confidence_threshold = self.settings.get("prediction_confidence_threshold", 0.6)
+        self.prophet_timeout_seconds = self.settings.get(
+            "prophet_timeout_seconds", app_settings.PREDICTION_PROPHET_TIMEOUT_SECONDS
+        )
+        self.failure_threshold_multiplier = self.settings.get("failure_threshold_multiplier", 2.0)
+        self.fast_path_enabled = self.settings.get("fast_path_enabled", app_settings.PREDICTION_FAST_PATH_ENABLED)
+        self.fast_path_window = self.settings.get("fast_path_window", app_settings.PREDICTION_FAST_PATH_WINDOW)
+        self.fast_path_min_confidence = self.settings.get(
+            "fast_path_min_confidence", app_settings.PREDICTION_FAST_PATH_MIN_CONFIDENCE
+        )
+        self.fast_path_escalation_days = self.settings.get(
+            "fast_path_escalation_days", app_settings.PREDICTION_FAST_PATH_ESCALATION_DAYS
+        )
+        self.debounce_seconds = self.settings.get(
+            "prediction_debounce_seconds", app_settings.PREDICTION_DEBOUNCE_SECONDS
+        )
+        self.prophet_pool = prophet_pool
+        self.fit_cache = fit_cache or ProphetFitCache(
+            max_sensors=app_settings.PREDICTION_PROPHET_CACHE_MAX_SENSORS,
+            refit_after_points=self.settings.get(
+                "prophet_refit_after_points", app_settings.PREDICTION_PROPHET_REFIT_AFTER_POINTS
+            ),
+            refit_interval_seconds=self.settings.get(
+                "prophet_refit_interval_seconds", app_settings.PREDICTION_PROPHET_REFIT_INTERVAL_SECONDS
+            ),
+            warm_start=app_settings.PREDICTION_PROPHET_WARM_START,
+        )
+        self._prophet_pool_warmup: Optional[asyncio.Task] = None
+        # Trigger coalescing state, keyed by (equipment_id, sensor_id)
+        self._pending_triggers: Dict[Tuple[str, str], AnomalyValidatedEvent] = {}
+        self._active_keys: Set[Tuple[str, str]] = set()
+        self._prediction_runs: Set[asyncio.Task] = set()
+        self.trigger_stats = {"triggers": 0, "runs": 0, "coalesced": 0}
         
         self.logger.info(
             f"PredictionAgent '{self.agent_id}' initialized. "
@@ -110,6 +167,9 @@ class PredictionAgent(BaseAgent):
             )
         else:
             self.logger.error(f"Agent {self.agent_id} cannot start: EventBus not provided.")
+        if self.prophet_pool is not None and app_settings.PREDICTION_PROPHET_PREWARM:
+            # Pre-warm in the background so agent startup is not delayed by Prophet imports.
+            self._prophet_pool_warmup = asyncio.create_task(self.prophet_pool.start())
 
     async def stop(self) -> None:
         """Stop the agent and unsubscribe from events."""
@@ -125,6 +185,17 @@ class PredictionAgent(BaseAgent):
             self.logger.warning(
                 f"Agent {self.agent_id} cannot stop gracefully: EventBus not provided during init."
             )
+        if self._prophet_pool_warmup is not None:
+            self._prophet_pool_warmup.cancel()
+            self._prophet_pool_warmup = None
+        self._pending_triggers.clear()
+        runs = list(self._prediction_runs)
+        for run in runs:
+            run.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+        self._active_keys.clear()
+        if self.prophet_pool is not None:
+            self.prophet_pool.shutdown()
         await super().stop()
 
     async def process(self, event: AnomalyValidatedEvent) -> None:
@@ -158,7 +229,64 @@ class PredictionAgent(BaseAgent):
                 )
                 return
 
-            # 3. Fetch historical data for prediction
+            # 3. Coalesce triggers per equipment/sensor: the first one schedules the
+            #    prediction after the debounce window, later ones only update it
+            key = (equipment_id, sensor_id)
+            self.trigger_stats["triggers"] += 1
+            self._pending_triggers[key] = event
+            if key in self._active_keys:
+                self.trigger_stats["coalesced"] += 1
+                self.logger.debug(
+                    f"Coalesced event {getattr(event, 'event_id', 'N/A')} into the pending prediction "
+                    f"for sensor {sensor_id}"
+                )
+                return
+            self._active_keys.add(key)
+            self._schedule_run(key)
+
+        except Exception as e:
+            self.logger.error(
+                f"Unhandled error processing AnomalyValidatedEvent "
+                f"{getattr(event, 'event_id', 'N/A')} (Correlation ID: {log_correlation_id}): {e}",
+                exc_info=True,
+            )
+
+    def _schedule_run(self, key: Tuple[str, str]) -> None:
+        """Run the coalesced prediction for ``key`` in a tracked background task."""
+        run = asyncio.create_task(self._run_coalesced(key))
+        self._prediction_runs.add(run)
+        run.add_done_callback(self._prediction_runs.discard)
+
+    async def wait_for_predictions(self) -> None:
+        """Wait until all scheduled predictions, including follow-up runs, have finished."""
+        while self._prediction_runs:
+            await asyncio.gather(*list(self._prediction_runs), return_exceptions=True)
+
+    async def _run_coalesced(self, key: Tuple[str, str]) -> None:
+        """
+        Predict from the latest pending trigger of ``key`` after the debounce window.
+
+        Triggers that arrive while the prediction runs are served by a single
+        follow-up run, so at most one prediction per sensor is in flight.
+        """
+        try:
+            if self.debounce_seconds > 0:
+                await asyncio.sleep(self.debounce_seconds)
+            event = self._pending_triggers.pop(key, None)
+            if event is not None:
+                self.trigger_stats["runs"] += 1
+                await self._predict_for_event(event, equipment_id=key[0], sensor_id=key[1])
+        finally:
+            if key in self._pending_triggers:
+                self._schedule_run(key)
+            else:
+                self._active_keys.discard(key)
+
+    async def _predict_for_event(self, event: AnomalyValidatedEvent, equipment_id: str, sensor_id: str) -> None:
+        """Fetch history, predict and publish for one (coalesced) trigger."""
+        log_correlation_id = getattr(event, 'correlation_id', 'N/A')
+        try:
+            # Fetch historical data for prediction
             self.logger.debug(f"Fetching historical data for sensor {sensor_id}")
             historical_data, error_msg = await self._fetch_historical_data_for_prediction(
                 sensor_id=sensor_id,
@@ -176,19 +304,21 @@ class PredictionAgent(BaseAgent):
                 )
                 return
 
-            # 4. Prepare data for Prophet
+            # Prepare data for Prophet
             prophet_data = self._prepare_prophet_data(historical_data)
             if prophet_data is None or len(prophet_data) < self.min_historical_points:
                 self.logger.error("Failed to prepare data for Prophet modeling")
                 return
 
-            # 5. Generate prediction using Prophet
-            prediction_result = await self._generate_prediction(prophet_data, sensor_id)
+            # Generate prediction (trend fast path, escalating to Prophet)
+            prediction_result = self._fast_path_prediction(prophet_data, sensor_id)
+            if prediction_result is None:
+                prediction_result = await self._generate_prediction(prophet_data, sensor_id)
             if not prediction_result:
                 self.logger.error("Failed to generate prediction")
                 return
 
-            # 6. Create and publish MaintenancePredictedEvent
+            # Create and publish MaintenancePredictedEvent
             await self._publish_maintenance_prediction(
                 event=event,
                 equipment_id=equipment_id,
@@ -198,7 +328,7 @@ class PredictionAgent(BaseAgent):
 
         except Exception as e:
             self.logger.error(
-                f"Unhandled error processing AnomalyValidatedEvent "
+                f"Error predicting for AnomalyValidatedEvent "
                 f"{getattr(event, 'event_id', 'N/A')} (Correlation ID: {log_correlation_id}): {e}",
                 exc_info=True,
             )
@@ -267,17 +397,20 @@ class PredictionAgent(BaseAgent):
 
     async def _fetch_historical_data_for_prediction(
         self, sensor_id: str, limit: int = 1000
-    ) -> Tuple[List[SensorReading], Optional[str]]:
+    ) -> Tuple[SensorHistory, Optional[str]]:
         """
         Fetch historical sensor readings for prediction modeling.
-        
+
+        Readings come back as columnar arrays (``fetch_series``); no ORM or
+        Pydantic objects are built per reading.
+
         Returns:
-            Tuple of (readings_list, error_message)
+            Tuple of (history, error_message)
         """
         if not self.db_session_factory:
             error_msg = "Cannot fetch historical data: Database session factory not provided."
             self.logger.error(error_msg)
-            return [], error_msg
+            return SensorHistory(sensor_id=sensor_id), error_msg
 
         session: Optional[AsyncSession] = None
         try:
@@ -287,8 +420,7 @@ class PredictionAgent(BaseAgent):
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=365)
             
-            # Use CRUD helper method to get Pydantic objects with correct field mapping
-            historical_readings = await self.crud_sensor_reading.get_sensor_readings_as_pydantic(
+            historical_readings = await self.crud_sensor_reading.fetch_series(
                 db=session,
                 sensor_id=sensor_id,
                 start_time=start_time,
@@ -305,7 +437,7 @@ class PredictionAgent(BaseAgent):
         except Exception as e:
             error_msg = f"Error fetching historical data for sensor {sensor_id}: {e}"
             self.logger.error(error_msg, exc_info=True)
-            return [], error_msg
+            return SensorHistory(sensor_id=sensor_id), error_msg
             
         finally:
             if session and hasattr(session, 'close'):
@@ -315,40 +447,38 @@ class PredictionAgent(BaseAgent):
                     session.close()
                 self.logger.debug("Database session closed after fetching historical data.")
 
-    def _prepare_prophet_data(self, historical_readings: List[SensorReading]) -> Optional[pd.DataFrame]:
+    def _prepare_prophet_data(
+        self, historical_readings: Union[SensorHistory, List[SensorReading]]
+    ) -> Optional[pd.DataFrame]:
         """
         Prepare historical sensor data for Prophet modeling.
         
         Prophet expects a DataFrame with 'ds' (datestamp) and 'y' (value) columns.
         
         Args:
-            historical_readings: List of SensorReading objects
+            historical_readings: Columnar history (or a list of SensorReading objects)
             
         Returns:
             DataFrame formatted for Prophet, or None if preparation fails
         """
         try:
-            if not historical_readings:
+            if not len(historical_readings):
                 self.logger.warning("No historical readings provided for Prophet data preparation")
                 return None
 
-            # Convert to pandas DataFrame
-            data = []
-            for reading in historical_readings:
-                # Remove timezone info for Prophet compatibility
-                timestamp = reading.timestamp
-                if timestamp.tzinfo is not None:
-                    timestamp = timestamp.replace(tzinfo=None)
-                
-                data.append({
-                    'ds': timestamp,  # datestamp (timezone-naive)
-                    'y': reading.value       # value to predict
-                })
-            
-            df = pd.DataFrame(data)
+            history = (
+                historical_readings
+                if isinstance(historical_readings, SensorHistory)
+                else SensorHistory.from_readings(historical_readings[0].sensor_id, historical_readings)
+            )
+            df = pd.DataFrame({
+                # datestamp as naive UTC for Prophet compatibility
+                'ds': pd.to_datetime(history.timestamps, utc=True).tz_localize(None),
+                'y': history.values  # value to predict
+            })
             
             # Sort by timestamp to ensure chronological order
-            df = df.sort_values('ds').reset_index(drop=True)
+            df = df.sort_values('ds', kind='stable').reset_index(drop=True)
             
             # Remove any duplicate timestamps (keep last)
             df = df.drop_duplicates(subset=['ds'], keep='last')
@@ -383,28 +513,8 @@ class PredictionAgent(BaseAgent):
         try:
             self.logger.debug(f"Starting Prophet prediction for sensor {sensor_id}")
             
-            # Initialize Prophet model
-            # Configure based on data characteristics
-            model = Prophet(
-                daily_seasonality=True,
-                weekly_seasonality=True,
-                yearly_seasonality=True,
-                changepoint_prior_scale=0.05,  # Less sensitive to trend changes
-                seasonality_prior_scale=10.0,  # More flexible seasonalities
-                interval_width=0.8  # 80% confidence intervals
-            )
-            
-            # Train the model
-            model.fit(prophet_data)
-            
-            # Create future dataframe for prediction
-            future = model.make_future_dataframe(
-                periods=self.prediction_horizon_days, 
-                freq='D'
-            )
-            
-            # Generate predictions
-            forecast = model.predict(future)
+            # Fit and forecast off the event loop; only the forecast frame comes back
+            forecast = await self._fit_and_forecast(prophet_data, sensor_id)
             
             # Analyze trend and determine failure prediction
             prediction_result = self._analyze_forecast_for_failure(
@@ -415,7 +525,6 @@ class PredictionAgent(BaseAgent):
             
             # Calculate model performance metrics
             metrics = self._calculate_model_metrics(
-                model=model, 
                 historical_data=prophet_data, 
                 forecast=forecast
             )
@@ -430,10 +539,135 @@ class PredictionAgent(BaseAgent):
             
             return prediction_result
             
+        except asyncio.TimeoutError:
+            self.logger.error(
+                f"Prophet prediction for sensor {sensor_id} exceeded {self.prophet_timeout_seconds}s"
+            )
+            return None
         except Exception as e:
             self.logger.error(f"Error generating Prophet prediction for sensor {sensor_id}: {e}", exc_info=True)
             return None
 
+    async def _fit_and_forecast(self, prophet_data: pd.DataFrame, sensor_id: Optional[str] = None) -> pd.DataFrame:
+        """
+        Forecast the horizon for a sensor, reusing or warm-starting its cached fit.
+
+        Fits run in the process pool (or a worker thread) and are skipped while
+        the sensor's cached fit is still current.
+        """
+        cached = self.fit_cache.lookup(sensor_id) if sensor_id else None
+        if cached is not None and self.fit_cache.is_current(cached, prophet_data):
+            self.fit_cache.record_hit()
+            self.logger.debug(f"Reusing cached Prophet fit for sensor {sensor_id}")
+            return cached.forecast
+
+        init = self.fit_cache.warm_start_params(cached)
+        if self.prophet_pool is not None:
+            forecast, fitted_params = await self.prophet_pool.submit(
+                fit_and_forecast_warm, prophet_data, self.prediction_horizon_days, init
+            )
+        else:
+            timeout = self.prophet_timeout_seconds if self.prophet_timeout_seconds else None
+            forecast, fitted_params = await asyncio.wait_for(
+                asyncio.to_thread(
+                    fit_and_forecast_warm, prophet_data, self.prediction_horizon_days, init, None, Prophet
+                ),
+                timeout=timeout,
+            )
+        if sensor_id:
+            self.fit_cache.store(sensor_id, prophet_data, forecast, fitted_params, warm=init is not None)
+        return forecast
+
+    def _fast_path_prediction(self, prophet_data: pd.DataFrame, sensor_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Time-to-failure from a Theil-Sen trend of the recent readings, without Prophet.
+
+        Returns a result shaped like ``_generate_prediction``'s, or None when the
+        fast path is disabled, the trend is not confident enough, or the failure
+        threshold may be reached within ``fast_path_escalation_days`` (those
+        cases escalate to Prophet).
+        """
+        if not self.fast_path_enabled:
+            return None
+        try:
+            last_date = prophet_data['ds'].iloc[-1]
+            last_value = float(prophet_data['y'].iloc[-1])
+            failure_threshold = last_value * self.failure_threshold_multiplier
+            days = (prophet_data['ds'] - last_date).dt.total_seconds().to_numpy() / 86400.0
+            t, y = trend_forecast.stack_series([(days, prophet_data['y'].to_numpy())], self.fast_path_window)
+            estimate = trend_forecast.theil_sen(t, y)
+            crossing = trend_forecast.threshold_crossing(
+                estimate, np.array([failure_threshold]), horizon_days=self.prediction_horizon_days
+            )
+        except Exception as e:
+            self.logger.warning(f"Fast-path trend failed for sensor {sensor_id}: {e}")
+            return None
+
+        confidence = float(crossing.confidence[0])
+        earliest_days = float(crossing.lower_days[0])
+        if confidence < self.fast_path_min_confidence or earliest_days <= self.fast_path_escalation_days:
+            self.logger.debug(
+                f"Escalating sensor {sensor_id} to Prophet (fast-path confidence {confidence:.2f}, "
+                f"earliest threshold crossing in {earliest_days:.1f} days)"
+            )
+            return None
+
+        now = datetime.utcnow()
+        crossing_days = float(crossing.days[0])
+        if crossing_days <= self.prediction_horizon_days:
+            failure_date = last_date.to_pydatetime() + timedelta(days=crossing_days)
+            confidence_lower = last_date.to_pydatetime() + timedelta(days=earliest_days)
+            latest_days = float(crossing.upper_days[0])
+            confidence_upper = (
+                last_date.to_pydatetime() + timedelta(days=latest_days)
+                if latest_days <= self.prediction_horizon_days * 2
+                else now + timedelta(days=self.prediction_horizon_days * 2)
+            )
+        else:
+            # Same convention as the Prophet path when no failure is predicted within the horizon
+            failure_date = now + timedelta(days=self.prediction_horizon_days * 2)
+            confidence_lower = failure_date - timedelta(days=30)
+            confidence_upper = failure_date + timedelta(days=30)
+        time_to_failure = max(1, (failure_date - now).days)
+        trend_slope = float(estimate.slope[0])
+        maintenance_type = self._maintenance_type(time_to_failure)
+
+        self.logger.info(
+            f"Generated fast-path prediction for sensor {sensor_id}: "
+            f"failure in {time_to_failure} days (confidence {confidence:.2f})"
+        )
+        return {
+            'predicted_failure_date': failure_date,
+            'confidence_interval_lower': confidence_lower,
+            'confidence_interval_upper': confidence_upper,
+            'prediction_confidence': confidence,
+            'time_to_failure_days': float(time_to_failure),
+            'maintenance_type': maintenance_type,
+            'recommended_actions': self._generate_maintenance_recommendations(
+                time_to_failure=time_to_failure,
+                maintenance_type=maintenance_type,
+                trend_slope=trend_slope
+            ),
+            'trend_slope': trend_slope,
+            'failure_threshold': failure_threshold,
+            'prediction_method': 'trend_fast_path',
+            'model_metrics': {
+                'mae': float(estimate.mae[0]),
+                'rmse': float(estimate.rmse[0]),
+                'mape': float(estimate.mape[0]),
+            },
+            'historical_data_points': len(prophet_data),
+        }
+
+    @staticmethod
+    def _maintenance_type(time_to_failure: float) -> str:
+        """Maintenance type for a time to failure (in days)."""
+        if time_to_failure <= 7:
+            return "urgent_corrective"
+        if time_to_failure <= 30:
+            return "preventive"
+        return "inspection"
+
     def _analyze_forecast_for_failure(
         self, forecast: pd.DataFrame, historical_data: pd.DataFrame, sensor_id: str
     ) -> Dict[str, Any]:
@@ -467,8 +701,7 @@ class PredictionAgent(BaseAgent):
             
             # Determine failure based on trend and thresholds
             # This is domain-specific logic that you would customize
-            failure_threshold_multiplier = 2.0  # Configurable based on sensor type
-            failure_threshold = last_historical_value * failure_threshold_multiplier
+            failure_threshold = last_historical_value * self.failure_threshold_multiplier
             
             # Find when the prediction crosses the failure threshold
             failure_predictions = future_forecast[future_forecast['yhat'] >= failure_threshold]
@@ -498,13 +731,7 @@ class PredictionAgent(BaseAgent):
                 time_to_failure = (failure_date - datetime.utcnow()).days
                 relative_confidence = 0.3  # Lower confidence for long-term predictions
             
-            # Determine maintenance type based on time to failure
-            if time_to_failure <= 7:
-                maintenance_type = "urgent_corrective"
-            elif time_to_failure <= 30:
-                maintenance_type = "preventive"
-            else:
-                maintenance_type = "inspection"
+            maintenance_type = self._maintenance_type(time_to_failure)
             
             # Generate recommendations
             recommendations = self._generate_maintenance_recommendations(
@@ -578,7 +805,7 @@ class PredictionAgent(BaseAgent):
         return recommendations
 
     def _calculate_model_metrics(
-        self, model: Prophet, historical_data: pd.DataFrame, forecast: pd.DataFrame
+        self, historical_data: pd.DataFrame, forecast: pd.DataFrame
     ) -> Dict[str, float]:
         """Calculate model performance metrics."""
         try:
@@ -631,7 +858,7 @@ class PredictionAgent(BaseAgent):
                 'prediction_confidence': prediction_result['prediction_confidence'],
                 'time_to_failure_days': prediction_result['time_to_failure_days'],
                 'maintenance_type': prediction_result['maintenance_type'],
-                'prediction_method': 'prophet',
+                'prediction_method': prediction_result.get('prediction_method', 'prophet'),
                 'historical_data_points': prediction_result['historical_data_points'],
                 'model_metrics': prediction_result['model_metrics'],
                 'recommended_actions': prediction_result['recommended_actions'],
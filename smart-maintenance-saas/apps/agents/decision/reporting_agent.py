@@ -2,23 +2,25 @@
 ReportingAgent
 
 This module implements the ReportingAgent for generating simple text/JSON reports 
-with basic analytics and matplotlib charts for the Smart Maintenance SaaS system.
+with analytics aggregated in TimescaleDB and matplotlib charts for the Smart
+Maintenance SaaS system.
 """
 
 import base64
-import io
 import json
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
-import random
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
 
+from apps.agents.decision.chart_rendering import ChartRenderer
 from core.base_agent_abc import BaseAgent
+from core.config.settings import settings
 from data.schemas import ReportRequest, ReportResult
 from core.logging_config import get_logger
 
@@ -26,15 +28,105 @@ from core.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+def _sync_database_url(url: str) -> str:
+    """``settings.database_url`` with the synchronous psycopg2 driver named explicitly."""
+    for prefix in ("postgresql+asyncpg://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg2://" + url[len(prefix):]
+    return url
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+# Every query aggregates inside TimescaleDB and returns at most one row per day.
+# time_bucket_gapfill emits empty days too, so series are dense over the range.
+_QUERIES = {
+    "anomaly_series": text("""
+        SELECT time_bucket_gapfill(INTERVAL '1 day', created_at, :start, :end) AS bucket,
+               COALESCE(count(*), 0) AS anomalies
+        FROM anomaly_alerts
+        WHERE created_at >= :start AND created_at < :end
+        GROUP BY bucket
+        ORDER BY bucket
+    """),
+    "anomaly_totals": text("""
+        SELECT count(DISTINCT sensor_id) AS sensors_affected,
+               count(*) FILTER (WHERE status IN ('false_positive', 'false_positive_suspected', 'dismissed'))
+                   AS false_positives,
+               count(*) AS alerts
+        FROM anomaly_alerts
+        WHERE created_at >= :start AND created_at < :end
+    """),
+    "task_totals": text("""
+        SELECT count(*) AS total,
+               count(*) FILTER (WHERE status = 'completed') AS completed,
+               count(*) FILTER (WHERE status IN ('pending', 'in_progress')) AS pending,
+               count(*) FILTER (WHERE status NOT IN ('completed', 'cancelled') AND scheduled_end_time < :end) AS overdue,
+               avg(EXTRACT(EPOCH FROM actual_end_time - actual_start_time) / 3600.0)
+                   FILTER (WHERE actual_end_time IS NOT NULL AND actual_start_time IS NOT NULL) AS avg_completion_hours,
+               count(DISTINCT equipment_id) AS equipment
+        FROM maintenance_tasks
+        WHERE created_at >= :start AND created_at < :end
+    """),
+    "log_totals": text("""
+        SELECT avg(actual_duration_hours) AS mttr_hours,
+               COALESCE(sum(actual_duration_hours), 0) AS hours_logged,
+               count(DISTINCT technician_id) AS technicians,
+               count(DISTINCT equipment_id) AS equipment
+        FROM maintenance_logs
+        WHERE completion_date >= :start AND completion_date < :end
+    """),
+    "sensor_series": text("""
+        SELECT time_bucket_gapfill(INTERVAL '1 day', timestamp, :start, :end) AS bucket,
+               COALESCE(count(DISTINCT sensor_id), 0) AS reporting_sensors
+        FROM sensor_readings
+        WHERE timestamp >= :start AND timestamp < :end
+        GROUP BY bucket
+        ORDER BY bucket
+    """),
+    "sensor_totals": text("""
+        SELECT count(DISTINCT sensor_id) AS sensors,
+               count(DISTINCT sensor_id) FILTER (WHERE timestamp >= :active_since) AS active_sensors,
+               avg(quality) AS data_quality,
+               avg(EXTRACT(EPOCH FROM created_at - timestamp) * 1000.0) FILTER (WHERE created_at >= timestamp)
+                   AS ingestion_latency_ms
+        FROM sensor_readings
+        WHERE timestamp >= :start AND timestamp < :end
+    """),
+    "alert_totals": text("""
+        SELECT count(*) AS alerts,
+               count(*) FILTER (WHERE severity >= 4) AS critical_alerts
+        FROM anomaly_alerts
+        WHERE created_at >= :start AND created_at < :end
+    """),
+}
+
+
 class AnalyticsEngine:
     """
-    Mock analytics engine that simulates database fetching and KPI calculation.
-    In a real implementation, this would connect to actual databases and perform
-    complex analytics queries.
+    Analytics engine computing report KPIs from TimescaleDB.
+
+    KPIs are aggregated in the database: daily ``time_bucket_gapfill`` series and
+    single-row ``FILTER`` aggregates over ``sensor_readings``, ``anomaly_alerts``,
+    ``maintenance_tasks`` and ``maintenance_logs``, so only compact series ever
+    reach Python. Reports are generated in worker threads, so queries run on a
+    pooled synchronous engine created on first use.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, engine: Optional[Engine] = None):
+        self._engine = engine
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = create_engine(
+                _sync_database_url(str(settings.database_url)),
+                pool_pre_ping=True,
+                pool_size=settings.REPORTING_DB_POOL_SIZE,
+            )
+        return self._engine
 
     def analyze(self, report_request: ReportRequest) -> Dict[str, Any]:
         """
@@ -48,96 +140,127 @@ class AnalyticsEngine:
         """
         logger.info(f"Analyzing data for report type: {report_request.report_type}")
         
-        # Mock time range
-        end_time = report_request.time_range_end or datetime.now(timezone.utc)
-        start_time = report_request.time_range_start or (end_time - timedelta(days=30))
+        end_time = _as_utc(report_request.time_range_end or datetime.now(timezone.utc))
+        start_time = _as_utc(report_request.time_range_start) if report_request.time_range_start else end_time - timedelta(days=30)
         
-        # Generate mock data based on report type
         if report_request.report_type == "anomaly_summary":
-            return self._generate_anomaly_summary_data(start_time, end_time)
+            builder = self._generate_anomaly_summary_data
         elif report_request.report_type == "maintenance_overview":
-            return self._generate_maintenance_overview_data(start_time, end_time)
+            builder = self._generate_maintenance_overview_data
         elif report_request.report_type == "system_health":
-            return self._generate_system_health_data(start_time, end_time)
+            builder = self._generate_system_health_data
         else:
             return self._generate_default_data(start_time, end_time)
 
-    def _generate_anomaly_summary_data(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
-        """Generate mock anomaly summary data."""
-        days = (end_time - start_time).days
-        
-        # Generate time series data
-        dates = [start_time + timedelta(days=i) for i in range(days)]
-        anomaly_counts = [random.randint(0, 10) for _ in range(days)]
-        
+        started = time.perf_counter()
+        with self.engine.connect() as connection:
+            result = builder(connection, start_time, end_time)
+        logger.debug(
+            f"{report_request.report_type} analytics for {start_time} - {end_time} took "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return result
+
+    def _rows(self, connection: Connection, query: str, **params: Any) -> List[Dict[str, Any]]:
+        return [dict(row) for row in connection.execute(_QUERIES[query], params).mappings()]
+
+    def _generate_anomaly_summary_data(self, connection: Connection, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+        """Daily anomaly counts and alert totals."""
+        series = self._rows(connection, "anomaly_series", start=start_time, end=end_time)
+        totals = self._rows(connection, "anomaly_totals", start=start_time, end=end_time)[0]
+        anomaly_counts = [int(row["anomalies"]) for row in series]
+        alerts = int(totals["alerts"] or 0)
+
         return {
             "total_anomalies": sum(anomaly_counts),
             "avg_anomalies_per_day": sum(anomaly_counts) / len(anomaly_counts) if anomaly_counts else 0,
             "peak_anomaly_day": max(anomaly_counts) if anomaly_counts else 0,
-            "anomaly_trend": "increasing" if random.choice([True, False]) else "stable",
+            "anomaly_trend": self._trend(anomaly_counts),
             "chart_data": {
-                "dates": [d.strftime("%Y-%m-%d") for d in dates],
+                "dates": [row["bucket"].strftime("%Y-%m-%d") for row in series],
                 "anomaly_counts": anomaly_counts,
                 "chart_type": "line",
                 "title": "Anomalies Over Time",
                 "xlabel": "Date",
                 "ylabel": "Anomaly Count"
             },
-            "sensors_affected": random.randint(5, 20),
-            "false_positive_rate": round(random.uniform(0.05, 0.15), 3)
+            "sensors_affected": int(totals["sensors_affected"] or 0),
+            "false_positive_rate": round(int(totals["false_positives"] or 0) / alerts, 3) if alerts else 0.0
         }
 
-    def _generate_maintenance_overview_data(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
-        """Generate mock maintenance overview data."""
+    def _generate_maintenance_overview_data(self, connection: Connection, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+        """Task status counts, completion times and technician load."""
+        tasks = self._rows(connection, "task_totals", start=start_time, end=end_time)[0]
+        logs = self._rows(connection, "log_totals", start=start_time, end=end_time)[0]
+        completed, pending, overdue = (int(tasks[key] or 0) for key in ("completed", "pending", "overdue"))
+        hours_logged = float(logs["hours_logged"] or 0.0)
+        range_hours = max((end_time - start_time).total_seconds() / 3600.0, 1.0)
+        # Working hours are 08:00-18:00 on weekdays, as in the scheduler
+        working_hours = 10.0 * max(1, int(np.busday_count(start_time.date(), end_time.date())))
+        technicians = int(logs["technicians"] or 0)
+        equipment = max(int(tasks["equipment"] or 0), int(logs["equipment"] or 0))
+
         return {
-            "total_maintenance_tasks": random.randint(20, 50),
-            "completed_tasks": random.randint(15, 40),
-            "pending_tasks": random.randint(2, 8),
-            "overdue_tasks": random.randint(0, 3),
-            "avg_completion_time": round(random.uniform(2.5, 8.0), 2),
-            "mttr_hours": round(random.uniform(4.0, 12.0), 2),
+            "total_maintenance_tasks": int(tasks["total"] or 0),
+            "completed_tasks": completed,
+            "pending_tasks": pending,
+            "overdue_tasks": overdue,
+            "avg_completion_time": self._round(tasks["avg_completion_hours"]),
+            "mttr_hours": self._round(logs["mttr_hours"]),
             "chart_data": {
                 "categories": ["Completed", "Pending", "Overdue"],
-                "values": [random.randint(15, 40), random.randint(2, 8), random.randint(0, 3)],
+                "values": [completed, pending, overdue],
                 "chart_type": "bar",
                 "title": "Maintenance Task Status",
                 "xlabel": "Task Status",
                 "ylabel": "Number of Tasks"
             },
-            "technician_utilization": round(random.uniform(0.70, 0.95), 3),
-            "equipment_uptime": round(random.uniform(0.92, 0.99), 3)
+            "technician_utilization": round(min(hours_logged / (technicians * working_hours), 1.0), 3) if technicians else None,
+            # Share of equipment time not spent in logged maintenance
+            "equipment_uptime": round(max(0.0, 1.0 - hours_logged / (equipment * range_hours)), 3) if equipment else None
         }
 
-    def _generate_system_health_data(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
-        """Generate mock system health data."""
-        days = min((end_time - start_time).days, 14)  # Last 14 days max
-        dates = [start_time + timedelta(days=i) for i in range(days)]
-        uptime_percentages = [round(random.uniform(95.0, 99.9), 2) for _ in range(days)]
-        
+    def _generate_system_health_data(self, connection: Connection, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+        """Sensor availability, data quality and alert volume."""
+        chart_start = max(start_time, end_time - timedelta(days=14))  # Last 14 days max
+        series = self._rows(connection, "sensor_series", start=chart_start, end=end_time)
+        sensors = self._rows(
+            connection, "sensor_totals", start=start_time, end=end_time, active_since=end_time - timedelta(days=1)
+        )[0]
+        alerts = self._rows(connection, "alert_totals", start=start_time, end=end_time)[0]
+        total_sensors = int(sensors["sensors"] or 0)
+        active_sensors = int(sensors["active_sensors"] or 0)
+        uptime_percentages = [
+            round(100.0 * int(row["reporting_sensors"]) / total_sensors, 2) if total_sensors else 0.0 for row in series
+        ]
+        data_quality = float(sensors["data_quality"]) if sensors["data_quality"] is not None else 0.0
+        availability = sum(uptime_percentages) / len(uptime_percentages) if uptime_percentages else 0.0
+
         return {
-            "overall_system_health": round(random.uniform(85.0, 98.0), 2),
-            "active_sensors": random.randint(50, 150),
-            "inactive_sensors": random.randint(2, 10),
-            "avg_response_time_ms": round(random.uniform(50.0, 200.0), 2),
-            "data_quality_score": round(random.uniform(0.85, 0.98), 3),
+            "overall_system_health": round(0.5 * availability + 50.0 * data_quality, 2),
+            "active_sensors": active_sensors,
+            "inactive_sensors": total_sensors - active_sensors,
+            # Delay between a reading's timestamp and its arrival in the database
+            "avg_response_time_ms": self._round(sensors["ingestion_latency_ms"]),
+            "data_quality_score": round(data_quality, 3),
             "chart_data": {
-                "dates": [d.strftime("%Y-%m-%d") for d in dates],
+                "dates": [row["bucket"].strftime("%Y-%m-%d") for row in series],
                 "uptime_percentages": uptime_percentages,
                 "chart_type": "line",
                 "title": "System Uptime Over Time",
                 "xlabel": "Date",
                 "ylabel": "Uptime (%)"
             },
-            "alerts_generated": random.randint(10, 50),
-            "critical_alerts": random.randint(0, 5)
+            "alerts_generated": int(alerts["alerts"] or 0),
+            "critical_alerts": int(alerts["critical_alerts"] or 0)
         }
 
     def _generate_default_data(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
-        """Generate default mock data for unknown report types."""
+        """Empty result for unknown report types (no queries are run)."""
         return {
             "report_type": "unknown",
-            "data_points": random.randint(100, 1000),
-            "processing_time_ms": round(random.uniform(10.0, 100.0), 2),
+            "data_points": 0,
+            "processing_time_ms": 0.0,
             "chart_data": {
                 "dates": [],
                 "values": [],
@@ -148,6 +271,23 @@ class AnalyticsEngine:
             }
         }
 
+    @staticmethod
+    def _trend(counts: List[int]) -> str:
+        """Compare the second half of a series with the first half."""
+        half = len(counts) // 2
+        if half == 0:
+            return "stable"
+        first, second = sum(counts[:half]) / half, sum(counts[-half:]) / half
+        if second > first * 1.1:
+            return "increasing"
+        if second < first * 0.9:
+            return "decreasing"
+        return "stable"
+
+    @staticmethod
+    def _round(value: Any, digits: int = 2) -> Optional[float]:
+        return round(float(value), digits) if value is not None else None
+
 
 class ReportingAgent(BaseAgent):
     """
@@ -158,20 +298,30 @@ class ReportingAgent(BaseAgent):
     - Maintenance overviews with task statistics
     - System health reports with uptime metrics
     
-    Reports can be generated in JSON or text format and include matplotlib charts
-    encoded as base64 strings.
+    Reports can be generated in JSON or text format and include PNG or SVG charts
+    encoded as base64 strings. Charts are rendered in worker processes and cached.
     """
 
-    def __init__(self, agent_id: str = None, event_bus=None):
+    def __init__(
+        self,
+        agent_id: str = None,
+        event_bus=None,
+        chart_renderer: Optional[ChartRenderer] = None,
+        analytics_engine: Optional[AnalyticsEngine] = None,
+    ):
         """
         Initialize the ReportingAgent.
         
         Args:
             agent_id: Optional agent identifier. If not provided, a UUID will be generated.
             event_bus: Event bus instance for inter-agent communication.
+            chart_renderer: Optional shared chart renderer; one is created from settings if omitted.
+            analytics_engine: Optional analytics engine, e.g. bound to a test database; one on
+                ``settings.database_url`` is created if omitted (it connects on first use).
         """
         super().__init__(agent_id or f"reporting-agent-{uuid.uuid4().hex[:8]}", event_bus)
-        self.analytics_engine = AnalyticsEngine()
+        self.analytics_engine = analytics_engine or AnalyticsEngine()
+        self.chart_renderer = chart_renderer or ChartRenderer()
         logger.info(f"ReportingAgent {self.agent_id} initialized")
 
     async def start(self) -> None:
@@ -182,6 +332,7 @@ class ReportingAgent(BaseAgent):
     async def stop(self) -> None:
         """Stop the ReportingAgent."""
         logger.info(f"ReportingAgent {self.agent_id} stopping...")
+        self.chart_renderer.shutdown()
         await super().stop()
 
     async def get_health(self) -> Dict[str, Any]:
@@ -190,6 +341,7 @@ class ReportingAgent(BaseAgent):
         return {
             **base_health,
             "analytics_engine_available": self.analytics_engine is not None,
+            "chart_renderer": self.chart_renderer.get_stats(),
             "supported_formats": ["json", "text"],
             "supported_report_types": [
                 "anomaly_summary",
@@ -242,8 +394,9 @@ class ReportingAgent(BaseAgent):
             
             # Generate charts if requested
             charts_encoded = {}
+            chart_format = (report_request.parameters or {}).get("chart_format", "png")
             if report_request.include_charts and analytics_data.get("chart_data"):
-                chart_b64 = self._generate_chart(analytics_data["chart_data"])
+                chart_b64 = self._generate_chart(analytics_data["chart_data"], chart_format)
                 if chart_b64:
                     charts_encoded["main_chart"] = chart_b64
             
@@ -260,6 +413,7 @@ class ReportingAgent(BaseAgent):
                     "time_range_start": report_request.time_range_start.isoformat() if report_request.time_range_start else None,
                     "time_range_end": report_request.time_range_end.isoformat() if report_request.time_range_end else None,
                     "include_charts": report_request.include_charts,
+                    "chart_format": chart_format,
                     "analytics_summary": {
                         "data_points": len((analytics_data.get("chart_data") or {}).get("dates", [])),
                         "has_chart_data": bool(analytics_data.get("chart_data"))
@@ -329,7 +483,7 @@ Generated on: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC
 
     def _generate_maintenance_text_report(self, data: Dict[str, Any]) -> str:
         """Generate text format for maintenance overview report."""
-        completion_rate = (data.get('completed_tasks', 0) / data.get('total_maintenance_tasks', 1)) * 100
+        completion_rate = (data.get('completed_tasks', 0) / (data.get('total_maintenance_tasks') or 1)) * 100
         
         # Format technician utilization
         tech_util = data.get('technician_utilization', 'N/A')
@@ -351,8 +505,8 @@ MAINTENANCE OVERVIEW REPORT
 • Completion Rate: {completion_rate:.1f}%
 
 ⏱️ Performance Metrics:
-• Average Completion Time: {data.get('avg_completion_time', 'N/A')} hours
-• Mean Time to Repair (MTTR): {data.get('mttr_hours', 'N/A')} hours
+• Average Completion Time: {data.get('avg_completion_time') if data.get('avg_completion_time') is not None else 'N/A'} hours
+• Mean Time to Repair (MTTR): {data.get('mttr_hours') if data.get('mttr_hours') is not None else 'N/A'} hours
 • Technician Utilization: {tech_util_str}
 • Equipment Uptime: {equipment_uptime_str}
 
@@ -372,10 +526,10 @@ SYSTEM HEALTH REPORT
 📡 Sensor Status:
 • Active Sensors: {data.get('active_sensors', 'N/A')}
 • Inactive Sensors: {data.get('inactive_sensors', 'N/A')}
-• Sensor Availability: {(data.get('active_sensors', 0) / (data.get('active_sensors', 0) + data.get('inactive_sensors', 1))) * 100:.1f}%
+• Sensor Availability: {(data.get('active_sensors', 0) / ((data.get('active_sensors', 0) + data.get('inactive_sensors', 1)) or 1)) * 100:.1f}%
 
 ⚡ Performance:
-• Average Response Time: {data.get('avg_response_time_ms', 'N/A')} ms
+• Average Response Time: {data.get('avg_response_time_ms') if data.get('avg_response_time_ms') is not None else 'N/A'} ms
 • Data Quality Score: {data.get('data_quality_score', 'N/A') if isinstance(data.get('data_quality_score'), str) else f"{data.get('data_quality_score', 0):.1%}"}
 
 🚨 Alerts:
@@ -400,74 +554,24 @@ Processing Time: {data.get('processing_time_ms', 'N/A')} ms
 Generated on: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC
         """.strip()
 
-    def _generate_chart(self, chart_data: Dict[str, Any]) -> Optional[str]:
+    def _generate_chart(self, chart_data: Dict[str, Any], chart_format: str = "png") -> Optional[str]:
         """
-        Generate a matplotlib chart and return it as base64 encoded string.
+        Render a chart in the chart worker pool and return it as base64 encoded string.
         
         Args:
             chart_data: Dictionary containing chart configuration and data
+            chart_format: Image format, "png" or "svg"
             
         Returns:
             Base64 encoded chart image, or None if generation fails
         """
         try:
-            if not chart_data or chart_data.get("chart_type") == "none":
+            image = self.chart_renderer.render(chart_data, chart_format)
+            if image is None:
                 return None
-                
-            # Create figure and axis
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            chart_type = chart_data.get("chart_type", "line")
-            title = chart_data.get("title", "Chart")
-            xlabel = chart_data.get("xlabel", "X")
-            ylabel = chart_data.get("ylabel", "Y")
-            
-            if chart_type == "line":
-                dates = chart_data.get("dates", [])
-                values = chart_data.get("anomaly_counts") or chart_data.get("uptime_percentages", [])
-                
-                if dates and values and len(dates) == len(values):
-                    ax.plot(dates, values, marker='o', linewidth=2, markersize=4)
-                    # Rotate x-axis labels for better readability
-                    plt.xticks(rotation=45)
-                else:
-                    # Fallback to simple plot if data doesn't match
-                    ax.plot([1, 2, 3, 4, 5], [1, 4, 2, 3, 5], marker='o')
-                    
-            elif chart_type == "bar":
-                categories = chart_data.get("categories", ["A", "B", "C"])
-                values = chart_data.get("values", [1, 2, 3])
-                
-                if len(categories) == len(values):
-                    ax.bar(categories, values)
-                else:
-                    # Fallback bar chart
-                    ax.bar(["A", "B", "C"], [1, 2, 3])
-            
-            # Set labels and title
-            ax.set_title(title, fontsize=14, fontweight='bold')
-            ax.set_xlabel(xlabel, fontsize=12)
-            ax.set_ylabel(ylabel, fontsize=12)
-            
-            # Improve layout
-            plt.tight_layout()
-            
-            # Save to BytesIO buffer
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            
-            # Encode to base64
-            chart_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            # Clean up
-            plt.close(fig)
-            buffer.close()
-            
-            logger.info(f"Chart generated successfully: {chart_type}")
-            return chart_b64
+            logger.info(f"Chart generated successfully: {chart_data.get('chart_type', 'line')}")
+            return base64.b64encode(image).decode('utf-8')
             
         except Exception as e:
             logger.error(f"Error generating chart: {str(e)}")
-            plt.close('all')  # Ensure cleanup on error
             return None
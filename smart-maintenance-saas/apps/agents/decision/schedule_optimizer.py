@@ -0,0 +1,264 @@
+"""
+Joint CP-SAT scheduling of a window of maintenance requests.
+
+SchedulingAgent used to build a fresh model for every request. During a
+fleet-wide incident that meant hundreds of sequential solves, each one blind
+to the requests that came after it. This module solves a whole window of
+requests in one model:
+
+- time is a grid of 15-minute working slots (weekdays 08:00-18:00 UTC) over a
+  fixed horizon, and a task never spans two working days;
+- each request has one optional interval per qualified technician, at most
+  one of which is present. Requests that do not fit are reported as
+  unscheduled instead of making the whole window infeasible;
+- bookings that already exist are fixed intervals in every technician's
+  no-overlap constraint;
+- the objective schedules urgent requests first and as early as possible,
+  with technician experience as a tie-breaker;
+- assignments from the previous schedule are passed as solution hints, and
+  the solver runs with several workers under a time limit;
+- booked tasks that are re-solved earn a stability bonus for staying where
+  they are. It outweighs any gain from starting earlier, but not the value of
+  fitting in another request, so booked work only moves (or, for strictly
+  more urgent work, is displaced) when that lets more requests be scheduled.
+"""
+
+import bisect
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:
+    cp_model = None
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 15
+# Reward for keeping a hinted task on its previous technician and start slot
+STABILITY_BONUS = 5_000
+WORKDAY_START_HOUR = 8
+WORKDAY_END_HOUR = 18
+
+
+def as_utc(dt: datetime) -> datetime:
+    """``dt`` as an aware UTC datetime (naive values are UTC)."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class WorkingTimeGrid:
+    """Maps working time to integer slots: slot ``k`` starts ``k`` working quarter-hours after the grid start."""
+
+    def __init__(self, start: datetime, horizon_days: int):
+        start = as_utc(start)
+        self.slots_per_day = (WORKDAY_END_HOUR - WORKDAY_START_HOUR) * 60 // SLOT_MINUTES
+        self.days: List[date] = [
+            day
+            for day in (start.date() + timedelta(days=offset) for offset in range(max(1, horizon_days)))
+            if day.weekday() < 5
+        ]
+        self.horizon = len(self.days) * self.slots_per_day
+        self.first_slot = self.slot_at_or_after(start)
+
+    def _at(self, day_index: int, offset: int) -> datetime:
+        opening = datetime.combine(self.days[day_index], time(WORKDAY_START_HOUR), tzinfo=timezone.utc)
+        return opening + timedelta(minutes=offset * SLOT_MINUTES)
+
+    def slot_start(self, slot: int) -> datetime:
+        """When slot ``slot`` begins."""
+        return self._at(*divmod(min(slot, self.horizon - 1), self.slots_per_day))
+
+    def slot_end(self, boundary: int) -> datetime:
+        """When a task ending at ``boundary`` (exclusive slot index) finishes."""
+        day_index, offset = divmod(max(boundary, 1) - 1, self.slots_per_day)
+        return self._at(day_index, offset + 1)
+
+    def _day_offset_minutes(self, dt: datetime) -> Tuple[int, float]:
+        dt = as_utc(dt)
+        day_index = bisect.bisect_left(self.days, dt.date())
+        if day_index < len(self.days) and self.days[day_index] == dt.date():
+            opening = datetime.combine(dt.date(), time(WORKDAY_START_HOUR), tzinfo=timezone.utc)
+            return day_index, (dt - opening).total_seconds() / 60
+        return day_index, -math.inf  # a non-working day: before the next working day's opening
+
+    def slot_at_or_after(self, dt: datetime) -> int:
+        """First slot starting at or after ``dt`` (``horizon`` when there is none)."""
+        day_index, minutes = self._day_offset_minutes(dt)
+        if day_index >= len(self.days):
+            return self.horizon
+        offset = max(0, math.ceil(minutes / SLOT_MINUTES)) if minutes != -math.inf else 0
+        if offset >= self.slots_per_day:
+            return (day_index + 1) * self.slots_per_day
+        return day_index * self.slots_per_day + offset
+
+    def boundary_at_or_before(self, dt: datetime) -> int:
+        """Last slot boundary at or before ``dt`` (0 when ``dt`` precedes the grid)."""
+        day_index, minutes = self._day_offset_minutes(dt)
+        if day_index >= len(self.days):
+            return self.horizon
+        if minutes == -math.inf or minutes <= 0:
+            return day_index * self.slots_per_day
+        return day_index * self.slots_per_day + min(self.slots_per_day, int(minutes // SLOT_MINUTES))
+
+
+@dataclass
+class WindowTask:
+    """One maintenance request as seen by the solver."""
+
+    request_id: str
+    duration_slots: int
+    earliest_slot: int
+    latest_end_slot: int
+    priority: int
+    technicians: Dict[str, int] = field(default_factory=dict)  # technician id -> tie-break bonus (0-10)
+    window_relaxed: bool = False
+
+
+@dataclass
+class SlotAssignment:
+    technician_id: str
+    start_slot: int
+    end_slot: int
+
+
+@dataclass
+class WindowSolution:
+    status: str
+    assignments: Dict[str, SlotAssignment]
+    objective: float = 0.0
+    wall_time: float = 0.0
+
+
+def build_task(
+    grid: WorkingTimeGrid,
+    request_id: str,
+    priority: int,
+    duration_hours: float,
+    technicians: Dict[str, int],
+    earliest: Optional[datetime] = None,
+    latest_end: Optional[datetime] = None,
+) -> Tuple[Optional[WindowTask], Optional[str]]:
+    """A solver task for a request, or the constraint that makes it unschedulable."""
+    duration = max(1, math.ceil(duration_hours * 60 / SLOT_MINUTES))
+    if duration > grid.slots_per_day:
+        return None, "duration_exceeds_working_day"
+    earliest_slot = grid.first_slot if earliest is None else max(grid.first_slot, grid.slot_at_or_after(earliest))
+    if earliest_slot + duration > grid.horizon:
+        return None, "outside_scheduling_horizon"
+    latest_end_slot = grid.horizon if latest_end is None else grid.boundary_at_or_before(latest_end)
+    relaxed = latest_end_slot < earliest_slot + duration
+    if relaxed:
+        latest_end_slot = grid.horizon  # the window cannot be met; schedule as early as possible instead
+    return (
+        WindowTask(
+            request_id=request_id,
+            duration_slots=duration,
+            earliest_slot=earliest_slot,
+            latest_end_slot=latest_end_slot,
+            priority=priority,
+            technicians=dict(technicians),
+            window_relaxed=relaxed,
+        ),
+        None,
+    )
+
+
+def solve_window(
+    grid: WorkingTimeGrid,
+    tasks: Sequence[WindowTask],
+    busy: Dict[str, List[Tuple[int, int]]],
+    hints: Optional[Dict[str, Tuple[str, int]]] = None,
+    workers: int = 8,
+    time_limit_seconds: float = 10.0,
+    stability_bonus: int = 0,
+) -> WindowSolution:
+    """
+    Assign every task to at most one qualified technician and a start slot.
+
+    Args:
+        busy: Already-booked (start_slot, end_slot) intervals per technician.
+        hints: request id -> (technician id, start slot) from the previous schedule.
+        stability_bonus: Objective reward for a hinted task that keeps its hinted
+            technician and start slot (0 = hints only guide the search).
+    """
+    model = cp_model.CpModel()
+    spd = grid.slots_per_day
+    starts: Dict[str, cp_model.IntVar] = {}
+    presence: Dict[Tuple[str, str], cp_model.IntVar] = {}
+    intervals: Dict[str, list] = {}
+    objective = []
+
+    for task in tasks:
+        duration = task.duration_slots
+        start = model.NewIntVar(task.earliest_slot, task.latest_end_slot - duration, f"start_{task.request_id}")
+        day = model.NewIntVar(0, len(grid.days) - 1, f"day_{task.request_id}")
+        offset = model.NewIntVar(0, spd - duration, f"offset_{task.request_id}")
+        model.Add(start == day * spd + offset)  # tasks stay within one working day
+        starts[task.request_id] = start
+
+        urgency = 6 - task.priority  # priority 1 (highest) .. 5
+        literals = []
+        for technician_id, bonus in task.technicians.items():
+            present = model.NewBoolVar(f"assign_{task.request_id}_{technician_id}")
+            presence[(task.request_id, technician_id)] = present
+            literals.append(present)
+            intervals.setdefault(technician_id, []).append(
+                model.NewOptionalFixedSizeIntervalVar(
+                    start, duration, present, f"interval_{task.request_id}_{technician_id}"
+                )
+            )
+            # Scheduling a request outweighs any lateness; experience breaks ties
+            objective.append(present * (urgency * 10_000 + bonus))
+        model.AddAtMostOne(literals)
+        objective.append(-urgency * start)
+
+    for technician_id, technician_intervals in intervals.items():
+        for index, (busy_start, busy_end) in enumerate(busy.get(technician_id, [])):
+            if busy_end > busy_start:
+                technician_intervals.append(
+                    model.NewIntervalVar(busy_start, busy_end - busy_start, busy_end, f"busy_{technician_id}_{index}")
+                )
+        if len(technician_intervals) > 1:
+            model.AddNoOverlap(technician_intervals)
+
+    for request_id, (technician_id, start_slot) in (hints or {}).items():
+        if request_id in starts and (request_id, technician_id) in presence:
+            model.AddHint(presence[(request_id, technician_id)], 1)
+            model.AddHint(starts[request_id], start_slot)
+            if stability_bonus:
+                stays = model.NewBoolVar(f"stays_{request_id}")
+                model.Add(starts[request_id] == start_slot).OnlyEnforceIf(stays)
+                model.AddImplication(stays, presence[(request_id, technician_id)])
+                objective.append(stability_bonus * stays)
+
+    model.Maximize(sum(objective))
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = max(1, workers)
+    solver.parameters.max_time_in_seconds = time_limit_seconds
+    status = solver.Solve(model)
+
+    assignments: Dict[str, SlotAssignment] = {}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        for task in tasks:
+            for technician_id in task.technicians:
+                if solver.Value(presence[(task.request_id, technician_id)]):
+                    start_slot = solver.Value(starts[task.request_id])
+                    assignments[task.request_id] = SlotAssignment(
+                        technician_id, start_slot, start_slot + task.duration_slots
+                    )
+                    break
+    logger.debug(
+        f"Solved scheduling window of {len(tasks)} tasks: {solver.StatusName(status)}, "
+        f"{len(assignments)} assigned in {solver.WallTime():.3f}s"
+    )
+    return WindowSolution(
+        status=solver.StatusName(status),
+        assignments=assignments,
+        objective=solver.ObjectiveValue() if assignments else 0.0,
+        wall_time=solver.WallTime(),
+    )
@@ -2,12 +2,14 @@
 SchedulingAgent - Handles maintenance task scheduling based on predictions.
 
 This agent receives MaintenancePredictedEvent notifications and schedules maintenance tasks
-using optimization algorithms (currently simplified greedy approach, with OR-Tools planned for future).
+using either a greedy algorithm or, behind a feature flag, OR-Tools CP-SAT over windows of
+requests that are solved jointly.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from uuid import uuid4
 
 try:
@@ -16,8 +18,12 @@ except ImportError:
     cp_model = None
 
 from core.base_agent_abc import BaseAgent, AgentCapability
-from core.events.event_models import MaintenancePredictedEvent, MaintenanceScheduledEvent
+from core.events.event_models import MaintenancePredictedEvent, MaintenanceScheduleChangedEvent, MaintenanceScheduledEvent
 from core.config.settings import settings
+from apps.agents.decision.schedule_optimizer import (
+    STABILITY_BONUS, WindowTask, WorkingTimeGrid, as_utc, build_task, solve_window,
+)
+from apps.agents.decision.technician_calendar import TechnicianCalendarIndex
 from data.schemas import MaintenanceRequest, OptimizedSchedule, ScheduleStatus
 from data.exceptions import EventPublishError, AgentProcessingError # Import EventPublishError and AgentProcessingError
 
@@ -27,10 +33,14 @@ logger = logging.getLogger(__name__)
 class CalendarService:
     """
     Dummy CalendarService for mocking external calendar integrations.
+
+    Bookings are kept in a per-technician ``TechnicianCalendarIndex`` so
+    availability checks and slot searches do not scan the calendar.
     """
     
     def __init__(self):
         self.logger = logging.getLogger(f"{__name__}.CalendarService")
+        self.index = TechnicianCalendarIndex()
         self.logger.info("CalendarService initialized (dummy implementation)", extra={"correlation_id": "N/A"})
     
     def check_availability(self, technician_id: str, start_time: datetime, end_time: datetime) -> bool:
@@ -38,18 +48,29 @@ class CalendarService:
         self.logger.debug(f"Checking availability for technician {technician_id} from {start_time} to {end_time}", extra={"correlation_id": "N/A"})
         business_start, business_end = 8, 18
         if (start_time.hour >= business_start and end_time.hour <= business_end and
-            start_time.weekday() < 5):
+            start_time.weekday() < 5 and self.index.is_free(technician_id, start_time, end_time)):
             self.logger.debug(f"Technician {technician_id} is available", extra={"correlation_id": "N/A"})
             return True
         self.logger.debug(f"Technician {technician_id} is not available", extra={"correlation_id": "N/A"})
         return False
     
+    def find_earliest_slot(self, technician_id: str, duration: timedelta, after: datetime,
+                           before: Optional[datetime] = None) -> Optional[Tuple[datetime, datetime]]:
+        """Earliest free working-hours slot of ``duration`` for the technician between ``after`` and ``before``."""
+        return self.index.earliest_free_slot(technician_id, duration, after, before)
+
     def book_slot(self, technician_id: str, start_time: datetime, end_time: datetime, 
                   maintenance_request_id: str) -> bool:
         # Assuming correlation_id is not available in this context or passed down
         self.logger.info(f"Booking slot for technician {technician_id}: {start_time} to {end_time} for request {maintenance_request_id}", extra={"correlation_id": "N/A"})
+        if not self.index.book(technician_id, start_time, end_time, maintenance_request_id):
+            self.logger.warning(f"Slot for request {maintenance_request_id} overlaps another booking of technician {technician_id}", extra={"correlation_id": "N/A"})
+            return False
         return True
 
+    def release_slot(self, maintenance_request_id: str) -> bool:
+        return self.index.release(maintenance_request_id)
+
 
 # Mock technicians data
 mock_technicians = [
@@ -89,6 +110,18 @@ class SchedulingAgent(BaseAgent):
         self.logger = logging.getLogger(f"{__name__}.{agent_id}")
         self.calendar_service = CalendarService()
         self.settings = settings  # Add settings reference for feature flag access
+
+        # Scheduling window: with OR-Tools enabled, requests are collected for up to
+        # SCHEDULING_WINDOW_SECONDS (or SCHEDULING_WINDOW_MAX_REQUESTS) and solved in one model
+        self.window_seconds = settings.SCHEDULING_WINDOW_SECONDS
+        self.window_max_requests = max(1, settings.SCHEDULING_WINDOW_MAX_REQUESTS)
+        self.current_schedule: Dict[str, OptimizedSchedule] = {}
+        self._scheduled_requests: Dict[str, MaintenanceRequest] = {}
+        self._pending_requests: List[Tuple[Any, MaintenanceRequest, str]] = []
+        self._window_task: Optional[asyncio.Task] = None
+        self._window_lock = asyncio.Lock()
+        self.window_stats = {"requests": 0, "windows": 0, "scheduled": 0}
+        self.reoptimization_stats = {"reopened": 0, "moved": 0, "unscheduled": 0}
         self.logger.info(f"SchedulingAgent {agent_id} initialized", extra={"correlation_id": "N/A"})
     
     async def start(self) -> None:
@@ -99,6 +132,18 @@ class SchedulingAgent(BaseAgent):
             extra={"correlation_id": "N/A"}
         )
     
+    async def stop(self) -> None:
+        """Schedule the requests still waiting in the current window, then stop."""
+        if self._window_task is not None and not self._window_task.done():
+            self._window_task.cancel()
+            try:
+                await self._window_task
+            except asyncio.CancelledError:
+                pass
+        self._window_task = None
+        await self._flush_window()
+        await super().stop()
+
     async def register_capabilities(self) -> None:
         self.capabilities.append(
             AgentCapability(name="maintenance_scheduling", description="Schedules maintenance tasks",
@@ -131,6 +176,10 @@ class SchedulingAgent(BaseAgent):
                 extra={"correlation_id": correlation_id}
             )
             
+            if self._windowed_scheduling_enabled():
+                await self._enqueue_request(prediction_event, maintenance_request, correlation_id)
+                return
+
             optimized_schedule = await self.schedule_maintenance_task(maintenance_request, correlation_id=correlation_id)
             
             if optimized_schedule.status == ScheduleStatus.SCHEDULED:
@@ -154,6 +203,52 @@ class SchedulingAgent(BaseAgent):
             )
             raise # Re-raise to be handled by BaseAgent's error handling logic
     
+    def _windowed_scheduling_enabled(self) -> bool:
+        return bool(settings.USE_OR_TOOLS_SCHEDULER and cp_model is not None and self.window_seconds > 0)
+
+    async def _enqueue_request(self, prediction_event: Any, maintenance_request: MaintenanceRequest, correlation_id: str) -> None:
+        """Add a request to the current scheduling window, solving it once the window is full."""
+        self._pending_requests.append((prediction_event, maintenance_request, correlation_id))
+        self.window_stats["requests"] += 1
+        self.logger.debug(
+            f"Queued request {maintenance_request.id} for joint scheduling ({len(self._pending_requests)} in window)",
+            extra={"correlation_id": correlation_id}
+        )
+        if len(self._pending_requests) >= self.window_max_requests:
+            await self._flush_window()
+        elif self._window_task is None or self._window_task.done():
+            self._window_task = asyncio.create_task(self._window_timer())
+
+    async def _window_timer(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self._flush_window()
+
+    async def _flush_window(self) -> None:
+        """Solve every pending request in one model and publish the resulting schedules."""
+        async with self._window_lock:
+            pending, self._pending_requests = self._pending_requests, []
+            if not pending:
+                return
+            self.window_stats["windows"] += 1
+            correlation_id = pending[0][2]
+            self.logger.info(f"Scheduling window of {len(pending)} requests", extra={"correlation_id": correlation_id})
+            schedules = await self._schedule_window([request for _, request, _ in pending], correlation_id)
+
+            for (prediction_event, request, request_correlation_id), schedule in zip(pending, schedules):
+                if schedule.status != ScheduleStatus.SCHEDULED:
+                    self.logger.warning(
+                        f"Failed to schedule maintenance for request {request.id}: {schedule.status}",
+                        extra={"correlation_id": request_correlation_id}
+                    )
+                    continue
+                self.window_stats["scheduled"] += 1
+                try:
+                    await self._publish_maintenance_scheduled_event(
+                        prediction_event, schedule, correlation_id=request_correlation_id, scheduling_method="or_tools_window"
+                    )
+                except EventPublishError:
+                    continue  # already logged; the other schedules of the window are still published
+
     def _create_maintenance_request(self, prediction_event) -> MaintenanceRequest:
         # Handle both dict and object types
         if isinstance(prediction_event, dict):
@@ -271,54 +366,44 @@ class SchedulingAgent(BaseAgent):
             A tuple of (scheduled_start_time, scheduled_end_time) if a slot is found and booked,
             otherwise None.
         """
-        current_time = maintenance_request.preferred_time_window_start or datetime.now(timezone.utc)
-        # Ensure current_time is not in the past for scheduling, adjust to next possible working hour if so.
         now = datetime.now(timezone.utc)
+        current_time = as_utc(maintenance_request.preferred_time_window_start or now)
+        # Ensure current_time is not in the past for scheduling
         if current_time < now:
             current_time = now
 
-        # Align current_time to a sensible start, e.g., next hour or next working day's start
+        # Align current_time to a sensible start, e.g., the next full hour
         if current_time.minute != 0 or current_time.second != 0 or current_time.microsecond != 0:
              current_time = current_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
 
-
-        end_window = maintenance_request.preferred_time_window_end or (current_time + timedelta(days=30)) # Default 30 day window
+        end_window = (
+            as_utc(maintenance_request.preferred_time_window_end)
+            if maintenance_request.preferred_time_window_end
+            else current_time + timedelta(days=30)  # Default 30 day window
+        )
+        duration = timedelta(hours=maintenance_request.estimated_duration_hours)
 
         self.logger.debug(
             f"Searching slot for tech {technician['id']} for req {maintenance_request.id} from {current_time} to {end_window}",
             extra={"correlation_id": correlation_id}
         )
 
+        # The calendar index proposes the earliest free working-hours slot; the
+        # calendar still has the final word, and a rejected slot moves the search on by an hour.
         while current_time < end_window:
-            # Adjust to business hours (e.g., 8 AM)
-            if current_time.hour < 8:
-                current_time = current_time.replace(hour=8, minute=0, second=0, microsecond=0)
-            # If current_time is past a reasonable hour to schedule a task of X duration (e.g. 14:00 for a 4hr task, assuming end by 18:00)
-            # or if it's a weekend
-            max_start_hour = 18 - int(maintenance_request.estimated_duration_hours + 0.99) # e.g. 18-4 = 14:00
-            if current_time.hour > max_start_hour or current_time.weekday() >= 5: # Monday is 0, Friday is 4
-                current_time = (current_time + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
-                if current_time >= end_window : # Check if we jumped past the window
-                    break
-                continue # Re-evaluate new current_time in the loop
-
-            scheduled_end = current_time + timedelta(hours=maintenance_request.estimated_duration_hours)
-
-            # Ensure scheduled_end is within business hours too
-            if scheduled_end.hour > 18 or (scheduled_end.day != current_time.day and scheduled_end.hour !=0) : # ends after 6 PM or spills to next day incorrectly
-                 current_time += timedelta(hours=1) # Try next hour
-                 continue
-
-
-            if self.calendar_service.check_availability(technician["id"], current_time, scheduled_end):
-                if self.calendar_service.book_slot(technician["id"], current_time, scheduled_end, maintenance_request.id):
+            slot = self.calendar_service.find_earliest_slot(technician["id"], duration, current_time, end_window)
+            if slot is None:
+                break
+            slot_start, slot_end = slot
+            if self.calendar_service.check_availability(technician["id"], slot_start, slot_end):
+                if self.calendar_service.book_slot(technician["id"], slot_start, slot_end, maintenance_request.id):
                     self.logger.info(
-                        f"Slot found and booked for tech {technician['id']} for req {maintenance_request.id}: {current_time} to {scheduled_end}",
+                        f"Slot found and booked for tech {technician['id']} for req {maintenance_request.id}: {slot_start} to {slot_end}",
                         extra={"correlation_id": correlation_id}
                     )
-                    return current_time, scheduled_end
+                    return slot_start, slot_end
 
-            current_time += timedelta(hours=1) # Check next hour slot
+            current_time = slot_start + timedelta(hours=1) # Check next hour slot
 
         self.logger.debug(
             f"No available slot found for tech {technician['id']} for req {maintenance_request.id} within the window.",
@@ -411,188 +496,301 @@ class SchedulingAgent(BaseAgent):
             raise AgentProcessingError(f"Greedy scheduling failed for request {maintenance_request.id}: {str(e)}", original_exception=e) from e
 
     # ================================================================================
-    # FUTURE ENHANCEMENT: OR-Tools Advanced Constraint Programming Scheduler
+    # OR-Tools Constraint Programming Scheduler
     # ================================================================================
-    # The following OR-Tools implementation is a planned future enhancement that will
-    # provide sophisticated optimization capabilities including:
-    # - Multi-objective optimization (priority, efficiency, resource utilization)
-    # - Complex constraint handling (technician skills, availability, travel time)
-    # - Global optimization across multiple maintenance requests
-    # - Advanced scheduling scenarios (recurring maintenance, emergency priorities)
+    # Requests are solved jointly per scheduling window (see schedule_optimizer):
+    # - technician skills, one task per technician at a time, existing bookings
+    # - urgent requests first and as early as possible, experience as tie-breaker
+    # - several solver workers under a time limit, hinted with the current schedule
     #
-    # Current Status: IMPLEMENTED but requires OR-Tools dependency and feature flag
-    # Default Behavior: System falls back to greedy algorithm for this deliverable
     # Activation: Set USE_OR_TOOLS_SCHEDULER=true in settings and install OR-Tools
+    # Default Behavior: the greedy algorithm schedules each request on arrival
     # ================================================================================
 
     async def _schedule_with_or_tools(self, maintenance_requests: List[MaintenanceRequest], correlation_id: Optional[str] = None) -> OptimizedSchedule:
         """
         Advanced constraint programming scheduler using OR-Tools.
-        
-        This method creates an optimization model that:
-        1. Models each maintenance task as an interval variable
-        2. Ensures tasks are only assigned to technicians with required skills
-        3. Prevents overlapping assignments for the same technician
-        4. Optimizes for scheduling high-priority tasks
+
+        Solves ``maintenance_requests`` jointly and returns the schedule of the
+        first one (see ``_schedule_window`` for all of them).
+        """
+        return (await self._schedule_window(maintenance_requests, correlation_id))[0]
+
+    async def _schedule_window(self, maintenance_requests: List[MaintenanceRequest], correlation_id: Optional[str] = None) -> List[OptimizedSchedule]:
+        """
+        Schedule a window of requests in one CP-SAT model.
+
+        The model is solved in a worker thread. Whenever OR-Tools is missing, fails
+        or finds no solution in time, every request falls back to the greedy
+        algorithm. Scheduled requests are booked and kept in ``current_schedule``
+        so later windows plan around them.
+
+        Bookings of the technicians the new requests could go to, starting within
+        SCHEDULING_REOPTIMIZATION_HORIZON_HOURS, are re-solved together with the
+        window (hinted with their current slots); all other bookings stay pinned.
+        Bookings that move are published as MaintenanceScheduleChangedEvents.
         """
         if cp_model is None:
             self.logger.error("OR-Tools not available, falling back to greedy algorithm", extra={"correlation_id": correlation_id})
-            return await self._schedule_with_greedy_algorithm(maintenance_requests[0], correlation_id)
-        
+            return await self._schedule_window_greedily(maintenance_requests, correlation_id)
+
         self.logger.info(f"Starting OR-Tools optimization for {len(maintenance_requests)} requests", extra={"correlation_id": correlation_id})
-        
+
+        changes: List[Tuple[MaintenanceRequest, OptimizedSchedule, Optional[OptimizedSchedule]]] = []
         try:
-            # Create the model
-            model = cp_model.CpModel()
-            
-            # Time horizon in hours (next 7 days, 8 hours per day)
-            horizon = 7 * 8  # 56 hours
-            time_slots_per_hour = 4  # 15-minute intervals
-            max_time = int(horizon * time_slots_per_hour)
-            
-            # Get qualified technicians for each request
-            request_technicians = {}
+            grid = WorkingTimeGrid(datetime.now(timezone.utc), settings.SCHEDULING_HORIZON_DAYS)
+            schedules: Dict[str, OptimizedSchedule] = {}
+            tasks = []
             for request in maintenance_requests:
-                qualified_techs = [
-                    tech for tech in mock_technicians
-                    if any(skill in tech["skills"] for skill in (request.required_skills or []))
-                ]
-                request_technicians[request.id] = qualified_techs
-                
-                if not qualified_techs:
+                task, violated = self._build_window_task(grid, request)
+                if violated == "no_qualified_technicians":
                     self.logger.warning(f"No qualified technicians for request {request.id}", extra={"correlation_id": correlation_id})
-                    return OptimizedSchedule(
+                    schedules[request.id] = OptimizedSchedule(
                         request_id=request.id,
                         status=ScheduleStatus.FAILED_TO_SCHEDULE,
                         constraints_violated=["no_qualified_technicians"],
                         scheduling_notes="No technicians available with required skills."
                     )
-            
-            # Create optional intervals with assignment constraints
-            task_intervals = {}
-            task_start_vars = {}
-            task_end_vars = {}
-            task_assignments = {}
-            
-            for request in maintenance_requests:
-                # Task duration in time slots (default 2 hours = 8 slots)
-                duration = int(getattr(request, 'estimated_duration_hours', 2) * time_slots_per_hour)
-                
-                for tech in request_technicians[request.id]:
-                    # Assignment variable (1 if task is assigned to this technician)
-                    assignment_var = model.NewBoolVar(f"assign_{request.id}_{tech['id']}")
-                    task_assignments[(request.id, tech['id'])] = assignment_var
-                    
-                    # Create start and end variables
-                    start_var = model.NewIntVar(0, int(max_time - duration), f"start_{request.id}_{tech['id']}")
-                    end_var = model.NewIntVar(duration, int(max_time), f"end_{request.id}_{tech['id']}")
-                    
-                    task_start_vars[(request.id, tech['id'])] = start_var
-                    task_end_vars[(request.id, tech['id'])] = end_var
-                    
-                    # Create optional interval - only present when assigned
-                    interval_var = model.NewOptionalIntervalVar(
-                        start_var, 
-                        duration, 
-                        end_var,
-                        assignment_var,  # Only present when assigned
-                        f"interval_{request.id}_{tech['id']}"
+                    continue
+                if task is None:
+                    schedules[request.id] = OptimizedSchedule(
+                        request_id=request.id,
+                        status=ScheduleStatus.FAILED_TO_SCHEDULE,
+                        constraints_violated=[violated],
+                        scheduling_notes="Request cannot be placed within the working-time scheduling horizon."
                     )
-                    task_intervals[(request.id, tech['id'])] = interval_var
-            
-            # Constraint: Each task is assigned to exactly one technician
-            for request in maintenance_requests:
-                qualified_techs = request_technicians[request.id]
-                if qualified_techs:
-                    model.AddExactlyOne([
-                        task_assignments[(request.id, tech['id'])]
-                        for tech in qualified_techs
-                    ])
-            
-            # Constraint: No overlapping tasks for the same technician
-            for tech in mock_technicians:
-                tech_intervals = []
-                for request in maintenance_requests:
-                    if tech in request_technicians[request.id]:
-                        interval = task_intervals[(request.id, tech['id'])]
-                        tech_intervals.append(interval)
-                
-                # Optional intervals automatically handle presence/absence
-                if len(tech_intervals) > 1:
-                    model.AddNoOverlap(tech_intervals)
-            
-            # Objective: Maximize weighted sum of scheduled high-priority tasks
-            objective_terms = []
-            for request in maintenance_requests:
-                priority_weight = getattr(request, 'priority_weight', 1.0)
-                for tech in request_technicians[request.id]:
-                    tech_experience_weight = min(tech['experience_years'] / 10.0, 1.0)
-                    total_weight = int(priority_weight * tech_experience_weight * 100)  # Scale to integer
-                    objective_terms.append(task_assignments[(request.id, tech['id'])] * total_weight)
-            
-            if objective_terms:
-                model.Maximize(sum(objective_terms))
-            
-            # Solve the model
-            solver = cp_model.CpSolver()
-            solver.parameters.max_time_in_seconds = 10.0  # Limit solving time
-            
-            status = solver.Solve(model)
-            
-            if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-                # Extract solution for the first request (single request optimization)
-                request = maintenance_requests[0]
-                
-                for tech in request_technicians[request.id]:
-                    if solver.Value(task_assignments[(request.id, tech['id'])]):
-                        # Found assignment
-                        start_slot = solver.Value(task_start_vars[(request.id, tech['id'])])
-                        end_slot = solver.Value(task_end_vars[(request.id, tech['id'])])
-                        
-                        # Convert slots back to datetime
-                        now = datetime.now()
-                        start_time = now + timedelta(minutes=start_slot * 15)  # 15-minute slots
-                        end_time = now + timedelta(minutes=end_slot * 15)
-                        
-                        # Adjust to business hours (8 AM to 6 PM, weekdays only)
-                        start_time = self._adjust_to_business_hours(start_time)
-                        end_time = start_time + timedelta(hours=getattr(request, 'estimated_duration_hours', 2))
-                        
-                        optimization_score = solver.ObjectiveValue() / (len(maintenance_requests) * 100)
-                        
-                        self.logger.info(
-                            f"OR-Tools scheduled request {request.id} to technician {tech['id']} from {start_time} to {end_time}",
-                            extra={"correlation_id": correlation_id}
+                    continue
+                tasks.append(task)
+
+            if tasks:
+                reopened = self._reopen_affected_bookings(grid, tasks)
+                all_tasks = tasks + reopened
+                solution = await asyncio.to_thread(
+                    solve_window,
+                    grid,
+                    all_tasks,
+                    self._busy_slots(grid, exclude={task.request_id for task in all_tasks}),
+                    hints=self._schedule_hints(grid, all_tasks),
+                    workers=settings.SCHEDULING_SOLVER_WORKERS,
+                    time_limit_seconds=settings.SCHEDULING_SOLVER_TIME_LIMIT_SECONDS,
+                    stability_bonus=STABILITY_BONUS,
+                )
+                if solution.status not in ("OPTIMAL", "FEASIBLE"):
+                    self.logger.warning(f"OR-Tools optimization failed with status: {solution.status}", extra={"correlation_id": correlation_id})
+                    # Fall back to greedy algorithm
+                    return await self._schedule_window_greedily(maintenance_requests, correlation_id)
+
+                technicians_by_id = {tech["id"]: tech for tech in mock_technicians}
+                for task in tasks:
+                    request = next(r for r in maintenance_requests if r.id == task.request_id)
+                    assignment = solution.assignments.get(task.request_id)
+                    if assignment is None:
+                        schedules[task.request_id] = OptimizedSchedule(
+                            request_id=task.request_id,
+                            status=ScheduleStatus.FAILED_TO_SCHEDULE,
+                            constraints_violated=["insufficient_technician_capacity"],
+                            scheduling_notes=f"No technician capacity left in the {settings.SCHEDULING_HORIZON_DAYS}-day horizon."
                         )
-                        
-                        return OptimizedSchedule(
-                            request_id=request.id,
-                            status=ScheduleStatus.SCHEDULED,
-                            assigned_technician_id=tech['id'],
-                            scheduled_start_time=start_time,
-                            scheduled_end_time=end_time,
-                            optimization_score=optimization_score,
-                            constraints_satisfied=["technician_skills_match", "no_overlapping_assignments", "within_time_horizon"],
-                            scheduling_notes=f"Optimized using OR-Tools constraint programming (status: {solver.StatusName(status)})"
+                        continue
+                    technician = technicians_by_id[assignment.technician_id]
+                    start_time = grid.slot_start(assignment.start_slot)
+                    end_time = grid.slot_end(assignment.end_slot)
+                    lateness = (assignment.start_slot - task.earliest_slot) / max(1, grid.horizon)
+                    score = self._calculate_optimization_score(request, technician, start_time, end_time) * (1.0 - 0.5 * lateness)
+                    self.logger.info(
+                        f"OR-Tools scheduled request {request.id} to technician {technician['id']} from {start_time} to {end_time}",
+                        extra={"correlation_id": correlation_id}
+                    )
+                    schedules[task.request_id] = OptimizedSchedule(
+                        request_id=request.id,
+                        status=ScheduleStatus.SCHEDULED,
+                        assigned_technician_id=technician["id"],
+                        scheduled_start_time=start_time,
+                        scheduled_end_time=end_time,
+                        optimization_score=round(min(max(score, 0.0), 1.0), 4),
+                        constraints_satisfied=["technician_skills_match", "no_overlapping_assignments", "within_time_horizon"],
+                        constraints_violated=["preferred_time_window"] if task.window_relaxed else [],
+                        scheduling_notes=(
+                            f"Optimized using OR-Tools constraint programming jointly with {len(tasks)} requests "
+                            f"(status: {solution.status})"
                         )
-                
-                # No assignment found for the request
-                return OptimizedSchedule(
-                    request_id=maintenance_requests[0].id,
-                    status=ScheduleStatus.FAILED_TO_SCHEDULE,
-                    constraints_violated=["optimization_failed"],
-                    scheduling_notes="OR-Tools found no feasible assignment."
-                )
-            
-            else:
-                self.logger.warning(f"OR-Tools optimization failed with status: {solver.StatusName(status)}", extra={"correlation_id": correlation_id})
-                # Fall back to greedy algorithm
-                return await self._schedule_with_greedy_algorithm(maintenance_requests[0], correlation_id)
-                
+                    )
+
+                for task in reopened:
+                    previous = self.current_schedule[task.request_id]
+                    assignment = solution.assignments.get(task.request_id)
+                    if assignment is None:
+                        changes.append((self._scheduled_requests[task.request_id], previous, None))
+                        continue
+                    start_time = grid.slot_start(assignment.start_slot)
+                    if assignment.technician_id == previous.assigned_technician_id and start_time == as_utc(previous.scheduled_start_time):
+                        continue
+                    changes.append((
+                        self._scheduled_requests[task.request_id],
+                        previous,
+                        previous.model_copy(update={
+                            "assigned_technician_id": assignment.technician_id,
+                            "scheduled_start_time": start_time,
+                            "scheduled_end_time": grid.slot_end(assignment.end_slot),
+                            "scheduling_notes": f"Re-optimized around {len(tasks)} new requests (status: {solution.status})",
+                        }),
+                    ))
+
         except Exception as e:
             self.logger.error(f"Error in OR-Tools scheduling: {e}", exc_info=True, extra={"correlation_id": correlation_id})
             # Fall back to greedy algorithm
-            return await self._schedule_with_greedy_algorithm(maintenance_requests[0], correlation_id)
+            return await self._schedule_window_greedily(maintenance_requests, correlation_id)
+
+        # Free the slots of moved bookings first: they may be taken by new requests
+        for request, _, _ in changes:
+            self.calendar_service.release_slot(request.id)
+            self.current_schedule.pop(request.id, None)
+            self._scheduled_requests.pop(request.id, None)
+        for request, _, schedule in changes:
+            if schedule is not None:
+                self._record_booking(request, schedule)
+        results = [schedules[request.id] for request in maintenance_requests]
+        for request, schedule in zip(maintenance_requests, results):
+            if schedule.status == ScheduleStatus.SCHEDULED:
+                self._record_booking(request, schedule)
+        if changes:
+            await self._publish_schedule_changes(changes, [request.id for request in maintenance_requests], correlation_id)
+        return results
+
+    def _build_window_task(self, grid: WorkingTimeGrid, request: MaintenanceRequest) -> Tuple[Optional[WindowTask], Optional[str]]:
+        """The solver task for ``request``, or None and the violated constraint."""
+        qualified_techs = [
+            tech for tech in mock_technicians
+            if any(skill in tech["skills"] for skill in (request.required_skills or []))
+        ]
+        if not qualified_techs:
+            return None, "no_qualified_technicians"
+        latest_ends = [as_utc(dt) for dt in (request.preferred_time_window_end, request.deadline) if dt is not None]
+        return build_task(
+            grid,
+            request_id=request.id,
+            priority=request.priority,
+            duration_hours=request.estimated_duration_hours,
+            technicians={tech["id"]: int(min(tech["experience_years"] / 10.0, 1.0) * 10) for tech in qualified_techs},
+            earliest=request.preferred_time_window_start,
+            latest_end=min(latest_ends) if latest_ends else None,
+        )
+
+    def _reopen_affected_bookings(self, grid: WorkingTimeGrid, tasks: List[WindowTask]) -> List[WindowTask]:
+        """
+        Solver tasks for the bookings that may move to make room for ``tasks``.
+
+        Only bookings of technicians qualified for a new task that have not
+        started and start within the re-optimization horizon are reopened.
+        """
+        horizon_hours = settings.SCHEDULING_REOPTIMIZATION_HORIZON_HOURS
+        if horizon_hours <= 0:
+            return []
+        affected_technicians = {technician_id for task in tasks for technician_id in task.technicians}
+        new_request_ids = {task.request_id for task in tasks}
+        earliest = grid.slot_start(grid.first_slot)
+        latest = earliest + timedelta(hours=horizon_hours)
+        reopened = []
+        for request_id, schedule in self.current_schedule.items():
+            request = self._scheduled_requests.get(request_id)
+            if (
+                request is None
+                or request_id in new_request_ids
+                or schedule.status != ScheduleStatus.SCHEDULED
+                or schedule.assigned_technician_id not in affected_technicians
+                or schedule.scheduled_start_time is None
+                or not earliest <= as_utc(schedule.scheduled_start_time) <= latest
+            ):
+                continue
+            task, _ = self._build_window_task(grid, request)
+            if task is not None:
+                reopened.append(task)
+        self.reoptimization_stats["reopened"] += len(reopened)
+        return reopened
+
+    async def _publish_schedule_changes(
+        self,
+        changes: List[Tuple[MaintenanceRequest, OptimizedSchedule, Optional[OptimizedSchedule]]],
+        triggering_request_ids: List[str],
+        correlation_id: Optional[str] = None,
+    ) -> None:
+        """Publish one MaintenanceScheduleChangedEvent per moved or displaced booking."""
+        for request, previous, schedule in changes:
+            if schedule is None:
+                change_type = "unscheduled"
+                reason = "Displaced by more urgent maintenance; no capacity left in the scheduling horizon."
+                self.reoptimization_stats["unscheduled"] += 1
+                self.logger.warning(f"Request {request.id} was displaced by more urgent work", extra={"correlation_id": correlation_id})
+            else:
+                change_type = "reassigned" if schedule.assigned_technician_id != previous.assigned_technician_id else "rescheduled"
+                reason = "Moved to make room for newly scheduled maintenance."
+                self.reoptimization_stats["moved"] += 1
+                self.logger.info(
+                    f"Request {request.id} {change_type}: {previous.assigned_technician_id} {previous.scheduled_start_time} -> "
+                    f"{schedule.assigned_technician_id} {schedule.scheduled_start_time}",
+                    extra={"correlation_id": correlation_id}
+                )
+            event = MaintenanceScheduleChangedEvent(
+                request_id=request.id,
+                equipment_id=request.equipment_id,
+                change_type=change_type,
+                previous_technician_id=previous.assigned_technician_id,
+                previous_start_time=previous.scheduled_start_time,
+                previous_end_time=previous.scheduled_end_time,
+                assigned_technician_id=schedule.assigned_technician_id if schedule else None,
+                scheduled_start_time=schedule.scheduled_start_time if schedule else None,
+                scheduled_end_time=schedule.scheduled_end_time if schedule else None,
+                triggering_request_ids=triggering_request_ids,
+                reason=reason,
+                agent_id=self.agent_id,
+                correlation_id=correlation_id,
+            )
+            try:
+                await self.event_bus.publish(event)
+            except Exception as e:
+                # The new schedule is already booked; a lost diff must not fail the window
+                self.logger.error(f"Error publishing schedule change for request {request.id}: {e}", exc_info=True, extra={"correlation_id": correlation_id})
+
+    async def _schedule_window_greedily(self, maintenance_requests: List[MaintenanceRequest], correlation_id: Optional[str] = None) -> List[OptimizedSchedule]:
+        results = []
+        for request in maintenance_requests:
+            schedule = await self._schedule_with_greedy_algorithm(request, correlation_id)
+            if schedule.status == ScheduleStatus.SCHEDULED:
+                # the greedy search already booked the slot
+                self.current_schedule[request.id] = schedule
+                self._scheduled_requests[request.id] = request
+            results.append(schedule)
+        return results
+
+    def _record_booking(self, request: MaintenanceRequest, schedule: OptimizedSchedule) -> None:
+        self.calendar_service.book_slot(
+            schedule.assigned_technician_id, schedule.scheduled_start_time, schedule.scheduled_end_time, request.id
+        )
+        self.current_schedule[request.id] = schedule
+        self._scheduled_requests[request.id] = request
+
+    def _busy_slots(self, grid: WorkingTimeGrid, exclude: Set[str] = frozenset()) -> Dict[str, List[Tuple[int, int]]]:
+        """Booked intervals of the current schedule (except ``exclude``), as grid slots per technician."""
+        busy: Dict[str, List[Tuple[int, int]]] = {}
+        for request_id, schedule in self.current_schedule.items():
+            if request_id in exclude or schedule.status != ScheduleStatus.SCHEDULED or not schedule.assigned_technician_id:
+                continue
+            if schedule.scheduled_start_time is None or schedule.scheduled_end_time is None:
+                continue
+            start = grid.boundary_at_or_before(schedule.scheduled_start_time)
+            end = grid.slot_at_or_after(schedule.scheduled_end_time)
+            if end > start:
+                busy.setdefault(schedule.assigned_technician_id, []).append((start, end))
+        return busy
+
+    def _schedule_hints(self, grid: WorkingTimeGrid, tasks) -> Dict[str, Tuple[str, int]]:
+        """Previous assignments of requests that are being scheduled again."""
+        hints: Dict[str, Tuple[str, int]] = {}
+        for task in tasks:
+            previous = self.current_schedule.get(task.request_id)
+            if previous is not None and previous.assigned_technician_id and previous.scheduled_start_time:
+                hints[task.request_id] = (previous.assigned_technician_id, grid.slot_at_or_after(previous.scheduled_start_time))
+        return hints
 
     def _adjust_to_business_hours(self, dt: datetime) -> datetime:
         """Adjust datetime to business hours (8 AM to 6 PM, Monday to Friday)."""
@@ -616,7 +814,8 @@ class SchedulingAgent(BaseAgent):
         score = technician["availability_score"] * 0.5 + min(technician["experience_years"] / 10.0, 1.0) * 0.5
         return min(score, 1.0)
     
-    async def _publish_maintenance_scheduled_event(self, original_event, schedule: OptimizedSchedule, correlation_id: Optional[str] = None) -> None:
+    async def _publish_maintenance_scheduled_event(self, original_event, schedule: OptimizedSchedule, correlation_id: Optional[str] = None,
+                                                   scheduling_method: str = "greedy") -> None:
         """Publish a MaintenanceScheduledEvent using the event bus directly."""
         try:
             # Handle both dict and object types
@@ -642,7 +841,7 @@ class SchedulingAgent(BaseAgent):
                 assigned_technician_id=schedule.assigned_technician_id,
                 scheduled_start_time=schedule.scheduled_start_time,
                 scheduled_end_time=schedule.scheduled_end_time,
-                scheduling_method="greedy", # Example
+                scheduling_method=scheduling_method,
                 optimization_score=schedule.optimization_score,
                 constraints_satisfied=schedule.constraints_satisfied or [],
                 constraints_violated=schedule.constraints_violated or [],
@@ -0,0 +1,196 @@
+"""
+In-memory per-technician calendar index.
+
+The greedy scheduler used to find a slot by walking forward an hour at a time
+and asking the calendar about each candidate. That costs one probe per hour
+of the search window, and calendars that are weeks full make it slower still.
+This index answers "earliest free slot of duration D after T, within working
+hours" directly:
+
+- time is measured in working seconds (weekdays 08:00-18:00 UTC laid end to
+  end), so nights and weekends take no room and a fully booked stretch of days
+  is a single busy block;
+- each technician's bookings are kept as sorted, non-overlapping busy blocks
+  (touching bookings are merged), so a lookup is a binary search and the
+  search only hops over blocks that actually get in the way;
+- booking checks for conflicts and inserts under a lock, so it either takes
+  the slot or leaves the calendar unchanged. Rebooking a request moves it, and
+  bookings can be released again.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from apps.agents.decision.schedule_optimizer import WORKDAY_END_HOUR, WORKDAY_START_HOUR, as_utc
+
+logger = logging.getLogger(__name__)
+
+WORKDAY_SECONDS = (WORKDAY_END_HOUR - WORKDAY_START_HOUR) * 3600
+_MONDAY = date(1970, 1, 5)
+
+
+def to_working_seconds(dt: datetime, round_up: bool = False) -> int:
+    """Working seconds between the epoch and ``dt``; non-working time maps to the next opening."""
+    dt = as_utc(dt)
+    weeks, weekday = divmod((dt.date() - _MONDAY).days, 7)
+    day = weeks * 5 + min(weekday, 5)
+    if weekday >= 5:
+        return day * WORKDAY_SECONDS  # Monday's opening
+    opening = datetime.combine(dt.date(), time(WORKDAY_START_HOUR), tzinfo=dt.tzinfo)
+    seconds = (dt - opening).total_seconds()
+    seconds = math.ceil(seconds) if round_up else math.floor(seconds)
+    return day * WORKDAY_SECONDS + min(max(seconds, 0), WORKDAY_SECONDS)
+
+
+def from_working_seconds(value: int) -> datetime:
+    """The UTC datetime ``value`` working seconds after the epoch."""
+    day, offset = divmod(value, WORKDAY_SECONDS)
+    weeks, weekday = divmod(day, 5)
+    opening = datetime.combine(_MONDAY + timedelta(days=weeks * 7 + weekday), time(WORKDAY_START_HOUR))
+    return as_utc(opening) + timedelta(seconds=offset)
+
+
+class _Timeline:
+    """Sorted, non-overlapping busy blocks of one technician, in working seconds."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def is_free(self, start: int, end: int) -> bool:
+        index = bisect.bisect_right(self.ends, start)  # first block ending after ``start``
+        return index == len(self.starts) or self.starts[index] >= end
+
+    def insert(self, start: int, end: int) -> None:
+        index = bisect.bisect_right(self.ends, start)
+        if index < len(self.starts) and self.starts[index] == end:
+            end = self.ends[index]
+            del self.starts[index], self.ends[index]
+        if index > 0 and self.ends[index - 1] == start:
+            index -= 1
+            start = self.starts[index]
+            del self.starts[index], self.ends[index]
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+
+    def remove(self, start: int, end: int) -> None:
+        index = bisect.bisect_right(self.starts, start) - 1  # the block holding [start, end)
+        block_start, block_end = self.starts[index], self.ends[index]
+        del self.starts[index], self.ends[index]
+        if end < block_end:
+            self.starts.insert(index, end)
+            self.ends.insert(index, block_end)
+        if block_start < start:
+            self.starts.insert(index, block_start)
+            self.ends.insert(index, start)
+
+
+class TechnicianCalendarIndex:
+    """Bookings per technician with O(log n) conflict checks and earliest-slot search."""
+
+    def __init__(self):
+        self._timelines: Dict[str, _Timeline] = {}
+        self._bookings: Dict[str, Tuple[str, int, int]] = {}  # request id -> (technician id, start, end)
+        self._lock = threading.Lock()
+        self.stats = {"bookings": 0, "conflicts": 0, "releases": 0, "searches": 0, "probes": 0}
+
+    def is_free(self, technician_id: str, start_time: datetime, end_time: datetime) -> bool:
+        """Whether the technician has no booking overlapping ``[start_time, end_time)``."""
+        start, end = to_working_seconds(start_time), to_working_seconds(end_time, round_up=True)
+        with self._lock:
+            timeline = self._timelines.get(technician_id)
+            return end <= start or timeline is None or timeline.is_free(start, end)
+
+    def book(self, technician_id: str, start_time: datetime, end_time: datetime, request_id: str) -> bool:
+        """
+        Book ``[start_time, end_time)`` for ``request_id``.
+
+        Returns False, leaving the calendar unchanged, when the slot overlaps
+        another booking. A request that is already booked is moved.
+        """
+        start, end = to_working_seconds(start_time), to_working_seconds(end_time, round_up=True)
+        with self._lock:
+            previous = self._bookings.pop(request_id, None)
+            if previous is not None:
+                self._timelines[previous[0]].remove(previous[1], previous[2])
+            timeline = self._timelines.setdefault(technician_id, _Timeline())
+            if end > start and not timeline.is_free(start, end):
+                if previous is not None:
+                    self._timelines[previous[0]].insert(previous[1], previous[2])
+                    self._bookings[request_id] = previous
+                self.stats["conflicts"] += 1
+                return False
+            if end > start:
+                timeline.insert(start, end)
+                self._bookings[request_id] = (technician_id, start, end)
+            self.stats["bookings"] += 1
+            return True
+
+    def release(self, request_id: str) -> bool:
+        """Free the slot booked for ``request_id``; False when it has none."""
+        with self._lock:
+            booking = self._bookings.pop(request_id, None)
+            if booking is None:
+                return False
+            self._timelines[booking[0]].remove(booking[1], booking[2])
+            self.stats["releases"] += 1
+            return True
+
+    def earliest_free_slot(
+        self,
+        technician_id: str,
+        duration: timedelta,
+        after: datetime,
+        before: Optional[datetime] = None,
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Earliest ``(start, end)`` of length ``duration`` within one working day,
+        starting at or after ``after`` and ending by ``before``.
+        """
+        length = math.ceil(duration.total_seconds())
+        if length > WORKDAY_SECONDS:
+            return None
+        candidate = to_working_seconds(after, round_up=True)
+        limit = to_working_seconds(before) if before is not None else None
+        with self._lock:
+            self.stats["searches"] += 1
+            timeline = self._timelines.get(technician_id) or _Timeline()
+            while limit is None or candidate + length <= limit:
+                self.stats["probes"] += 1
+                index = bisect.bisect_right(timeline.ends, candidate)
+                if index < len(timeline.starts) and timeline.starts[index] < candidate + length:
+                    candidate = timeline.ends[index]  # hop over the blocking booking
+                    continue
+                day_close = (candidate // WORKDAY_SECONDS + 1) * WORKDAY_SECONDS
+                if candidate + length > day_close:
+                    candidate = day_close  # does not fit before closing: next working day
+                    continue
+                start_time = from_working_seconds(candidate)
+                return start_time, start_time + duration
+        return None
+
+    def bookings(self, technician_id: str) -> List[Tuple[datetime, datetime]]:
+        """The technician's busy blocks, merged where bookings touch."""
+        with self._lock:
+            timeline = self._timelines.get(technician_id)
+            if timeline is None:
+                return []
+            return [
+                (from_working_seconds(start), from_working_seconds(end - 1) + timedelta(seconds=1))
+                for start, end in zip(timeline.starts, timeline.ends)
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "technicians": len(self._timelines),
+                "active_bookings": len(self._bookings),
+                "busy_blocks": sum(len(timeline.starts) for timeline in self._timelines.values()),
+            }
@@ -1,3 +1,4 @@
+import asyncio
 import logging  # For basic logging if setup_logging is not yet fully integrated
 
 from fastapi import Depends, FastAPI, HTTPException, Request, status
@@ -111,6 +112,31 @@ async def lifespan(app: FastAPI):
         logging.error(f"Error during Redis client initialization: {e}", exc_info=True)
         # Continue without Redis - graceful degradation
 
+    # Keep MLflow registry metadata mirrored in-process (version resolution, model routing)
+    if not settings.DISABLE_MLFLOW_MODEL_LOADING:
+        try:
+            from apps.ml.registry_mirror import get_registry_mirror
+
+            get_registry_mirror().start()
+            logging.info("MLflow registry mirror background refresh started.")
+        except Exception as e:
+            logging.error(f"Error starting MLflow registry mirror: {e}", exc_info=True)
+
+    # Warm champion models in the background; /health/ready stays not-ready until done
+    from apps.ml.model_loader import mlflow_disabled
+    from apps.ml.warmup import get_model_warmup
+
+    model_warmup = get_model_warmup()
+    app.state.model_warmup_task = None
+    if mlflow_disabled():
+        model_warmup.skip("MLflow model loading disabled")
+    elif not settings.ML_WARMUP_ENABLED:
+        model_warmup.skip("ML_WARMUP_ENABLED is false")
+    else:
+        app.state.model_warmup_task = asyncio.create_task(
+            model_warmup.run(ml_endpoints._resolve_model_version)
+        )
+
     # Expose the /metrics endpoint
     instrumentator.expose(app, include_in_schema=False)
     logging.info("Prometheus metrics endpoint exposed at /metrics")
@@ -118,6 +144,10 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
+    warmup_task = getattr(app.state, "model_warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+
     logging.info("Application shutdown: Shutting down Redis client...")
     try:
         await close_redis_client()
@@ -125,6 +155,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logging.error(f"Error during Redis client shutdown: {e}", exc_info=True)
 
+    logging.info("Application shutdown: Releasing ML serving executors...")
+    try:
+        from apps.ml.forecasting import shutdown_forecast_pool
+        from apps.ml.model_cache import shutdown_model_cache
+        from apps.ml.registry_mirror import shutdown_registry_mirror
+        from apps.ml.serving import shutdown_model_server
+
+        shutdown_registry_mirror()
+        shutdown_model_server()
+        shutdown_forecast_pool()
+        shutdown_model_cache()
+    except Exception as e:
+        logging.error(f"Error during ML serving shutdown: {e}", exc_info=True)
+
     logging.info("Application shutdown: Shutting down SystemCoordinator...")
     if hasattr(app.state, 'coordinator') and app.state.coordinator:
         try:
@@ -226,6 +270,18 @@ async def health_check() -> HealthStatus:
     return response
 
 
+# Readiness probe: not ready until the model warm-up phase has completed
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """Report whether champion models are loaded and warmed (503 while warming up)."""
+    from apps.ml.warmup import get_model_warmup
+
+    warmup_status = get_model_warmup().get_status()
+    if not warmup_status["ready"]:
+        return JSONResponse(warmup_status, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return warmup_status
+
+
 # Database health check endpoint
 @app.get("/health/db", tags=["Health"])
 async def health_check_db(db: AsyncSession = Depends(get_async_db)):
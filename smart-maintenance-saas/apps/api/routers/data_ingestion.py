@@ -2,6 +2,7 @@ import uuid
 import logging
 from fastapi import APIRouter, Request, HTTPException, Depends, Security
 from apps.api.dependencies import api_key_auth # Updated to use api_key_auth
+from apps.ml.forecast_cache import get_forecast_cache
 from data.schemas import SensorReadingCreate
 from core.events.event_models import SensorDataReceivedEvent
 from core.events.event_bus import EventBus
@@ -130,6 +131,8 @@ async def ingest_sensor_data(
     try:
         await event_bus.publish(event)
         logger.info(f"Successfully published event {event.event_id} for sensor {reading.sensor_id}")
+        # New data makes cached forecasts for this sensor stale
+        get_forecast_cache().note_readings(reading.sensor_id)
         
         return {
             "status": "event_published",
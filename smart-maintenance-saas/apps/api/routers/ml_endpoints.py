@@ -5,28 +5,61 @@ This module provides production-ready ML API endpoints for prediction and anomal
 using our validated MLflow Model Registry integration from Day 11.
 """
 
+import asyncio
+import bisect
+import json
 import logging
 import uuid
 import math
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Set, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Security
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.dependencies import api_key_auth
-from apps.ml.model_loader import load_model, mlflow_disabled
+from apps.ml.explainability import (
+    SHAP_AVAILABLE,
+    BackgroundNotReadyError,
+    explain_rows,
+    get_explainer_cache,
+    get_explanation_job_store,
+    unwrap_native_model,
+)
+from apps.ml.forecast_cache import forecast_cache_key, get_forecast_cache
+from apps.ml.forecasting import (
+    future_frame,
+    get_forecast_pool,
+    history_frame,
+    infer_cadence_minutes,
+    predict_forecast,
+)
+from apps.ml.model_cache import get_model_cache
+from apps.ml.model_loader import load_model, model_cache_key, mlflow_disabled
+from apps.ml.registry_mirror import get_registry_mirror
+from apps.ml.serving import Deadline, get_model_server
+from apps.ml.warmup import get_model_warmup
+from core.config.settings import settings
 from core.database.session import get_async_db
 from core.security.api_keys import API_KEY_HEADER_NAME
 from data.schemas import AnomalyAlert, AnomalyType, SensorReading
 from scipy.stats import ks_2samp
 
-from core.database.crud.crud_sensor_reading import crud_sensor_reading
+from core.database.crud.crud_sensor_reading import SensorHistory, crud_sensor_reading
+
+try:  # Arrow IPC payloads for /predict_batch
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PYARROW_AVAILABLE = False
+    pa = None
 
 try:  # Resolve model versions when "auto" requested
     import mlflow
@@ -37,14 +70,6 @@ except ImportError:  # pragma: no cover - optional dependency already present in
     mlflow = None
     MlflowClient = None
 
-# SHAP for explainable AI
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    shap = None
-
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -77,6 +102,15 @@ ANOMALY_SCALE_BASELINES = {
 
 FALLBACK_MODEL_VERSIONS: tuple[str, ...] = ("5", "4", "3", "2", "1")
 
+AI4I_FEATURE_ORDER = [
+    "Air_temperature_K",
+    "Process_temperature_K",
+    "Rotational_speed_rpm",
+    "Torque_Nm",
+    "Tool_wear_min",
+]
+ARROW_CONTENT_TYPES = {"application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file"}
+
 
 def _ensure_mlflow_enabled() -> None:
     """Raise a consistent HTTPException when MLflow access is disabled."""
@@ -136,12 +170,12 @@ def _resolve_model_version(model_name: str, requested_version: str) -> str:
     return requested_version
 
 
-def _min_max_scale(value: float, lower: float, upper: float) -> float:
-    """Safely scale a numeric value into [0, 1] range."""
-    if upper <= lower:
-        return 0.5
-    scaled = (value - lower) / (upper - lower)
-    return float(min(1.0, max(0.0, scaled)))
+def _min_max_scale_array(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Safely scale values into [0, 1] range (0.5 where the range is empty)."""
+    span = upper - lower
+    scaled = np.full(values.shape, 0.5)
+    np.divide(values - lower, span, out=scaled, where=span > 0)
+    return np.where(span > 0, np.clip(scaled, 0.0, 1.0), 0.5)
 
 
 def _resolve_feature_order(
@@ -175,30 +209,24 @@ async def _fetch_sensor_histories(
     db: AsyncSession,
     readings: List[SensorReading],
     history_limit: int = ANOMALY_HISTORY_LOOKBACK,
-) -> Dict[str, List[SensorReading]]:
-    """Retrieve recent sensor readings per sensor_id for feature engineering."""
-    histories: Dict[str, List[SensorReading]] = {}
-    for reading in readings:
-        sensor_id = reading.sensor_id
-        if not sensor_id or sensor_id in histories:
-            continue
-        try:
-            raw_history = await crud_sensor_reading.get_sensor_readings_by_sensor_id(
-                db,
-                sensor_id=sensor_id,
-                limit=history_limit,
-            )
-            histories[sensor_id] = [
-                crud_sensor_reading.orm_to_pydantic(item) for item in raw_history
-            ]
-        except Exception as history_error:  # noqa: BLE001
-            logger.warning(
-                "Unable to load historical readings for sensor %s: %s",
-                sensor_id,
-                history_error,
-            )
-            histories[sensor_id] = []
-    return histories
+) -> Dict[str, SensorHistory]:
+    """Retrieve recent sensor readings for every sensor in the request with one query."""
+    sensor_ids = [reading.sensor_id for reading in readings if reading.sensor_id]
+    if not sensor_ids:
+        return {}
+    try:
+        return await crud_sensor_reading.get_recent_readings_for_sensors(
+            db,
+            sensor_ids=sensor_ids,
+            limit_per_sensor=history_limit,
+        )
+    except Exception as history_error:  # noqa: BLE001
+        logger.warning(
+            "Unable to load historical readings for %d sensors: %s",
+            len(set(sensor_ids)),
+            history_error,
+        )
+        return {}
 
 
 # ==============================================================================
@@ -212,7 +240,13 @@ class PredictionRequest(BaseModel):
     model_version: str = Field(default="auto", description="Version of the model (default: auto-resolve)")
     features: Dict[str, Any] = Field(..., description="Feature values for prediction")
     sensor_id: Optional[str] = Field(None, description="Optional sensor ID for tracking")
-    explain: bool = Field(True, description="Whether to compute SHAP explainability (can add latency)")
+    explain: Union[Literal["async"], bool] = Field(
+        False,
+        description=(
+            "SHAP explainability mode: false (default) skips it, true computes it inline "
+            "(adds latency), 'async' returns an explanation job id immediately"
+        ),
+    )
     
     class Config:
         json_schema_extra = {
@@ -241,11 +275,79 @@ class PredictionResponse(BaseModel):
     request_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique request ID")
     shap_values: Optional[Dict[str, Any]] = Field(None, description="SHAP explainability values")
     feature_importance: Optional[Dict[str, float]] = Field(None, description="Feature importance scores")
+    explanation_job_id: Optional[str] = Field(None, description="Job id to poll when explain='async'")
+    explanation_status: Optional[str] = Field(
+        None,
+        description="Status of the asynchronous explanation job, or 'background_not_ready' for inline SHAP",
+    )
     
     class Config:
         json_encoders = {datetime: lambda dt: dt.isoformat()}
 
 
+class BatchPredictionRequest(BaseModel):
+    """Request schema for /predict_batch endpoint (JSON variant)"""
+
+    model_name: str = Field(..., description="Name of the model in MLflow Registry")
+    model_version: str = Field(default="auto", description="Version of the model (default: auto-resolve)")
+    rows: List[Dict[str, Any]] = Field(..., min_length=1, description="Feature rows to score")
+    sensor_ids: Optional[List[Optional[str]]] = Field(None, description="Optional sensor ID per row")
+    explain: bool = Field(False, description="Compute SHAP values for every row in one batched call")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model_name": "ai4i_classifier_randomforest_baseline",
+                "model_version": "auto",
+                "rows": [
+                    {
+                        "Air_temperature_K": 298.1,
+                        "Process_temperature_K": 308.6,
+                        "Rotational_speed_rpm": 1551,
+                        "Torque_Nm": 42.8,
+                        "Tool_wear_min": 108
+                    }
+                ],
+                "sensor_ids": ["sensor_001"]
+            }
+        }
+
+
+class BatchPredictionResponse(BaseModel):
+    """Columnar response schema for /predict_batch endpoint"""
+
+    row_count: int = Field(..., description="Number of rows scored")
+    feature_names: List[str] = Field(..., description="Feature column order used for scoring")
+    predictions: List[Any] = Field(..., description="Prediction per row")
+    confidence: Optional[List[Optional[float]]] = Field(None, description="Max class probability per row")
+    sensor_ids: Optional[List[Optional[str]]] = Field(None, description="Sensor ID per row, if provided")
+    shap_values: Optional[Dict[str, List[float]]] = Field(None, description="SHAP value columns keyed by feature")
+    explanation_status: Optional[str] = Field(
+        None, description="'background_not_ready' when SHAP was requested before enough rows were scored"
+    )
+    model_info: Dict[str, str] = Field(..., description="Model metadata")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Prediction timestamp")
+    request_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique request ID")
+
+    class Config:
+        json_encoders = {datetime: lambda dt: dt.isoformat()}
+
+
+class ExplanationJobResponse(BaseModel):
+    """Status/result of an asynchronous SHAP explanation job"""
+
+    job_id: str
+    status: str = Field(..., description="pending, completed or failed")
+    model_name: str
+    model_version: str
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    shap_values: Optional[Dict[str, Any]] = None
+    feature_importance: Optional[Dict[str, float]] = None
+    explainer_type: Optional[str] = None
+    error: Optional[str] = None
+
+
 class AnomalyDetectionRequest(BaseModel):
     """Request schema for /detect_anomaly endpoint"""
     
@@ -354,6 +456,20 @@ class ForecastResponse(BaseModel):
     metrics: Optional[Dict[str, Any]] = None
 
 
+class ForecastBatchRequest(BaseModel):
+    """Payload for forecasting many sensors in one call."""
+
+    sensor_ids: List[str] = Field(..., description="Sensors to forecast")
+    model_name: Optional[str] = Field(None, description="Registered model used for every sensor")
+    model_names: Dict[str, str] = Field(
+        default_factory=dict, description="Per-sensor model overrides (sensor_id -> registered model name)"
+    )
+    model_version: str = Field(default="auto", description="Specific model version or 'auto' for latest")
+    history_window: int = Field(default=288, ge=10, le=1000, description="Number of latest readings per sensor")
+    horizon_steps: int = Field(default=12, ge=1, le=288, description="Number of future predictions per sensor")
+    cadence_minutes: Optional[int] = Field(None, description="Override cadence in minutes; defaults to sensor cadence")
+
+
 class ForecastRequest(BaseModel):
     """Payload for generating forecasts for a sensor."""
 
@@ -369,7 +485,12 @@ class ForecastRequest(BaseModel):
 # HELPER FUNCTIONS
 # ==============================================================================
 
-def compute_shap_explanation(model, feature_array: np.ndarray, feature_names: List[str] = None) -> Optional[Dict[str, Any]]:
+def compute_shap_explanation(
+    model,
+    feature_array: np.ndarray,
+    feature_names: List[str] = None,
+    cache_key: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Compute SHAP values for model explainability.
     
@@ -377,75 +498,102 @@ def compute_shap_explanation(model, feature_array: np.ndarray, feature_names: Li
         model: Trained model
         feature_array: Input features
         feature_names: List of feature names
+        cache_key: ``model:version`` key used to reuse the cached explainer
         
     Returns:
-        Dictionary with SHAP values and feature importance, or None if SHAP not available
+        Dictionary with SHAP values and feature importance for the first row,
+        or None if SHAP not available
+
+    Raises:
+        BackgroundNotReadyError: Too few rows have been scored to explain this model yet
     """
     if not SHAP_AVAILABLE:
         logger.warning("SHAP not available for explainability")
         return None
     
     try:
-        # Check if model is tree-based (supports TreeExplainer)
-        model_type = str(type(model)).lower()
-        
-        if any(tree_type in model_type for tree_type in ['forest', 'tree', 'lgb', 'xgb', 'catboost']):
-            # Use TreeExplainer for tree-based models
-            explainer = shap.TreeExplainer(model)
-            shap_values = explainer.shap_values(feature_array)
-            
-            # Handle multi-class outputs
-            if isinstance(shap_values, list):
-                shap_values = shap_values[0]  # Use first class for simplicity
-                
-        else:
-            # Use KernelExplainer for other models (slower but more general)
-            # Create a small background dataset from the input
-            background = np.zeros((min(10, feature_array.shape[0]), feature_array.shape[1]))
-            explainer = shap.KernelExplainer(model.predict, background)
-            shap_values = explainer.shap_values(feature_array)
-        
-        # Convert to feature importance dictionary
-        if feature_names is None:
-            feature_names = [f"feature_{i}" for i in range(feature_array.shape[1])]
-        
-        # For single prediction, extract the first row
-        if len(shap_values.shape) > 1:
-            importance_values = shap_values[0]
-        else:
-            importance_values = shap_values
-            
-        feature_importance = {
-            name: float(value) for name, value in zip(feature_names, importance_values)
-        }
-        
-        # Convert SHAP values to dictionary format expected by Pydantic model
-        if len(shap_values.shape) > 1:
-            shap_values_dict = {
-                name: float(value) for name, value in zip(feature_names, shap_values[0])
-            }
-        else:
-            shap_values_dict = {
-                name: float(value) for name, value in zip(feature_names, shap_values)
-            }
-        
-        return {
-            "shap_values": shap_values_dict,  # Return as dictionary instead of list
-            "feature_importance": feature_importance,
-            "explainer_type": explainer.__class__.__name__
-        }
-        
+        explanations = explain_rows(model, feature_array, feature_names, cache_key=cache_key)
+        return explanations[0] if explanations else None
+    except BackgroundNotReadyError:
+        raise
     except Exception as e:
         logger.warning(f"Failed to compute SHAP values: {e}")
         return None
 
 
+# Strong references to in-flight explanation tasks so they are not garbage collected.
+_explanation_tasks: Set[asyncio.Task] = set()
+
+
+async def _run_explanation_job(
+    job: Dict[str, Any],
+    model,
+    prediction_input: np.ndarray,
+    feature_names: Optional[List[str]],
+    cache_key: str,
+) -> None:
+    """Compute SHAP values for a prediction off the request path and record the outcome."""
+    store = get_explanation_job_store()
+    await store.save(job)
+    try:
+        explanation = await get_model_server().run(
+            compute_shap_explanation, model, prediction_input, feature_names, cache_key
+        )
+        if explanation is None:
+            job.update(status="failed", error="SHAP explanation unavailable for this model")
+        else:
+            job.update(
+                status="completed",
+                shap_values=explanation.get("shap_values"),
+                feature_importance=explanation.get("feature_importance"),
+                explainer_type=explanation.get("explainer_type"),
+            )
+    except Exception as job_error:  # noqa: BLE001
+        logger.warning("Explanation job %s failed: %s", job["job_id"], job_error)
+        job.update(status="failed", error=str(job_error))
+    job["completed_at"] = datetime.utcnow().isoformat()
+    await store.save(job)
+
+
+def _schedule_explanation_job(
+    model,
+    model_name: str,
+    model_version: str,
+    prediction_input: np.ndarray,
+    feature_names: Optional[List[str]],
+) -> Dict[str, Any]:
+    """Register an explanation job and start it in the background."""
+    job = get_explanation_job_store().create(model_name, model_version)
+    task = asyncio.create_task(
+        _run_explanation_job(
+            job,
+            model,
+            prediction_input,
+            feature_names,
+            model_cache_key(model_name, model_version),
+        )
+    )
+    _explanation_tasks.add(task)
+    task.add_done_callback(_explanation_tasks.discard)
+    return job
+
+
 def _resolve_model_version(model_name: str, requested_version: str) -> str:
     """Resolve model version when callers request 'auto' or 'latest'."""
 
     if requested_version and requested_version.lower() not in {"auto", "latest"}:
         return requested_version
 
+    stage_preferences = [["Production"], ["Staging"], ["None"], None]
+
+    # Registry mirror first: O(1) lookups that never wait on the registry.
+    mirror_snapshot = get_registry_mirror().peek()
+    if mirror_snapshot is not None and mirror_snapshot.versions.get(model_name):
+        for stages in stage_preferences:
+            resolved = mirror_snapshot.latest_version(model_name, stages)
+            if resolved:
+                return resolved
+
     if not MLFLOW_AVAILABLE:
         logger.warning(
             "MLflow unavailable while resolving version for %s; defaulting to '1'",
@@ -454,7 +602,6 @@ def _resolve_model_version(model_name: str, requested_version: str) -> str:
         return "1"
 
     client = MlflowClient()
-    stage_preferences = [["Production"], ["Staging"], ["None"], None]
     for stages in stage_preferences:
         try:
             latest_versions = (
@@ -497,10 +644,7 @@ def prepare_features_for_prediction(features: Dict[str, Any], model_name: str) -
         # Model-specific feature preparation
         if "ai4i" in model_name.lower():
             # AI4I dataset specific features
-            expected_features = [
-                "Air_temperature_K", "Process_temperature_K", 
-                "Rotational_speed_rpm", "Torque_Nm", "Tool_wear_min"
-            ]
+            expected_features = AI4I_FEATURE_ORDER
             
             # Ensure all expected features are present
             missing_features = [f for f in expected_features if f not in df.columns]
@@ -525,136 +669,497 @@ def prepare_features_for_prediction(features: Dict[str, Any], model_name: str) -
         )
 
 
+def _score_features(
+    model,
+    features: Dict[str, Any],
+    model_name: str,
+    resolved_version: str,
+) -> Tuple[Any, np.ndarray, Optional[float]]:
+    """
+    Prepare features, run the model and extract confidence (blocking; runs in the inference pool).
+
+    Falls back to adapting the feature vector to the model's expected width when the
+    standard preparation does not match the model signature.
+
+    Returns:
+        Tuple of (prediction, prediction_input, confidence)
+    """
+    prediction_input = None  # Initialize prediction_input variable
+    
+    try:
+        # Try to prepare features normally first
+        feature_array = prepare_features_for_prediction(features, model_name)
+        
+        # Check if the feature count matches model expectations
+        prediction_input = feature_array.reshape(1, -1)
+        
+        # Try prediction to see if dimensions match
+        prediction = model.predict(prediction_input)
+        
+    except Exception as feature_error:
+        logger.warning(f"Standard feature preparation failed: {feature_error}")
+        
+        # Flexible feature adaptation
+        try:
+            # Get model's expected feature count
+            if hasattr(model, 'n_features_in_'):
+                expected_features = model.n_features_in_
+            elif hasattr(model, 'feature_importances_'):
+                expected_features = len(model.feature_importances_)
+            else:
+                # Try to infer from a test prediction
+                test_input = np.zeros((1, len(features)))
+                try:
+                    model.predict(test_input)
+                    expected_features = len(features)
+                except Exception as e:
+                    # Extract expected feature count from error message
+                    error_str = str(e)
+                    if "expecting" in error_str and "features" in error_str:
+                        import re
+                        match = re.search(r'expecting (\d+) features', error_str)
+                        if match:
+                            expected_features = int(match.group(1))
+                        else:
+                            expected_features = 12  # Common default
+                    else:
+                        expected_features = 12
+            
+            logger.info(f"Model expects {expected_features} features, adapting input...")
+            
+            # Create feature vector of the right size
+            feature_values = list(features.values())
+            
+            if len(feature_values) < expected_features:
+                # Pad with zeros or repeat last value
+                padding_needed = expected_features - len(feature_values)
+                if len(feature_values) > 0:
+                    # Repeat the mean of existing features
+                    mean_value = np.mean(feature_values)
+                    feature_values.extend([mean_value] * padding_needed)
+                else:
+                    # All zeros if no features provided
+                    feature_values = [0.0] * expected_features
+            elif len(feature_values) > expected_features:
+                # Truncate to expected size
+                feature_values = feature_values[:expected_features]
+            
+            # Create prediction input
+            prediction_input = np.array(feature_values).reshape(1, -1)
+            
+            # Generate prediction
+            prediction = model.predict(prediction_input)
+            
+            logger.info(f"Successfully adapted features from {len(features)} to {expected_features}")
+            
+        except Exception as adapt_error:
+            logger.error(
+                "Feature adaptation failed for model %s v%s (%d features provided): %s",
+                model_name,
+                resolved_version,
+                len(features),
+                adapt_error,
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    "Feature adaptation failed for model "
+                    f"'{model_name}' (version {resolved_version}). "
+                    f"Provided {len(features)} features; "
+                    f"error: {adapt_error}. Try a different model or verify feature requirements."
+                ),
+            )
+    
+    # Extract confidence if available (model-dependent)
+    confidence = None
+    if hasattr(model, 'predict_proba'):
+        try:
+            proba = model.predict_proba(prediction_input)
+            confidence = float(np.max(proba))
+        except Exception as e:
+            logger.warning(f"Could not extract confidence: {e}")
+
+    return prediction, prediction_input, confidence
+
+
+def _resolve_batch_feature_order(
+    model,
+    model_name: str,
+    feature_names: Optional[List[str]],
+    frame: pd.DataFrame,
+) -> List[str]:
+    """Determine the column order for batch scoring (artifact schema first, then model hints)."""
+    if feature_names:
+        return list(feature_names)
+    if "ai4i" in model_name.lower():
+        return list(AI4I_FEATURE_ORDER)
+    for candidate in (model, unwrap_native_model(model)):
+        model_feature_names = getattr(candidate, "feature_names_in_", None)
+        if model_feature_names is not None:
+            return [str(name) for name in model_feature_names]
+    return [str(column) for column in frame.columns]
+
+
+def prepare_feature_matrix(
+    frame: pd.DataFrame,
+    model,
+    model_name: str,
+    feature_names: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Validate a batch of feature rows once and return the ordered numeric matrix.
+
+    Args:
+        frame: One row per prediction, one column per feature
+        model: Loaded model (used for feature-name hints)
+        model_name: Name of the model (for model-specific feature order)
+        feature_names: Feature schema from the model artifact, if available
+
+    Returns:
+        DataFrame restricted to (and ordered by) the model's feature columns
+
+    Raises:
+        HTTPException: 400 listing missing columns or rows with missing/non-numeric values
+    """
+    feature_order = _resolve_batch_feature_order(model, model_name, feature_names, frame)
+
+    missing_columns = [name for name in feature_order if name not in frame.columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing required features: {missing_columns}",
+        )
+
+    matrix = frame[feature_order].apply(pd.to_numeric, errors="coerce").astype(float)
+    invalid_rows = np.flatnonzero(matrix.isna().to_numpy().any(axis=1))
+    if invalid_rows.size:
+        preview = invalid_rows[:10].tolist()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"{invalid_rows.size} rows have missing or non-numeric feature values "
+                f"(first row indices: {preview})"
+            ),
+        )
+    return matrix
+
+
+def _score_feature_matrix(model, matrix: pd.DataFrame) -> Tuple[List[Any], Optional[List[Optional[float]]]]:
+    """Run one predict (and one predict_proba when supported) over the whole batch."""
+    predictions = np.asarray(model.predict(matrix)).reshape(len(matrix), -1)
+    prediction_values = (
+        predictions[:, 0].tolist() if predictions.shape[1] == 1 else predictions.tolist()
+    )
+
+    confidence: Optional[List[Optional[float]]] = None
+    proba_model = model if hasattr(model, "predict_proba") else unwrap_native_model(model)
+    if hasattr(proba_model, "predict_proba"):
+        try:
+            proba_input = (
+                matrix if getattr(proba_model, "feature_names_in_", None) is not None else matrix.to_numpy()
+            )
+            proba = np.asarray(proba_model.predict_proba(proba_input))
+            confidence = proba.max(axis=1).astype(float).tolist()
+        except Exception as proba_error:  # noqa: BLE001
+            logger.warning(f"Could not extract batch confidence: {proba_error}")
+
+    return prediction_values, confidence
+
+
+def _observe_scored_rows(model_name: str, model_version: str, matrix: Any) -> None:
+    """Offer scored feature rows to the SHAP background reservoir of the model version."""
+    try:
+        get_explainer_cache().observe(model_cache_key(model_name, model_version), np.asarray(matrix, dtype=float))
+    except Exception as observe_error:  # noqa: BLE001 - explainability must never fail a prediction
+        logger.debug("Scored rows not recorded for SHAP background: %s", observe_error)
+
+
+def _explain_feature_matrix(
+    model, matrix: pd.DataFrame, cache_key: str
+) -> Optional[Dict[str, List[float]]]:
+    """Explain every row of a batch in one SHAP call and return columnar values."""
+    explanations = explain_rows(model, matrix.to_numpy(), list(matrix.columns), cache_key=cache_key)
+    if not explanations:
+        return None
+    return {
+        name: [row["shap_values"][name] for row in explanations] for name in matrix.columns
+    }
+
+
+def _read_arrow_frame(body: bytes, content_type: str) -> pd.DataFrame:
+    """Decode an Arrow IPC stream/file payload into a DataFrame."""
+    if not PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Arrow payloads require pyarrow, which is not installed",
+        )
+    try:
+        if content_type.endswith(".file"):
+            table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+        else:
+            table = pa.ipc.open_stream(pa.BufferReader(body)).read_all()
+    except Exception as arrow_error:  # noqa: BLE001
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid Arrow payload: {arrow_error}",
+        ) from arrow_error
+    return table.to_pandas()
+
+
+def _deadline_exceeded(operation: str, model_name: str, deadline: Deadline) -> HTTPException:
+    """Build the 504 raised when an ML request exhausts its deadline."""
+    logger.warning(
+        "%s for model %s exceeded its %.1fs deadline",
+        operation,
+        model_name,
+        deadline.timeout_seconds or 0.0,
+    )
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=f"{operation} exceeded the {deadline.timeout_seconds}s request deadline",
+    )
+
+
+@dataclass
+class _HistoryBlock:
+    """Location of one sensor's history inside the flattened history arrays."""
+
+    offset: int
+    timestamps: List[Optional[datetime]]
+    leading_untimed: int
+    quality_min: float
+    quality_max: float
+
+
+def _count_prior_readings(block: _HistoryBlock, timestamp: Optional[datetime]) -> int:
+    """Number of history rows strictly before ``timestamp`` (untimed rows always count)."""
+    if not timestamp:
+        return len(block.timestamps)
+    return bisect.bisect_left(block.timestamps, timestamp, lo=block.leading_untimed)
+
+
+def _build_anomaly_feature_matrix(
+    readings: List[SensorReading],
+    sensor_histories: Dict[str, SensorHistory],
+    feature_order: List[str],
+) -> Tuple[List[int], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the anomaly feature matrix for every scorable reading at once.
+
+    Each sensor's history is laid out once in a flat array; lag values and the
+    running min/max used for scaling are then gathered with index arithmetic.
+
+    Returns:
+        (indices of scored readings, feature matrix, current values, quality values)
+    """
+    indices = [idx for idx, reading in enumerate(readings) if reading.value is not None]
+    row_count = len(indices)
+    current = np.fromiter((float(readings[idx].value) for idx in indices), dtype=float, count=row_count)
+    quality = np.fromiter(
+        (
+            float(readings[idx].quality) if readings[idx].quality is not None else 0.5
+            for idx in indices
+        ),
+        dtype=float,
+        count=row_count,
+    )
+
+    blocks: Dict[str, _HistoryBlock] = {}
+    flat_values: List[np.ndarray] = []
+    flat_min: List[np.ndarray] = []
+    flat_max: List[np.ndarray] = []
+    offset = 0
+    offsets = np.zeros(row_count, dtype=np.int64)
+    prior_counts = np.zeros(row_count, dtype=np.int64)
+    history_quality_min = np.empty(row_count, dtype=float)
+    history_quality_max = np.empty(row_count, dtype=float)
+
+    for row, idx in enumerate(indices):
+        reading = readings[idx]
+        sensor_id = reading.sensor_id or "unknown"
+        block = blocks.get(sensor_id)
+        if block is None:
+            history = sensor_histories.get(sensor_id) or SensorHistory(sensor_id=sensor_id)
+            valid_quality = history.quality[~np.isnan(history.quality)]
+            block = _HistoryBlock(
+                offset=offset,
+                timestamps=history.timestamps,
+                leading_untimed=next(
+                    (pos for pos, ts in enumerate(history.timestamps) if ts), len(history.timestamps)
+                ),
+                quality_min=float(valid_quality.min()) if valid_quality.size else math.inf,
+                quality_max=float(valid_quality.max()) if valid_quality.size else -math.inf,
+            )
+            blocks[sensor_id] = block
+            if len(history):
+                flat_values.append(history.values)
+                flat_min.append(np.minimum.accumulate(history.values))
+                flat_max.append(np.maximum.accumulate(history.values))
+                offset += len(history)
+        offsets[row] = block.offset
+        prior_counts[row] = _count_prior_readings(block, reading.timestamp)
+        history_quality_min[row] = block.quality_min
+        history_quality_max[row] = block.quality_max
+
+    # A trailing sentinel keeps gathers valid for sensors without history.
+    values_flat = np.concatenate(flat_values + [np.zeros(1)])
+    running_min = np.concatenate(flat_min + [np.zeros(1)])
+    running_max = np.concatenate(flat_max + [np.zeros(1)])
+
+    has_prior = prior_counts > 0
+    lag_columns: Dict[str, np.ndarray] = {}
+    for lag in range(1, 6):
+        lag_index = offsets + np.where(prior_counts >= lag, prior_counts - lag, 0)
+        lag_columns[ANOMALY_DEFAULT_FEATURE_ORDER[lag - 1]] = np.where(
+            has_prior, values_flat[lag_index], current
+        )
+
+    # Min-max scaling for value and quality using training baselines extended with live data.
+    last_prior = offsets + np.maximum(prior_counts - 1, 0)
+    value_lower = np.minimum(
+        np.minimum(ANOMALY_SCALE_BASELINES["value"]["min"], current),
+        np.where(has_prior, running_min[last_prior], np.inf),
+    )
+    value_upper = np.maximum(
+        np.maximum(ANOMALY_SCALE_BASELINES["value"]["max"], current),
+        np.where(has_prior, running_max[last_prior], -np.inf),
+    )
+    quality_lower = np.minimum(
+        np.minimum(ANOMALY_SCALE_BASELINES["quality"]["min"], quality), history_quality_min
+    )
+    quality_upper = np.maximum(
+        np.maximum(ANOMALY_SCALE_BASELINES["quality"]["max"], quality), history_quality_max
+    )
+
+    feature_columns = {
+        "value_scaled": _min_max_scale_array(current, value_lower, value_upper),
+        "quality_scaled": _min_max_scale_array(quality, quality_lower, quality_upper),
+        **lag_columns,
+    }
+    zeros = np.zeros(row_count, dtype=float)
+    matrix = np.empty((row_count, len(feature_order)), dtype=float)
+    for column, name in enumerate(feature_order):
+        matrix[:, column] = feature_columns.get(name, zeros)
+    return indices, matrix, current, quality
+
+
+def _logistic_scores(raw_scores: np.ndarray, sign: float) -> np.ndarray:
+    """Map raw scores to ``1 / (1 + exp(sign * raw))``; NaN where exp overflows."""
+    scores = np.empty(raw_scores.shape, dtype=float)
+    for pos, raw in enumerate(raw_scores.tolist()):
+        try:
+            scores[pos] = 1.0 / (1.0 + math.exp(sign * raw))
+        except OverflowError:
+            scores[pos] = np.nan
+    return scores
+
+
+def _batch_anomaly_scores(model, feature_array: np.ndarray) -> np.ndarray:
+    """Score all rows with ``decision_function`` (falling back to ``score_samples``); NaN if unavailable."""
+    scores = np.full(feature_array.shape[0], np.nan)
+    native_model = getattr(model, "_model_impl", None)
+    if native_model is None or not feature_array.shape[0]:
+        return scores
+
+    if hasattr(native_model, "decision_function"):
+        try:
+            raw = np.asarray(native_model.decision_function(feature_array), dtype=float).reshape(-1)
+            scores = _logistic_scores(raw, 1.0)
+        except Exception as score_error:  # noqa: BLE001
+            logger.debug("decision_function failed for anomaly batch: %s", score_error)
+
+    missing = np.isnan(scores)
+    if missing.any() and hasattr(native_model, "score_samples"):
+        try:
+            raw = np.asarray(native_model.score_samples(feature_array[missing]), dtype=float).reshape(-1)
+            scores[missing] = _logistic_scores(raw, -1.0)
+        except Exception as score_error:  # noqa: BLE001
+            logger.debug("score_samples failed for anomaly batch: %s", score_error)
+    return scores
+
+
+def _anomaly_labels(prediction, row_count: int) -> np.ndarray:
+    """Boolean anomaly flag per row from model predictions (-1 or "anomaly")."""
+    prediction_array = np.asarray(prediction)
+    if prediction_array.size == 0:
+        return np.zeros(row_count, dtype=bool)
+    first_column = prediction_array.reshape(row_count, -1)[:, 0]
+    if np.issubdtype(first_column.dtype, np.number) or first_column.dtype == bool:
+        return first_column == -1
+    return np.array(
+        [value == -1 or str(value).lower() == "anomaly" for value in first_column.tolist()], dtype=bool
+    )
+
+
 def analyze_sensor_readings_for_anomalies(
     readings: List[SensorReading],
     model,
     sensitivity: float,
     feature_names: Optional[List[str]] = None,
-    sensor_histories: Optional[Dict[str, List[SensorReading]]] = None,
+    sensor_histories: Optional[Dict[str, Union[SensorHistory, List[SensorReading]]]] = None,
 ) -> List[AnomalyAlert]:
     """
     Analyze sensor readings for anomalies using the loaded model.
 
     Builds feature vectors that mirror the feature engineering used during training
-    (lagged value windows and scaled value/quality columns).
+    (lagged value windows and scaled value/quality columns) for the whole request
+    as one matrix, then makes a single ``predict`` call and a single score call.
+    ``sensor_histories`` maps sensor ids to columnar ``SensorHistory`` objects
+    (lists of readings are converted on the fly).
     """
-    sensor_histories = sensor_histories or {}
+    sensor_histories = {
+        sensor_id: (
+            history
+            if isinstance(history, SensorHistory)
+            else SensorHistory.from_readings(sensor_id, history)
+        )
+        for sensor_id, history in (sensor_histories or {}).items()
+    }
     anomalies: List[AnomalyAlert] = []
     expected_features = getattr(model, "n_features_in_", None)
     feature_order = _resolve_feature_order(feature_names, model, expected_features)
 
     try:
-        for reading in readings:
-            if reading.value is None:
-                logger.debug("Skipping reading %s due to missing value", reading.sensor_id)
-                continue
-
-            sensor_id = reading.sensor_id or "unknown"
-            history = sensor_histories.get(sensor_id, [])
-            sorted_history = sorted(
-                history,
-                key=lambda item: item.timestamp or datetime.min,
-            )
-
-            # Gather prior values strictly before the current reading when timestamps allow.
-            lag_candidates: List[float] = []
-            for item in sorted_history:
-                if item.value is None:
-                    continue
-                if reading.timestamp and item.timestamp and item.timestamp >= reading.timestamp:
-                    continue
-                lag_candidates.append(float(item.value))
-
-            current_value = float(reading.value)
-            if not lag_candidates:
-                lag_candidates = [current_value]
-
-            lag_values: List[float] = []
-            for offset in range(1, 6):
-                index = -offset
-                if len(lag_candidates) >= offset:
-                    lag_values.append(float(lag_candidates[index]))
-                else:
-                    lag_values.append(float(lag_candidates[0]))
-
-            # Min-max scaling for value and quality using training baselines extended with live data.
-            value_reference = lag_candidates + [current_value]
-            value_lower = min([ANOMALY_SCALE_BASELINES["value"]["min"]] + value_reference)
-            value_upper = max([ANOMALY_SCALE_BASELINES["value"]["max"]] + value_reference)
-            value_scaled = _min_max_scale(current_value, value_lower, value_upper)
-
-            quality_value = float(reading.quality) if reading.quality is not None else 0.5
-            quality_reference = [quality_value]
-            for item in sorted_history:
-                if item.quality is not None:
-                    quality_reference.append(float(item.quality))
-            quality_lower = min([ANOMALY_SCALE_BASELINES["quality"]["min"]] + quality_reference)
-            quality_upper = max([ANOMALY_SCALE_BASELINES["quality"]["max"]] + quality_reference)
-            quality_scaled = _min_max_scale(quality_value, quality_lower, quality_upper)
-
-            feature_payload: Dict[str, float] = {
-                "value_scaled": value_scaled,
-                "quality_scaled": quality_scaled,
-            }
-            for idx, name in enumerate(ANOMALY_DEFAULT_FEATURE_ORDER[:5]):
-                feature_payload[name] = lag_values[idx]
-
-            ordered_payload = {name: float(feature_payload.get(name, 0.0)) for name in feature_order}
-            feature_df = pd.DataFrame([ordered_payload], columns=feature_order)
-            feature_array = feature_df.to_numpy(dtype=float)
-
-            prediction = model.predict(feature_df)
-            prediction_array = np.asarray(prediction)
-            prediction_value = prediction_array.flat[0] if prediction_array.size else prediction
-            is_anomaly_label = bool(prediction_value == -1 or str(prediction_value).lower() == "anomaly")
-
-            anomaly_score = None
-            native_model = getattr(model, "_model_impl", None)
-            if native_model is not None:
-                if hasattr(native_model, "decision_function"):
-                    try:
-                        raw_decision = float(native_model.decision_function(feature_array)[0])
-                        anomaly_score = 1.0 / (1.0 + math.exp(raw_decision))
-                    except Exception as score_error:  # noqa: BLE001
-                        logger.debug("decision_function failed for %s: %s", sensor_id, score_error)
-                if anomaly_score is None and hasattr(native_model, "score_samples"):
-                    try:
-                        raw_score = float(native_model.score_samples(feature_array)[0])
-                        anomaly_score = 1.0 / (1.0 + math.exp(-raw_score))
-                    except Exception as score_error:  # noqa: BLE001
-                        logger.debug("score_samples failed for %s: %s", sensor_id, score_error)
-
-            if anomaly_score is None:
-                anomaly_score = 1.0 if is_anomaly_label else 0.0
-
-            is_anomaly = is_anomaly_label or anomaly_score >= sensitivity
-            if not is_anomaly:
-                continue
-
+        indices, feature_array, current_values, quality_values = _build_anomaly_feature_matrix(
+            readings, sensor_histories, feature_order
+        )
+        if not indices:
+            return anomalies
+
+        feature_df = pd.DataFrame(feature_array, columns=feature_order)
+        labels = _anomaly_labels(model.predict(feature_df), len(indices))
+        scores = _batch_anomaly_scores(model, feature_array)
+        scores = np.where(np.isnan(scores), labels.astype(float), scores)
+
+        flagged = np.flatnonzero(labels | (scores >= sensitivity))
+        for row in flagged.tolist():
+            reading = readings[indices[row]]
+            anomaly_score = float(scores[row])
             severity = min(5, max(1, int(round(anomaly_score * 5))))
-            anomaly = AnomalyAlert(
-                sensor_id=sensor_id,
-                anomaly_type=AnomalyType.ISOLATION_FOREST,
-                severity=severity,
-                confidence=anomaly_score,
-                description=(
-                    f"Isolation Forest detected anomaly (score={anomaly_score:.3f}, "
-                    f"sensitivity={sensitivity:.2f})"
-                ),
-                evidence={
-                    "sensor_value": current_value,
-                    "sensor_unit": reading.unit,
-                    "sensor_type": str(reading.sensor_type),
-                    "quality_score": quality_value,
-                    "feature_vector": ordered_payload,
-                },
-                recommended_actions=[
-                    "Investigate sensor reading",
-                    "Check sensor calibration",
-                    "Review historical data for patterns",
-                ],
+            anomalies.append(
+                AnomalyAlert(
+                    sensor_id=reading.sensor_id or "unknown",
+                    anomaly_type=AnomalyType.ISOLATION_FOREST,
+                    severity=severity,
+                    confidence=anomaly_score,
+                    description=(
+                        f"Isolation Forest detected anomaly (score={anomaly_score:.3f}, "
+                        f"sensitivity={sensitivity:.2f})"
+                    ),
+                    evidence={
+                        "sensor_value": float(current_values[row]),
+                        "sensor_unit": reading.unit,
+                        "sensor_type": str(reading.sensor_type),
+                        "quality_score": float(quality_values[row]),
+                        "feature_vector": dict(zip(feature_order, feature_array[row].tolist())),
+                    },
+                    recommended_actions=[
+                        "Investigate sensor reading",
+                        "Check sensor calibration",
+                        "Review historical data for patterns",
+                    ],
+                )
             )
-            anomalies.append(anomaly)
 
     except HTTPException:
         raise
@@ -701,6 +1206,12 @@ async def list_registered_models():
         ) from e
 
 
+@router.get("/models/cache", tags=["ML Models"], dependencies=[Security(api_key_auth, scopes=["ml:predict"])])
+async def get_model_cache_stats():
+    """Report hit/miss/eviction metrics and memory use of the shared model cache."""
+    return get_model_cache().get_stats()
+
+
 @router.get("/models/{model_name}/versions", tags=["ML Models"], dependencies=[Security(api_key_auth, scopes=["ml:predict"])])
 async def list_model_versions(model_name: str):
     """List available versions for a given model in the MLflow registry.
@@ -710,6 +1221,14 @@ async def list_model_versions(model_name: str):
     """
     try:
         _ensure_mlflow_enabled()
+        mirror_snapshot = get_registry_mirror().peek()
+        if mirror_snapshot is not None and model_name in mirror_snapshot.versions:
+            versions = [
+                {key: mv[key] for key in ("version", "current_stage", "status", "creation_timestamp")}
+                for mv in mirror_snapshot.versions[model_name]
+            ]
+            return {"model_name": model_name, "versions": versions}
+
         import mlflow
         client = mlflow.tracking.MlflowClient()
         # Get *all* registered models then filter; or use search_model_versions
@@ -789,14 +1308,21 @@ async def predict(
     Features automatic model version resolution and flexible feature handling.
     """
     logger.info(f"Prediction request for model: {request.model_name} v{request.model_version}")
-    
+
+    model_server = get_model_server()
+    deadline = model_server.deadline()
+
     try:
         _ensure_mlflow_enabled()
-        # Step 1: Resolve model version automatically if needed
-        resolved_version = _resolve_model_version(request.model_name, request.model_version)
+        # Step 1: Resolve model version automatically if needed (registry I/O off the event loop)
+        resolved_version = await model_server.run_io(
+            _resolve_model_version, request.model_name, request.model_version, deadline=deadline
+        )
         
-        # Step 2: Load model with resolved version
-        model, feature_names = load_model(request.model_name, resolved_version)
+        # Step 2: Load model with resolved version (coalesced with concurrent loads)
+        model, feature_names = await model_server.load_model(
+            request.model_name, resolved_version, deadline=deadline
+        )
 
         if model is None:
             raise HTTPException(
@@ -804,120 +1330,56 @@ async def predict(
                 detail=f"Model '{request.model_name}' version '{resolved_version}' not found in MLflow Registry"
             )
 
-        # Step 3: Flexible feature handling - adapt features to model expectations
-        prediction_input = None  # Initialize prediction_input variable
-        
-        try:
-            # Try to prepare features normally first
-            feature_array = prepare_features_for_prediction(request.features, request.model_name)
-            
-            # Check if the feature count matches model expectations
-            prediction_input = feature_array.reshape(1, -1)
-            
-            # Try prediction to see if dimensions match
-            prediction = model.predict(prediction_input)
-            
-        except Exception as feature_error:
-            logger.warning(f"Standard feature preparation failed: {feature_error}")
-            
-            # Step 4: Flexible feature adaptation
-            try:
-                # Get model's expected feature count
-                if hasattr(model, 'n_features_in_'):
-                    expected_features = model.n_features_in_
-                elif hasattr(model, 'feature_importances_'):
-                    expected_features = len(model.feature_importances_)
-                else:
-                    # Try to infer from a test prediction
-                    test_input = np.zeros((1, len(request.features)))
-                    try:
-                        model.predict(test_input)
-                        expected_features = len(request.features)
-                    except Exception as e:
-                        # Extract expected feature count from error message
-                        error_str = str(e)
-                        if "expecting" in error_str and "features" in error_str:
-                            import re
-                            match = re.search(r'expecting (\d+) features', error_str)
-                            if match:
-                                expected_features = int(match.group(1))
-                            else:
-                                expected_features = 12  # Common default
-                        else:
-                            expected_features = 12
-                
-                logger.info(f"Model expects {expected_features} features, adapting input...")
-                
-                # Create feature vector of the right size
-                feature_values = list(request.features.values())
-                
-                if len(feature_values) < expected_features:
-                    # Pad with zeros or repeat last value
-                    padding_needed = expected_features - len(feature_values)
-                    if len(feature_values) > 0:
-                        # Repeat the mean of existing features
-                        mean_value = np.mean(feature_values)
-                        feature_values.extend([mean_value] * padding_needed)
-                    else:
-                        # All zeros if no features provided
-                        feature_values = [0.0] * expected_features
-                elif len(feature_values) > expected_features:
-                    # Truncate to expected size
-                    feature_values = feature_values[:expected_features]
-                
-                # Create prediction input
-                prediction_input = np.array(feature_values).reshape(1, -1)
-                
-                # Generate prediction
-                prediction = model.predict(prediction_input)
-                
-                logger.info(f"Successfully adapted features from {len(request.features)} to {expected_features}")
-                
-            except Exception as adapt_error:
-                logger.error(
-                    "Feature adaptation failed for model %s v%s (%d features provided): %s",
-                    request.model_name,
-                    resolved_version,
-                    len(request.features),
-                    adapt_error,
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=(
-                        "Feature adaptation failed for model "
-                        f"'{request.model_name}' (version {resolved_version}). "
-                        f"Provided {len(request.features)} features; "
-                        f"error: {adapt_error}. Try a different model or verify feature requirements."
-                    ),
-                )
-        
-        # At this point we have a successful prediction
-        # prediction_input contains the final feature array used
-        
-        # Extract confidence if available (model-dependent)
-        confidence = None
-        if hasattr(model, 'predict_proba'):
-            try:
-                proba = model.predict_proba(prediction_input)
-                confidence = float(np.max(proba))
-            except Exception as e:
-                logger.warning(f"Could not extract confidence: {e}")
+        # Steps 3-4: Feature preparation/adaptation, prediction and confidence in the inference pool
+        prediction, prediction_input, confidence = await model_server.run(
+            _score_features,
+            model,
+            request.features,
+            request.model_name,
+            resolved_version,
+            deadline=deadline,
+        )
         
         # Compute SHAP explainability (optional)
         shap_explanation = None
-        if request.explain:
+        explanation_job = None
+        explanation_status = None
+        if request.explain == "async":
+            explanation_job = _schedule_explanation_job(
+                model, request.model_name, resolved_version, prediction_input, feature_names
+            )
+            logger.info("Scheduled explanation job %s", explanation_job["job_id"])
+        elif request.explain:
             import time
             start_time = time.time()
             try:
-                shap_explanation = compute_shap_explanation(model, prediction_input, feature_names)
+                shap_explanation = await model_server.run(
+                    compute_shap_explanation,
+                    model,
+                    prediction_input,
+                    feature_names,
+                    model_cache_key(request.model_name, resolved_version),
+                    deadline=deadline,
+                )
                 shap_duration = time.time() - start_time
                 logger.info(f"SHAP computation completed in {shap_duration:.3f}s for model {request.model_name}")
                 if shap_duration > 5.0:
                     logger.warning(f"SHAP computation exceeded 5s (took {shap_duration:.2f}s)")
+            except BackgroundNotReadyError as not_ready:
+                logger.info("SHAP skipped for %s: %s", request.model_name, not_ready)
+                explanation_status = "background_not_ready"
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "SHAP computation for model %s exceeded the request deadline; returning prediction without explanation",
+                    request.model_name,
+                )
             except Exception as shap_err:
                 logger.warning(f"SHAP computation failed: {shap_err}")
         else:
             logger.info("Explainability skipped per request (explain=false)")
+
+        # Recorded after any inline explanation so its background never contains the explained row
+        _observe_scored_rows(request.model_name, resolved_version, prediction_input)
         
         # Prepare response
         response = PredictionResponse(
@@ -930,7 +1392,9 @@ async def predict(
                 "feature_adaptation": f"Adapted {len(request.features)} input features"
             },
             shap_values=shap_explanation.get("shap_values") if shap_explanation else None,
-            feature_importance=shap_explanation.get("feature_importance") if shap_explanation else None
+            feature_importance=shap_explanation.get("feature_importance") if shap_explanation else None,
+            explanation_job_id=explanation_job["job_id"] if explanation_job else None,
+            explanation_status=explanation_job["status"] if explanation_job else explanation_status,
         )
         
         logger.info(f"Prediction completed successfully for model: {request.model_name} v{resolved_version}")
@@ -938,6 +1402,8 @@ async def predict(
         
     except HTTPException:
         raise
+    except asyncio.TimeoutError as timeout_error:
+        raise _deadline_exceeded("Prediction", request.model_name, deadline) from timeout_error
     except Exception as e:
         logger.error(f"Prediction failed for model {request.model_name}: {e}", exc_info=True)
         raise HTTPException(
@@ -946,6 +1412,226 @@ async def predict(
         )
 
 
+@router.post(
+    "/predict_batch",
+    response_model=BatchPredictionResponse,
+    tags=["ML Prediction"],
+    dependencies=[Security(api_key_auth, scopes=["ml:predict"])],
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": BatchPredictionRequest.model_json_schema()},
+                "application/vnd.apache.arrow.stream": {
+                    "schema": {"type": "string", "format": "binary"}
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def predict_batch(
+    http_request: Request,
+    model_name: Optional[str] = None,
+    model_version: str = "auto",
+    explain: bool = False,
+) -> BatchPredictionResponse:
+    """
+    Score many feature rows with a single model call.
+
+    Accepts either a JSON ``BatchPredictionRequest`` body or an Arrow IPC stream
+    (``Content-Type: application/vnd.apache.arrow.stream``, one column per feature,
+    optional ``sensor_id`` column) with ``model_name``/``model_version`` passed as
+    query parameters. Rows are validated against the model's feature schema once,
+    stacked into a single matrix and scored with one ``predict``/``predict_proba`` call.
+    """
+    content_type = (http_request.headers.get("content-type") or "application/json").split(";")[0].strip()
+    body = await http_request.body()
+    sensor_ids: Optional[List[Optional[str]]] = None
+
+    if content_type in ARROW_CONTENT_TYPES:
+        if not model_name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="model_name query parameter is required for Arrow payloads",
+            )
+        frame = _read_arrow_frame(body, content_type)
+        if "sensor_id" in frame.columns:
+            sensor_ids = [None if pd.isna(value) else str(value) for value in frame.pop("sensor_id")]
+    else:
+        try:
+            batch_request = BatchPredictionRequest.model_validate_json(body)
+        except ValueError as validation_error:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Request validation failed: {validation_error}",
+            ) from validation_error
+        model_name = batch_request.model_name
+        model_version = batch_request.model_version
+        explain = batch_request.explain
+        sensor_ids = batch_request.sensor_ids
+        frame = pd.DataFrame.from_records(batch_request.rows)
+
+    row_count = len(frame)
+    if row_count == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No feature rows provided")
+    if row_count > settings.ML_PREDICT_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {row_count} rows exceeds limit of {settings.ML_PREDICT_BATCH_MAX_ROWS}",
+        )
+    if sensor_ids is not None and len(sensor_ids) != row_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sensor_ids has {len(sensor_ids)} entries for {row_count} rows",
+        )
+
+    logger.info(f"Batch prediction request for model: {model_name} v{model_version} ({row_count} rows)")
+
+    model_server = get_model_server()
+    deadline = model_server.deadline()
+
+    try:
+        _ensure_mlflow_enabled()
+        resolved_version = await model_server.run_io(
+            _resolve_model_version, model_name, model_version, deadline=deadline
+        )
+        model, feature_names = await model_server.load_model(model_name, resolved_version, deadline=deadline)
+        if model is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Model '{model_name}' version '{resolved_version}' not found in MLflow Registry",
+            )
+
+        matrix = await model_server.run(
+            prepare_feature_matrix, frame, model, model_name, feature_names, deadline=deadline
+        )
+        predictions, confidence = await model_server.run(
+            _score_feature_matrix, model, matrix, deadline=deadline
+        )
+
+        shap_columns = None
+        explanation_status = None
+        if explain:
+            try:
+                shap_columns = await model_server.run(
+                    _explain_feature_matrix,
+                    model,
+                    matrix,
+                    model_cache_key(model_name, resolved_version),
+                    deadline=deadline,
+                )
+            except BackgroundNotReadyError as not_ready:
+                logger.info("Batch SHAP skipped for %s: %s", model_name, not_ready)
+                explanation_status = "background_not_ready"
+            except asyncio.TimeoutError:
+                logger.warning("Batch SHAP computation for %s exceeded the request deadline", model_name)
+            except Exception as shap_err:  # noqa: BLE001
+                logger.warning(f"Batch SHAP computation failed: {shap_err}")
+        _observe_scored_rows(model_name, resolved_version, matrix.to_numpy())
+
+        logger.info(f"Batch prediction completed for model: {model_name} v{resolved_version} ({row_count} rows)")
+        return BatchPredictionResponse(
+            row_count=row_count,
+            feature_names=list(matrix.columns),
+            predictions=predictions,
+            confidence=confidence,
+            sensor_ids=sensor_ids,
+            shap_values=shap_columns,
+            explanation_status=explanation_status,
+            model_info={
+                "model_name": model_name,
+                "model_version": resolved_version,
+                "loaded_from": "MLflow Model Registry",
+            },
+        )
+
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError as timeout_error:
+        raise _deadline_exceeded("Batch prediction", model_name, deadline) from timeout_error
+    except Exception as e:
+        logger.error(f"Batch prediction failed for model {model_name}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}",
+        )
+
+
+@router.get(
+    "/explanations/{job_id}",
+    response_model=ExplanationJobResponse,
+    tags=["ML Prediction"],
+    dependencies=[Security(api_key_auth, scopes=["ml:predict"])],
+)
+async def get_explanation_job(job_id: str) -> ExplanationJobResponse:
+    """Poll the status of an asynchronous SHAP explanation requested with explain='async'."""
+    job = await get_explanation_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Explanation job '{job_id}' not found or expired",
+        )
+    return ExplanationJobResponse(**job)
+
+
+def _forecast_points(forecast_df: pd.DataFrame, horizon_steps: int) -> List[ForecastPoint]:
+    """Convert a Prophet-style ``ds``/``yhat`` frame into response points (naive UTC)."""
+    forecast_points: List[ForecastPoint] = []
+    for _, row in forecast_df.head(horizon_steps).iterrows():
+        raw_ts = row.get("ds") or row.get("timestamp")
+        if pd.isna(raw_ts):
+            continue
+        ts = pd.to_datetime(raw_ts).to_pydatetime()
+        if ts.tzinfo:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        predicted = row.get("yhat")
+        if predicted is None or pd.isna(predicted):
+            continue
+        lower = row.get("yhat_lower")
+        upper = row.get("yhat_upper")
+        forecast_points.append(
+            ForecastPoint(
+                timestamp=ts,
+                predicted_value=float(predicted),
+                lower_bound=float(lower) if lower is not None and not pd.isna(lower) else None,
+                upper_bound=float(upper) if upper is not None and not pd.isna(upper) else None,
+            )
+        )
+    return forecast_points
+
+
+def _build_forecast_response(
+    sensor_id: str,
+    model_name: str,
+    model_version: str,
+    history_df: pd.DataFrame,
+    cadence_minutes: int,
+    forecast_df: pd.DataFrame,
+    horizon_steps: int,
+) -> Optional[ForecastResponse]:
+    """Assemble a ``ForecastResponse``; ``None`` when the model produced no usable points."""
+    forecast_points = _forecast_points(forecast_df, horizon_steps)
+    if not forecast_points:
+        return None
+
+    metrics = {
+        "history_start": history_df["timestamp"].iloc[0].isoformat(),
+        "history_end": history_df["timestamp"].iloc[-1].isoformat(),
+        "history_points": len(history_df),
+        "cadence_minutes": cadence_minutes,
+    }
+    return ForecastResponse(
+        sensor_id=sensor_id,
+        model_name=model_name,
+        model_version=model_version,
+        history_points=len(history_df),
+        horizon_steps=len(forecast_points),
+        cadence_minutes=cadence_minutes,
+        forecast=forecast_points,
+        metrics=metrics,
+    )
+
+
 @router.post(
     "/forecast",
     response_model=ForecastResponse,
@@ -956,40 +1642,54 @@ async def forecast_sensor(
     request: ForecastRequest,
     db: AsyncSession = Depends(get_async_db),
 ) -> ForecastResponse:
-    """Generate time-series forecasts for a sensor using registered MLflow models."""
+    """Generate time-series forecasts for a sensor using registered MLflow models.
+
+    Results are cached per sensor, resolved model version and request shape until
+    new readings arrive for the sensor (see ``apps.ml.forecast_cache``).
+    """
 
     _ensure_mlflow_enabled()
 
-    history = await crud_sensor_reading.get_sensor_readings_by_sensor_id(
+    model_server = get_model_server()
+    deadline = model_server.deadline()
+    try:
+        resolved_version = await model_server.run_io(
+            _resolve_model_version, request.model_name, request.model_version, deadline=deadline
+        )
+    except asyncio.TimeoutError as timeout_error:
+        raise _deadline_exceeded("Forecast", request.model_name, deadline) from timeout_error
+
+    forecast_cache = get_forecast_cache()
+    cache_key = forecast_cache_key(
+        request.sensor_id,
+        request.model_name,
+        resolved_version,
+        request.horizon_steps,
+        request.history_window,
+        request.cadence_minutes,
+    )
+    cached_forecast, watermark = forecast_cache.lookup(cache_key)
+    if cached_forecast is None and watermark is not None:
+        latest_timestamp, new_readings = await crud_sensor_reading.get_sensor_watermark(
+            db, sensor_id=request.sensor_id, since=watermark
+        )
+        cached_forecast = forecast_cache.revalidate(cache_key, latest_timestamp, new_readings)
+    if cached_forecast is not None:
+        return cached_forecast
+
+    history = await crud_sensor_reading.fetch_series(
         db,
         sensor_id=request.sensor_id,
         limit=request.history_window,
     )
 
-    if not history:
+    if not len(history):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No readings found for sensor '{request.sensor_id}'",
         )
 
-    history_sorted = sorted(
-        [h for h in history if h.timestamp is not None],
-        key=lambda item: item.timestamp,
-    )
-
-    if not history_sorted:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Sensor '{request.sensor_id}' does not have timestamped readings",
-        )
-
-    history_df = pd.DataFrame(
-        {
-            "timestamp": [item.timestamp.replace(tzinfo=None) if item.timestamp.tzinfo else item.timestamp for item in history_sorted],
-            "value": [float(item.value) if item.value is not None else np.nan for item in history_sorted],
-            "quality": [float(item.quality) if item.quality is not None else np.nan for item in history_sorted],
-        }
-    ).dropna(subset=["timestamp", "value"])
+    history_df = history_frame(history.timestamps, history.values)
 
     if history_df.empty:
         raise HTTPException(
@@ -997,19 +1697,12 @@ async def forecast_sensor(
             detail="Insufficient data after cleaning to perform forecast",
         )
 
-    cadence_minutes = request.cadence_minutes
-    if cadence_minutes is None and len(history_df) >= 2:
-        diffs = history_df["timestamp"].diff().dropna()
-        if not diffs.empty:
-            median_minutes = float(diffs.dt.total_seconds().median() / 60.0)
-            if median_minutes > 0:
-                cadence_minutes = max(1, int(round(median_minutes)))
-
-    if cadence_minutes is None or cadence_minutes <= 0:
-        cadence_minutes = 5  # sensible default for synthetic dataset cadence
+    cadence_minutes = infer_cadence_minutes(history_df, request.cadence_minutes)
 
-    resolved_version = _resolve_model_version(request.model_name, request.model_version)
-    model, _ = load_model(request.model_name, resolved_version)
+    try:
+        model, _ = await model_server.load_model(request.model_name, resolved_version, deadline=deadline)
+    except asyncio.TimeoutError as timeout_error:
+        raise _deadline_exceeded("Forecast", request.model_name, deadline) from timeout_error
 
     if model is None:
         raise HTTPException(
@@ -1017,17 +1710,12 @@ async def forecast_sensor(
             detail=f"Model '{request.model_name}' version '{resolved_version}' not found",
         )
 
-    last_timestamp = history_df["timestamp"].iloc[-1]
-    future_index = pd.date_range(
-        start=last_timestamp + pd.Timedelta(minutes=cadence_minutes),
-        periods=request.horizon_steps,
-        freq=f"{cadence_minutes}min",
-    )
-
-    future_payload = pd.DataFrame({"ds": future_index})
+    future_payload = future_frame(history_df["timestamp"].iloc[-1], cadence_minutes, request.horizon_steps)
 
     try:
-        forecast_raw = model.predict(future_payload)
+        forecast_raw = await model_server.run(model.predict, future_payload, deadline=deadline)
+    except asyncio.TimeoutError as timeout_error:
+        raise _deadline_exceeded("Forecast", request.model_name, deadline) from timeout_error
     except Exception as exc:  # noqa: BLE001
         logger.error(
             "Forecast prediction failed for %s v%s: %s",
@@ -1045,53 +1733,165 @@ async def forecast_sensor(
         forecast_df = forecast_raw.copy()
     else:
         forecast_df = pd.DataFrame({"yhat": np.array(forecast_raw).reshape(-1)})
-        forecast_df["ds"] = future_index[: len(forecast_df)]
+        forecast_df["ds"] = future_payload["ds"].iloc[: len(forecast_df)].to_numpy()
+
+    response = _build_forecast_response(
+        request.sensor_id,
+        request.model_name,
+        resolved_version,
+        history_df,
+        cadence_minutes,
+        forecast_df,
+        request.horizon_steps,
+    )
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Forecast model returned empty results",
+        )
+    forecast_cache.store(cache_key, response, watermark=history.timestamps[-1])
+    return response
+
+
+async def _forecast_batch_sensor(
+    request: ForecastBatchRequest,
+    sensor_id: str,
+    model_name: str,
+    resolved_version: Optional[str],
+    history: SensorHistory,
+) -> Dict[str, Any]:
+    """Forecast one sensor of a batch; failures are reported in the result, never raised."""
+    result: Dict[str, Any] = {"sensor_id": sensor_id, "model_name": model_name, "model_version": resolved_version}
+    if resolved_version is None:
+        return {**result, "status": "error", "error": f"Model '{model_name}' could not be resolved"}
+
+    history_df = history_frame(history.timestamps, history.values)
+    if history_df.empty:
+        return {**result, "status": "error", "error": f"No readings found for sensor '{sensor_id}'"}
 
-    forecast_points: List[ForecastPoint] = []
-    for _, row in forecast_df.head(request.horizon_steps).iterrows():
-        raw_ts = row.get("ds") or row.get("timestamp")
-        if pd.isna(raw_ts):
-            continue
-        ts = pd.to_datetime(raw_ts).to_pydatetime()
-        if ts.tzinfo:
-            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
-        predicted = row.get("yhat")
-        if predicted is None or pd.isna(predicted):
-            continue
-        lower = row.get("yhat_lower")
-        upper = row.get("yhat_upper")
-        forecast_points.append(
-            ForecastPoint(
-                timestamp=ts,
-                predicted_value=float(predicted),
-                lower_bound=float(lower) if lower is not None and not pd.isna(lower) else None,
-                upper_bound=float(upper) if upper is not None and not pd.isna(upper) else None,
+    # The batch already holds the sensor's newest readings, so cached entries are
+    # revalidated against them without a watermark query.
+    forecast_cache = get_forecast_cache()
+    cache_key = forecast_cache_key(
+        sensor_id, model_name, resolved_version, request.horizon_steps, request.history_window, request.cadence_minutes
+    )
+    latest_timestamp = history.timestamps[-1]
+    cached_forecast, watermark = forecast_cache.lookup(cache_key)
+    if cached_forecast is None and watermark is not None:
+        new_readings = sum(1 for ts in history.timestamps if ts > watermark)
+        cached_forecast = forecast_cache.revalidate(cache_key, latest_timestamp, new_readings)
+    if cached_forecast is not None:
+        return {**result, "status": "ok", "cached": True, "forecast": cached_forecast.model_dump(mode="json")}
+
+    cadence_minutes = infer_cadence_minutes(history_df, request.cadence_minutes)
+    future_payload = future_frame(history_df["timestamp"].iloc[-1], cadence_minutes, request.horizon_steps)
+    pool = get_forecast_pool()
+    try:
+        forecast_df = await pool.run(predict_forecast, model_name, resolved_version, future_payload)
+    except asyncio.TimeoutError:
+        return {**result, "status": "timeout", "error": f"Forecast exceeded {pool.task_timeout_seconds}s"}
+    except Exception as exc:  # noqa: BLE001 - one sensor must not fail the batch
+        logger.warning("Batch forecast failed for sensor %s (%s v%s): %s", sensor_id, model_name, resolved_version, exc)
+        return {**result, "status": "error", "error": str(exc)}
+
+    response = _build_forecast_response(
+        sensor_id, model_name, resolved_version, history_df, cadence_minutes, forecast_df, request.horizon_steps
+    )
+    if response is None:
+        return {**result, "status": "error", "error": "Forecast model returned empty results"}
+    forecast_cache.store(cache_key, response, watermark=latest_timestamp)
+    return {**result, "status": "ok", "cached": False, "forecast": response.model_dump(mode="json")}
+
+
+async def _stream_batch_forecasts(
+    request: ForecastBatchRequest,
+    models_by_sensor: Dict[str, str],
+    histories: Dict[str, SensorHistory],
+) -> AsyncIterator[bytes]:
+    """Yield one NDJSON line per sensor, in completion order."""
+    model_server = get_model_server()
+    resolved_versions: Dict[str, Optional[str]] = {}
+    for model_name in dict.fromkeys(models_by_sensor.values()):
+        try:
+            resolved_versions[model_name] = await model_server.run_io(
+                _resolve_model_version, model_name, request.model_version
+            )
+        except Exception as resolve_error:  # noqa: BLE001 - reported per sensor
+            logger.warning("Could not resolve %s for batch forecast: %s", model_name, resolve_error)
+            resolved_versions[model_name] = None
+
+    tasks = [
+        asyncio.create_task(
+            _forecast_batch_sensor(
+                request,
+                sensor_id,
+                model_name,
+                resolved_versions[model_name],
+                histories.get(sensor_id) or SensorHistory(sensor_id=sensor_id),
             )
         )
+        for sensor_id, model_name in models_by_sensor.items()
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield (json.dumps(await next_result, default=str) + "\n").encode()
+    finally:
+        for task in tasks:
+            task.cancel()
 
-    if not forecast_points:
+
+@router.post(
+    "/forecast_batch",
+    tags=["ML Prediction"],
+    dependencies=[Security(api_key_auth, scopes=["ml:predict"])],
+)
+async def forecast_batch(
+    request: ForecastBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    """Forecast many sensors at once, streaming NDJSON results as each sensor finishes.
+
+    Histories for every sensor are fetched in one query; the forecasts are fanned
+    out across the forecast process pool with a per-sensor timeout. Each line is
+    ``{sensor_id, model_name, model_version, status: ok|error|timeout, cached?,
+    forecast?, error?}``.
+    """
+    _ensure_mlflow_enabled()
+
+    sensor_ids = list(dict.fromkeys(sensor_id for sensor_id in request.sensor_ids if sensor_id))
+    if not sensor_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No sensor_ids provided")
+    if len(sensor_ids) > settings.ML_FORECAST_BATCH_MAX_SENSORS:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Forecast model returned empty results",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {len(sensor_ids)} sensors exceeds limit of {settings.ML_FORECAST_BATCH_MAX_SENSORS}",
         )
-
-    metrics = {
-        "history_start": history_df["timestamp"].iloc[0].isoformat(),
-        "history_end": history_df["timestamp"].iloc[-1].isoformat(),
-        "history_points": len(history_df),
-        "cadence_minutes": cadence_minutes,
+    models_by_sensor = {
+        sensor_id: request.model_names.get(sensor_id) or request.model_name for sensor_id in sensor_ids
     }
+    unassigned = [sensor_id for sensor_id, model_name in models_by_sensor.items() if not model_name]
+    if unassigned:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No model_name given for sensors: {unassigned}",
+        )
 
-    return ForecastResponse(
-        sensor_id=request.sensor_id,
-        model_name=request.model_name,
-        model_version=resolved_version,
-        history_points=len(history_df),
-        horizon_steps=len(forecast_points),
-        cadence_minutes=cadence_minutes,
-        forecast=forecast_points,
-        metrics=metrics,
+    # All database work happens before streaming starts; the session is not used afterwards.
+    histories = await crud_sensor_reading.get_recent_readings_for_sensors(
+        db,
+        sensor_ids=sensor_ids,
+        limit_per_sensor=request.history_window,
     )
+    return StreamingResponse(
+        _stream_batch_forecasts(request, models_by_sensor, histories),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/forecast/cache", tags=["ML Prediction"], dependencies=[Security(api_key_auth, scopes=["ml:predict"])])
+async def get_forecast_cache_stats():
+    """Report hit/miss/invalidation metrics of the forecast result cache and the forecast pool."""
+    return {**get_forecast_cache().get_stats(), "pool": get_forecast_pool().get_stats()}
 
 
 @router.post("/detect_anomaly", response_model=AnomalyDetectionResponse, tags=["ML Anomaly Detection"], dependencies=[Security(api_key_auth, scopes=["ml:anomaly"])])
@@ -1108,12 +1908,19 @@ async def detect_anomaly(
     _ensure_mlflow_enabled()
 
     logger.info(f"Anomaly detection request for {len(request.sensor_readings)} readings")
+
+    model_server = get_model_server()
+    deadline = model_server.deadline()
     
     try:
-        resolved_version = _resolve_model_version(request.model_name, request.model_version)
+        resolved_version = await model_server.run_io(
+            _resolve_model_version, request.model_name, request.model_version, deadline=deadline
+        )
 
         # Load anomaly detection model from MLflow Registry
-        model, feature_names = load_model(request.model_name, resolved_version)
+        model, feature_names = await model_server.load_model(
+            request.model_name, resolved_version, deadline=deadline
+        )
 
         if model is None:
             raise HTTPException(
@@ -1125,12 +1932,14 @@ async def detect_anomaly(
         sensor_histories = await _fetch_sensor_histories(db, request.sensor_readings, ANOMALY_HISTORY_LOOKBACK)
 
         # Analyze sensor readings for anomalies
-        detected_anomalies = analyze_sensor_readings_for_anomalies(
+        detected_anomalies = await model_server.run(
+            analyze_sensor_readings_for_anomalies,
             request.sensor_readings,
             model,
             request.sensitivity,
             feature_names=feature_names,
             sensor_histories=sensor_histories,
+            deadline=deadline,
         )
         
         # Prepare response
@@ -1151,6 +1960,8 @@ async def detect_anomaly(
         
     except HTTPException:
         raise
+    except asyncio.TimeoutError as timeout_error:
+        raise _deadline_exceeded("Anomaly detection", request.model_name, deadline) from timeout_error
     except Exception as e:
         logger.error(f"Anomaly detection failed: {e}", exc_info=True)
         raise HTTPException(
@@ -1183,7 +1994,7 @@ async def check_drift(
 
     try:
         # Fetch baseline readings
-        baseline_readings = await crud_sensor_reading.get_sensor_readings_by_sensor_id(
+        baseline_history = await crud_sensor_reading.fetch_series(
             db,
             sensor_id=drift_request.sensor_id,
             start_time=baseline_start,
@@ -1191,7 +2002,7 @@ async def check_drift(
             limit=drift_request.min_samples * 5,  # heuristic buffer
         )
         # Fetch recent readings
-        recent_readings = await crud_sensor_reading.get_sensor_readings_by_sensor_id(
+        recent_history = await crud_sensor_reading.fetch_series(
             db,
             sensor_id=drift_request.sensor_id,
             start_time=recent_start,
@@ -1199,8 +2010,8 @@ async def check_drift(
             limit=drift_request.min_samples * 5,
         )
 
-        baseline_values = [r.value for r in baseline_readings]
-        recent_values = [r.value for r in recent_readings]
+        baseline_values = baseline_history.values
+        recent_values = recent_history.values
 
         insufficient = False
         ks_statistic = None
@@ -1255,26 +2066,51 @@ async def ml_health_check():
     """
     Health check endpoint for ML services.
     
-    Verifies connectivity to MLflow and basic model loading capability.
+    Reports registry connectivity from the in-process registry mirror and the
+    models loaded by the startup warm-up. Probes never load a model; readiness
+    (warm-up completion) is reported separately by ``/health/ready``.
+
+    This is a liveness probe: a cold start (mirror not refreshed yet, nothing
+    loaded) is reported in ``registry_mirror.state`` rather than as a 503.
+    503 is only returned when the registry failed and no model is available.
     """
     try:
         _ensure_mlflow_enabled()
-        # Test MLflow connectivity by attempting to load a model that actually exists
-        # Using version "4" (latest actual version) instead of "latest" string
-        test_model, _ = load_model("anomaly_detector_refined_v2", "4")  # Use actual version number
-
-        if test_model is not None:
-            return {
-                "status": "healthy",
-                "mlflow_connection": "ok",
-                "model_registry": "accessible",
-                "test_model_loaded": True,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="MLflow reachable but model artifacts are unavailable",
-        )
+        mirror = get_registry_mirror()
+        mirror_stats = mirror.get_stats()
+        if mirror_stats["last_error"] is not None:
+            mirror_state = "error"
+        elif mirror_stats["refreshes"] > 0:
+            mirror_state = "ok"
+        else:
+            mirror_state = "pending"
+        registry_ok = mirror_state == "ok"
+
+        warmup = get_model_warmup()
+        models_loaded = sorted(name for name, result in warmup.results.items() if result.loaded)
+        cached_models = get_model_cache().get_stats()["entries"]
+
+        if mirror_state == "error" and not models_loaded and not cached_models:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"MLflow registry unavailable and no models loaded: {mirror_stats['last_error']}",
+            )
+        return {
+            "status": "healthy" if registry_ok else "degraded",
+            "mlflow_connection": {"ok": "ok", "pending": "pending"}.get(mirror_state, "unavailable"),
+            "model_registry": "accessible" if registry_ok else "unavailable",
+            "registry_mirror": {
+                "state": mirror_state,
+                "refreshes": mirror_stats["refreshes"],
+                "age_seconds": mirror_stats.get("age_seconds"),
+                "last_error": mirror_stats["last_error"],
+            },
+            "test_model_loaded": bool(models_loaded or cached_models),
+            "models_loaded": models_loaded,
+            "cached_models": cached_models,
+            "warmup_status": warmup.status,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
 
     except HTTPException:
         raise
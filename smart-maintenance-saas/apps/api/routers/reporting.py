@@ -9,7 +9,8 @@ from concurrent.futures import ThreadPoolExecutor
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Thread pool for blocking operations
+# Thread pool for blocking report assembly (analytics queries, waiting on chart workers);
+# charts themselves render in the reporting agent's worker processes
 executor = ThreadPoolExecutor(max_workers=4)
 
 def _generate_report_sync(reporting_agent, report_request: ReportRequest) -> ReportResult:
@@ -39,7 +40,7 @@ async def generate_report_endpoint(
             raise HTTPException(status_code=500, detail="Reporting agent not available on coordinator.")
 
         # Call the generate_report method in a thread pool to avoid blocking
-        # This prevents matplotlib and other blocking operations from causing async issues
+        # Analytics queries and chart rendering block, so keep them off the event loop
         try:
             logger.info("Calling reporting_agent.generate_report in thread pool...")
             loop = asyncio.get_event_loop()
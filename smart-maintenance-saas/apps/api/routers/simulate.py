@@ -9,6 +9,7 @@ import asyncio
 import logging
 import uuid
 import os
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
@@ -17,6 +18,7 @@ import requests
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
 
+from apps.ml.forecast_cache import get_forecast_cache
 from core.database.session import AsyncSessionLocal
 from core.database.crud.crud_sensor_reading import CRUDSensorReading
 from core.security.api_keys import API_KEY_HEADER_NAME, get_configured_api_keys
@@ -402,6 +404,8 @@ async def ingest_synthetic_data(
             
             # Commit all insertions
             await db.commit()
+            for sensor_id, count in Counter(reading["sensor_id"] for reading in synthetic_data).items():
+                get_forecast_cache().note_readings(sensor_id, count)
             
         except Exception as e:
             await db.rollback()
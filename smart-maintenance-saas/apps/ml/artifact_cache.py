@@ -0,0 +1,396 @@
+"""
+Content-addressed on-disk cache for downloaded model artifacts.
+
+``mlflow.pyfunc.load_model`` downloads the whole artifact tree from the
+registry/S3 on every call, so each process start and every in-memory cache miss
+paid the network transfer again. Artifacts are now downloaded once into a local
+store and loaded from disk afterwards:
+
+``objects/<digest>/``
+    The artifact tree plus ``manifest.json`` (per-file SHA256 hashes). The
+    directory name is the digest of those hashes, so identical artifacts
+    referenced by several registry versions are stored once.
+``refs/<sha256(ref)>.json``
+    Maps an immutable reference (pinned ``models:/name/<version>``, ``runs:/``
+    or ``s3://`` URI) to an object digest, plus metadata such as feature names.
+
+Downloads are staged under ``tmp/`` and renamed into place, so readers (and
+other worker processes) never see partial artifacts. Objects are verified
+against their manifest the first time a process uses them; corrupted entries
+are dropped and downloaded again. The store is capped in size and evicts the
+least recently used objects. When the registry is unreachable, the last
+artifact seen for a reference is still served.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+ARTIFACT_DIR = "artifact"
+DERIVED_DIR = "derived"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+Downloader = Callable[[str], str]
+
+
+def sha256_file(path: Union[str, Path], chunk_size: int = HASH_CHUNK_BYTES) -> str:
+    """SHA256 of a file, read in chunks so large model files are not loaded into memory."""
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def hash_tree(root: Union[str, Path]) -> Dict[str, str]:
+    """Map every file below ``root`` (relative POSIX path) to its SHA256."""
+    root = Path(root)
+    if root.is_file():
+        return {root.name: sha256_file(root)}
+    return {
+        path.relative_to(root).as_posix(): sha256_file(path)
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+def tree_digest(file_hashes: Dict[str, str]) -> str:
+    """Digest identifying an artifact tree by its file names and contents."""
+    digest = hashlib.sha256()
+    for relative_path in sorted(file_hashes):
+        digest.update(f"{relative_path}\0{file_hashes[relative_path]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedArtifact:
+    """A verified artifact in the local store."""
+
+    digest: str
+    path: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ArtifactCache:
+    """Size-capped, content-addressed artifact store shared by all loaders (and processes)."""
+
+    def __init__(self, root: Union[str, Path], max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._objects = self.root / "objects"
+        self._refs = self.root / "refs"
+        self._tmp = self.root / "tmp"
+        for directory in (self._objects, self._refs, self._tmp):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._ref_locks: Dict[str, threading.Lock] = {}
+        self._verified: set = set()
+        self.stats = {"hits": 0, "misses": 0, "downloads": 0, "evictions": 0, "corrupted": 0}
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+    def _ref_file(self, ref: str) -> Path:
+        return self._refs / f"{hashlib.sha256(ref.encode('utf-8')).hexdigest()}.json"
+
+    def _object_dir(self, digest: str) -> Path:
+        return self._objects / digest
+
+    def _artifact_path(self, object_dir: Path) -> Path:
+        manifest = self._read_json(object_dir / MANIFEST_FILE) or {}
+        return object_dir / ARTIFACT_DIR / manifest.get("entry", "")
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json_atomic(self, path: Path, payload: Dict[str, Any]) -> None:
+        staging = self._tmp / f"{uuid.uuid4().hex}.json"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(staging, path)
+
+    def _ref_lock(self, ref: str) -> threading.Lock:
+        with self._lock:
+            return self._ref_locks.setdefault(ref, threading.Lock())
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get(self, ref: str) -> Optional[CachedArtifact]:
+        """Return the verified local artifact recorded for ``ref``, if any."""
+        record = self._read_json(self._ref_file(ref))
+        if not record:
+            self.stats["misses"] += 1
+            return None
+        digest = record.get("digest", "")
+        object_dir = self._object_dir(digest)
+        if not object_dir.is_dir() or not self._verify(digest):
+            self._ref_file(ref).unlink(missing_ok=True)
+            self.stats["misses"] += 1
+            return None
+        # Manifest mtime doubles as the LRU timestamp shared across processes.
+        os.utime(object_dir / MANIFEST_FILE)
+        self.stats["hits"] += 1
+        return CachedArtifact(digest, str(self._artifact_path(object_dir)), record.get("metadata") or {})
+
+    def _verify(self, digest: str) -> bool:
+        if digest in self._verified:
+            return True
+        object_dir = self._object_dir(digest)
+        manifest = self._read_json(object_dir / MANIFEST_FILE)
+        try:
+            actual = hash_tree(object_dir / ARTIFACT_DIR)
+        except OSError:
+            actual = None
+        if not manifest or actual != manifest.get("files") or tree_digest(actual) != digest:
+            self.stats["corrupted"] += 1
+            logger.warning("Artifact cache object %s failed integrity verification; discarding", digest)
+            shutil.rmtree(object_dir, ignore_errors=True)
+            return False
+        self._verified.add(digest)
+        return True
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def fetch(
+        self,
+        ref: str,
+        download: Downloader,
+        *,
+        immutable: bool = True,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> CachedArtifact:
+        """Return the local artifact for ``ref``, downloading it on a miss.
+
+        Args:
+            ref: Reference the artifact is recorded under
+            download: Callable receiving a staging directory and returning the
+                local path of the downloaded artifact inside it
+            immutable: ``False`` for moving references (``latest``/stages), which
+                are always downloaded; the cached copy then only serves as an
+                offline fallback
+            metadata: Extra metadata stored with the reference
+        """
+        with self._ref_lock(ref):
+            if immutable:
+                cached = self.get(ref)
+                if cached is not None:
+                    return cached
+            artifact = self._store(download)
+            self.annotate(ref, artifact.digest, **(metadata or {}))
+            self.stats["downloads"] += 1
+            self.evict(keep=artifact.digest)
+            return CachedArtifact(artifact.digest, artifact.path, dict(metadata or {}))
+
+    def _store(self, download: Downloader) -> CachedArtifact:
+        staging = self._tmp / uuid.uuid4().hex
+        staging.mkdir()
+        try:
+            downloaded = Path(download(str(staging / "download")))
+            entry = downloaded.name if downloaded.is_file() else ""
+            if entry:
+                (staging / ARTIFACT_DIR).mkdir()
+                os.replace(downloaded, staging / ARTIFACT_DIR / entry)
+            else:
+                os.replace(downloaded, staging / ARTIFACT_DIR)
+            files = hash_tree(staging / ARTIFACT_DIR)
+            digest = tree_digest(files)
+            manifest = {
+                "digest": digest,
+                "entry": entry,
+                "files": files,
+                "size_bytes": sum(path.stat().st_size for path in (staging / ARTIFACT_DIR).rglob("*") if path.is_file()),
+                "created_at": time.time(),
+            }
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            shutil.rmtree(staging / "download", ignore_errors=True)
+
+            object_dir = self._object_dir(digest)
+            try:
+                os.rename(staging, object_dir)
+            except OSError:
+                if not object_dir.is_dir():
+                    raise
+                # Same content already stored (another reference or another process).
+            self._verified.add(digest)
+            return CachedArtifact(digest, str(self._artifact_path(object_dir)))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def annotate(self, ref: str, digest: Optional[str] = None, **metadata: Any) -> None:
+        """Point ``ref`` at ``digest`` and/or merge metadata into its record."""
+        ref_file = self._ref_file(ref)
+        record = self._read_json(ref_file) or {"ref": ref, "metadata": {}}
+        if digest is not None and digest != record.get("digest"):
+            record.update(digest=digest, metadata={})
+        if "digest" not in record:
+            return
+        record.setdefault("metadata", {}).update(metadata)
+        self._write_json_atomic(ref_file, record)
+
+    # ------------------------------------------------------------------
+    # Derived formats (e.g. packed, memory-mappable models)
+    # ------------------------------------------------------------------
+    def _derived_manifest(self, digest: str, name: str) -> Path:
+        return self._object_dir(digest) / DERIVED_DIR / f"{name}.json"
+
+    def get_derived(self, digest: str, name: str) -> Optional[Path]:
+        """Verified directory of a format derived from object ``digest``, if built."""
+        path = self._object_dir(digest) / DERIVED_DIR / name
+        manifest = self._read_json(self._derived_manifest(digest, name))
+        if manifest is None or not path.is_dir():
+            return None
+        verified_key = f"{digest}/{name}"
+        if verified_key not in self._verified:
+            if hash_tree(path) != manifest.get("files"):
+                self.stats["corrupted"] += 1
+                logger.warning("Derived artifact %s failed integrity verification; discarding", verified_key)
+                shutil.rmtree(path, ignore_errors=True)
+                self._derived_manifest(digest, name).unlink(missing_ok=True)
+                return None
+            self._verified.add(verified_key)
+        return path
+
+    def store_derived(self, digest: str, name: str, build: Callable[[Path], bool]) -> Optional[Path]:
+        """Build a derived format next to object ``digest`` (staged, then renamed into place).
+
+        ``build`` receives an empty directory and returns ``False`` to abandon the build.
+        """
+        if not self._object_dir(digest).is_dir():
+            return None
+        staging = self._tmp / uuid.uuid4().hex
+        staging.mkdir()
+        try:
+            if not build(staging):
+                return None
+            files = hash_tree(staging)
+            size_bytes = sum(path.stat().st_size for path in staging.rglob("*") if path.is_file())
+            target = self._object_dir(digest) / DERIVED_DIR / name
+            target.parent.mkdir(exist_ok=True)
+            # Manifest first: readers ignore a manifest whose directory is not there yet.
+            self._write_json_atomic(self._derived_manifest(digest, name), {"files": files, "size_bytes": size_bytes})
+            try:
+                os.rename(staging, target)
+            except OSError:
+                if not target.is_dir():
+                    raise
+            self._verified.add(f"{digest}/{name}")
+            return target
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _object_size(self, object_dir: Path, manifest: Dict[str, Any]) -> int:
+        size_bytes = manifest.get("size_bytes", 0)
+        derived = object_dir / DERIVED_DIR
+        if derived.is_dir():
+            for derived_manifest in derived.glob("*.json"):
+                size_bytes += (self._read_json(derived_manifest) or {}).get("size_bytes", 0)
+        return size_bytes
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used objects until the store fits ``max_bytes``."""
+        objects = []
+        for object_dir in self._objects.iterdir():
+            manifest_path = object_dir / MANIFEST_FILE
+            manifest = self._read_json(manifest_path)
+            if manifest is None:
+                continue
+            objects.append((manifest_path.stat().st_mtime, object_dir.name, self._object_size(object_dir, manifest)))
+        total = sum(size for _, _, size in objects)
+        removed = 0
+        for _, digest, size in sorted(objects):
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            shutil.rmtree(self._object_dir(digest), ignore_errors=True)
+            self._verified.discard(digest)
+            total -= size
+            removed += 1
+            self.stats["evictions"] += 1
+            logger.info("Evicted model artifact %s (%.1f MB) from the artifact cache", digest, size / 1e6)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        size_bytes = 0
+        count = 0
+        for object_dir in self._objects.iterdir():
+            manifest = self._read_json(object_dir / MANIFEST_FILE)
+            if manifest is not None:
+                size_bytes += self._object_size(object_dir, manifest)
+                count += 1
+        return {**self.stats, "objects": count, "bytes": size_bytes, "max_bytes": self.max_bytes, "root": str(self.root)}
+
+
+def _download_with_mlflow(artifact_uri: str) -> Downloader:
+    def download(destination: str) -> str:
+        from mlflow.artifacts import download_artifacts
+
+        os.makedirs(destination, exist_ok=True)
+        return download_artifacts(artifact_uri=artifact_uri, dst_path=destination)
+
+    return download
+
+
+def fetch_model_artifact(model_uri: str, *, immutable: bool = True) -> Optional[CachedArtifact]:
+    """Download ``model_uri`` through the artifact cache (``None`` when the cache is disabled).
+
+    Falls back to the last cached artifact for the URI when the download fails
+    (registry/S3 offline).
+    """
+    cache = get_artifact_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.fetch(model_uri, _download_with_mlflow(model_uri), immutable=immutable)
+    except Exception:
+        cached = cache.get(model_uri)
+        if cached is None:
+            raise
+        logger.warning("Download of %s failed; serving the cached artifact %s", model_uri, cached.digest)
+        return cached
+
+
+def localize_model_uri(model_uri: str, *, immutable: bool = True) -> str:
+    """Return a local path for ``model_uri``, or the URI itself when the cache is disabled."""
+    artifact = fetch_model_artifact(model_uri, immutable=immutable)
+    return artifact.path if artifact is not None else model_uri
+
+
+# Global artifact cache instance (singleton pattern)
+_artifact_cache: Optional[ArtifactCache] = None
+_artifact_cache_unavailable = False
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """Get the process-wide artifact cache, or ``None`` when disabled or unusable."""
+    global _artifact_cache, _artifact_cache_unavailable
+    if _artifact_cache is None and settings.ML_ARTIFACT_CACHE_ENABLED and not _artifact_cache_unavailable:
+        try:
+            _artifact_cache = ArtifactCache(
+                settings.ML_ARTIFACT_CACHE_DIR, settings.ML_ARTIFACT_CACHE_MAX_MB * 1024 * 1024
+            )
+        except OSError as cache_error:
+            _artifact_cache_unavailable = True
+            logger.warning("Artifact cache unavailable at %s: %s", settings.ML_ARTIFACT_CACHE_DIR, cache_error)
+    return _artifact_cache
@@ -0,0 +1,348 @@
+"""
+SHAP explainability with cached explainers.
+
+Building a SHAP explainer is the expensive part of an explanation: a
+``TreeExplainer`` walks every tree of the model and a ``KernelExplainer``
+needs a representative background dataset. Explainers are therefore cached per
+``model:version`` and reused across requests, and explanations are computed
+for whole feature matrices at once.
+
+Kernel explainers use a background sample drawn from the feature rows scored
+by ``/predict`` and ``/predict_batch`` for that model (reservoir sampling),
+instead of an all-zeros matrix that places the baseline far outside the
+training distribution. Until ``ML_SHAP_MIN_BACKGROUND_ROWS`` rows have been
+scored a kernel explanation raises ``BackgroundNotReadyError``: explaining a
+row against itself would only ever return zeros.
+"""
+
+import json
+import logging
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from apps.ml.packed_forest import explainable_estimator
+from core.config.settings import settings
+
+try:
+    import shap
+    SHAP_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    SHAP_AVAILABLE = False
+    shap = None
+
+logger = logging.getLogger(__name__)
+
+TREE_MODEL_MARKERS = ("forest", "tree", "lgb", "lightgbm", "xgb", "catboost", "gradientboosting")
+
+
+def unwrap_native_model(model: Any) -> Any:
+    """Return the underlying estimator of an MLflow pyfunc model when available."""
+    impl = getattr(model, "_model_impl", None)
+    if impl is None:
+        return model
+    return getattr(impl, "sklearn_model", None) or getattr(impl, "lgb_model", None) or impl
+
+
+def is_tree_model(model: Any) -> bool:
+    model_type = str(type(model)).lower()
+    return any(marker in model_type for marker in TREE_MODEL_MARKERS)
+
+
+class BackgroundNotReadyError(RuntimeError):
+    """Not enough scored rows have been observed to build a kernel explainer background."""
+
+
+@dataclass
+class _CachedExplainer:
+    explainer: Any
+    explainer_type: str
+    background_rows: int = 0
+    provisional: bool = False
+
+
+@dataclass
+class _BackgroundReservoir:
+    capacity: int
+    rows: List[np.ndarray] = field(default_factory=list)
+    seen: int = 0
+
+    def add(self, matrix: np.ndarray) -> None:
+        if matrix.shape[0] > self.capacity:
+            # A large batch can replace at most ``capacity`` rows; sample them up front.
+            self.seen += matrix.shape[0] - self.capacity
+            matrix = matrix[np.random.choice(matrix.shape[0], self.capacity, replace=False)]
+        for row in matrix:
+            self.seen += 1
+            if len(self.rows) < self.capacity:
+                self.rows.append(np.array(row, dtype=float))
+                continue
+            slot = random.randrange(self.seen)
+            if slot < self.capacity:
+                self.rows[slot] = np.array(row, dtype=float)
+
+    def matrix(self) -> Optional[np.ndarray]:
+        if not self.rows:
+            return None
+        return np.vstack(self.rows)
+
+
+class ExplainerCache:
+    """Thread-safe LRU cache of SHAP explainers keyed by ``model:version``."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        background_size: Optional[int] = None,
+        min_background_rows: Optional[int] = None,
+    ):
+        self.max_entries = max_entries or settings.ML_EXPLAINER_CACHE_SIZE
+        self.background_size = background_size or settings.ML_SHAP_BACKGROUND_SIZE
+        # At least two rows, so a background can never be just the explained row
+        self.min_background_rows = max(
+            2, min(self.background_size, min_background_rows or settings.ML_SHAP_MIN_BACKGROUND_ROWS)
+        )
+        self._explainers: "OrderedDict[str, _CachedExplainer]" = OrderedDict()
+        self._backgrounds: Dict[str, _BackgroundReservoir] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "builds": 0}
+
+    def observe(self, cache_key: str, feature_matrix: np.ndarray) -> None:
+        """Record rows scored by the prediction endpoints as background candidates."""
+        matrix = np.atleast_2d(np.asarray(feature_matrix, dtype=float))
+        with self._lock:
+            reservoir = self._backgrounds.get(cache_key)
+            if reservoir is None:
+                reservoir = _BackgroundReservoir(capacity=self.background_size)
+                self._backgrounds[cache_key] = reservoir
+            reservoir.add(matrix)
+
+    def get_explainer(self, cache_key: str, model: Any, feature_matrix: np.ndarray) -> _CachedExplainer:
+        """Return a cached explainer, building (or upgrading) it when needed."""
+        with self._lock:
+            cached = self._explainers.get(cache_key)
+            reservoir = self._backgrounds.get(cache_key)
+            background_ready = reservoir is not None and len(reservoir.rows) >= self.background_size
+            if cached is not None and not (cached.provisional and background_ready):
+                self._explainers.move_to_end(cache_key)
+                self.stats["hits"] += 1
+                return cached
+            self.stats["misses"] += 1
+            background = reservoir.matrix() if reservoir is not None else None
+
+        built = self._build(model, feature_matrix, background)
+        with self._lock:
+            self._explainers[cache_key] = built
+            self._explainers.move_to_end(cache_key)
+            self.stats["builds"] += 1
+            while len(self._explainers) > self.max_entries:
+                evicted_key, _ = self._explainers.popitem(last=False)
+                self._backgrounds.pop(evicted_key, None)
+                logger.debug("Evicted SHAP explainer for %s", evicted_key)
+        return built
+
+    def _build(
+        self, model: Any, feature_matrix: np.ndarray, background: Optional[np.ndarray]
+    ) -> _CachedExplainer:
+        native_model = explainable_estimator(unwrap_native_model(model))
+        if is_tree_model(native_model):
+            explainer = shap.TreeExplainer(native_model)
+            return _CachedExplainer(explainer, explainer.__class__.__name__)
+
+        observed = 0 if background is None else background.shape[0]
+        if observed < self.min_background_rows or background.shape[1] != feature_matrix.shape[1]:
+            raise BackgroundNotReadyError(
+                f"background not ready: {observed} of {self.min_background_rows} scored rows observed"
+            )
+        provisional = background.shape[0] < self.background_size
+        if background.shape[0] > self.background_size:
+            background = shap.sample(background, self.background_size)
+        explainer = shap.KernelExplainer(model.predict, background)
+        return _CachedExplainer(
+            explainer,
+            explainer.__class__.__name__,
+            background_rows=int(background.shape[0]),
+            provisional=provisional,
+        )
+
+    def invalidate(self, cache_key: Optional[str] = None) -> None:
+        with self._lock:
+            if cache_key is None:
+                self._explainers.clear()
+                self._backgrounds.clear()
+            else:
+                self._explainers.pop(cache_key, None)
+                self._backgrounds.pop(cache_key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._explainers)}
+
+
+def _normalize_shap_matrix(shap_values: Any, n_rows: int) -> np.ndarray:
+    """Coerce SHAP output to a (rows, features) matrix, using the first class for multi-class."""
+    if isinstance(shap_values, list):
+        shap_values = shap_values[0]  # Use first class for simplicity
+    values = np.asarray(shap_values, dtype=float)
+    if values.ndim == 3:
+        values = values[:, :, 0]
+    if values.ndim == 1:
+        values = values.reshape(n_rows, -1)
+    return values
+
+
+def explain_rows(
+    model: Any,
+    feature_matrix: np.ndarray,
+    feature_names: Optional[List[str]] = None,
+    cache_key: Optional[str] = None,
+    cache: Optional["ExplainerCache"] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Compute SHAP explanations for every row of ``feature_matrix`` in one call.
+
+    Args:
+        model: Trained model (MLflow pyfunc or native estimator)
+        feature_matrix: 2-D feature matrix
+        feature_names: Optional column names
+        cache_key: ``model:version`` key; when omitted the explainer is not cached
+        cache: Explainer cache to use (defaults to the process-wide cache)
+
+    Returns:
+        One dict per row with ``shap_values``, ``feature_importance`` and ``explainer_type``
+
+    Raises:
+        BackgroundNotReadyError: A kernel explainer is needed but too few rows
+            have been scored for ``cache_key`` (always the case without a key)
+    """
+    if not SHAP_AVAILABLE:
+        logger.warning("SHAP not available for explainability")
+        return []
+
+    matrix = np.atleast_2d(np.asarray(feature_matrix, dtype=float))
+    explainer_cache = cache or get_explainer_cache()
+    if cache_key is not None:
+        cached = explainer_cache.get_explainer(cache_key, model, matrix)
+    else:
+        cached = explainer_cache._build(model, matrix, None)
+
+    values = _normalize_shap_matrix(cached.explainer.shap_values(matrix), matrix.shape[0])
+
+    if feature_names is None or len(feature_names) != matrix.shape[1]:
+        feature_names = [f"feature_{i}" for i in range(matrix.shape[1])]
+
+    explanations: List[Dict[str, Any]] = []
+    for row in values:
+        row_values = {name: float(value) for name, value in zip(feature_names, row)}
+        explanations.append(
+            {
+                "shap_values": row_values,
+                "feature_importance": dict(row_values),
+                "explainer_type": cached.explainer_type,
+            }
+        )
+    return explanations
+
+
+_explainer_cache: Optional[ExplainerCache] = None
+
+
+def get_explainer_cache() -> ExplainerCache:
+    """Get the process-wide explainer cache (singleton)."""
+    global _explainer_cache
+    if _explainer_cache is None:
+        _explainer_cache = ExplainerCache()
+    return _explainer_cache
+
+
+# ==============================================================================
+# ASYNCHRONOUS EXPLANATION JOBS
+# ==============================================================================
+
+EXPLANATION_JOB_LOCAL_LIMIT = 1000
+
+
+def _explanation_job_key(job_id: str) -> str:
+    return f"ml:explanation:{job_id}"
+
+
+class ExplanationJobStore:
+    """
+    Status store for explanations computed off the request path.
+
+    Jobs are recorded in a bounded in-process map (always available to the worker
+    that owns the job) and mirrored to Redis with a TTL so that status polls served
+    by other API workers can see them. Redis failures degrade to local-only storage.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, local_limit: int = EXPLANATION_JOB_LOCAL_LIMIT):
+        self.ttl_seconds = ttl_seconds or settings.ML_EXPLANATION_JOB_TTL_SECONDS
+        self.local_limit = local_limit
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def create(self, model_name: str, model_version: str) -> Dict[str, Any]:
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "pending",
+            "model_name": model_name,
+            "model_version": model_version,
+            "created_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "shap_values": None,
+            "feature_importance": None,
+            "explainer_type": None,
+            "error": None,
+        }
+        self._remember(job)
+        return job
+
+    def _remember(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["job_id"]] = job
+        self._jobs.move_to_end(job["job_id"])
+        while len(self._jobs) > self.local_limit:
+            self._jobs.popitem(last=False)
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        self._remember(job)
+        try:
+            from core.redis_client import get_redis_client
+
+            redis_client = await get_redis_client()
+            async with redis_client.get_redis() as redis_conn:
+                await redis_conn.setex(
+                    _explanation_job_key(job["job_id"]), self.ttl_seconds, json.dumps(job)
+                )
+        except Exception as redis_error:  # noqa: BLE001 - local store remains authoritative
+            logger.debug("Explanation job %s not mirrored to Redis: %s", job["job_id"], redis_error)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        try:
+            from core.redis_client import get_redis_client
+
+            redis_client = await get_redis_client()
+            async with redis_client.get_redis() as redis_conn:
+                raw = await redis_conn.get(_explanation_job_key(job_id))
+            return json.loads(raw) if raw else None
+        except Exception as redis_error:  # noqa: BLE001
+            logger.debug("Explanation job %s lookup in Redis failed: %s", job_id, redis_error)
+            return None
+
+
+_explanation_job_store: Optional[ExplanationJobStore] = None
+
+
+def get_explanation_job_store() -> ExplanationJobStore:
+    """Get the process-wide explanation job store (singleton)."""
+    global _explanation_job_store
+    if _explanation_job_store is None:
+        _explanation_job_store = ExplanationJobStore()
+    return _explanation_job_store
@@ -0,0 +1,188 @@
+"""
+Result cache for ``/api/v1/ml/forecast``.
+
+A forecast only depends on the sensor's recent history, the model version and
+the request shape, so repeated calls (dashboards refreshing every few seconds)
+recompute identical Prophet predictions until a new reading arrives. Results
+are cached per ``(sensor, model, resolved version, horizon, history window,
+cadence)`` together with the timestamp of the newest reading they were built
+from (the *watermark*).
+
+Invalidation is data driven:
+
+* in-process ingestion paths call ``note_readings`` and a sensor's entries are
+  dropped once ``ML_FORECAST_CACHE_INVALIDATE_AFTER_READINGS`` new readings
+  have been seen;
+* readings written by other processes are caught by a cheap watermark probe
+  (the newest timestamp, plus a count of newer readings only when it moved)
+  issued at most once every ``ML_FORECAST_CACHE_RECHECK_SECONDS`` per entry.
+
+Within the recheck window a hit is a dictionary lookup; no database or model
+work is done.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ForecastKey = Tuple[str, str, str, int, int, Optional[int]]
+
+
+@dataclass
+class _ForecastEntry:
+    response: Any
+    watermark: datetime
+    checked_at: float
+    stored_at: float
+
+
+def forecast_cache_key(
+    sensor_id: str,
+    model_name: str,
+    model_version: str,
+    horizon_steps: int,
+    history_window: int,
+    cadence_minutes: Optional[int] = None,
+) -> ForecastKey:
+    """Cache key of a forecast request (``model_version`` must be resolved, never ``auto``)."""
+    return (sensor_id, model_name, str(model_version), int(horizon_steps), int(history_window), cadence_minutes)
+
+
+class ForecastCache:
+    """Bounded LRU of forecast responses invalidated by new sensor readings."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        recheck_seconds: float = 5.0,
+        invalidate_after_readings: int = 1,
+        ttl_seconds: float = 3600.0,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.recheck_seconds = max(0.0, float(recheck_seconds))
+        self.invalidate_after_readings = max(1, int(invalidate_after_readings))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[ForecastKey, _ForecastEntry]" = OrderedDict()
+        self._pending_readings: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "revalidated_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "evictions": 0,
+        }
+
+    def lookup(self, key: ForecastKey) -> Tuple[Optional[Any], Optional[datetime]]:
+        """Return ``(response, None)`` for a fresh hit.
+
+        ``(None, watermark)`` means an entry exists but the watermark has to be
+        re-checked against the database (see ``revalidate``); ``(None, None)``
+        is a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl_seconds > 0 and now - entry.stored_at > self.ttl_seconds):
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None, None
+            self._entries.move_to_end(key)
+            if now - entry.checked_at < self.recheck_seconds:
+                self.stats["hits"] += 1
+                return entry.response, None
+            return None, entry.watermark
+
+    def revalidate(
+        self, key: ForecastKey, latest_timestamp: Optional[datetime], new_readings: int
+    ) -> Optional[Any]:
+        """Serve the cached entry if the probed watermark shows no (or too few) new readings."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            unchanged = latest_timestamp is None or latest_timestamp <= entry.watermark
+            if unchanged or new_readings < self.invalidate_after_readings:
+                entry.checked_at = time.monotonic()
+                self.stats["revalidated_hits"] += 1
+                return entry.response
+            del self._entries[key]
+            self.stats["invalidations"] += 1
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, key: ForecastKey, response: Any, watermark: datetime) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = _ForecastEntry(response, watermark, checked_at=now, stored_at=now)
+            self._entries.move_to_end(key)
+            self._pending_readings.pop(key[0], None)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def note_readings(self, sensor_id: str, count: int = 1) -> None:
+        """Record readings ingested for ``sensor_id``; drops its forecasts past the threshold."""
+        with self._lock:
+            pending = self._pending_readings.get(sensor_id, 0) + count
+            if pending < self.invalidate_after_readings:
+                self._pending_readings[sensor_id] = pending
+                return
+            self._pending_readings.pop(sensor_id, None)
+            self._invalidate_locked(sensor_id)
+
+    def invalidate(self, sensor_id: Optional[str] = None) -> int:
+        """Drop the forecasts of one sensor (or all of them); returns the number removed."""
+        with self._lock:
+            if sensor_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._pending_readings.clear()
+                self.stats["invalidations"] += removed
+                return removed
+            return self._invalidate_locked(sensor_id)
+
+    def _invalidate_locked(self, sensor_id: str) -> int:
+        stale = [key for key in self._entries if key[0] == sensor_id]
+        for key in stale:
+            del self._entries[key]
+        self.stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        served = stats["hits"] + stats["revalidated_hits"]
+        lookups = served + stats["misses"]
+        stats["hit_rate"] = round(served / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["recheck_seconds"] = self.recheck_seconds
+        return stats
+
+
+# Global forecast cache instance (singleton pattern)
+_forecast_cache: Optional[ForecastCache] = None
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Get the process-wide forecast result cache."""
+    global _forecast_cache
+    if _forecast_cache is None:
+        _forecast_cache = ForecastCache(
+            max_entries=settings.ML_FORECAST_CACHE_MAX_ENTRIES,
+            recheck_seconds=settings.ML_FORECAST_CACHE_RECHECK_SECONDS,
+            invalidate_after_readings=settings.ML_FORECAST_CACHE_INVALIDATE_AFTER_READINGS,
+            ttl_seconds=settings.ML_FORECAST_CACHE_TTL_SECONDS,
+        )
+    return _forecast_cache
@@ -0,0 +1,233 @@
+"""
+Forecast preparation and process-pool execution.
+
+Prophet prediction is CPU bound and holds the GIL, so the inference thread
+pool of ``ModelServer`` effectively runs one forecast at a time. Fleet
+forecasts (``/forecast_batch``) are instead fanned out across a pool of worker
+processes. Each worker loads models through ``apps.ml.model_loader``, which
+gives it its own model cache backed by the shared on-disk artifact store.
+
+Only plain data (model name, version, future timestamps) crosses the process
+boundary; models are never pickled between processes. Every worker caps its
+model cache at its share of ``ML_MODEL_CACHE_MAX_MB`` (see
+``_init_forecast_worker``), so the pool as a whole stays within the budget.
+
+Each task gets its own timeout. A process pool cannot interrupt a single task,
+so a task that times out while running recycles the pool (its workers are
+terminated); tasks interrupted by the recycle are retried once on the fresh
+pool.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from apps.ml import model_loader
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Cadence used when a sensor's history is too short to infer one (synthetic dataset cadence)
+DEFAULT_CADENCE_MINUTES = 5
+
+
+def history_frame(timestamps: Sequence[Optional[datetime]], values: Sequence[Any]) -> pd.DataFrame:
+    """Naive-UTC ``timestamp``/``value`` frame sorted oldest first, without missing values."""
+    frame = pd.DataFrame(
+        {
+            "timestamp": [
+                ts.replace(tzinfo=None) if ts is not None and ts.tzinfo else ts for ts in timestamps
+            ],
+            "value": np.asarray([np.nan if value is None else value for value in values], dtype=float),
+        }
+    )
+    return frame.dropna(subset=["timestamp", "value"]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def infer_cadence_minutes(history: pd.DataFrame, override: Optional[int] = None) -> int:
+    """Requested cadence, else the median spacing of the history (in whole minutes)."""
+    cadence_minutes = override
+    if cadence_minutes is None and len(history) >= 2:
+        diffs = history["timestamp"].diff().dropna()
+        if not diffs.empty:
+            median_minutes = float(diffs.dt.total_seconds().median() / 60.0)
+            if median_minutes > 0:
+                cadence_minutes = max(1, int(round(median_minutes)))
+    if cadence_minutes is None or cadence_minutes <= 0:
+        cadence_minutes = DEFAULT_CADENCE_MINUTES
+    return cadence_minutes
+
+
+def future_frame(last_timestamp: Any, cadence_minutes: int, horizon_steps: int) -> pd.DataFrame:
+    """Prophet-style ``ds`` frame with ``horizon_steps`` points after ``last_timestamp``."""
+    future_index = pd.date_range(
+        start=last_timestamp + pd.Timedelta(minutes=cadence_minutes),
+        periods=horizon_steps,
+        freq=f"{cadence_minutes}min",
+    )
+    return pd.DataFrame({"ds": future_index})
+
+
+def predict_forecast(model_name: str, model_version: str, future: pd.DataFrame) -> pd.DataFrame:
+    """Load (or reuse) a forecaster in the current process and predict ``future``.
+
+    Runs inside pool workers, so it only takes and returns picklable data.
+    """
+    loaded = model_loader.get_cached_model(model_name, model_version)
+    if loaded is None:
+        loaded = model_loader.load_model(model_name, model_version)
+    model = loaded[0] if loaded else None
+    if model is None:
+        raise LookupError(f"Model '{model_name}' version '{model_version}' not found")
+
+    forecast_raw = model.predict(future)
+    if isinstance(forecast_raw, pd.DataFrame):
+        return forecast_raw
+    forecast = pd.DataFrame({"yhat": np.asarray(forecast_raw).reshape(-1)})
+    forecast["ds"] = future["ds"].iloc[: len(forecast)].to_numpy()
+    return forecast
+
+
+def _init_forecast_worker(cache_max_bytes: int) -> None:
+    """Worker initializer: cap this process's model cache at its share of the budget."""
+    from apps.ml.model_cache import configure_model_cache
+
+    configure_model_cache(cache_max_bytes)
+
+
+class ForecastPool:
+    """Runs forecast tasks in worker processes (or in-process threads when disabled)."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        use_processes: Optional[bool] = None,
+        task_timeout_seconds: Optional[float] = None,
+    ):
+        configured = workers if workers is not None else settings.ML_FORECAST_PROCESS_WORKERS
+        self.workers = configured if configured and configured > 0 else (os.cpu_count() or 1)
+        self.use_processes = use_processes if use_processes is not None else settings.ML_FORECAST_USE_PROCESS_POOL
+        self.task_timeout_seconds = (
+            task_timeout_seconds if task_timeout_seconds is not None else settings.ML_FORECAST_TASK_TIMEOUT_SECONDS
+        )
+        self.worker_cache_max_mb = (
+            settings.ML_FORECAST_WORKER_CACHE_MAX_MB or max(1, settings.ML_MODEL_CACHE_MAX_MB // self.workers)
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"tasks": 0, "completed": 0, "failed": 0, "timeouts": 0, "recycles": 0}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" keeps workers independent of the API's threads, locks and sockets.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_forecast_worker,
+                initargs=(self.worker_cache_max_mb * 1024 * 1024,),
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, timeout_seconds: Optional[float] = None) -> T:
+        """Execute ``func(*args)`` in a worker under the per-task timeout."""
+        timeout = timeout_seconds if timeout_seconds is not None else self.task_timeout_seconds
+        timeout = timeout if timeout and timeout > 0 else None
+        self.stats["tasks"] += 1
+        try:
+            if self.use_processes:
+                try:
+                    result = await self._run_in_process(func, args, timeout)
+                except BrokenProcessPool:
+                    # Another task's timeout recycled the pool (or a worker crashed) mid-task.
+                    result = await self._run_in_process(func, args, timeout)
+            else:
+                from apps.ml.serving import get_model_server
+
+                future = asyncio.get_running_loop().run_in_executor(
+                    get_model_server().inference_executor, functools.partial(func, *args)
+                )
+                result = await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
+
+    async def _run_in_process(self, func: Callable[..., T], args: tuple, timeout: Optional[float]) -> T:
+        executor = self.executor
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                self._executor = None
+            raise
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                self._executor = None  # a broken pool cannot be reused
+            raise
+        except asyncio.TimeoutError:
+            if not future.cancel():
+                logger.warning("Forecast task exceeded %.1fs while running; recycling workers", timeout)
+                self._recycle(executor)
+            raise
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Terminate the workers of ``executor``; the next task starts a fresh pool."""
+        if self._executor is executor:
+            self._executor = None
+        self.stats["recycles"] += 1
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "use_processes": self.use_processes,
+            "worker_cache_max_mb": self.worker_cache_max_mb,
+            "task_timeout_seconds": self.task_timeout_seconds,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global forecast pool (singleton pattern)
+_forecast_pool: Optional[ForecastPool] = None
+
+
+def get_forecast_pool() -> ForecastPool:
+    """Get the process-wide forecast pool; worker processes start on first use."""
+    global _forecast_pool
+    if _forecast_pool is None:
+        _forecast_pool = ForecastPool()
+    return _forecast_pool
+
+
+def shutdown_forecast_pool() -> None:
+    """Shut down the global forecast pool if it was created."""
+    global _forecast_pool
+    if _forecast_pool is not None:
+        _forecast_pool.shutdown()
+        _forecast_pool = None
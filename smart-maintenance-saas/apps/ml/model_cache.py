@@ -0,0 +1,329 @@
+"""
+Process-wide, memory-bounded cache for loaded models.
+
+Both model loaders (``apps.ml.model_loader`` for the API and
+``core.ml.model_loader`` for the agents) keep their loaded models here, so a
+single memory budget covers every model held by the process. Each entry is
+charged its measured size (pickled payload plus out-of-band numpy buffers);
+when the budget is exceeded the least recently used entry is evicted (or the
+least frequently used one with ``policy="lfu"``).
+
+Entries that track a moving reference (``latest``, a stage) are given a TTL and
+a loader. Once an entry passes the refresh-ahead point of its TTL, reads keep
+returning the cached model while a single background reload replaces it
+(stale-while-revalidate), so no request ever pays for a TTL-triggered reload.
+A failed refresh keeps serving the previous model and is retried later.
+"""
+
+import logging
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Any]
+
+_SIZE_WALK_LIMIT = 100_000
+
+
+def _walk_size(obj: Any) -> int:
+    """Approximate deep size for objects that cannot be pickled."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < _SIZE_WALK_LIMIT:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        nbytes = getattr(current, "nbytes", None)
+        if isinstance(nbytes, int) and not isinstance(current, type):
+            total += nbytes
+            continue
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            stack.append(vars(current))
+    return total
+
+
+def estimate_size(obj: Any) -> int:
+    """Measure the memory footprint of a loaded model in bytes.
+
+    Uses the pickle protocol 5 stream length plus the size of out-of-band
+    buffers (numpy arrays are reported without being copied); objects that
+    cannot be pickled fall back to a bounded reference walk.
+    """
+    buffer_bytes = 0
+
+    def _count_buffer(buffer: pickle.PickleBuffer) -> bool:
+        nonlocal buffer_bytes
+        buffer_bytes += buffer.raw().nbytes
+        return False  # keep the stream free of the buffer contents
+
+    try:
+        payload = pickle.dumps(obj, protocol=5, buffer_callback=_count_buffer)
+        return len(payload) + buffer_bytes
+    except Exception:  # noqa: BLE001 - pyfunc wrappers may hold unpicklable handles
+        return _walk_size(obj)
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    size_bytes: int
+    loaded_at: float
+    ttl_seconds: Optional[float] = None
+    loader: Optional[Loader] = None
+    hits: int = 0
+    refreshing: bool = False
+    next_refresh_at: Optional[float] = field(default=None)
+
+
+class ModelCache:
+    """Thread-safe, size-aware model cache with stale-while-revalidate refreshes."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        default_ttl_seconds: Optional[float] = None,
+        refresh_ahead_ratio: Optional[float] = None,
+        policy: Optional[str] = None,
+        refresh_workers: int = 1,
+    ):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.ML_MODEL_CACHE_MAX_MB * 1024 * 1024
+        self.default_ttl_seconds = (
+            default_ttl_seconds if default_ttl_seconds is not None else settings.ML_MODEL_CACHE_TTL_SECONDS
+        )
+        self.refresh_ahead_ratio = (
+            refresh_ahead_ratio if refresh_ahead_ratio is not None else settings.ML_MODEL_CACHE_REFRESH_AHEAD_RATIO
+        )
+        self.policy = (policy or settings.ML_MODEL_CACHE_POLICY).lower()
+        if self.policy not in {"lru", "lfu"}:
+            raise ValueError(f"Unsupported model cache policy: {self.policy}")
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._refresh_workers = refresh_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "evicted_bytes": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "oversized": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, scheduling a background refresh when it is due."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.stats["hits"] += 1
+            if self._refresh_due(entry):
+                entry.refreshing = True
+                self._submit_refresh(key, entry)
+            return entry.value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _refresh_due(self, entry: _CacheEntry) -> bool:
+        if entry.loader is None or entry.ttl_seconds is None or entry.refreshing:
+            return False
+        due_at = entry.next_refresh_at
+        if due_at is None:
+            due_at = entry.loaded_at + entry.ttl_seconds * self.refresh_ahead_ratio
+        return time.monotonic() >= due_at
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        loader: Optional[Loader] = None,
+        ttl_seconds: Optional[float] = None,
+        size_bytes: Optional[int] = None,
+    ) -> None:
+        """Store a value, evicting other entries until the memory budget fits.
+
+        Args:
+            key: Cache key (namespaced by the caller)
+            value: Loaded model (or loader-specific tuple)
+            loader: Zero-argument callable that reloads the value; enables
+                background refresh before the TTL expires
+            ttl_seconds: Refresh horizon; defaults to the cache TTL when a
+                loader is given, ``None`` (never stale) otherwise
+            size_bytes: Pre-computed size; measured with ``estimate_size`` when omitted
+        """
+        if size_bytes is None:
+            size_bytes = estimate_size(value)
+        if loader is not None and ttl_seconds is None:
+            ttl_seconds = self.default_ttl_seconds
+        entry = _CacheEntry(
+            value=value,
+            size_bytes=int(size_bytes),
+            loaded_at=time.monotonic(),
+            ttl_seconds=ttl_seconds if loader is not None else None,
+            loader=loader,
+        )
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size_bytes
+                entry.hits = previous.hits
+            if entry.size_bytes > self.max_bytes:
+                # Serving a model uncached would reload it on every request; keep it
+                # alone in the cache and report the overshoot instead.
+                self.stats["oversized"] += 1
+                logger.warning(
+                    "Model %s (%.1f MB) exceeds the model cache budget (%.1f MB)",
+                    key,
+                    entry.size_bytes / 1e6,
+                    self.max_bytes / 1e6,
+                )
+            self._evict_until_fits(entry.size_bytes)
+            self._entries[key] = entry
+            self._bytes += entry.size_bytes
+
+    def _evict_until_fits(self, incoming_bytes: int) -> None:
+        while self._entries and self._bytes + incoming_bytes > self.max_bytes:
+            victim_key = self._choose_victim()
+            victim = self._entries.pop(victim_key)
+            self._bytes -= victim.size_bytes
+            self.stats["evictions"] += 1
+            self.stats["evicted_bytes"] += victim.size_bytes
+            logger.info("Evicted model %s from cache (%.1f MB)", victim_key, victim.size_bytes / 1e6)
+
+    def _choose_victim(self) -> str:
+        if self.policy == "lfu":
+            # Ties go to the least recently used entry (iteration order is LRU first).
+            return min(self._entries.items(), key=lambda item: item[1].hits)[0]
+        return next(iter(self._entries))
+
+    def invalidate(self, key: Optional[str] = None, *, prefix: Optional[str] = None) -> int:
+        """Drop one key, every key under ``prefix``, or everything; returns the count removed."""
+        with self._lock:
+            if key is not None:
+                keys = [key] if key in self._entries else []
+            elif prefix is not None:
+                keys = [existing for existing in self._entries if existing.startswith(prefix)]
+            else:
+                keys = list(self._entries)
+            for existing in keys:
+                self._bytes -= self._entries.pop(existing).size_bytes
+            return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+    def _submit_refresh(self, key: str, entry: _CacheEntry) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._refresh_workers, thread_name_prefix="model-cache-refresh"
+            )
+        self._executor.submit(self._refresh, key, entry)
+
+    def _refresh(self, key: str, entry: _CacheEntry) -> None:
+        try:
+            value = entry.loader()
+            if value is None or (isinstance(value, tuple) and value and value[0] is None):
+                raise RuntimeError("loader returned no model")
+        except Exception as refresh_error:  # noqa: BLE001 - keep serving the cached model
+            with self._lock:
+                self.stats["refresh_failures"] += 1
+                entry.refreshing = False
+                entry.next_refresh_at = time.monotonic() + entry.ttl_seconds * (1 - self.refresh_ahead_ratio)
+            logger.warning("Background refresh of model %s failed: %s", key, refresh_error)
+            return
+
+        size_bytes = estimate_size(value)
+        with self._lock:
+            entry.refreshing = False
+            if self._entries.get(key) is not entry:
+                return  # evicted or replaced while reloading
+            self.set(key, value, loader=entry.loader, ttl_seconds=entry.ttl_seconds, size_bytes=size_bytes)
+            self.stats["refreshes"] += 1
+        logger.info("Refreshed cached model %s in the background", key)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "policy": self.policy,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+            }
+
+
+# Global model cache instance (singleton pattern)
+_model_cache: Optional[ModelCache] = None
+
+
+def get_model_cache() -> ModelCache:
+    """Get the process-wide model cache shared by every model loader."""
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = ModelCache()
+    return _model_cache
+
+
+def configure_model_cache(max_bytes: int) -> ModelCache:
+    """Replace the process-wide cache with one capped at ``max_bytes`` (for worker processes)."""
+    global _model_cache
+    if _model_cache is not None:
+        _model_cache.shutdown()
+    _model_cache = ModelCache(max_bytes=max_bytes)
+    return _model_cache
+
+
+def shutdown_model_cache() -> None:
+    """Stop background refreshes and drop cached models."""
+    global _model_cache
+    if _model_cache is not None:
+        _model_cache.shutdown()
+        _model_cache.clear()
+        _model_cache = None
@@ -9,6 +9,9 @@ import mlflow.pyfunc
 from mlflow.tracking import MlflowClient
 from mlflow.artifacts import download_artifacts
 
+from apps.ml.artifact_cache import CachedArtifact, fetch_model_artifact, get_artifact_cache
+from apps.ml.model_cache import get_model_cache
+from apps.ml.packed_forest import PackedForest, PackedForestModel, can_pack, pack_estimator
 from core.config.settings import settings
 
 # Set up logging
@@ -33,8 +36,6 @@ else:
     logger.info("MLflow model loading disabled; skipping MlflowClient initialization.")
     _MLFLOW_CLIENT = None
 
-_model_cache: Dict[str, Tuple[Any, Optional[List[str]]]] = {}
-
 # Direct S3 fallbacks for scenarios where the MLflow registry is unavailable but
 # artifacts are still stored remotely. URIs are derived from docs/S3_ARTIFACT_MAPPING.md.
 S3_MODEL_URIS: Dict[str, str] = {
@@ -77,7 +78,7 @@ def _load_from_s3_fallback(model_name: str) -> Tuple[Optional[Any], Optional[Lis
 
     try:
         logger.warning("Falling back to S3 for model '%s' (%s)", model_name, s3_uri)
-        loaded_model = mlflow.pyfunc.load_model(s3_uri)
+        loaded_model = _load_pyfunc(s3_uri)
         feature_names = S3_FEATURE_NAME_HINTS.get(model_name)
         if feature_names:
             logger.info("Loaded S3 fallback with feature schema for model '%s'", model_name)
@@ -108,6 +109,94 @@ def _debug_list_model_versions(model_name: str) -> None:
         print(f"[model_loader] Failed listing versions for '{model_name}': {e}")
 
 
+def model_cache_key(model_name: str, model_version: str = "1") -> str:
+    """Return the cache key used for a registry name/version or explicit URI."""
+    if model_name.startswith("runs:/") or model_name.startswith("models:/"):
+        return model_name
+    return f"{model_name}:{model_version}"
+
+
+def _tracks_moving_reference(model_name: str, model_version: str) -> bool:
+    """True when the reference can point at new artifacts over time (``latest``, a stage)."""
+    if model_name.startswith("runs:/"):
+        return False
+    if model_name.startswith("models:/"):
+        model_version = model_name.rstrip("/").rsplit("/", 1)[-1]
+    return not str(model_version).isdigit()
+
+
+# Name of the packed (memory-mapped) tree format stored next to cached artifacts
+PACKED_MODEL_FORMAT = "packed-forest-v1"
+
+
+def _pack_loaded_model(artifact: CachedArtifact, model: Any) -> Optional[PackedForestModel]:
+    """Store a tree model in the packed format so every worker can share one mapped copy."""
+    from apps.ml.explainability import unwrap_native_model
+
+    native_model = unwrap_native_model(model)
+    artifact_cache = get_artifact_cache()
+    if artifact_cache is None or not can_pack(native_model):
+        return None
+    try:
+        packed_dir = artifact_cache.store_derived(
+            artifact.digest, PACKED_MODEL_FORMAT, lambda directory: pack_estimator(native_model, directory)
+        )
+        if packed_dir is None:
+            return None
+        logger.info("Packed %s for memory-mapped serving (%s)", type(native_model).__name__, packed_dir)
+        return PackedForestModel(
+            PackedForest(packed_dir),
+            source_path=artifact.path,
+            native_batch_rows=settings.ML_PACKED_NATIVE_BATCH_ROWS,
+        )
+    except Exception as pack_error:  # noqa: BLE001 - the regular model keeps working
+        logger.warning("Could not pack model artifact %s: %s", artifact.digest, pack_error)
+        return None
+
+
+def _load_artifact_model(artifact: CachedArtifact) -> Any:
+    """Load a model from the local artifact store, preferring its packed (memory-mapped) form."""
+    artifact_cache = get_artifact_cache()
+    if settings.ML_PACKED_MODELS_ENABLED and artifact_cache is not None:
+        packed_dir = artifact_cache.get_derived(artifact.digest, PACKED_MODEL_FORMAT)
+        if packed_dir is not None:
+            print(f"Loading packed model from local artifact cache: {packed_dir}")
+            return PackedForestModel(
+                PackedForest(packed_dir),
+                source_path=artifact.path,
+                native_batch_rows=settings.ML_PACKED_NATIVE_BATCH_ROWS,
+            )
+
+    model = mlflow.pyfunc.load_model(artifact.path)
+    if settings.ML_PACKED_MODELS_ENABLED:
+        # Serve the first load from the mapping too, so this worker drops its private copy.
+        packed = _pack_loaded_model(artifact, model)
+        if packed is not None:
+            return packed
+    return model
+
+
+def _load_pyfunc(model_uri: str, immutable: bool = True) -> Any:
+    """Load a model via the local artifact store (direct remote load when the store is disabled)."""
+    artifact = fetch_model_artifact(model_uri, immutable=immutable)
+    if artifact is None:
+        return mlflow.pyfunc.load_model(model_uri)
+    return _load_artifact_model(artifact)
+
+
+def _load_cached_artifact(cached: CachedArtifact) -> Tuple[Any, Optional[List[str]]]:
+    """Load a model from the local artifact store along with its recorded feature schema."""
+    print(f"Loading model from local artifact cache: {cached.path}")
+    return _load_artifact_model(cached), cached.metadata.get("feature_names")
+
+
+def get_cached_model(
+    model_name: str, model_version: str = "1"
+) -> Optional[Tuple[Any, Optional[List[str]]]]:
+    """Return a cached ``(model, feature_names)`` tuple without triggering a load."""
+    return get_model_cache().get(model_cache_key(model_name, model_version))
+
+
 def load_model(model_name: str, model_version: str = "1") -> Tuple[Optional[Any], Optional[List[str]]]:
     """Load an MLflow model (registry or run URI) and accompanying feature schema.
 
@@ -133,27 +222,50 @@ def load_model(model_name: str, model_version: str = "1") -> Tuple[Optional[Any]
         )
         return None, None
 
+    cache_key = model_cache_key(model_name, model_version)
+    cached = get_model_cache().get(cache_key)
+    if cached is not None:
+        print(f"Loading model from cache: {cache_key}")
+        return cached
+
+    loaded = _load_model_uncached(model_name, model_version)
+    if loaded[0] is not None:
+        refresh = None
+        if _tracks_moving_reference(model_name, model_version):
+            refresh = lambda: _load_model_uncached(model_name, model_version)  # noqa: E731
+        get_model_cache().set(cache_key, loaded, loader=refresh)
+    return loaded
+
+
+def _load_model_uncached(
+    model_name: str, model_version: str = "1"
+) -> Tuple[Optional[Any], Optional[List[str]]]:
+    """Load a model and its feature schema from MLflow (or the S3 fallback), bypassing the cache."""
     # Determine if model_name is already a complete URI
     if model_name.startswith("runs:/"):
         # Direct run URI - use as-is
         model_uri = model_name
-        cache_key = model_name
         print(f"Using run URI: {model_uri}")
     elif model_name.startswith("models:/"):
         # Direct models URI - use as-is  
         model_uri = model_name
-        cache_key = model_name
         print(f"Using models URI: {model_uri}")
     else:
         # Registry name - construct URI
         model_uri = f"models:/{model_name}/{model_version}"
-        cache_key = f"{model_name}:{model_version}"
         print(f"Constructing registry URI: {model_uri}")
-    
-    # Check cache first
-    if cache_key in _model_cache:
-        print(f"Loading model from cache: {cache_key}")
-        return _model_cache[cache_key]
+
+    # Pinned versions and run URIs never change: serve them from the local artifact
+    # store without touching the registry.
+    immutable = not _tracks_moving_reference(model_name, model_version)
+    artifact_cache = get_artifact_cache()
+    if artifact_cache is not None and immutable:
+        cached = artifact_cache.get(model_uri)
+        if cached is not None:
+            try:
+                return _load_cached_artifact(cached)
+            except Exception as cached_error:  # noqa: BLE001 - fall through to a fresh download
+                logger.warning("Cached artifact for '%s' failed to load: %s", model_uri, cached_error)
 
     try:
         print(f"Loading model from MLflow: {model_uri}")
@@ -191,7 +303,7 @@ def load_model(model_name: str, model_version: str = "1") -> Tuple[Optional[Any]
                 run_id = None
         
         # Load the model
-        loaded_model = mlflow.pyfunc.load_model(model_uri)
+        loaded_model = _load_pyfunc(model_uri, immutable=immutable)
         feature_names: Optional[List[str]] = None
 
         # Attempt to retrieve feature_names.txt artifact if we have a run_id
@@ -225,10 +337,10 @@ def load_model(model_name: str, model_version: str = "1") -> Tuple[Optional[Any]
                 print("No feature_names.txt artifact found; schema validation will be skipped.")
         else:
             print("run_id unavailable; skipping feature schema retrieval.")
+        if artifact_cache is not None:
+            artifact_cache.annotate(model_uri, feature_names=feature_names)
 
-        # Cache and return
-        _model_cache[cache_key] = (loaded_model, feature_names)
-        print(f"Model loaded and cached successfully: {type(loaded_model)}; feature_names={feature_names}")
+        print(f"Model loaded successfully: {type(loaded_model)}; feature_names={feature_names}")
         return loaded_model, feature_names
         
     except Exception as e:
@@ -245,9 +357,15 @@ def load_model(model_name: str, model_version: str = "1") -> Tuple[Optional[Any]
         # Print full stack trace to stdout for container log capture
         traceback.print_exc()
         print(f"--- END MLFLOW LOAD EXCEPTION ---")
+        # Registry unreachable: serve the last artifact downloaded for this reference.
+        cached = artifact_cache.get(model_uri) if artifact_cache is not None else None
+        if cached is not None:
+            try:
+                return _load_cached_artifact(cached)
+            except Exception as cached_error:  # noqa: BLE001
+                logger.warning("Cached artifact for '%s' failed to load: %s", model_uri, cached_error)
         fallback_model, fallback_features = _load_from_s3_fallback(model_name)
         if fallback_model is not None:
-            _model_cache[cache_key] = (fallback_model, fallback_features)
             return fallback_model, fallback_features
     return None, None
 
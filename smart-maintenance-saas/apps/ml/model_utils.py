@@ -12,6 +12,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from mlflow.tracking import MlflowClient
 from mlflow.exceptions import MlflowException
 
+from apps.ml.registry_mirror import RegistrySnapshot, get_registry_mirror
 from core.config.settings import settings
 
 # Set up logging
@@ -39,10 +40,103 @@ def _get_mlflow_client():
     return MlflowClient(tracking_uri=MLFLOW_TRACKING_URI)
 
 
+def _collect_pages(fetch_page) -> List[Any]:
+    """Drain a paginated MLflow search call (``PagedList`` with ``token``)."""
+    items: List[Any] = []
+    page_token = None
+    while True:
+        page = fetch_page(page_token)
+        items.extend(page)
+        page_token = getattr(page, 'token', None)
+        if not page_token:
+            return items
+
+
+def _version_record(version: Any) -> Dict[str, Any]:
+    return {
+        'version': str(version.version),
+        'current_stage': getattr(version, 'current_stage', None),
+        'status': getattr(version, 'status', None),
+        'creation_timestamp': getattr(version, 'creation_timestamp', None),
+        'run_id': getattr(version, 'run_id', None),
+        'tags': getattr(version, 'tags', None) or {},
+        'aliases': list(getattr(version, 'aliases', None) or []),
+    }
+
+
+def fetch_registry_snapshot() -> RegistrySnapshot:
+    """
+    Build a registry snapshot with two bulk calls (models + all versions).
+
+    Replaces the per-model ``search_model_versions`` loop; used by the
+    registry mirror's background refresh.
+    """
+    if getattr(settings, 'DISABLE_MLFLOW_MODEL_LOADING', False):
+        return RegistrySnapshot(refreshed_at=time.time())
+
+    client = _get_mlflow_client()
+    registered_models = _collect_pages(
+        lambda token: client.search_registered_models(max_results=1000, page_token=token)
+    )
+    all_versions = _collect_pages(
+        lambda token: client.search_model_versions(page_token=token)
+    )
+
+    versions_by_model: Dict[str, List[Dict[str, Any]]] = {}
+    for version in all_versions:
+        versions_by_model.setdefault(version.name, []).append(_version_record(version))
+    for versions in versions_by_model.values():
+        versions.sort(key=lambda v: int(v['version']) if v['version'].isdigit() else -1, reverse=True)
+
+    models: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, Dict[str, str]] = {}
+    for model in registered_models:
+        versions = versions_by_model.get(model.name, [])
+        latest = versions[0] if versions else None
+        models[model.name] = {
+            'name': model.name,
+            'description': model.description,
+            'latest_version': latest['version'] if latest else 'unknown',
+            'creation_timestamp': model.creation_timestamp,
+            'last_updated_timestamp': model.last_updated_timestamp,
+            'tags': model.tags or {},
+            'version_tags': latest['tags'] if latest else {},
+            'current_stage': latest['current_stage'] if latest else 'unknown',
+            'run_id': latest['run_id'] if latest else 'unknown',
+        }
+        aliases[model.name] = {
+            str(alias): str(version) for alias, version in (getattr(model, 'aliases', None) or {}).items()
+        }
+
+    # Change detection: any new model/version, stage move or tag edit alters the fingerprint.
+    fingerprint = tuple(sorted(
+        (
+            name,
+            info['last_updated_timestamp'],
+            tuple(
+                (v['version'], v['current_stage'], tuple(sorted(v['tags'].items())))
+                for v in versions_by_model.get(name, [])
+            ),
+        )
+        for name, info in models.items()
+    ))
+    return RegistrySnapshot(
+        models=models,
+        versions=versions_by_model,
+        aliases=aliases,
+        sensor_type_mapping=_build_sensor_type_mapping(list(models.values())),
+        fingerprint=fingerprint,
+        refreshed_at=time.time(),
+    )
+
+
 def get_all_registered_models() -> List[Dict[str, Any]]:
     """
-    Fetch all registered models from MLflow registry.
+    Fetch all registered models from the MLflow registry mirror.
     
+    The mirror is refreshed in the background; only a cold start waits for the
+    registry.
+
     Returns:
         List of dictionaries containing model information including name, version, tags, etc.
     """
@@ -50,48 +144,10 @@ def get_all_registered_models() -> List[Dict[str, Any]]:
         logger.debug("MLflow model loading disabled by settings; returning empty model list.")
         return []
     try:
-        client = _get_mlflow_client()
-        models = client.search_registered_models()
-        model_info = []
-        
-        for model in models:
-            # Get the latest version for each model
-            try:
-                versions = client.search_model_versions(f"name='{model.name}'")
-                if versions:
-                    # Sort by version number and get the latest
-                    latest_version = max(versions, key=lambda v: int(v.version))
-                    
-                    model_data = {
-                        'name': model.name,
-                        'description': model.description,
-                        'latest_version': latest_version.version,
-                        'creation_timestamp': model.creation_timestamp,
-                        'last_updated_timestamp': model.last_updated_timestamp,
-                        'tags': model.tags or {},
-                        'version_tags': latest_version.tags or {},
-                        'current_stage': latest_version.current_stage,
-                        'run_id': latest_version.run_id
-                    }
-                    model_info.append(model_data)
-                    
-            except Exception as e:
-                logger.warning(f"Failed to get versions for model {model.name}: {e}")
-                # Add basic model info even if we can't get version details
-                model_data = {
-                    'name': model.name,
-                    'description': model.description,
-                    'tags': model.tags or {},
-                    'latest_version': 'unknown',
-                    'version_tags': {},
-                    'current_stage': 'unknown',
-                    'run_id': 'unknown'
-                }
-                model_info.append(model_data)
-        
-        logger.info(f"Found {len(model_info)} registered models")
+        model_info = list(get_registry_mirror().snapshot().models.values())
+        logger.debug(f"Found {len(model_info)} registered models")
         return model_info
-        
+
     except MlflowException as e:
         logger.error(f"MLflow error while fetching registered models: {e}")
         return []
@@ -104,10 +160,8 @@ def get_models_by_sensor_type() -> Dict[str, List[str]]:
     """
     Get models organized by sensor type based on MLflow tags and model name analysis.
     
-    This function looks for models with 'sensor_type' tags and also infers types
-    from model names to ensure proper categorization. Models without clear sensor
-    affinity are categorized more carefully to prevent mismatches.
-    
+    The mapping is computed once per registry snapshot (see ``_build_sensor_type_mapping``).
+
     Returns:
         Dictionary mapping sensor types to lists of model names.
         Example: {'bearing': ['nasa_bearing_model'], 'temperature': ['temp_anomaly_detector']}
@@ -116,50 +170,60 @@ def get_models_by_sensor_type() -> Dict[str, List[str]]:
         logger.debug("MLflow model loading disabled; returning empty sensor type mapping.")
         return {}
     try:
-        models = get_all_registered_models()
-        sensor_type_mapping = {}
-        
-        for model in models:
-            model_name = model['name'].lower()
-            
-            # Check both model-level tags and version-level tags for sensor_type
-            sensor_type = None
-            
-            # First check version-level tags (most specific)
-            if 'sensor_type' in model.get('version_tags', {}):
-                sensor_type = model['version_tags']['sensor_type']
-            # Fallback to model-level tags
-            elif 'sensor_type' in model.get('tags', {}):
-                sensor_type = model['tags']['sensor_type']
-            # Infer from model name if no explicit tags
-            else:
-                sensor_type = _infer_sensor_type_from_name(model_name.lower())
-                logger.info(f"DEBUG: Model {model_name} -> inferred sensor_type: {sensor_type}")
-            
-            if sensor_type:
-                sensor_type = sensor_type.lower().strip()
-                if sensor_type not in sensor_type_mapping:
-                    sensor_type_mapping[sensor_type] = []
-                sensor_type_mapping[sensor_type].append(model['name'])
-                logger.debug(f"Model {model['name']} categorized for sensor type: {sensor_type}")
-            else:
-                # Only add to 'general' if it's truly a general-purpose anomaly detector
-                if _is_general_purpose_model(model_name.lower()):
-                    if 'general' not in sensor_type_mapping:
-                        sensor_type_mapping['general'] = []
-                    sensor_type_mapping['general'].append(model['name'])
-                    logger.debug(f"Model {model['name']} added to general category")
-                else:
-                    logger.warning(f"DEBUG: Model {model['name']} could not be categorized and is NOT general-purpose - skipping to prevent mismatches")
-        
-        logger.info(f"Organized models by sensor type: {sensor_type_mapping}")
-        return sensor_type_mapping
-        
+        mapping = get_registry_mirror().snapshot().sensor_type_mapping
+        return {sensor_type: list(models) for sensor_type, models in mapping.items()}
     except Exception as e:
         logger.error(f"Error organizing models by sensor type: {e}")
         return {}
 
 
+def _build_sensor_type_mapping(models: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Organize models by sensor type based on MLflow tags and model name analysis.
+    
+    This function looks for models with 'sensor_type' tags and also infers types
+    from model names to ensure proper categorization. Models without clear sensor
+    affinity are categorized more carefully to prevent mismatches.
+    """
+    sensor_type_mapping: Dict[str, List[str]] = {}
+
+    for model in models:
+        model_name = model['name'].lower()
+
+        # Check both model-level tags and version-level tags for sensor_type
+        sensor_type = None
+
+        # First check version-level tags (most specific)
+        if 'sensor_type' in model.get('version_tags', {}):
+            sensor_type = model['version_tags']['sensor_type']
+        # Fallback to model-level tags
+        elif 'sensor_type' in model.get('tags', {}):
+            sensor_type = model['tags']['sensor_type']
+        # Infer from model name if no explicit tags
+        else:
+            sensor_type = _infer_sensor_type_from_name(model_name.lower())
+            logger.debug(f"Model {model_name} -> inferred sensor_type: {sensor_type}")
+
+        if sensor_type:
+            sensor_type = sensor_type.lower().strip()
+            if sensor_type not in sensor_type_mapping:
+                sensor_type_mapping[sensor_type] = []
+            sensor_type_mapping[sensor_type].append(model['name'])
+            logger.debug(f"Model {model['name']} categorized for sensor type: {sensor_type}")
+        else:
+            # Only add to 'general' if it's truly a general-purpose anomaly detector
+            if _is_general_purpose_model(model_name.lower()):
+                if 'general' not in sensor_type_mapping:
+                    sensor_type_mapping['general'] = []
+                sensor_type_mapping['general'].append(model['name'])
+                logger.debug(f"Model {model['name']} added to general category")
+            else:
+                logger.warning(f"Model {model['name']} could not be categorized and is NOT general-purpose - skipping to prevent mismatches")
+
+    logger.info(f"Organized models by sensor type: {sensor_type_mapping}")
+    return sensor_type_mapping
+
+
 def _infer_sensor_type_from_name(model_name: str) -> Optional[str]:
     """
     Infer sensor type from model name using keyword matching.
@@ -380,11 +444,12 @@ def get_model_details(model_name: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary containing detailed model information or None if not found
     """
+    if getattr(settings, 'DISABLE_MLFLOW_MODEL_LOADING', False):
+        return None
     try:
-        models = get_all_registered_models()
-        for model in models:
-            if model['name'] == model_name:
-                return model
+        model = get_registry_mirror().snapshot().models.get(model_name)
+        if model is not None:
+            return model
         
         logger.warning(f"Model '{model_name}' not found in registry")
         return None
@@ -449,6 +514,7 @@ def add_sensor_type_tag(model_name: str, version: str, sensor_type: str) -> bool
         client = _get_mlflow_client()
         client.set_model_version_tag(model_name, version, "sensor_type", sensor_type)
         logger.info(f"Successfully tagged model {model_name} v{version} with sensor_type: {sensor_type}")
+        get_registry_mirror().request_refresh()
         return True
         
     except Exception as e:
@@ -0,0 +1,407 @@
+"""
+Memory-mapped ("packed") tree ensembles shared across worker processes.
+
+Unpickling a RandomForest/IsolationForest gives every uvicorn worker a private
+copy of all tree arrays; scikit-learn's ``Tree.__setstate__`` copies node
+arrays into its own buffers, so ``joblib.load(mmap_mode="r")`` alone does not
+help. Instead, the trees are flattened into one set of ``.npy`` arrays
+(children, split feature/threshold, missing-value direction, leaf values) and
+scored directly from read-only memory maps. Every worker maps the same files,
+so the operating system keeps a single physical copy in the page cache.
+
+Scoring reproduces scikit-learn exactly: inputs are cast to ``float32`` like
+``Tree.apply``, NaNs follow ``missing_go_to_left`` and per-tree contributions
+are accumulated in estimator order. ``pack_estimator`` verifies that on a
+probe sample before a packed model is ever used.
+
+The NumPy traversal wins on the small batches of the request path but loses
+to scikit-learn's compiled traversal beyond a few hundred rows. Batches larger
+than ``native_batch_rows`` are therefore routed to the original estimator,
+loaded on first use only in the workers that actually score large batches.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PACKED_FORMAT_VERSION = 1
+META_FILE = "meta.json"
+ARRAYS = ("left", "right", "feature", "threshold", "missing_left", "value", "roots", "leaf_term")
+
+CLASSIFIER = "classifier"
+REGRESSOR = "regressor"
+ISOLATION_FOREST = "isolation_forest"
+
+_PROBE_ROWS = 256
+
+
+def _estimator_kind(estimator: Any) -> Optional[str]:
+    from sklearn.ensemble import (
+        ExtraTreesClassifier,
+        ExtraTreesRegressor,
+        IsolationForest,
+        RandomForestClassifier,
+        RandomForestRegressor,
+    )
+    from sklearn.tree import BaseDecisionTree, DecisionTreeClassifier
+
+    if getattr(estimator, "n_outputs_", 1) != 1:
+        return None
+    if isinstance(estimator, IsolationForest):
+        return ISOLATION_FOREST
+    if isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+        return CLASSIFIER
+    if isinstance(estimator, (RandomForestRegressor, ExtraTreesRegressor)) or isinstance(estimator, BaseDecisionTree):
+        return REGRESSOR
+    return None
+
+
+def can_pack(estimator: Any) -> bool:
+    """True for fitted single-output scikit-learn trees and forests."""
+    return _estimator_kind(estimator) is not None and (
+        hasattr(estimator, "estimators_") or hasattr(estimator, "tree_")
+    )
+
+
+def _flatten(estimator: Any, kind: str) -> Dict[str, np.ndarray]:
+    trees = getattr(estimator, "estimators_", None) or [estimator]
+    if kind == ISOLATION_FOREST:
+        tree_features = estimator.estimators_features_
+        leaf_terms = [
+            # Same expression as sklearn's _parallel_compute_tree_depths, per node.
+            decision_path_lengths + average_path_lengths - 1.0
+            for decision_path_lengths, average_path_lengths in zip(
+                estimator._decision_path_lengths, estimator._average_path_length_per_tree
+            )
+        ]
+    else:
+        tree_features = [None] * len(trees)
+        leaf_terms = None
+
+    left, right, feature, threshold, missing_left, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    for tree_estimator, features in zip(trees, tree_features):
+        tree = tree_estimator.tree_
+        n_nodes = tree.node_count
+        is_leaf = tree.children_left == -1
+        own_index = np.arange(n_nodes) + offset
+        roots.append(offset)
+        # Leaves point to themselves so traversal can run a fixed number of steps.
+        left.append(np.where(is_leaf, own_index, tree.children_left + offset))
+        right.append(np.where(is_leaf, own_index, tree.children_right + offset))
+        node_feature = np.where(is_leaf, 0, tree.feature)
+        if features is not None:
+            node_feature = np.asarray(features)[node_feature]  # subsampled -> original columns
+        feature.append(node_feature)
+        threshold.append(tree.threshold)
+        missing = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(
+            np.zeros(n_nodes, dtype=bool) if missing is None else np.asarray(missing, dtype=bool)
+        )
+        value.append(tree.value[:, 0, :])
+        offset += n_nodes
+
+    arrays = {
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "missing_left": np.concatenate(missing_left),
+        "value": np.ascontiguousarray(np.concatenate(value).astype(np.float64)),
+        "roots": np.asarray(roots, dtype=np.int64),
+        "leaf_term": (
+            np.concatenate(leaf_terms).astype(np.float64) if leaf_terms is not None else np.zeros(0)
+        ),
+    }
+    return arrays
+
+
+def _meta(estimator: Any, kind: str) -> Dict[str, Any]:
+    meta: Dict[str, Any] = {
+        "format_version": PACKED_FORMAT_VERSION,
+        "kind": kind,
+        "estimator_class": type(estimator).__name__,
+        "n_features_in_": int(estimator.n_features_in_),
+        "n_trees": len(getattr(estimator, "estimators_", None) or [estimator]),
+        "max_depth": int(max(tree.tree_.max_depth for tree in (getattr(estimator, "estimators_", None) or [estimator]))),
+        "is_ensemble": hasattr(estimator, "estimators_"),
+        "feature_names_in_": (
+            [str(name) for name in estimator.feature_names_in_]
+            if getattr(estimator, "feature_names_in_", None) is not None
+            else None
+        ),
+    }
+    if kind == CLASSIFIER:
+        meta["classes_"] = np.asarray(estimator.classes_).tolist()
+        meta["n_classes"] = int(len(estimator.classes_))
+    if kind == ISOLATION_FOREST:
+        from sklearn.ensemble._iforest import _average_path_length
+
+        meta["denominator"] = float(len(estimator.estimators_) * _average_path_length([estimator._max_samples])[0])
+        meta["offset_"] = float(estimator.offset_)
+    return meta
+
+
+def _probe_matrix(arrays: Dict[str, np.ndarray], n_features: int, seed: int = 0) -> np.ndarray:
+    """Rows that exercise both sides of the learned thresholds for every feature."""
+    rng = np.random.default_rng(seed)
+    probe = rng.normal(size=(_PROBE_ROWS, n_features))
+    split = arrays["left"] != np.arange(arrays["left"].size)
+    for column in range(n_features):
+        thresholds = arrays["threshold"][split & (arrays["feature"] == column)]
+        if thresholds.size:
+            low, high = float(thresholds.min()), float(thresholds.max())
+            margin = max(high - low, 1.0) * 0.1
+            probe[:, column] = rng.uniform(low - margin, high + margin, size=_PROBE_ROWS)
+    probe[0, :] = np.nan  # exercise missing-value routing
+    return probe
+
+
+def _reference_outputs(estimator: Any, kind: str, matrix: Any) -> Dict[str, np.ndarray]:
+    if kind == CLASSIFIER:
+        return {"predict_proba": estimator.predict_proba(matrix), "predict": estimator.predict(matrix)}
+    if kind == REGRESSOR:
+        return {"predict": estimator.predict(matrix)}
+    return {"score_samples": estimator.score_samples(matrix), "predict": estimator.predict(matrix)}
+
+
+def pack_estimator(estimator: Any, directory: Union[str, Path]) -> bool:
+    """Write ``estimator`` as packed arrays into ``directory`` after verifying equivalence.
+
+    Returns ``False`` (writing nothing usable) for unsupported estimators, for
+    estimators without native NaN support, or when the packed scores differ.
+    """
+    if not can_pack(estimator):
+        return False
+    kind = _estimator_kind(estimator)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    arrays = _flatten(estimator, kind)
+    meta = _meta(estimator, kind)
+    for name in ARRAYS:
+        np.save(directory / f"{name}.npy", arrays[name], allow_pickle=False)
+    with open(directory / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    probe = _probe_matrix(arrays, meta["n_features_in_"])
+    if meta["feature_names_in_"] is not None:
+        import pandas as pd
+
+        probe_input = pd.DataFrame(probe, columns=meta["feature_names_in_"])
+    else:
+        probe_input = probe
+    try:
+        expected = _reference_outputs(estimator, kind, probe_input)
+    except ValueError:
+        # Estimator cannot score NaN inputs; verify on finite rows only.
+        probe_input = probe_input[1:]
+        expected = _reference_outputs(estimator, kind, probe_input)
+
+    packed = PackedForest(directory)
+    for method, reference in expected.items():
+        if not np.array_equal(getattr(packed, method)(probe_input), reference):
+            logger.warning("Packed %s disagrees with %s.%s; not using it", meta["estimator_class"], method, method)
+            return False
+    return True
+
+
+class PackedForest:
+    """Read-only, memory-mapped tree ensemble with the scikit-learn scoring API."""
+
+    def __init__(self, directory: Union[str, Path], mmap: bool = True):
+        self.directory = Path(directory)
+        # Set by ``PackedForestModel``: source of the original estimator and the
+        # batch size above which it scores instead of the packed traversal (0 = never).
+        self.native_model_loader: Optional[Callable[[], Any]] = None
+        self.native_batch_rows = 0
+        with open(self.directory / META_FILE, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != PACKED_FORMAT_VERSION:
+            raise ValueError(f"Unsupported packed model format: {self.meta.get('format_version')}")
+        mmap_mode = "r" if mmap else None
+        for name in ARRAYS:
+            setattr(self, f"_{name}", np.load(self.directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False))
+        self.kind = self.meta["kind"]
+        self.n_features_in_ = self.meta["n_features_in_"]
+        names = self.meta.get("feature_names_in_")
+        self.feature_names_in_ = np.asarray(names, dtype=object) if names is not None else None
+        if self.kind == CLASSIFIER:
+            self.classes_ = np.asarray(self.meta["classes_"])
+        if self.kind == ISOLATION_FOREST:
+            self.offset_ = self.meta["offset_"]
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, f"_{name}").nbytes for name in ARRAYS))
+
+    def __reduce__(self):
+        # Pickling (e.g. model-cache size measurement) should not copy mapped arrays.
+        return (PackedForest, (str(self.directory),))
+
+    def _as_matrix(self, X: Any) -> np.ndarray:
+        if self.feature_names_in_ is not None and hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)]
+        matrix = np.asarray(X, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {matrix.shape[1]} features, but {self.meta['estimator_class']} "
+                f"is expecting {self.n_features_in_} features as input."
+            )
+        return matrix
+
+    def _native_for(self, X: Any) -> Optional[Any]:
+        """The original estimator when ``X`` is a batch large enough to route to it."""
+        if self.native_model_loader is None or self.native_batch_rows <= 0:
+            return None
+        shape = np.shape(X)
+        if len(shape) < 2 or shape[0] <= self.native_batch_rows:
+            return None
+        return self.native_model_loader()
+
+    def _native_input(self, estimator: Any, X: Any) -> Any:
+        """Present ``X`` the way the original estimator was fitted (named or plain columns)."""
+        names = getattr(estimator, "feature_names_in_", None)
+        if names is None:
+            return np.asarray(X) if hasattr(X, "columns") else X
+        if hasattr(X, "columns"):
+            return X[list(names)]
+        import pandas as pd
+
+        return pd.DataFrame(np.asarray(X), columns=list(names))
+
+    def apply(self, X: Any) -> np.ndarray:
+        """Leaf node (global index) reached by every sample in every tree: ``(n_trees, n_samples)``."""
+        matrix = self._as_matrix(X)
+        n_samples = matrix.shape[0]
+        flat = np.ascontiguousarray(matrix).reshape(-1)
+        row_offsets = (np.arange(n_samples) * matrix.shape[1])[None, :]
+        has_missing = bool(np.isnan(flat).any())
+        nodes = np.repeat(np.asarray(self._roots)[:, None], n_samples, axis=1)
+        for _ in range(self.meta["max_depth"]):
+            values = flat[row_offsets + self._feature[nodes]]
+            go_left = values <= self._threshold[nodes]
+            if has_missing:
+                go_left = np.where(np.isnan(values), self._missing_left[nodes], go_left)
+            nodes = np.where(go_left, self._left[nodes], self._right[nodes])
+        return nodes
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        if self.kind != CLASSIFIER:
+            raise AttributeError("predict_proba is only available for classifiers")
+        native = self._native_for(X)
+        if native is not None:
+            return native.predict_proba(self._native_input(native, X))
+        leaves = self.apply(X)
+        n_classes = self.meta["n_classes"]
+        proba = np.zeros((leaves.shape[1], n_classes), dtype=np.float64)
+        for tree_leaves in leaves:
+            proba += self._value[tree_leaves, :n_classes]
+        if self.meta["is_ensemble"]:
+            proba /= self.meta["n_trees"]
+        return proba
+
+    def score_samples(self, X: Any) -> np.ndarray:
+        if self.kind != ISOLATION_FOREST:
+            raise AttributeError("score_samples is only available for isolation forests")
+        native = self._native_for(X)
+        if native is not None:
+            return native.score_samples(self._native_input(native, X))
+        leaves = self.apply(X)
+        depths = np.zeros(leaves.shape[1], order="f")
+        for tree_leaves in leaves:
+            depths += self._leaf_term[tree_leaves]
+        denominator = self.meta["denominator"]
+        scores = 2 ** (-np.divide(depths, denominator, out=np.ones_like(depths), where=denominator != 0))
+        return -scores
+
+    def decision_function(self, X: Any) -> np.ndarray:
+        if self.kind != ISOLATION_FOREST:
+            raise AttributeError("decision_function is only available for isolation forests")
+        native = self._native_for(X)
+        if native is not None:
+            return native.decision_function(self._native_input(native, X))
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X: Any) -> np.ndarray:
+        native = self._native_for(X)
+        if native is not None:
+            return native.predict(self._native_input(native, X))
+        if self.kind == CLASSIFIER:
+            return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+        if self.kind == ISOLATION_FOREST:
+            decision = self.decision_function(X)
+            is_inlier = np.ones_like(decision, dtype=int)
+            is_inlier[decision < 0] = -1
+            return is_inlier
+        leaves = self.apply(X)
+        prediction = np.zeros(leaves.shape[1], dtype=np.float64)
+        for tree_leaves in leaves:
+            prediction += self._value[tree_leaves, 0]
+        if self.meta["is_ensemble"]:
+            prediction /= self.meta["n_trees"]
+        return prediction
+
+
+class PackedForestModel:
+    """pyfunc-compatible wrapper serving a ``PackedForest``.
+
+    ``_model_impl`` mirrors MLflow's pyfunc layout so ``unwrap_native_model``
+    and the anomaly scorer reach the packed estimator unchanged. ``predict``
+    enforces the input schema of the model signature exactly like
+    ``PyFuncModel.predict``. SHAP and large batches need the original
+    scikit-learn estimator, which is loaded from the artifact on first use.
+    """
+
+    def __init__(self, forest: PackedForest, source_path: Optional[str] = None, native_batch_rows: int = 0):
+        self._model_impl = forest
+        self.source_path = source_path
+        self._native_model: Optional[Any] = None
+        self._input_schema = self._read_input_schema(source_path)
+        forest.native_model_loader = self._load_native_model
+        forest.native_batch_rows = native_batch_rows if source_path is not None else 0
+
+    @staticmethod
+    def _read_input_schema(source_path: Optional[str]) -> Optional[Any]:
+        if source_path is None or not (Path(source_path) / "MLmodel").exists():
+            return None
+        from mlflow.models import Model
+
+        try:
+            return Model.load(source_path).get_input_schema()
+        except Exception as schema_error:  # noqa: BLE001
+            logger.warning("Could not read the signature of %s: %s", source_path, schema_error)
+            return None
+
+    def predict(self, data: Any) -> np.ndarray:
+        if self._input_schema is not None:
+            from mlflow.pyfunc import _validate_prediction_input
+
+            data, _ = _validate_prediction_input(data, None, self._input_schema, None)
+        return self._model_impl.predict(data)
+
+    def _load_native_model(self) -> Any:
+        if self._native_model is None:
+            if self.source_path is None:
+                raise ValueError("Original estimator unavailable for packed model")
+            import mlflow.sklearn
+
+            self._native_model = mlflow.sklearn.load_model(self.source_path)
+        return self._native_model
+
+    def __repr__(self) -> str:
+        meta = self._model_impl.meta
+        return f"PackedForestModel({meta['estimator_class']}, trees={meta['n_trees']}, path={self._model_impl.directory})"
+
+
+def explainable_estimator(native_model: Any) -> Any:
+    """Return the estimator SHAP should explain (the original one for packed forests)."""
+    loader = getattr(native_model, "native_model_loader", None)
+    return loader() if loader is not None else native_model
+
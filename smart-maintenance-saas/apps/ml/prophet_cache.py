@@ -0,0 +1,106 @@
+"""
+Per-sensor cache of Prophet fits for ``PredictionAgent``.
+
+Every validated anomaly used to trigger a from-scratch Prophet fit on the
+sensor's full history, even when the same sensor had been fitted minutes
+earlier on nearly identical data. The agent now keeps, per sensor, the
+forecast of its last fit, the newest history timestamp it saw and the fitted
+Stan parameters:
+
+* while fewer than ``refit_after_points`` new readings have arrived and the
+  fit is younger than ``refit_interval_seconds``, the cached forecast is
+  reused and no fit runs at all;
+* otherwise the sensor is refitted with the previous parameters as the
+  optimizer's starting point (``Prophet.fit(init=...)``), which converges in
+  fewer iterations than a cold start from Prophet's default initialization.
+
+Only the forecast frame and a handful of parameter arrays are stored; fitted
+Prophet objects stay in the worker that produced them.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProphetFit:
+    """Result of one fit for a sensor."""
+
+    forecast: pd.DataFrame
+    last_ds: Any
+    init: Optional[Dict[str, Any]]
+    fitted_at: float
+
+
+class ProphetFitCache:
+    """Bounded LRU of per-sensor Prophet fits with a refit policy."""
+
+    def __init__(
+        self,
+        max_sensors: int = 1024,
+        refit_after_points: int = 24,
+        refit_interval_seconds: float = 3600.0,
+        warm_start: bool = True,
+    ):
+        self.max_sensors = max(1, int(max_sensors))
+        self.refit_after_points = max(1, int(refit_after_points))
+        self.refit_interval_seconds = float(refit_interval_seconds)
+        self.warm_start = warm_start
+        self._fits: "OrderedDict[str, ProphetFit]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "warm_refits": 0, "cold_fits": 0, "evictions": 0}
+
+    def lookup(self, sensor_id: str) -> Optional[ProphetFit]:
+        """The cached fit of ``sensor_id``, whether or not it is still current (``None`` if never fitted)."""
+        with self._lock:
+            fit = self._fits.get(sensor_id)
+            if fit is not None:
+                self._fits.move_to_end(sensor_id)
+            return fit
+
+    def is_current(self, fit: ProphetFit, history: pd.DataFrame) -> bool:
+        """True when ``fit`` may serve ``history`` without refitting."""
+        if self.refit_interval_seconds > 0 and time.monotonic() - fit.fitted_at >= self.refit_interval_seconds:
+            return False
+        new_points = int((history["ds"] > fit.last_ds).sum())
+        return new_points < self.refit_after_points
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.stats["hits"] += 1
+
+    def warm_start_params(self, fit: Optional[ProphetFit]) -> Optional[Dict[str, Any]]:
+        """Parameters to start a refit from (``None`` for a cold fit)."""
+        return fit.init if fit is not None and self.warm_start else None
+
+    def store(
+        self, sensor_id: str, history: pd.DataFrame, forecast: pd.DataFrame, init: Optional[Dict[str, Any]], warm: bool
+    ) -> None:
+        with self._lock:
+            self._fits[sensor_id] = ProphetFit(
+                forecast=forecast, last_ds=history["ds"].max(), init=init, fitted_at=time.monotonic()
+            )
+            self._fits.move_to_end(sensor_id)
+            self.stats["warm_refits" if warm else "cold_fits"] += 1
+            while len(self._fits) > self.max_sensors:
+                self._fits.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, sensor_id: Optional[str] = None) -> None:
+        with self._lock:
+            if sensor_id is None:
+                self._fits.clear()
+            else:
+                self._fits.pop(sensor_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "sensors": len(self._fits)}
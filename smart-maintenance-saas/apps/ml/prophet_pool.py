@@ -0,0 +1,240 @@
+"""
+Dedicated worker processes for Prophet fits.
+
+``PredictionAgent`` fits a fresh Prophet model per validated anomaly. The
+cmdstan fit takes seconds, and the pandas/Prophet pre- and post-processing
+around it hold the GIL, so running it inside the agent runtime stalled every
+other agent on the event bus. Fits now run in a small pool of "spawn" worker
+processes:
+
+- each worker imports Prophet/cmdstanpy and runs one tiny fit at start-up
+  (``_prewarm_worker``), so jobs do not pay for imports or the first cmdstan
+  run;
+- jobs pass the history frame in and get a trimmed forecast frame back
+  (``ds``/``yhat``/``yhat_lower``/``yhat_upper``). The fitted model never
+  leaves the worker;
+- a semaphore bounds the number of concurrent fits. A cancelled job is dropped
+  if it has not started; a running one finishes and its result is discarded;
+- a job past its timeout is cancelled if it has not started. If it is already
+  running, the pool is recycled (its workers are terminated) so a stuck fit
+  cannot hold a worker forever. Jobs interrupted by a recycle are retried once.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Model configuration shared by the in-process and pooled fits
+PROPHET_PARAMS: Dict[str, Any] = {
+    "daily_seasonality": True,
+    "weekly_seasonality": True,
+    "yearly_seasonality": True,
+    "changepoint_prior_scale": 0.05,  # Less sensitive to trend changes
+    "seasonality_prior_scale": 10.0,  # More flexible seasonalities
+    "interval_width": 0.8,  # 80% confidence intervals
+}
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+
+def summarize_forecast(forecast: pd.DataFrame) -> pd.DataFrame:
+    """Keep only the forecast columns the prediction logic needs."""
+    return forecast[[column for column in FORECAST_COLUMNS if column in forecast.columns]].copy()
+
+
+def _prewarm_worker() -> None:
+    """Worker initializer: import Prophet and run one tiny fit.
+
+    Instantiating ``Prophet`` alone does not touch cmdstan; the first ``fit``
+    loads the compiled Stan model and starts the cmdstan executable, which is
+    the cost real jobs should not pay.
+    """
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    try:
+        from prophet import Prophet
+
+        warmup_history = pd.DataFrame(
+            {"ds": pd.date_range("2000-01-01", periods=10, freq="D"), "y": [float(i % 3) for i in range(10)]}
+        )
+        Prophet(daily_seasonality=False, weekly_seasonality=False, yearly_seasonality=False).fit(warmup_history)
+    except Exception as warm_error:  # noqa: BLE001 - a failed warm-up must not break the pool
+        logger.warning("Prophet worker pre-warm fit failed: %s", warm_error)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def stan_init(model: Any) -> Optional[Dict[str, Any]]:
+    """Fitted parameters of ``model`` in the form ``Prophet.fit(init=...)`` accepts.
+
+    Returns ``None`` when the model has no usable point estimates.
+    """
+    try:
+        params = model.params
+        init: Dict[str, Any] = {name: float(params[name][0][0]) for name in ("k", "m", "sigma_obs")}
+        init.update({name: np.asarray(params[name][0], dtype=float) for name in ("delta", "beta")})
+        return init
+    except Exception:  # noqa: BLE001 - warm starts are an optimization only
+        return None
+
+
+def fit_and_forecast_warm(
+    history: pd.DataFrame,
+    horizon_days: int,
+    init: Optional[Dict[str, Any]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    prophet_class: Optional[Callable[..., Any]] = None,
+) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+    """``fit_and_forecast`` that starts the optimizer from ``init`` and returns the new fit's parameters.
+
+    Prophet replaces any ``init`` entry whose shape no longer matches (e.g. a
+    different number of changepoints) with its default, so a stale ``init``
+    only costs the warm start.
+    """
+    if prophet_class is None:
+        from prophet import Prophet as prophet_class
+
+    model = prophet_class(**(params or PROPHET_PARAMS))
+    if init is not None:
+        model.fit(history, init=init)
+    else:
+        model.fit(history)
+    future = model.make_future_dataframe(periods=horizon_days, freq="D")
+    return summarize_forecast(model.predict(future)), stan_init(model)
+
+
+def fit_and_forecast(
+    history: pd.DataFrame,
+    horizon_days: int,
+    params: Optional[Dict[str, Any]] = None,
+    prophet_class: Optional[Callable[..., Any]] = None,
+) -> pd.DataFrame:
+    """Fit Prophet on ``history`` (``ds``/``y``) and forecast ``horizon_days`` daily points.
+
+    Runs inside pool workers (and in a thread when no pool is configured);
+    returns the history plus horizon rows of ``FORECAST_COLUMNS``.
+    ``prophet_class`` defaults to ``prophet.Prophet``.
+    """
+    return fit_and_forecast_warm(history, horizon_days, None, params, prophet_class)[0]
+
+
+class ProphetProcessPool:
+    """Bounded, pre-warmed process pool for Prophet fits."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        initializer: Optional[Callable[[], None]] = _prewarm_worker,
+    ):
+        self.workers = max(1, workers or settings.PREDICTION_PROPHET_WORKERS or 1)
+        self.max_concurrency = max(1, max_concurrency or settings.PREDICTION_PROPHET_MAX_CONCURRENCY or self.workers)
+        self.timeout_seconds = (
+            timeout_seconds if timeout_seconds is not None else settings.PREDICTION_PROPHET_TIMEOUT_SECONDS
+        )
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "cancelled": 0, "recycles": 0}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        return self._executor
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def start(self) -> None:
+        """Spawn and pre-warm every worker so the first fit does not pay the import cost."""
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(
+                *(loop.run_in_executor(self.executor, _worker_ready) for _ in range(self.workers))
+            )
+            logger.info("Prophet pool ready with %d pre-warmed worker(s)", self.workers)
+        except Exception as warm_error:  # noqa: BLE001 - jobs will retry on a fresh pool
+            logger.warning("Prophet pool pre-warm failed: %s", warm_error)
+
+    async def submit(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` in a worker once a concurrency slot is free."""
+        self.stats["submitted"] += 1
+        async with self.semaphore:
+            try:
+                try:
+                    result = await self._run(func, *args)
+                except BrokenProcessPool:
+                    # A recycle (another job's timeout) or a crashed worker interrupted this job.
+                    result = await self._run(func, *args)
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+        self.stats["completed"] += 1
+        return result
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        executor = self.executor
+        timeout = self.timeout_seconds if self.timeout_seconds and self.timeout_seconds > 0 else None
+        try:
+            future = executor.submit(func, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                self._executor = None  # a broken pool cannot be reused
+            raise
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            if not future.cancel():
+                logger.warning("Prophet job exceeded %.1fs while running; recycling workers", timeout)
+                self._recycle(executor)
+            raise
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            future.cancel()
+            raise
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Terminate the workers of ``executor``; the next job starts a fresh pool."""
+        if self._executor is executor:
+            self._executor = None
+        self.stats["recycles"] += 1
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,200 @@
+"""
+In-process mirror of MLflow Model Registry metadata.
+
+Registry lookups (latest versions, tags, sensor-type routing) sit on the
+request and agent hot paths but change rarely. The mirror keeps an immutable
+snapshot of registered models, versions, tags, aliases and the derived
+sensor-type mapping, refreshed with two bulk registry calls by a background
+thread that only the API lifespan starts (never on import, and not when
+``DISABLE_MLFLOW_MODEL_LOADING`` is set). Readers get O(1) dictionary lookups
+and never wait on the registry once the snapshot is warm; a failed refresh
+keeps serving the previous snapshot.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable view of the registry at refresh time."""
+
+    models: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    versions: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    aliases: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    sensor_type_mapping: Dict[str, List[str]] = field(default_factory=dict)
+    fingerprint: Tuple = ()
+    refreshed_at: float = 0.0
+
+    def latest_version(self, model_name: str, stages: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Highest version number for a model, optionally restricted to stages."""
+        allowed = {stage.lower() for stage in stages} if stages else None
+        for version in self.versions.get(model_name, []):  # sorted newest first
+            stage = str(version.get("current_stage") or "None").lower()
+            if allowed is None or stage in allowed:
+                return version["version"]
+        return None
+
+
+SnapshotBuilder = Callable[[], RegistrySnapshot]
+
+
+class RegistryMirror:
+    """Background-refreshed registry snapshot with non-blocking reads."""
+
+    def __init__(
+        self,
+        builder: SnapshotBuilder,
+        refresh_interval_seconds: Optional[float] = None,
+    ):
+        self._builder = builder
+        self.refresh_interval_seconds = (
+            refresh_interval_seconds
+            if refresh_interval_seconds is not None
+            else settings.ML_REGISTRY_MIRROR_REFRESH_SECONDS
+        )
+        self._snapshot: Optional[RegistrySnapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "changes": 0,
+            "last_error": None,
+        }
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    def refresh(self) -> Optional[RegistrySnapshot]:
+        """Rebuild the snapshot now (single-flight); keeps the old one on failure."""
+        with self._refresh_lock:
+            started = time.monotonic()
+            try:
+                snapshot = self._builder()
+            except Exception as refresh_error:  # noqa: BLE001 - keep serving the previous snapshot
+                self.stats["refresh_failures"] += 1
+                self.stats["last_error"] = str(refresh_error)
+                logger.warning("Registry mirror refresh failed: %s", refresh_error)
+                return self._snapshot
+
+            previous = self._snapshot
+            if previous is None or previous.fingerprint != snapshot.fingerprint:
+                self.stats["changes"] += 1
+                logger.info(
+                    "Registry mirror updated: %d models, %d versions (%.2fs)",
+                    len(snapshot.models),
+                    sum(len(versions) for versions in snapshot.versions.values()),
+                    time.monotonic() - started,
+                )
+            self._snapshot = snapshot
+            self.stats["refreshes"] += 1
+            self.stats["last_error"] = None
+            return snapshot
+
+    def request_refresh(self) -> None:
+        """Ask for an early refresh (e.g. after tagging a model).
+
+        Wakes the background refresher when it runs; otherwise the snapshot is
+        dropped so the next ``snapshot()`` reloads it.
+        """
+        if self._is_refreshing_in_background():
+            self._wakeup.set()
+        else:
+            self._snapshot = None
+
+    def _is_refreshing_in_background(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.refresh()
+            self._wakeup.wait(self.refresh_interval_seconds)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start periodic background refreshes (idempotent); called from the app lifespan only."""
+        if settings.DISABLE_MLFLOW_MODEL_LOADING:
+            logger.info("MLflow model loading disabled; registry mirror refresh not started")
+            return
+        if self._is_refreshing_in_background():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="registry-mirror", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def is_stale(self) -> bool:
+        snapshot = self._snapshot
+        return snapshot is None or (time.time() - snapshot.refreshed_at) > 2 * self.refresh_interval_seconds
+
+    def peek(self) -> Optional[RegistrySnapshot]:
+        """Return the current snapshot without ever touching the registry."""
+        return self._snapshot
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Return the current snapshot, loading it synchronously on a cold start.
+
+        Without the background refresher (tests, scripts, refresher not
+        started) a stale snapshot is also reloaded here, by the caller.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or (self.is_stale() and not self._is_refreshing_in_background()):
+            snapshot = self.refresh()
+        return snapshot or RegistrySnapshot()
+
+    def latest_version(self, model_name: str, stages: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Non-blocking latest-version lookup; ``None`` when unknown or not yet mirrored."""
+        snapshot = self.peek()
+        if snapshot is None:
+            return None
+        return snapshot.latest_version(model_name, stages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self.stats,
+            "models": len(snapshot.models) if snapshot else 0,
+            "age_seconds": round(time.time() - snapshot.refreshed_at, 1) if snapshot else None,
+            "background_refresh": self._is_refreshing_in_background(),
+        }
+
+
+# Global registry mirror instance (singleton pattern)
+_registry_mirror: Optional[RegistryMirror] = None
+
+
+def get_registry_mirror() -> RegistryMirror:
+    """Get the process-wide registry mirror backed by the MLflow registry."""
+    global _registry_mirror
+    if _registry_mirror is None:
+        from apps.ml.model_utils import fetch_registry_snapshot
+
+        _registry_mirror = RegistryMirror(fetch_registry_snapshot)
+    return _registry_mirror
+
+
+def shutdown_registry_mirror() -> None:
+    """Stop the background refresher if the mirror was created."""
+    global _registry_mirror
+    if _registry_mirror is not None:
+        _registry_mirror.stop()
+        _registry_mirror = None
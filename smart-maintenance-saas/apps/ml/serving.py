@@ -0,0 +1,217 @@
+"""
+Non-blocking model serving layer for the ML API.
+
+MLflow registry lookups, artifact downloads and model inference are all
+synchronous. This module moves that work off the event loop into bounded
+thread pools so a slow model load cannot stall unrelated requests:
+
+- Model loads run in a dedicated (small) pool and are coalesced per
+  ``model:version`` key, so concurrent cache misses trigger a single load.
+- Inference/explainability work runs in a separate pool so loads can never
+  starve scoring of already-loaded models.
+- Every call accepts a deadline; callers get ``asyncio.TimeoutError`` when the
+  remaining budget is exhausted instead of waiting indefinitely.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from apps.ml import model_loader
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LoadResult = Tuple[Optional[Any], Optional[List[str]]]
+
+
+class Deadline:
+    """Monotonic per-request time budget shared across serving stages."""
+
+    def __init__(self, timeout_seconds: Optional[float]):
+        self.timeout_seconds = timeout_seconds
+        self.expires_at = (
+            time.monotonic() + timeout_seconds if timeout_seconds and timeout_seconds > 0 else None
+        )
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the budget, or ``None`` when unbounded."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0.0
+
+
+class ModelServer:
+    """Executor-backed model loading and inference with single-flight loads."""
+
+    def __init__(
+        self,
+        load_workers: Optional[int] = None,
+        inference_workers: Optional[int] = None,
+        default_timeout_seconds: Optional[float] = None,
+    ):
+        self.load_workers = load_workers or settings.ML_SERVING_LOAD_WORKERS
+        self.inference_workers = inference_workers or settings.ML_SERVING_INFERENCE_WORKERS
+        self.default_timeout_seconds = (
+            default_timeout_seconds
+            if default_timeout_seconds is not None
+            else settings.ML_REQUEST_TIMEOUT_SECONDS
+        )
+        self._load_executor: Optional[ThreadPoolExecutor] = None
+        self._inference_executor: Optional[ThreadPoolExecutor] = None
+        self._inflight_loads: Dict[str, "asyncio.Future[LoadResult]"] = {}
+        self.stats = {
+            "loads_started": 0,
+            "loads_coalesced": 0,
+            "cache_hits": 0,
+            "timeouts": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Executors
+    # ------------------------------------------------------------------
+    @property
+    def load_executor(self) -> ThreadPoolExecutor:
+        if self._load_executor is None:
+            self._load_executor = ThreadPoolExecutor(
+                max_workers=self.load_workers, thread_name_prefix="ml-load"
+            )
+        return self._load_executor
+
+    @property
+    def inference_executor(self) -> ThreadPoolExecutor:
+        if self._inference_executor is None:
+            self._inference_executor = ThreadPoolExecutor(
+                max_workers=self.inference_workers, thread_name_prefix="ml-infer"
+            )
+        return self._inference_executor
+
+    def deadline(self, timeout_seconds: Optional[float] = None) -> Deadline:
+        """Create a request deadline, defaulting to ``ML_REQUEST_TIMEOUT_SECONDS``."""
+        return Deadline(
+            timeout_seconds if timeout_seconds is not None else self.default_timeout_seconds
+        )
+
+    async def _await_with_deadline(
+        self, awaitable: "asyncio.Future[T]", deadline: Optional[Deadline]
+    ) -> T:
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None and remaining <= 0.0:
+            self.stats["timeouts"] += 1
+            raise asyncio.TimeoutError("ML request deadline exceeded")
+        try:
+            return await asyncio.wait_for(awaitable, timeout=remaining)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def load_model(
+        self,
+        model_name: str,
+        model_version: str,
+        deadline: Optional[Deadline] = None,
+    ) -> LoadResult:
+        """Load a model off the event loop, coalescing concurrent loads.
+
+        Cached models are returned without an executor hop. A timed-out caller
+        abandons the wait but the shared load keeps running so the result is
+        still cached for subsequent requests.
+        """
+        cached = model_loader.get_cached_model(model_name, model_version)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        key = model_loader.model_cache_key(model_name, model_version)
+        future = self._inflight_loads.get(key)
+        if future is None or future.done():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self.load_executor,
+                model_loader.load_model,
+                model_name,
+                model_version,
+            )
+            self._inflight_loads[key] = future
+            future.add_done_callback(lambda _f, k=key: self._inflight_loads.pop(k, None))
+            self.stats["loads_started"] += 1
+        else:
+            self.stats["loads_coalesced"] += 1
+            logger.debug("Coalescing concurrent load for %s", key)
+
+        return await self._await_with_deadline(asyncio.shield(future), deadline)
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        deadline: Optional[Deadline] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Execute a blocking callable in the inference pool under a deadline."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        future = loop.run_in_executor(self.inference_executor, call)
+        return await self._await_with_deadline(future, deadline)
+
+    async def run_io(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        deadline: Optional[Deadline] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Execute blocking registry/network I/O in the load pool under a deadline."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        future = loop.run_in_executor(self.load_executor, call)
+        return await self._await_with_deadline(future, deadline)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "inflight_loads": len(self._inflight_loads),
+            "load_workers": self.load_workers,
+            "inference_workers": self.inference_workers,
+        }
+
+    def shutdown(self) -> None:
+        """Release executor threads (called from the API lifespan)."""
+        for executor in (self._load_executor, self._inference_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._load_executor = None
+        self._inference_executor = None
+        self._inflight_loads.clear()
+
+
+# Global model server instance (singleton pattern)
+_model_server: Optional[ModelServer] = None
+
+
+def get_model_server() -> ModelServer:
+    """Get the process-wide model server, creating it on first use."""
+    global _model_server
+    if _model_server is None:
+        _model_server = ModelServer()
+    return _model_server
+
+
+def shutdown_model_server() -> None:
+    """Shut down the global model server if it was created."""
+    global _model_server
+    if _model_server is not None:
+        _model_server.shutdown()
+        _model_server = None
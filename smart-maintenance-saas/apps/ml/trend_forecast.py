@@ -0,0 +1,141 @@
+"""
+Vectorized fast-path trend forecasts for time-to-failure estimates.
+
+A Prophet fit takes seconds, but most prediction requests only need to know
+whether a sensor is drifting towards its failure threshold and roughly when.
+This module answers that with a robust Theil-Sen line (median of pairwise
+slopes) fitted over the most recent ``window`` points of many sensors at once:
+series are stacked into NaN-padded ``(sensors, points)`` arrays and every step
+is a NumPy reduction along the point axis, so one call costs well under a
+millisecond per sensor.
+
+Times are expressed in days relative to each sensor's newest point (so the
+fitted intercept is the current level). ``threshold_crossing`` turns the fits
+into time-to-threshold estimates with an 80% band (matching the Prophet
+``interval_width``) and a confidence score; callers escalate to Prophet when
+that confidence is low or the crossing is near.
+"""
+
+import warnings
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# z-score of the two-sided 80% interval used by the Prophet models
+INTERVAL_Z = 1.2816
+MIN_POINTS = 3
+
+
+@dataclass
+class TrendEstimate:
+    """Per-sensor Theil-Sen fits; every field is an array with one entry per sensor."""
+
+    slope: np.ndarray  # value change per day
+    level: np.ndarray  # fitted value at the newest point
+    residual_scale: np.ndarray  # robust (MAD) standard deviation of residuals
+    slope_stderr: np.ndarray
+    mean_offset_days: np.ndarray  # mean point time (<= 0) relative to the newest point
+    mae: np.ndarray
+    rmse: np.ndarray
+    mape: np.ndarray
+    n_points: np.ndarray
+
+
+@dataclass
+class ThresholdCrossing:
+    """Days (after the newest point) until each fitted trend reaches its threshold."""
+
+    days: np.ndarray  # inf when the trend never reaches the threshold
+    lower_days: np.ndarray
+    upper_days: np.ndarray
+    confidence: np.ndarray  # 0..1, from the width of the 80% band at the crossing
+
+
+def stack_series(series: Sequence[Tuple[np.ndarray, np.ndarray]], window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack ``(days, values)`` pairs (oldest first) into NaN-padded ``(sensors, window)`` arrays.
+
+    Only the newest ``window`` points of each series are kept; days are shifted
+    so that each sensor's newest point is at 0.
+    """
+    t = np.full((len(series), window), np.nan)
+    y = np.full((len(series), window), np.nan)
+    for row, (days, values) in enumerate(series):
+        days = np.asarray(days, dtype=float)[-window:]
+        values = np.asarray(values, dtype=float)[-window:]
+        if days.size:
+            t[row, : days.size] = days - days[-1]
+            y[row, : values.size] = values
+    return t, y
+
+
+def theil_sen(t: np.ndarray, y: np.ndarray) -> TrendEstimate:
+    """Fit a Theil-Sen line to every row of ``t``/``y`` (NaN marks missing points)."""
+    t = np.atleast_2d(np.asarray(t, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    valid = np.isfinite(t) & np.isfinite(y)
+    t = np.where(valid, t, np.nan)
+    y = np.where(valid, y, np.nan)
+    n_points = valid.sum(axis=1)
+
+    first, second = np.triu_indices(t.shape[1], k=1)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows are masked below
+        slopes = (y[:, second] - y[:, first]) / (t[:, second] - t[:, first])
+        slopes[~np.isfinite(slopes)] = np.nan
+        slope = np.nanmedian(slopes, axis=1)
+        # Level at the newest point (t = 0): median of the detrended values
+        level = np.nanmedian(y - slope[:, None] * t, axis=1)
+        residuals = y - (level[:, None] + slope[:, None] * t)
+        residual_scale = 1.4826 * np.nanmedian(np.abs(residuals), axis=1)
+        mean_offset = np.nanmean(t, axis=1)
+        spread = np.nansum((t - mean_offset[:, None]) ** 2, axis=1)
+        slope_stderr = residual_scale / np.sqrt(spread)
+        mae = np.nanmean(np.abs(residuals), axis=1)
+        rmse = np.sqrt(np.nanmean(residuals**2, axis=1))
+        mape = np.nanmean(np.abs(residuals / y), axis=1) * 100.0
+
+    usable = n_points >= MIN_POINTS
+    for values in (slope, level, residual_scale, slope_stderr, mae, rmse, mape):
+        values[~usable] = np.nan
+    return TrendEstimate(
+        slope=slope,
+        level=level,
+        residual_scale=residual_scale,
+        slope_stderr=slope_stderr,
+        mean_offset_days=mean_offset,
+        mae=mae,
+        rmse=rmse,
+        mape=mape,
+        n_points=n_points,
+    )
+
+
+def _days_to_reach(gap: np.ndarray, slope: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.where(slope > 0, gap / slope, np.inf)
+    return np.where(gap <= 0, 0.0, days)
+
+
+def threshold_crossing(
+    estimate: TrendEstimate, thresholds: np.ndarray, horizon_days: float, z: float = INTERVAL_Z
+) -> ThresholdCrossing:
+    """When each trend reaches its (upper) ``thresholds`` and how certain that is.
+
+    The band uses the slope's standard error; the confidence mirrors the
+    Prophet path: one minus the width of the 80% prediction interval at the
+    crossing (or at ``horizon_days`` when there is none) relative to the
+    threshold. Sensors without a usable fit get zero confidence.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    gap = thresholds - estimate.level
+    days = _days_to_reach(gap, estimate.slope)
+    lower_days = _days_to_reach(gap, estimate.slope + z * estimate.slope_stderr)
+    upper_days = _days_to_reach(gap, estimate.slope - z * estimate.slope_stderr)
+
+    at = np.minimum(days, horizon_days) - estimate.mean_offset_days
+    width = 2.0 * z * np.sqrt(estimate.residual_scale**2 + (estimate.slope_stderr * at) ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        confidence = np.clip(1.0 - width / np.abs(thresholds), 0.0, 1.0)
+    confidence = np.where(np.isfinite(confidence), confidence, 0.0)
+    return ThresholdCrossing(days=days, lower_days=lower_days, upper_days=upper_days, confidence=confidence)
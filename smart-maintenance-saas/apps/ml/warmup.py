@@ -0,0 +1,201 @@
+"""
+Startup warm-up of champion models.
+
+Right after a deploy the first request for each model used to pay for the
+registry lookup, artifact download, unpickling and the first (lazy) inference
+and SHAP explainer build. The API lifespan now runs a warm-up phase in the
+background that, for every configured champion model and in parallel:
+
+1. resolves the version exactly as the request path does (same cache keys),
+2. loads it through the shared ``ModelServer`` (filling the model cache),
+3. runs one dummy inference on a zero row to initialise lazy state, and
+4. builds the SHAP explainer for tree models so ``explain=true`` is warm too.
+
+``/health/ready`` reports not-ready until the phase has finished, so traffic is
+only routed to instances whose models are already in memory.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from apps.ml.explainability import SHAP_AVAILABLE, get_explainer_cache, is_tree_model, unwrap_native_model
+from apps.ml.model_loader import model_cache_key
+from apps.ml.packed_forest import PackedForest
+from apps.ml.serving import ModelServer, get_model_server
+from core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+VersionResolver = Callable[[str, str], str]
+
+# Warm-up phase states
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+SKIPPED = "skipped"
+
+
+@dataclass
+class ModelWarmupResult:
+    model_name: str
+    requested_version: str
+    resolved_version: Optional[str] = None
+    loaded: bool = False
+    inference_ok: bool = False
+    explainer_built: bool = False
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+
+def parse_warmup_targets(spec: str) -> List[Tuple[str, str]]:
+    """Parse ``"name[:version],..."`` into ``(name, version)`` pairs (version defaults to ``auto``)."""
+    targets: List[Tuple[str, str]] = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, version = item.partition(":")
+        targets.append((name.strip(), version.strip() or "auto"))
+    return targets
+
+
+def _warmup_input(model: Any, feature_names: Optional[List[str]]) -> Optional[Any]:
+    """A single all-zero row shaped like the model input, or ``None`` when unknown."""
+    native_model = unwrap_native_model(model)
+    names = feature_names or getattr(native_model, "feature_names_in_", None)
+    if names is not None and len(names):
+        return pd.DataFrame(np.zeros((1, len(names))), columns=[str(name) for name in names])
+    n_features = getattr(native_model, "n_features_in_", None)
+    if n_features:
+        return np.zeros((1, int(n_features)))
+    return None
+
+
+class ModelWarmup:
+    """Tracks and runs the startup warm-up phase."""
+
+    def __init__(self, targets: Optional[List[Tuple[str, str]]] = None):
+        self.targets = targets if targets is not None else parse_warmup_targets(settings.ML_WARMUP_MODELS)
+        self.status = PENDING
+        self.results: Dict[str, ModelWarmupResult] = {}
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status in {READY, SKIPPED}
+
+    def skip(self, reason: str) -> None:
+        """Mark the phase complete without loading anything (e.g. MLflow disabled)."""
+        self.status = SKIPPED
+        self.completed_at = time.time()
+        logger.info("Model warm-up skipped: %s", reason)
+
+    async def run(
+        self,
+        resolve_version: VersionResolver,
+        server: Optional[ModelServer] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> Dict[str, ModelWarmupResult]:
+        """Warm every target in parallel; the phase completes even if some models fail."""
+        server = server or get_model_server()
+        timeout_seconds = timeout_seconds if timeout_seconds is not None else settings.ML_WARMUP_TIMEOUT_SECONDS
+        self.status = WARMING
+        self.started_at = time.time()
+        logger.info("Warming up %d model(s): %s", len(self.targets), self.targets)
+
+        tasks = [
+            asyncio.create_task(self._warm_one(name, version, resolve_version, server))
+            for name, version in self.targets
+        ]
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout_seconds or None)
+            for task in pending:
+                task.cancel()
+            for (name, version), task in zip(self.targets, tasks):
+                if task in done and not task.cancelled() and task.exception() is None:
+                    result = task.result()
+                else:
+                    result = ModelWarmupResult(name, version, error="warm-up timed out")
+                self.results[name] = result
+
+        self.status = READY
+        self.completed_at = time.time()
+        logger.info(
+            "Model warm-up finished in %.2fs: %d/%d loaded",
+            self.completed_at - self.started_at,
+            sum(result.loaded for result in self.results.values()),
+            len(self.targets),
+        )
+        return self.results
+
+    async def _warm_one(
+        self, model_name: str, requested_version: str, resolve_version: VersionResolver, server: ModelServer
+    ) -> ModelWarmupResult:
+        result = ModelWarmupResult(model_name, requested_version)
+        started = time.perf_counter()
+        try:
+            resolved = await server.run_io(resolve_version, model_name, requested_version)
+            result.resolved_version = resolved
+            model, feature_names = await server.load_model(model_name, resolved)
+            if model is None:
+                result.error = "model could not be loaded"
+                return result
+            result.loaded = True
+
+            sample = _warmup_input(model, feature_names)
+            if sample is None:
+                result.error = "input schema unknown; inference skipped"
+                return result
+            await server.run(model.predict, sample)
+            result.inference_ok = True
+
+            native_model = unwrap_native_model(model)
+            packed = isinstance(native_model, PackedForest)
+            if settings.ML_WARMUP_EXPLAINERS and SHAP_AVAILABLE and is_tree_model(native_model) and not packed:
+                # Kernel explainers need a background drawn from real traffic, so only
+                # tree explainers (which need no background) are built up front. Packed
+                # models would have to load a private estimator copy, so they explain lazily.
+                await server.run(
+                    get_explainer_cache().get_explainer,
+                    model_cache_key(model_name, resolved),
+                    model,
+                    np.asarray(sample, dtype=float),
+                )
+                result.explainer_built = True
+        except Exception as warmup_error:  # noqa: BLE001 - a failed model must not block the others
+            result.error = str(warmup_error)
+            logger.warning("Warm-up of model %s failed: %s", model_name, warmup_error)
+        finally:
+            result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "ready": self.is_ready,
+            "models": {name: asdict(result) for name, result in self.results.items()},
+            "duration_seconds": (
+                round(self.completed_at - self.started_at, 2)
+                if self.started_at is not None and self.completed_at is not None
+                else None
+            ),
+        }
+
+
+# Global warm-up tracker (singleton pattern)
+_model_warmup: Optional[ModelWarmup] = None
+
+
+def get_model_warmup() -> ModelWarmup:
+    """Get the process-wide warm-up tracker."""
+    global _model_warmup
+    if _model_warmup is None:
+        _model_warmup = ModelWarmup()
+    return _model_warmup
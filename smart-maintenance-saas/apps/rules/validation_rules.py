@@ -1,12 +1,243 @@
+"""
+Declarative validation rules for anomaly alerts.
+
+Rules live in a JSON file (or YAML, when PyYAML is installed) instead of code.
+Each rule lists conditions on alert and reading fields that must all hold,
+the confidence adjustment it contributes and a reason template:
+
+    {"name": "poor_data_quality",
+     "when": [{"field": "reading.quality", "op": "lt", "value": 0.5}],
+     "adjustment": -0.2,
+     "reason": "Triggering sensor reading quality ({reading.quality:.2f}) is low (below 0.5)."}
+
+At load time every condition is compiled into a NumPy predicate. A batch of
+alerts is then evaluated as one column per referenced field and one boolean
+mask per rule, so the cost of a batch grows with the number of rules, not
+rules times alerts. The rule file is re-read when it changes (hot reload), and
+per-rule hit counts are kept for monitoring.
+"""
+
+import json
 import logging
-from typing import Tuple, List, Any
+import operator
+import os
+import string
+import time
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config.settings import settings
+from data.exceptions import ConfigurationError
 from data.schemas import AnomalyAlert, SensorReading # Ensure these are the correct Pydantic models
 
+DEFAULT_RULES_PATH = Path(__file__).with_name("default_validation_rules.json")
+
+_MODELS = {"alert": AnomalyAlert, "reading": SensorReading}
+_COMPARISONS: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "eq": operator.eq,
+    "ne": operator.ne,
+}
+_MEMBERSHIP = {"in": False, "not_in": True}
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    field: str
+    kind: str  # "number" or "text": how the field's column is materialized
+    predicate: Callable[[np.ndarray], np.ndarray]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    conditions: Tuple[CompiledCondition, ...]
+    adjustment: float
+    reason: str
+
+    def format_reason(self, alert: AnomalyAlert, reading: SensorReading) -> str:
+        return self.reason.format(alert=alert, reading=reading)
+
+
+def _check_field(field: Any, rule_name: str) -> str:
+    root, _, attribute = str(field).partition(".")
+    model = _MODELS.get(root)
+    if model is None or attribute not in model.model_fields:
+        raise ConfigurationError(
+            f"Rule '{rule_name}' references unknown field '{field}' "
+            f"(expected alert.<field> or reading.<field>)"
+        )
+    return f"{root}.{attribute}"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _compile_condition(spec: Dict[str, Any], rule_name: str) -> CompiledCondition:
+    if not isinstance(spec, dict):
+        raise ConfigurationError(f"Rule '{rule_name}' has a malformed condition: {spec!r}")
+    field = _check_field(spec.get("field"), rule_name)
+    op = spec.get("op")
+    value = spec.get("value")
+
+    if op in _COMPARISONS:
+        if op not in ("eq", "ne") and not _is_number(value):
+            raise ConfigurationError(f"Rule '{rule_name}': '{op}' on {field} needs a numeric value, got {value!r}")
+        kind = "number" if _is_number(value) else "text"
+        target = float(value) if kind == "number" else str(value)
+        compare = _COMPARISONS[op]
+        return CompiledCondition(field, kind, lambda column: compare(column, target))
+
+    if op in _MEMBERSHIP:
+        if not isinstance(value, (list, tuple)) or not value:
+            raise ConfigurationError(f"Rule '{rule_name}': '{op}' on {field} needs a non-empty list")
+        kind = "number" if all(_is_number(item) for item in value) else "text"
+        members = np.array([float(item) if kind == "number" else str(item) for item in value])
+        invert = _MEMBERSHIP[op]
+        return CompiledCondition(field, kind, lambda column: np.isin(column, members, invert=invert))
+
+    raise ConfigurationError(
+        f"Rule '{rule_name}' uses unknown operator {op!r} "
+        f"(expected one of {sorted([*_COMPARISONS, *_MEMBERSHIP])})"
+    )
+
+
+def _check_reason(template: str, rule_name: str) -> None:
+    for _, field_name, _, _ in string.Formatter().parse(template):
+        if field_name is not None:
+            _check_field(field_name.split("[", 1)[0], rule_name)
+
+
+def compile_rules(definitions: Sequence[Dict[str, Any]]) -> List[CompiledRule]:
+    """Validate rule definitions and compile their conditions into predicates."""
+    compiled: List[CompiledRule] = []
+    seen = set()
+    for position, definition in enumerate(definitions):
+        if not isinstance(definition, dict):
+            raise ConfigurationError(f"Rule #{position} is not a mapping: {definition!r}")
+        name = str(definition.get("name") or f"rule_{position}")
+        if name in seen:
+            raise ConfigurationError(f"Duplicate rule name '{name}'")
+        seen.add(name)
+        if not definition.get("enabled", True):
+            continue
+        conditions = definition.get("when")
+        if not isinstance(conditions, list) or not conditions:
+            raise ConfigurationError(f"Rule '{name}' needs a non-empty 'when' list of conditions")
+        adjustment = definition.get("adjustment")
+        if not _is_number(adjustment):
+            raise ConfigurationError(f"Rule '{name}' needs a numeric 'adjustment'")
+        reason = str(definition.get("reason") or f"Rule '{name}' triggered.")
+        _check_reason(reason, name)
+        compiled.append(
+            CompiledRule(
+                name=name,
+                conditions=tuple(_compile_condition(condition, name) for condition in conditions),
+                adjustment=float(adjustment),
+                reason=reason,
+            )
+        )
+    return compiled
+
+
+def load_rule_definitions(path: Path) -> List[Dict[str, Any]]:
+    """Read rule definitions from a JSON or YAML file (a list, or a mapping with a 'rules' list)."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:  # pragma: no cover - optional dependency
+            raise ConfigurationError(f"PyYAML is required to load validation rules from {path}") from e
+        document = yaml.safe_load(text)
+    else:
+        document = json.loads(text)
+    rules = document.get("rules") if isinstance(document, dict) else document
+    if not isinstance(rules, list):
+        raise ConfigurationError(f"{path} does not contain a list of rules")
+    return rules
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
 class RuleEngine:
-    def __init__(self):
+    def __init__(
+        self,
+        rules_path: Optional[str] = None,
+        rule_definitions: Optional[Sequence[Dict[str, Any]]] = None,
+        reload_interval_seconds: Optional[float] = None,
+    ):
         self.logger = logging.getLogger(__name__)
-        # Potentially load rules from a configuration file or database in a real scenario
-        self.logger.info("RuleEngine initialized.")
+        self.rules_path: Optional[Path] = None
+        if rule_definitions is None:
+            self.rules_path = Path(rules_path or settings.VALIDATION_RULES_PATH or DEFAULT_RULES_PATH)
+        self.reload_interval_seconds = (
+            settings.VALIDATION_RULES_RELOAD_SECONDS if reload_interval_seconds is None else reload_interval_seconds
+        )
+        self.rule_hits: Counter = Counter()
+        self.stats: Dict[str, int] = {"batches": 0, "evaluations": 0, "reloads": 0, "reload_errors": 0}
+        self._rules_mtime: Optional[float] = None
+        self._last_reload_check = time.monotonic()
+
+        if rule_definitions is not None:
+            self.rules: List[CompiledRule] = compile_rules(rule_definitions)
+        else:
+            self.rules = compile_rules(load_rule_definitions(self.rules_path))
+            self._rules_mtime = self._current_mtime()
+        self.logger.info(f"RuleEngine initialized with {len(self.rules)} rules.")
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.rules_path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """Recompile the rule file. On errors the previous rules stay active."""
+        if self.rules_path is None:
+            return False
+        mtime = self._current_mtime()
+        try:
+            rules = compile_rules(load_rule_definitions(self.rules_path))
+        except Exception as e:
+            self.stats["reload_errors"] += 1
+            self._rules_mtime = mtime  # do not retry a broken file until it changes again
+            self.logger.error(f"Keeping {len(self.rules)} active rules; reloading {self.rules_path} failed: {e}")
+            return False
+        self.rules = rules
+        self._rules_mtime = mtime
+        self.stats["reloads"] += 1
+        self.logger.info(f"Reloaded {len(rules)} validation rules from {self.rules_path}")
+        return True
+
+    def maybe_reload(self) -> bool:
+        """Reload the rule file if it changed, checking at most every ``reload_interval_seconds``."""
+        if self.rules_path is None or self.reload_interval_seconds <= 0:
+            return False
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_interval_seconds:
+            return False
+        self._last_reload_check = now
+        if self._current_mtime() == self._rules_mtime:
+            return False
+        return self.reload()
 
     async def evaluate_rules(
         self, alert: AnomalyAlert, reading: SensorReading
@@ -24,61 +255,70 @@ class RuleEngine:
                                                            Positive values increase confidence, negative decrease.
                 - rule_reasons (List[str]): A list of reasons explaining the adjustment.
         '''
-        rule_based_confidence_adjustment = 0.0
-        rule_reasons = []
-
         self.logger.debug(f"Evaluating rules for alert on sensor {alert.sensor_id} and reading from {reading.timestamp}")
+        self.maybe_reload()
+        rule_based_confidence_adjustment, rule_reasons = self.evaluate_batch([(alert, reading)])[0]
+        self.logger.info(f"Rule evaluation complete. Adjustment: {rule_based_confidence_adjustment}, Reasons: {rule_reasons}")
+        return rule_based_confidence_adjustment, rule_reasons
+
+    async def evaluate_rules_batch(
+        self, pairs: Sequence[Tuple[AnomalyAlert, SensorReading]]
+    ) -> List[Tuple[float, List[str]]]:
+        """``evaluate_rules`` for many (alert, reading) pairs in one vectorized pass."""
+        self.maybe_reload()
+        results = self.evaluate_batch(pairs)
+        self.logger.debug(f"Evaluated {len(self.rules)} rules over a batch of {len(pairs)} alerts")
+        return results
 
-        # Rule 1: Low Original Confidence
-        # If the initial alert confidence is very low, it might be less reliable.
-        # AnomalyAlert schema has: confidence: float = Field(ge=0, le=1)
-        if alert.confidence < 0.3:
-            rule_based_confidence_adjustment -= 0.1
-            reason = f"Initial alert confidence ({alert.confidence:.2f}) is below threshold (0.3)."
-            rule_reasons.append(reason)
-            self.logger.debug(f"Rule 1 (Low Original Confidence) triggered: {reason}")
-
-        # Rule 2: Poor Data Quality
-        # If the sensor reading quality is poor, the alert might be based on faulty data.
-        # SensorReading schema has: quality: float = Field(default=1.0, ge=0, le=1)
-        if reading.quality < 0.5:
-            rule_based_confidence_adjustment -= 0.2
-            reason = f"Triggering sensor reading quality ({reading.quality:.2f}) is low (below 0.5)."
-            rule_reasons.append(reason)
-            self.logger.debug(f"Rule 2 (Poor Data Quality) triggered: {reason}")
-
-        # Rule 3: Value vs. Type-Specific Broad Threshold Check (Example for Temperature)
-        # This is a simplified example. Real rules would be more sophisticated and configurable.
-        # SensorReading schema has: sensor_type: SensorType, value: float
-        # AnomalyAlert schema has: anomaly_type: AnomalyType (enum)
-        if reading.sensor_type == "temperature": # Assumes SensorType is an Enum with string value
-            # Example: If it's a 'spike' alert but the value is not extremely high for a temperature sensor,
-            # it might be a minor fluctuation rather than a critical anomaly.
-            # This rule is quite subjective and for demonstration.
-            if alert.anomaly_type == "spike" and reading.value < 40: # Assuming Celsius
-                rule_based_confidence_adjustment -= 0.05
-                reason = (
-                    f"Temperature spike alert ({alert.anomaly_type}) for a value ({reading.value}°C) "
-                    f"that is not considered extremely high (< 40°C)."
-                )
-                rule_reasons.append(reason)
-                self.logger.debug(f"Rule 3 (Temp Spike Value Check) triggered: {reason}")
-            elif alert.anomaly_type == "low_value" and reading.value > 0: # Example for low value alert
-                 rule_based_confidence_adjustment -= 0.05
-                 reason = (
-                    f"Temperature low_value alert ({alert.anomaly_type}) for a value ({reading.value}°C) "
-                    f"that is not critically low (> 0°C)."
-                 )
-                 rule_reasons.append(reason)
-                 self.logger.debug(f"Rule 3 (Temp Low Value Check) triggered: {reason}")
-
-
-        # Ensure adjustment does not push confidence out of bounds later
+    def evaluate_batch(
+        self, pairs: Sequence[Tuple[AnomalyAlert, SensorReading]]
+    ) -> List[Tuple[float, List[str]]]:
+        """Apply every rule to a columnar view of the batch; results are in input order."""
+        count = len(pairs)
+        rules = self.rules  # reloads swap the list, so this batch sees one consistent rule set
+        columns: Dict[Tuple[str, str], np.ndarray] = {}
+
+        def column(field: str, kind: str) -> np.ndarray:
+            key = (field, kind)
+            if key not in columns:
+                root, _, attribute = field.partition(".")
+                position = 0 if root == "alert" else 1
+                raw = [_plain(getattr(pair[position], attribute, None)) for pair in pairs]
+                if kind == "number":
+                    columns[key] = np.array([_number(value) for value in raw], dtype=float)
+                else:
+                    columns[key] = np.array(["" if value is None else str(value) for value in raw], dtype=object)
+            return columns[key]
+
+        adjustments = np.zeros(count)
+        reasons: List[List[str]] = [[] for _ in range(count)]
+        with np.errstate(invalid="ignore"):
+            for rule in rules:
+                mask = np.ones(count, dtype=bool)
+                for condition in rule.conditions:
+                    mask &= np.asarray(condition.predicate(column(condition.field, condition.kind)), dtype=bool)
+                    if not mask.any():
+                        break
+                hits = np.flatnonzero(mask)
+                if not hits.size:
+                    continue
+                adjustments[hits] += rule.adjustment
+                self.rule_hits[rule.name] += int(hits.size)
+                for index in hits:
+                    reasons[index].append(rule.format_reason(*pairs[index]))
+
+        self.stats["batches"] += 1
+        self.stats["evaluations"] += count
         # The adjustment is relative; final clamping will be done by the agent.
+        return [
+            (float(adjustments[index]), reasons[index] or ["No rule-based adjustments applied."])
+            for index in range(count)
+        ]
 
-        if not rule_reasons:
-            rule_reasons.append("No rule-based adjustments applied.")
-            self.logger.debug("No validation rules triggered significant adjustments.")
-        
-        self.logger.info(f"Rule evaluation complete. Adjustment: {rule_based_confidence_adjustment}, Reasons: {rule_reasons}")
-        return rule_based_confidence_adjustment, rule_reasons
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "rules": len(self.rules),
+            "source": str(self.rules_path) if self.rules_path else "inline",
+            "rule_hits": dict(self.rule_hits),
+        }
@@ -20,6 +20,7 @@ import os
 
 # Additional Decision Layer Agents
 from apps.agents.decision.prediction_agent import PredictionAgent
+from apps.ml.prophet_pool import ProphetProcessPool
 from apps.agents.core.orchestrator_agent import OrchestratorAgent
 from apps.agents.decision.scheduling_agent import SchedulingAgent
 from apps.agents.interface.human_interface_agent import HumanInterfaceAgent
@@ -174,7 +175,10 @@ class SystemCoordinator:
                 event_bus=self.event_bus,
                 crud_sensor_reading=crud_sensor_reading,
                 db_session_factory=self.db_session_factory,
-                specific_settings={}
+                specific_settings={},
+                prophet_pool=(
+                    ProphetProcessPool() if settings.PREDICTION_PROPHET_WORKERS > 0 else None
+                ),
             ),
             OrchestratorAgent(
                 agent_id="orchestrator_agent_01",
@@ -1,7 +1,10 @@
-from datetime import datetime
-from typing import List, Optional
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import DateTime, String, column, func, select, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database.orm_models import SensorReadingORM
@@ -11,6 +14,81 @@ from data.schemas import (  # Assuming SensorReadingCreate is in schemas.py
 )
 
 
+@dataclass
+class SensorHistory:
+    """
+    Columnar recent history for one sensor, ordered oldest to newest.
+
+    ``values`` and ``quality`` are float arrays aligned with ``timestamps``;
+    missing quality scores are stored as NaN.
+    """
+
+    sensor_id: str
+    timestamps: List[datetime] = field(default_factory=list)
+    values: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=float))
+    quality: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=float))
+    sensor_type: Optional[str] = None
+    unit: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_readings(cls, sensor_id: str, readings: Iterable[SensorReading]) -> "SensorHistory":
+        """Build a history from Pydantic/ORM readings in any order."""
+        ordered = sorted(
+            (item for item in readings if item.value is not None),
+            key=lambda item: item.timestamp or datetime.min,
+        )
+        return cls(
+            sensor_id=sensor_id,
+            timestamps=[item.timestamp for item in ordered],
+            values=np.array([float(item.value) for item in ordered], dtype=float),
+            quality=np.array(
+                [float(item.quality) if item.quality is not None else np.nan for item in ordered],
+                dtype=float,
+            ),
+            sensor_type=str(ordered[-1].sensor_type) if ordered else None,
+            unit=ordered[-1].unit if ordered else None,
+        )
+
+    def window(self, end_time: datetime, limit: int) -> "SensorHistory":
+        """The last ``limit`` readings at or before ``end_time`` (inclusive, like the queries)."""
+        if self.timestamps and (self.timestamps[-1].tzinfo is None) != (end_time.tzinfo is None):
+            end_time = (
+                end_time.replace(tzinfo=timezone.utc)
+                if end_time.tzinfo is None
+                else end_time.astimezone(timezone.utc).replace(tzinfo=None)
+            )
+        stop = bisect_right(self.timestamps, end_time)
+        start = max(0, stop - max(0, limit))
+        return SensorHistory(
+            sensor_id=self.sensor_id,
+            timestamps=self.timestamps[start:stop],
+            values=self.values[start:stop],
+            quality=self.quality[start:stop],
+            sensor_type=self.sensor_type,
+            unit=self.unit,
+        )
+
+    def to_readings(self, newest_first: bool = True) -> List[SensorReading]:
+        """Materialize the history as Pydantic readings (newest first by default)."""
+        indices = range(len(self) - 1, -1, -1) if newest_first else range(len(self))
+        readings = []
+        for i in indices:
+            payload = {
+                "sensor_id": self.sensor_id,
+                "sensor_type": self.sensor_type,
+                "value": float(self.values[i]),
+                "unit": self.unit or "",
+                "timestamp": self.timestamps[i],
+            }
+            if not np.isnan(self.quality[i]):
+                payload["quality"] = float(self.quality[i])
+            readings.append(SensorReading.model_validate(payload))
+        return readings
+
+
 class CRUDSensorReading:
     async def create_sensor_reading(
         self, db: AsyncSession, *, obj_in: SensorReadingCreate
@@ -76,6 +154,174 @@ class CRUDSensorReading:
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def fetch_series(
+        self,
+        db: AsyncSession,
+        *,
+        sensor_id: str,
+        limit: int = 100,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> SensorHistory:
+        """
+        Retrieve the latest ``limit`` readings of a sensor as columnar arrays.
+
+        Same filters as ``get_sensor_readings_by_sensor_id``, but only
+        ``timestamp``, ``value`` and ``quality`` are selected and the arrays are
+        built straight from the result rows: no ORM entities (identity map) and
+        no per-row Pydantic validation, which dominated the cost of long
+        histories. ``sensor_type`` and ``unit`` are left unset.
+
+        Returns:
+            The history ordered oldest to newest (empty when there are no rows).
+        """
+        stmt = select(
+            SensorReadingORM.timestamp, SensorReadingORM.value, SensorReadingORM.quality
+        ).where(SensorReadingORM.sensor_id == sensor_id)
+
+        if start_time:
+            stmt = stmt.where(SensorReadingORM.timestamp >= start_time)
+        if end_time:
+            stmt = stmt.where(SensorReadingORM.timestamp <= end_time)
+
+        stmt = stmt.order_by(SensorReadingORM.timestamp.desc()).limit(limit)
+
+        result = await db.execute(stmt)
+        rows = result.all()
+        if not rows:
+            return SensorHistory(sensor_id=sensor_id)
+        timestamps, row_values, quality = zip(*reversed(rows))
+        return SensorHistory(
+            sensor_id=sensor_id,
+            timestamps=list(timestamps),
+            values=np.array(row_values, dtype=float),
+            quality=np.array(quality, dtype=float),  # NULL quality becomes NaN
+        )
+
+    async def get_sensor_watermark(
+        self,
+        db: AsyncSession,
+        *,
+        sensor_id: str,
+        since: Optional[datetime] = None,
+    ) -> Tuple[Optional[datetime], int]:
+        """
+        Return the newest reading timestamp of a sensor and the number of readings after ``since``.
+
+        ``max(timestamp)`` for one sensor is a single backward probe of the
+        ``(sensor_id, timestamp)`` index. The count is only issued when that
+        watermark moved past ``since``, as a separate range query on the same
+        index, so the common "nothing new" case costs one index lookup.
+        """
+        latest = await db.scalar(
+            select(func.max(SensorReadingORM.timestamp)).where(SensorReadingORM.sensor_id == sensor_id)
+        )
+        if since is None or latest is None or latest <= since:
+            return latest, 0
+        newer = await db.scalar(
+            select(func.count())
+            .select_from(SensorReadingORM)
+            .where(SensorReadingORM.sensor_id == sensor_id, SensorReadingORM.timestamp > since)
+        )
+        return latest, int(newer or 0)
+
+    async def get_recent_readings_for_sensors(
+        self,
+        db: AsyncSession,
+        *,
+        sensor_ids: Sequence[str],
+        limit_per_sensor: int = 100,
+        end_time: Optional[datetime] = None,
+        end_times: Optional[Dict[str, datetime]] = None,
+    ) -> Dict[str, SensorHistory]:
+        """
+        Retrieve the latest ``limit_per_sensor`` readings for many sensors in one query.
+
+        Rows are ranked with ``ROW_NUMBER() OVER (PARTITION BY sensor_id ORDER BY
+        timestamp DESC)`` and only the needed columns are selected, so no ORM objects
+        are built. ``end_times`` applies an inclusive per-sensor cutoff (joined as a
+        ``VALUES`` list); ``end_time`` applies one cutoff to every sensor.
+
+        Returns:
+            Columnar history per requested sensor (empty histories for sensors without rows).
+        """
+        unique_ids = list(dict.fromkeys(sensor_id for sensor_id in sensor_ids if sensor_id))
+        histories = {sensor_id: SensorHistory(sensor_id=sensor_id) for sensor_id in unique_ids}
+        if not unique_ids or limit_per_sensor <= 0:
+            return histories
+
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=SensorReadingORM.sensor_id,
+                order_by=SensorReadingORM.timestamp.desc(),
+            )
+            .label("rank")
+        )
+        ranked = select(
+            SensorReadingORM.sensor_id,
+            SensorReadingORM.timestamp,
+            SensorReadingORM.value,
+            SensorReadingORM.quality,
+            SensorReadingORM.sensor_type,
+            SensorReadingORM.unit,
+            rank,
+        )
+
+        if end_times:
+            cutoffs = values(
+                column("sensor_id", String),
+                column("cutoff", DateTime(timezone=True)),
+                name="cutoffs",
+            ).data([(sensor_id, end_times.get(sensor_id)) for sensor_id in unique_ids])
+            ranked = ranked.join(
+                cutoffs,
+                (cutoffs.c.sensor_id == SensorReadingORM.sensor_id)
+                & (cutoffs.c.cutoff.is_(None) | (SensorReadingORM.timestamp <= cutoffs.c.cutoff)),
+            )
+        else:
+            ranked = ranked.where(SensorReadingORM.sensor_id.in_(unique_ids))
+            if end_time:
+                ranked = ranked.where(SensorReadingORM.timestamp <= end_time)
+
+        ranked_subquery = ranked.subquery("ranked_readings")
+        stmt = (
+            select(
+                ranked_subquery.c.sensor_id,
+                ranked_subquery.c.timestamp,
+                ranked_subquery.c.value,
+                ranked_subquery.c.quality,
+                ranked_subquery.c.sensor_type,
+                ranked_subquery.c.unit,
+            )
+            .where(ranked_subquery.c.rank <= limit_per_sensor)
+            .order_by(ranked_subquery.c.sensor_id, ranked_subquery.c.timestamp)
+        )
+
+        result = await db.execute(stmt)
+        return self._rows_to_histories(result.all(), histories)
+
+    @staticmethod
+    def _rows_to_histories(
+        rows: Sequence, histories: Dict[str, SensorHistory]
+    ) -> Dict[str, SensorHistory]:
+        """Group ``(sensor_id, timestamp, value, quality, sensor_type, unit)`` rows into columns."""
+        grouped: Dict[str, List] = {}
+        for row in rows:
+            grouped.setdefault(row[0], []).append(row)
+
+        for sensor_id, sensor_rows in grouped.items():
+            _, timestamps, row_values, quality, sensor_types, units = zip(*sensor_rows)
+            histories[sensor_id] = SensorHistory(
+                sensor_id=sensor_id,
+                timestamps=list(timestamps),
+                values=np.array(row_values, dtype=float),
+                quality=np.array([np.nan if q is None else q for q in quality], dtype=float),
+                sensor_type=sensor_types[-1],
+                unit=units[-1],
+            )
+        return histories
+
     async def get_sensor_reading_by_id(
         self, db: AsyncSession, *, reading_id: int
     ) -> Optional[SensorReadingORM]:
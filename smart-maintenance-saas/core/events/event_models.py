@@ -318,6 +318,54 @@ class MaintenanceScheduledEvent(BaseEventModel):
     )
 
 
+
+class MaintenanceScheduleChangedEvent(BaseEventModel):
+    """
+    Event indicating that an already scheduled maintenance task was moved or unscheduled.
+
+    Published by the SchedulingAgent when re-optimizing the schedule around new,
+    more urgent requests changes an existing booking. Each event describes the
+    change of one task.
+
+    Attributes:
+        request_id: ID of the maintenance request whose booking changed.
+        equipment_id: Identifier of the equipment/component the maintenance is for.
+        change_type: "rescheduled" (same technician, new time), "reassigned" (new technician)
+            or "unscheduled" (displaced by more urgent work).
+        previous_technician_id: Technician the task was assigned to before the change.
+        previous_start_time: Previous scheduled start time.
+        previous_end_time: Previous scheduled end time.
+        assigned_technician_id: Technician assigned after the change (None when unscheduled).
+        scheduled_start_time: New scheduled start time (None when unscheduled).
+        scheduled_end_time: New scheduled end time (None when unscheduled).
+        triggering_request_ids: The new requests whose scheduling caused the change.
+        reason: Human-readable explanation of the change.
+        agent_id: ID of the scheduling agent that generated this event.
+    """
+
+    request_id: str = Field(..., description="ID of the maintenance request whose booking changed.")
+    equipment_id: str = Field(..., description="Identifier of the equipment/component the maintenance is for.")
+    change_type: str = Field(
+        ..., description="Type of change: 'rescheduled', 'reassigned' or 'unscheduled'."
+    )
+    previous_technician_id: Optional[str] = Field(
+        None, description="Technician the task was assigned to before the change."
+    )
+    previous_start_time: Optional[datetime] = Field(None, description="Previous scheduled start time.")
+    previous_end_time: Optional[datetime] = Field(None, description="Previous scheduled end time.")
+    assigned_technician_id: Optional[str] = Field(
+        None, description="Technician assigned after the change (None when unscheduled)."
+    )
+    scheduled_start_time: Optional[datetime] = Field(None, description="New scheduled start time.")
+    scheduled_end_time: Optional[datetime] = Field(None, description="New scheduled end time.")
+    triggering_request_ids: List[str] = Field(
+        default_factory=list, description="The new requests whose scheduling caused the change."
+    )
+    reason: Optional[str] = Field(None, description="Human-readable explanation of the change.")
+    agent_id: str = Field(
+        ..., description="ID of the scheduling agent that generated this event."
+    )
+
 class SystemFeedbackReceivedEvent(BaseEventModel):
     """
     Event indicating that system feedback has been received and needs to be processed by the Learning Agent.
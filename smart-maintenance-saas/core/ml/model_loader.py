@@ -9,7 +9,6 @@ import os
 import logging
 import pickle
 from typing import Any, Dict, List, Optional, Tuple, Union
-from datetime import datetime, timedelta
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
@@ -24,6 +23,8 @@ import urllib3
 from botocore.config import Config
 import boto3
 
+from apps.ml.artifact_cache import localize_model_uri
+from apps.ml.model_cache import ModelCache, get_model_cache
 from apps.ml.model_utils import (
     get_model_recommendations, 
     get_model_details, 
@@ -33,41 +34,8 @@ from data.exceptions import MLModelError, ConfigurationError
 from data.schemas import SensorReading
 
 
-class ModelCache:
-    """Simple in-memory model cache with TTL support."""
-    
-    def __init__(self, ttl_minutes: int = 60):
-        self.cache = {}
-        self.timestamps = {}
-        self.ttl_minutes = ttl_minutes
-        self.logger = logging.getLogger(f"{__name__}.ModelCache")
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get a cached model if it exists and hasn't expired."""
-        if key not in self.cache:
-            return None
-        
-        # Check if cache entry has expired
-        if datetime.utcnow() - self.timestamps[key] > timedelta(minutes=self.ttl_minutes):
-            self.logger.debug(f"Cache entry for {key} has expired, removing")
-            del self.cache[key]
-            del self.timestamps[key]
-            return None
-        
-        self.logger.debug(f"Cache hit for {key}")
-        return self.cache[key]
-    
-    def set(self, key: str, value: Any) -> None:
-        """Store a model in cache."""
-        self.cache[key] = value
-        self.timestamps[key] = datetime.utcnow()
-        self.logger.debug(f"Cached model for {key}")
-    
-    def clear(self) -> None:
-        """Clear all cached models."""
-        self.cache.clear()
-        self.timestamps.clear()
-        self.logger.info("Model cache cleared")
+# Namespace for this loader's entries in the shared model cache
+CACHE_KEY_PREFIX = "sensor-loader:"
 
 
 class MLflowModelLoader:
@@ -77,7 +45,7 @@ class MLflowModelLoader:
     Features:
     - Dynamic model loading based on sensor type
     - Intelligent model selection using MLflow registry
-    - In-memory caching with TTL
+    - Shared, memory-bounded model cache with background refresh of "latest" models
     - Graceful fallbacks and error handling
     - Async-friendly design for high-performance loading
     """
@@ -92,13 +60,14 @@ class MLflowModelLoader:
         
         Args:
             mlflow_uri: MLflow tracking URI (defaults to env var)
-            cache_ttl_minutes: Time-to-live for cached models in minutes
+            cache_ttl_minutes: Refresh horizon for cached "latest" models in minutes
             max_concurrent_loads: Maximum concurrent model loading operations
             enable_fallback: Whether to enable fallback to general models
         """
         self.mlflow_uri = mlflow_uri or os.getenv("MLFLOW_TRACKING_URI", "http://mlflow:5000")
         self.enable_fallback = enable_fallback
-        self.cache = ModelCache(ttl_minutes=cache_ttl_minutes)
+        self.cache: ModelCache = get_model_cache()
+        self.cache_ttl_seconds = cache_ttl_minutes * 60
         self.executor = ThreadPoolExecutor(max_workers=max_concurrent_loads)
         self.logger = logging.getLogger(f"{__name__}.MLflowModelLoader")
         
@@ -218,7 +187,7 @@ class MLflowModelLoader:
         """
         # Create cache key
         version_str = version or "latest"
-        cache_key = f"{model_name}:{version_str}:preprocessor={include_preprocessor}"
+        cache_key = f"{CACHE_KEY_PREFIX}{model_name}:{version_str}:preprocessor={include_preprocessor}"
         
         # Check cache first
         cached_result = self.cache.get(cache_key)
@@ -239,8 +208,12 @@ class MLflowModelLoader:
             include_preprocessor
         )
         
-        # Cache the result
-        self.cache.set(cache_key, result)
+        # Cache the result; unpinned ("latest") models are reloaded in the background
+        # before their TTL runs out instead of expiring on a request.
+        refresh = None
+        if version is None or not str(version).isdigit():
+            refresh = lambda: self._load_model_sync(model_name, version, include_preprocessor)  # noqa: E731
+        self.cache.set(cache_key, result, loader=refresh, ttl_seconds=self.cache_ttl_seconds)
         self.stats['models_loaded'] += 1
         
         return result
@@ -269,8 +242,9 @@ class MLflowModelLoader:
             
             self.logger.info(f"Loading model from URI: {model_uri}")
             
-            # Load the main model
-            model = mlflow.pyfunc.load_model(model_uri)
+            # Load the main model (artifacts come from the local store once downloaded)
+            pinned = version is not None and str(version).isdigit()
+            model = mlflow.pyfunc.load_model(localize_model_uri(model_uri, immutable=pinned))
             
             preprocessor = None
             if include_preprocessor:
@@ -452,15 +426,16 @@ class MLflowModelLoader:
             return []
     
     def clear_cache(self) -> None:
-        """Clear the model cache."""
-        self.cache.clear()
+        """Drop the models this loader put in the shared model cache."""
+        self.cache.invalidate(prefix=CACHE_KEY_PREFIX)
         self.logger.info("Model cache cleared")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get loader statistics."""
         return {
             **self.stats,
-            'cache_size': len(self.cache.cache),
+            'cache_size': len(self.cache),
+            'shared_cache': self.cache.get_stats(),
             'cache_hit_rate': (
                 self.stats['cache_hits'] / max(1, self.stats['cache_hits'] + self.stats['cache_misses'])
             ) * 100
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Nightly Fleet Forecast Job
+
+Forecasts every configured sensor with a single call to the batch forecast
+endpoint (/api/v1/ml/forecast_batch). The API fans the forecasts out over its
+process pool; this job consumes the NDJSON stream as results arrive and writes
+them to a JSON Lines file.
+
+Configuration (environment variables):
+- API_BASE_URL: API root (default http://localhost:8000)
+- API_KEY: API key with the ml:predict scope
+- FLEET_FORECAST_SENSORS: comma-separated sensor ids
+- FLEET_FORECAST_MODEL: registered model used for every sensor
+- FLEET_FORECAST_MODEL_TEMPLATE: per-sensor model name, e.g. "prophet_forecaster_{sensor_id}"
+- FLEET_FORECAST_HORIZON_STEPS: forecast horizon (default 288)
+- FLEET_FORECAST_OUTPUT: output file (default reports/fleet_forecast_<date>.jsonl)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+import aiohttp
+
+# Add project root to path for importing our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from core.security.api_keys import API_KEY_HEADER_NAME, get_configured_api_keys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def build_payload() -> Dict:
+    """Build the /forecast_batch request from the environment."""
+    sensors = [s.strip() for s in os.getenv('FLEET_FORECAST_SENSORS', '').split(',') if s.strip()]
+    payload: Dict = {
+        "sensor_ids": sensors,
+        "horizon_steps": int(os.getenv('FLEET_FORECAST_HORIZON_STEPS', '288')),
+    }
+    template = os.getenv('FLEET_FORECAST_MODEL_TEMPLATE')
+    if template:
+        payload["model_names"] = {sensor_id: template.format(sensor_id=sensor_id) for sensor_id in sensors}
+    if os.getenv('FLEET_FORECAST_MODEL'):
+        payload["model_name"] = os.getenv('FLEET_FORECAST_MODEL')
+    return payload
+
+
+async def run_fleet_forecast() -> List[Dict]:
+    """Request the batch forecast and persist results as they stream in."""
+    api_base_url = os.getenv('API_BASE_URL', 'http://localhost:8000')
+    api_key = os.getenv('API_KEY') or get_configured_api_keys()[0]
+    output_path = os.getenv(
+        'FLEET_FORECAST_OUTPUT', f"reports/fleet_forecast_{datetime.utcnow():%Y%m%d}.jsonl"
+    )
+    payload = build_payload()
+    if not payload["sensor_ids"]:
+        logger.error("FLEET_FORECAST_SENSORS is empty; nothing to forecast")
+        return []
+
+    correlation_id = str(uuid.uuid4())
+    headers = {'X-Request-ID': correlation_id, API_KEY_HEADER_NAME: api_key}
+    logger.info(f"Forecasting {len(payload['sensor_ids'])} sensors [correlation_id={correlation_id}]")
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    results: List[Dict] = []
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            f"{api_base_url}/api/v1/ml/forecast_batch",
+            json=payload,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=600),
+        ) as response:
+            if response.status != 200:
+                logger.error(f"Batch forecast failed: {response.status} - {await response.text()}")
+                return []
+            with open(output_path, 'w', encoding='utf-8') as output:
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    result = json.loads(line)
+                    results.append(result)
+                    output.write(json.dumps(result) + "\n")
+                    logger.info(f"{result['sensor_id']}: {result['status']}")
+
+    failed = [r['sensor_id'] for r in results if r.get('status') != 'ok']
+    logger.info(
+        f"Fleet forecast complete: {len(results) - len(failed)}/{len(results)} ok, "
+        f"written to {output_path} [correlation_id={correlation_id}]"
+    )
+    if failed:
+        logger.warning(f"Sensors without a forecast: {failed}")
+    return results
+
+
+if __name__ == "__main__":
+    asyncio.run(run_fleet_forecast())
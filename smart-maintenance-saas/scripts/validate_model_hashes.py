@@ -15,7 +15,6 @@ Example:
 """
 
 import argparse
-import hashlib
 import json
 import logging
 import os
@@ -27,6 +26,9 @@ from typing import Dict, Optional
 import mlflow
 from mlflow.tracking import MlflowClient
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from apps.ml.artifact_cache import sha256_file
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -94,13 +96,8 @@ class ModelHashValidator:
             raise FileNotFoundError(f"No supported model file found in {model_path}. Available files: {available_files}")
         
         logger.info(f"Calculating hash for: {model_file}")
-        sha256_hash = hashlib.sha256()
-        with open(model_file, "rb") as f:
-            # Read file in chunks to handle large files
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        
-        return sha256_hash.hexdigest()
+        # Same chunked SHA256 the runtime artifact cache uses to verify downloads
+        return sha256_file(model_file)
     
     def get_latest_model_run(self, model_name: str) -> Optional[str]:
         """
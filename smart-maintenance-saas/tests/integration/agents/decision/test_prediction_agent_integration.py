@@ -18,7 +18,7 @@ from uuid import uuid4
 from apps.agents.decision.prediction_agent import PredictionAgent
 from core.events.event_bus import EventBus
 from core.events.event_models import AnomalyValidatedEvent, MaintenancePredictedEvent
-from core.database.crud.crud_sensor_reading import CRUDSensorReading
+from core.database.crud.crud_sensor_reading import CRUDSensorReading, SensorHistory
 from data.schemas import SensorReading, SensorType
 
 
@@ -43,7 +43,8 @@ class TestPredictionAgentIntegration(unittest.IsolatedAsyncioTestCase):
             "min_historical_points": 5,  # Lower threshold for testing
             "prediction_horizon_days": 7,
             "historical_data_limit": 50,
-            "prediction_confidence_threshold": 0.6
+            "prediction_confidence_threshold": 0.6,
+            "prediction_debounce_seconds": 0.0  # predict as soon as the trigger arrives
         }
 
         self.agent = PredictionAgent(
@@ -126,7 +127,9 @@ class TestPredictionAgentIntegration(unittest.IsolatedAsyncioTestCase):
             )
             mock_historical_readings.append(reading)
             
-        self.mock_crud_sensor_reading.get_sensor_readings_as_pydantic.return_value = mock_historical_readings
+        self.mock_crud_sensor_reading.fetch_series.return_value = SensorHistory.from_readings(
+            "test_sensor_123", mock_historical_readings
+        )
 
         # Create a valid anomaly event
         test_event = self._create_anomaly_validated_event()
@@ -30,7 +30,7 @@ async def test_prediction_agent_fetches_real_historical_data(db_session: AsyncSe
         event_bus=event_bus,
         crud_sensor_reading=crud_sensor_reading,
         db_session_factory=lambda: db_session,
-        specific_settings={}
+        specific_settings={"prediction_debounce_seconds": 0.0}
     )
     
     # Start the agent
@@ -154,7 +154,7 @@ async def test_prediction_agent_handles_no_historical_data(db_session: AsyncSess
         event_bus=event_bus,
         crud_sensor_reading=crud_sensor_reading,
         db_session_factory=lambda: db_session,
-        specific_settings={}
+        specific_settings={"prediction_debounce_seconds": 0.0}
     )
     
     # Start the agent
@@ -215,7 +215,7 @@ async def test_prediction_agent_uses_sufficient_historical_data(db_session: Asyn
         event_bus=event_bus,
         crud_sensor_reading=crud_sensor_reading,
         db_session_factory=lambda: db_session,
-        specific_settings={}
+        specific_settings={"prediction_debounce_seconds": 0.0}
     )
     
     # Start the agent
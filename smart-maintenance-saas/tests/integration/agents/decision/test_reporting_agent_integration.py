@@ -3,25 +3,80 @@ Integration tests for ReportingAgent - Day 9
 
 Tests the ReportingAgent's integration with its components including
 real analytics engine interaction and chart generation.
+
+Tests marked ``db`` run the analytics queries against the TimescaleDB test
+database (``test_db_url``) and are skipped when it is not available.
 """
 
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import base64
+import uuid
 from unittest.mock import Mock
 
-from apps.agents.decision.reporting_agent import ReportingAgent, AnalyticsEngine
+from sqlalchemy import create_engine, insert, text
+
+from apps.agents.decision.chart_rendering import ChartRenderer
+from apps.agents.decision.reporting_agent import ReportingAgent, AnalyticsEngine, _sync_database_url
+from core.database.base import Base
+from core.database.orm_models import AnomalyAlertORM, MaintenanceLogORM, MaintenanceTaskORM, SensorReadingORM
 from data.schemas import ReportRequest, ReportResult
 
+REPORTING_TABLES = [
+    SensorReadingORM.__table__,
+    AnomalyAlertORM.__table__,
+    MaintenanceTaskORM.__table__,
+    MaintenanceLogORM.__table__,
+]
+
+
+@pytest.fixture(scope="module")
+def reporting_db_engine(request):
+    """Synchronous engine on the TimescaleDB test database with the reporting tables."""
+    try:
+        engine = create_engine(_sync_database_url(request.getfixturevalue("test_db_url")), pool_pre_ping=True)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS timescaledb"))
+            connection.execute(text("CREATE SEQUENCE IF NOT EXISTS sensor_readings_id_seq"))
+        Base.metadata.create_all(engine, tables=REPORTING_TABLES)
+        with engine.begin() as connection:
+            connection.execute(text("SELECT create_hypertable('sensor_readings', 'timestamp', if_not_exists => TRUE)"))
+    except Exception as error:  # noqa: BLE001 - no container runtime or database
+        pytest.skip(f"TimescaleDB test database not available: {error}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def reporting_db(reporting_db_engine):
+    """The reporting engine with empty reporting tables."""
+    with reporting_db_engine.begin() as connection:
+        connection.execute(text("TRUNCATE " + ", ".join(table.name for table in REPORTING_TABLES)))
+    return reporting_db_engine
+
+
+@pytest.fixture(scope="module")
+def chart_renderer():
+    renderer = ChartRenderer(workers=2)
+    yield renderer
+    renderer.shutdown()
+
 
 class TestReportingAgentIntegration:
     """Integration tests for ReportingAgent."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
+    @pytest.fixture(autouse=True)
+    def _setup_agent(self, request, chart_renderer):
+        """Set up the agent; ``db`` tests get an analytics engine on the test database."""
         self.mock_event_bus = Mock()
-        self.agent = ReportingAgent("integration-test-agent", self.mock_event_bus)
+        self.db_engine = request.getfixturevalue("reporting_db") if request.node.get_closest_marker("db") else None
+        self.agent = ReportingAgent(
+            "integration-test-agent",
+            self.mock_event_bus,
+            chart_renderer=chart_renderer,
+            analytics_engine=AnalyticsEngine(engine=self.db_engine) if self.db_engine is not None else None,
+        )
 
     @pytest.mark.asyncio
     async def test_agent_initialization_and_lifecycle(self):
@@ -48,6 +103,7 @@ class TestReportingAgentIntegration:
         await self.agent.stop()
         assert self.agent.status == "stopped"
 
+    @pytest.mark.db
     def test_end_to_end_anomaly_summary_report_json(self):
         """Test complete anomaly summary report generation in JSON format."""
         request = ReportRequest(
@@ -93,6 +149,7 @@ class TestReportingAgentIntegration:
         assert metadata["include_charts"] is True
         assert "analytics_summary" in metadata
 
+    @pytest.mark.db
     def test_end_to_end_maintenance_overview_report_text(self):
         """Test complete maintenance overview report generation in text format."""
         request = ReportRequest(
@@ -120,6 +177,7 @@ class TestReportingAgentIntegration:
         assert "main_chart" in result.charts_encoded
         assert len(result.charts_encoded["main_chart"]) > 0
 
+    @pytest.mark.db
     def test_end_to_end_system_health_report_json(self):
         """Test complete system health report generation in JSON format."""
         request = ReportRequest(
@@ -145,6 +203,7 @@ class TestReportingAgentIntegration:
         # Verify charts were generated
         assert "main_chart" in result.charts_encoded
 
+    @pytest.mark.db
     def test_report_without_charts(self):
         """Test report generation without charts."""
         request = ReportRequest(
@@ -162,9 +221,10 @@ class TestReportingAgentIntegration:
         content_data = json.loads(result.content)
         assert "total_anomalies" in content_data
 
+    @pytest.mark.db
     def test_analytics_engine_integration(self):
         """Test direct integration with AnalyticsEngine."""
-        analytics_engine = AnalyticsEngine()
+        analytics_engine = AnalyticsEngine(engine=self.db_engine)
         
         # Test different report types
         request_anomaly = ReportRequest(
@@ -183,6 +243,7 @@ class TestReportingAgentIntegration:
         assert len(result["chart_data"]["dates"]) == 14  # 14 days
         assert len(result["chart_data"]["anomaly_counts"]) == 14
 
+    @pytest.mark.db
     def test_multiple_report_generation(self):
         """Test generating multiple reports in sequence."""
         requests = [
@@ -203,6 +264,7 @@ class TestReportingAgentIntegration:
             assert result.generated_at is not None
             assert len(result.content) > 0
 
+    @pytest.mark.db
     def test_chart_generation_integration(self):
         """Test chart generation with real matplotlib integration."""
         request = ReportRequest(
@@ -225,6 +287,7 @@ class TestReportingAgentIntegration:
         except Exception as e:
             pytest.fail(f"Failed to decode chart: {e}")
 
+    @pytest.mark.db
     def test_time_range_handling(self):
         """Test report generation with different time ranges."""
         # Test with explicit time range
@@ -262,6 +325,7 @@ class TestReportingAgentIntegration:
         assert result is not None
         assert result.report_type == "invalid_report_type"
 
+    @pytest.mark.db
     def test_concurrent_report_generation(self):
         """Test handling of concurrent report generation requests."""
         import asyncio
@@ -293,6 +357,7 @@ class TestReportingAgentIntegration:
             assert result.error_message is None
             assert len(result.content) > 0
 
+    @pytest.mark.db
     def test_large_time_range_handling(self):
         """Test report generation with large time ranges."""
         # Test with 6 months of data
@@ -314,6 +379,7 @@ class TestReportingAgentIntegration:
         # Verify chart generation works with large data sets
         assert "main_chart" in result.charts_encoded
 
+    @pytest.mark.db
     @pytest.mark.asyncio
     async def test_agent_health_monitoring(self):
         """Test agent health monitoring during operation."""
@@ -335,6 +401,7 @@ class TestReportingAgentIntegration:
         
         await self.agent.stop()
 
+    @pytest.mark.db
     def test_custom_parameters_integration(self):
         """Test report generation with custom parameters."""
         custom_params = {
@@ -358,6 +425,7 @@ class TestReportingAgentIntegration:
         metadata = result.metadata
         assert metadata["parameters"] == custom_params
 
+    @pytest.mark.db
     def test_chart_generation_fallback(self):
         """Test chart generation with malformed data (fallback behavior)."""
         request = ReportRequest(
@@ -372,3 +440,91 @@ class TestReportingAgentIntegration:
         assert result.error_message is None
         # Chart generation should handle any issues gracefully
         # Either generate a chart or handle the error without failing the report
+
+
+def _utc(day: int, hour: float = 0.0) -> datetime:
+    return datetime(2024, 3, day, tzinfo=timezone.utc) + timedelta(hours=hour)
+
+
+@pytest.mark.db
+class TestAnalyticsQueries:
+    """Runs every report query against TimescaleDB with known rows."""
+
+    # Monday 4 March to Saturday 9 March 2024 (exclusive): five daily buckets
+    START, END = _utc(4), _utc(9)
+
+    @pytest.fixture(autouse=True)
+    def _seed(self, reporting_db):
+        alert = {"anomaly_type": "spike", "confidence": 0.9}
+        task_ids = [uuid.uuid4() for _ in range(2)]
+        with reporting_db.begin() as connection:
+            connection.execute(insert(AnomalyAlertORM), [
+                {**alert, "sensor_id": "s1", "severity": 5, "status": "open", "created_at": _utc(4, 9)},
+                {**alert, "sensor_id": "s2", "severity": 2, "status": "false_positive", "created_at": _utc(4, 15)},
+                {**alert, "sensor_id": "s1", "severity": 4, "status": "dismissed", "created_at": _utc(6, 10)},
+                {**alert, "sensor_id": "s3", "severity": 5, "status": "open", "created_at": _utc(10, 10)},  # outside
+            ])
+            # (equipment, type, status, created, actual start, actual end, scheduled end)
+            tasks = [
+                ("eq1", "repair", "completed", _utc(4, 8), _utc(5, 8), _utc(5, 10), None),
+                ("eq2", "repair", "pending", _utc(4, 8), None, None, _utc(5, 12)),  # overdue
+                ("eq1", "inspection", "in_progress", _utc(5, 8), None, None, _utc(20, 12)),
+                ("eq3", "inspection", "cancelled", _utc(6, 8), None, None, _utc(5, 12)),
+            ]
+            connection.execute(insert(MaintenanceTaskORM), [
+                {"equipment_id": equipment_id, "task_type": task_type, "status": status, "created_at": created_at,
+                 "actual_start_time": actual_start, "actual_end_time": actual_end, "scheduled_end_time": scheduled_end}
+                for equipment_id, task_type, status, created_at, actual_start, actual_end, scheduled_end in tasks
+            ])
+            connection.execute(insert(MaintenanceLogORM), [
+                {"task_id": task_ids[0], "equipment_id": "eq1", "technician_id": "tech-a",
+                 "completion_date": _utc(5, 10), "actual_duration_hours": 2.0},
+                {"task_id": task_ids[1], "equipment_id": "eq2", "technician_id": "tech-b",
+                 "completion_date": _utc(7, 16), "actual_duration_hours": 4.0},
+            ])
+            readings = [("s1", _utc(4, 10), 1.0), ("s2", _utc(4, 11), 0.5), ("s1", _utc(5, 10), 1.0), ("s1", _utc(8, 12), 1.0)]
+            connection.execute(insert(SensorReadingORM), [
+                {"sensor_id": sensor_id, "sensor_type": "temperature", "value": 20.0, "timestamp": timestamp,
+                 "quality": quality, "created_at": timestamp + timedelta(milliseconds=200)}
+                for sensor_id, timestamp, quality in readings
+            ])
+
+    def _analyze(self, reporting_db, report_type):
+        request = ReportRequest(
+            report_type=report_type, format="json", time_range_start=self.START, time_range_end=self.END
+        )
+        return AnalyticsEngine(engine=reporting_db).analyze(request)
+
+    def test_anomaly_summary_is_gap_filled(self, reporting_db):
+        result = self._analyze(reporting_db, "anomaly_summary")
+
+        assert result["chart_data"]["dates"] == ["2024-03-04", "2024-03-05", "2024-03-06", "2024-03-07", "2024-03-08"]
+        assert result["chart_data"]["anomaly_counts"] == [2, 0, 1, 0, 0]
+        assert (result["total_anomalies"], result["peak_anomaly_day"]) == (3, 2)
+        assert result["avg_anomalies_per_day"] == pytest.approx(0.6)
+        assert result["sensors_affected"] == 2
+        assert result["false_positive_rate"] == pytest.approx(0.667)
+
+    def test_maintenance_overview_kpis(self, reporting_db):
+        result = self._analyze(reporting_db, "maintenance_overview")
+
+        assert result["total_maintenance_tasks"] == 4
+        assert (result["completed_tasks"], result["pending_tasks"], result["overdue_tasks"]) == (1, 2, 1)
+        assert result["chart_data"]["values"] == [1, 2, 1]
+        assert result["avg_completion_time"] == pytest.approx(2.0)
+        assert result["mttr_hours"] == pytest.approx(3.0)
+        # 6 logged hours over 2 technicians x 5 working days x 10 hours
+        assert result["technician_utilization"] == pytest.approx(0.06)
+        # 6 logged hours over 3 pieces of equipment x 120 hours
+        assert result["equipment_uptime"] == pytest.approx(0.983)
+
+    def test_system_health_is_gap_filled(self, reporting_db):
+        result = self._analyze(reporting_db, "system_health")
+
+        assert len(result["chart_data"]["dates"]) == 5
+        assert result["chart_data"]["uptime_percentages"] == [100.0, 50.0, 0.0, 0.0, 50.0]
+        assert (result["active_sensors"], result["inactive_sensors"]) == (1, 1)
+        assert result["data_quality_score"] == pytest.approx(0.875)
+        assert result["overall_system_health"] == pytest.approx(63.75)
+        assert result["avg_response_time_ms"] == pytest.approx(200.0)
+        assert (result["alerts_generated"], result["critical_alerts"]) == (3, 2)
@@ -37,6 +37,7 @@ from apps.agents.core.validation_agent import ValidationAgent
 from apps.agents.decision.prediction_agent import PredictionAgent
 
 # Data models and processors
+from core.database.crud.crud_sensor_reading import SensorHistory
 from data.schemas import SensorReading, SensorReadingCreate, SensorType
 from data.validators.agent_data_validator import DataValidator
 from data.processors.agent_data_enricher import DataEnricher
@@ -125,10 +126,11 @@ class TestFullWorkflowIntegration(unittest.IsolatedAsyncioTestCase):
         
         self.mock_crud_sensor_reading = AsyncMock(spec=CRUDSensorReading)
         
-        # Mock historical readings as ORM objects that get converted by orm_to_pydantic
+        # Mock historical readings as the columnar history returned by fetch_series
         mock_historical_readings = self._create_mock_historical_readings()
-        self.mock_crud_sensor_reading.get_sensor_readings_by_sensor_id.return_value = mock_historical_readings
-        self.mock_crud_sensor_reading.orm_to_pydantic.side_effect = lambda orm_obj: orm_obj  # Identity function since we're using Pydantic objects directly
+        self.mock_crud_sensor_reading.fetch_series.return_value = SensorHistory.from_readings(
+            "sensor_temp_001", mock_historical_readings
+        )
         
         self.mock_rule_engine = MagicMock(spec=RuleEngine)
         self.mock_rule_engine.evaluate_rules = AsyncMock(return_value=(0.0, ["Rule reason: no adjustment needed"]))
@@ -157,9 +159,9 @@ class TestFullWorkflowIntegration(unittest.IsolatedAsyncioTestCase):
             # Mock database session and CRUD for PredictionAgent
             self.mock_pred_crud_sensor_reading = AsyncMock(spec=CRUDSensorReading)
             mock_historical_readings = self._create_mock_historical_readings()
-            self.mock_pred_crud_sensor_reading.get_sensor_readings_by_sensor_id.return_value = mock_historical_readings
-            self.mock_pred_crud_sensor_reading.get_sensor_readings_as_pydantic.return_value = mock_historical_readings  # This is the method PredictionAgent actually uses
-            self.mock_pred_crud_sensor_reading.orm_to_pydantic.side_effect = lambda orm_obj: orm_obj  # Identity function
+            self.mock_pred_crud_sensor_reading.fetch_series.return_value = SensorHistory.from_readings(
+                "sensor_temp_001", mock_historical_readings
+            )  # This is the method PredictionAgent actually uses
             
             self.mock_pred_db_session_factory = MagicMock()
             
@@ -168,7 +170,8 @@ class TestFullWorkflowIntegration(unittest.IsolatedAsyncioTestCase):
                 'historical_data_limit': 50,
                 'min_historical_points': 5,  # Lower requirement to make test easier
                 'prediction_horizon_days': 30,
-                'confidence_threshold': 0.5  # Lower than validation confidence of 0.86
+                'confidence_threshold': 0.5,  # Lower than validation confidence of 0.86
+                'prediction_debounce_seconds': 0.0  # Predict as soon as the trigger arrives
             }
             self.prediction_agent = PredictionAgent(
                 agent_id="test-prediction-agent",
@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from apps.agents.core.sensor_window_cache import SensorWindowCache
+from apps.agents.core.validation_agent import ValidationAgent
+from core.database.crud.crud_sensor_reading import SensorHistory
+from core.events.event_models import AnomalyDetectedEvent, DataProcessedEvent
+from data.schemas import AnomalyType
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0)
+
+
+def _history(count: int, sensor_id: str = "s1") -> SensorHistory:
+    return SensorHistory(
+        sensor_id=sensor_id,
+        timestamps=[BASE_TIME + timedelta(minutes=i) for i in range(count)],
+        values=np.arange(count, dtype=float) + 20.0,
+        quality=np.ones(count),
+    )
+
+
+def test_lookup_hits_only_when_the_window_holds_every_reading():
+    cache = SensorWindowCache(window_size=5)
+    assert cache.lookup("s1", BASE_TIME, 3) is None
+
+    cache.store("s1", _history(8), requested=5)  # newest 5 of a longer series
+
+    window = cache.lookup("s1", BASE_TIME + timedelta(minutes=6), 3)
+    assert list(window.values) == [24.0, 25.0, 26.0]
+    # Only two cached readings precede minute 4, older ones live in the database
+    assert cache.lookup("s1", BASE_TIME + timedelta(minutes=4), 3) is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_short_series_is_exact_from_its_first_reading():
+    cache = SensorWindowCache(window_size=5)
+    cache.store("s1", _history(2), requested=5)
+
+    assert len(cache.lookup("s1", BASE_TIME + timedelta(minutes=1), 10)) == 2
+
+
+def test_append_extends_and_trims_the_window():
+    cache = SensorWindowCache(window_size=3)
+    assert cache.append("s1", BASE_TIME, 1.0) is False  # no window to extend
+
+    cache.store("s1", _history(2), requested=3)
+    assert cache.append("s1", BASE_TIME + timedelta(minutes=1), 99.0) is False  # already cached
+    assert cache.append("s1", BASE_TIME + timedelta(minutes=2), 30.0, quality=0.5)
+    assert cache.append("s1", BASE_TIME + timedelta(minutes=3), 31.0)
+
+    window = cache.lookup("s1", BASE_TIME + timedelta(minutes=3), 3)
+    assert list(window.values) == [21.0, 30.0, 31.0]
+    assert window.quality[1] == 0.5 and np.isnan(window.quality[2])
+    # The first reading was trimmed off, so an earlier cutoff can no longer be served
+    assert cache.lookup("s1", BASE_TIME + timedelta(minutes=1), 2) is None
+
+
+def test_windows_are_evicted_lru_and_expire():
+    cache = SensorWindowCache(window_size=2, max_sensors=2)
+    cache.store("s1", _history(2, "s1"), requested=2)
+    cache.store("s2", _history(2, "s2"), requested=2)
+    cache.lookup("s1", BASE_TIME + timedelta(minutes=1), 2)
+    cache.store("s3", _history(2, "s3"), requested=2)
+
+    assert "s1" in cache and "s3" in cache and "s2" not in cache
+    assert cache.get_stats()["evictions"] == 1
+
+    expiring = SensorWindowCache(window_size=2, refresh_seconds=1e-9)
+    expiring.store("s1", _history(2), requested=2)
+    assert expiring.lookup("s1", BASE_TIME + timedelta(minutes=1), 2) is None
+    assert "s1" not in expiring
+
+
+def _anomaly(timestamp: datetime) -> AnomalyDetectedEvent:
+    return AnomalyDetectedEvent(
+        anomaly_details={
+            "sensor_id": "s1",
+            "anomaly_type": AnomalyType.SPIKE.value,
+            "severity": 3,
+            "confidence": 0.6,
+            "description": "spike",
+        },
+        triggering_data={
+            "sensor_id": "s1",
+            "value": 150.0,
+            "timestamp": timestamp.isoformat(),
+            "sensor_type": "temperature",
+            "unit": "C",
+        },
+        correlation_id=str(uuid.uuid4()),
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_serves_steady_state_history_from_the_stream():
+    crud = Mock()
+    crud.fetch_series = AsyncMock(return_value=_history(30))
+    rule_engine = Mock()
+    rule_engine.evaluate_rules = AsyncMock(return_value=(0.0, []))
+    event_bus = Mock()
+    event_bus.publish = AsyncMock()
+    agent = ValidationAgent(
+        agent_id="cached_validation_agent",
+        event_bus=event_bus,
+        crud_sensor_reading=crud,
+        rule_engine=rule_engine,
+        db_session_factory=Mock(return_value=Mock()),
+        specific_settings={"historical_check_limit": 10, "history_window_size": 50},
+    )
+
+    await agent.process(_anomaly(BASE_TIME + timedelta(minutes=29)))
+    assert crud.fetch_series.await_args.kwargs["limit"] == 50
+    assert crud.fetch_series.await_args.kwargs["end_time"] is None
+
+    # A live reading extends the window, so the next anomaly needs no query
+    new_time = BASE_TIME + timedelta(minutes=30)
+    await agent._observe_reading(
+        DataProcessedEvent(
+            processed_data={"sensor_id": "s1", "timestamp": new_time, "value": 50.0, "quality": 1.0}
+        )
+    )
+    await agent.process(_anomaly(new_time))
+
+    assert crud.fetch_series.await_count == 1
+    assert event_bus.publish.await_count == 2
+    stats = (await agent.get_validation_metrics())["history_cache"]
+    assert (stats["loads"], stats["hits"], stats["misses"]) == (1, 2, 1)
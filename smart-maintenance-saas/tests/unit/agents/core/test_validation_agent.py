@@ -4,6 +4,7 @@ import uuid
 from datetime import datetime
 
 from apps.agents.core.validation_agent import ValidationAgent
+from core.database.crud.crud_sensor_reading import SensorHistory
 from core.events.event_models import AnomalyDetectedEvent, AnomalyValidatedEvent
 from data.schemas import AnomalyAlert, SensorReading, ValidationStatus, AnomalyType
 from apps.rules.validation_rules import RuleEngine # Assuming RuleEngine can be mocked or instantiated simply
@@ -23,7 +24,7 @@ def mock_crud_sensor_reading():
     # Configure mock methods as needed, e.g., for _fetch_historical_data
     # Make it async compatible since the real method is async
     from unittest.mock import AsyncMock
-    crud.get_sensor_readings_by_sensor_id = AsyncMock(return_value=[])
+    crud.fetch_series = AsyncMock(return_value=SensorHistory(sensor_id="mock"))
     return crud
 
 @pytest.fixture
@@ -106,7 +107,7 @@ class TestValidationAgentProcessEnumUsage:
         # So, initial confidence 0.6 + rule_adj 0.2 = 0.8. This should be CREDIBLE_ANOMALY.
 
         # If _fetch_historical_data or _perform_historical_validation are async, ensure their mocks are too.
-        # For this test, _fetch_historical_data uses mock_crud_sensor_reading.get_sensor_readings_by_sensor_id
+        # For this test, _fetch_historical_data uses mock_crud_sensor_reading.fetch_series
         # which should be an async mock if the actual method is async.
         # Let's assume they are patched/mocked correctly by fixtures.
         # Keep the AsyncMock setup from the fixture
@@ -187,7 +188,7 @@ class TestValidationAgentProcessEnumUsage:
 # For this example, assuming standard Mocks are okay or will be adjusted if runtime issues arise.
 # The current `mock_event_bus.publish` is a standard Mock. If `event_bus.publish` is an `async def`,
 # it should be `mock_event_bus.publish = AsyncMock()` or similar.
-# The same applies to `rule_engine.evaluate_rules` and `crud_sensor_reading.get_sensor_readings_by_sensor_id`.
+# The same applies to `rule_engine.evaluate_rules` and `crud_sensor_reading.fetch_series`.
 # For simplicity, this example assumes they are either synchronous or the mocking handles async calls.
 # If `pytest-asyncio` is used, it often works fine with standard mocks for awaited calls.
 # Let's refine the mock_event_bus fixture for async.
@@ -206,18 +207,18 @@ def mock_rule_engine(): # Overwrite previous one for async context
 @pytest.fixture
 def mock_crud_sensor_reading(): # Overwrite previous one for async context
     crud = Mock()
-    crud.get_sensor_readings_by_sensor_id = Mock(return_value=[])
+    crud.fetch_series = Mock(return_value=SensorHistory(sensor_id="mock"))
     return crud
 
 # The @pytest.mark.asyncio handles the test coroutine correctly.
 # The mocks for async methods should ideally be AsyncMock if strictness is required,
 # but often standard Mocks work if they just need to be awaitable and return a value.
-# If `evaluate_rules` or `get_sensor_readings_by_sensor_id` are truly async,
+# If `evaluate_rules` or `fetch_series` are truly async,
 # their mocks should be `AsyncMock`.
 # For now, let's assume this setup is sufficient for pytest-asyncio.
 # If `AttributeError: 'Mock' object is not awaitable` occurs, then AsyncMock is needed.
 # e.g. from unittest.mock import AsyncMock
 # mock_event_bus.publish = AsyncMock()
 # mock_rule_engine.evaluate_rules = AsyncMock(return_value=(0.0, ["mock rule reason"]))
-# mock_crud_sensor_reading.get_sensor_readings_by_sensor_id = AsyncMock(return_value=[])
+# mock_crud_sensor_reading.fetch_series = AsyncMock(return_value=[])
 pytest
@@ -0,0 +1,193 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from apps.agents.core.validation_agent import ValidationAgent
+from core.database.crud.crud_sensor_reading import SensorHistory
+from core.events.event_models import AnomalyDetectedEvent
+from data.schemas import AnomalyType
+
+
+def _event(sensor_id: str, timestamp: datetime) -> AnomalyDetectedEvent:
+    return AnomalyDetectedEvent(
+        event_id=str(uuid.uuid4()),
+        anomaly_details={
+            "sensor_id": sensor_id,
+            "anomaly_type": AnomalyType.SPIKE.value,
+            "severity": 3,
+            "confidence": 0.6,
+            "description": "spike",
+        },
+        triggering_data={
+            "sensor_id": sensor_id,
+            "value": 150.0,
+            "timestamp": timestamp.isoformat(),
+            "sensor_type": "temperature",
+            "unit": "C",
+        },
+        correlation_id=str(uuid.uuid4()),
+    )
+
+
+def _history(sensor_id: str, timestamps) -> SensorHistory:
+    return SensorHistory(
+        sensor_id=sensor_id,
+        timestamps=list(timestamps),
+        values=np.arange(len(timestamps), dtype=float) + 20.0,
+        quality=np.ones(len(timestamps)),
+        sensor_type="temperature",
+        unit="C",
+    )
+
+
+def _agent(crud, historical_check_limit=None):
+    rule_engine = Mock()
+    rule_engine.evaluate_rules = AsyncMock(return_value=(0.0, []))
+    event_bus = Mock()
+    event_bus.publish = AsyncMock()
+    specific_settings = {"historical_check_limit": historical_check_limit} if historical_check_limit else None
+    agent = ValidationAgent(
+        agent_id="batch_validation_agent",
+        event_bus=event_bus,
+        crud_sensor_reading=crud,
+        rule_engine=rule_engine,
+        db_session_factory=Mock(return_value=Mock()),
+        specific_settings=specific_settings,
+    )
+    return agent, event_bus
+
+
+@pytest.mark.asyncio
+async def test_batch_fetches_histories_with_one_query():
+    now = datetime.utcnow()
+    crud = Mock()
+    crud.fetch_series = AsyncMock(return_value=SensorHistory(sensor_id="s1"))
+    crud.get_recent_readings_for_sensors = AsyncMock(
+        side_effect=lambda db, sensor_ids, limit_per_sensor, end_times: {
+            sensor_id: _history(sensor_id, [now - timedelta(minutes=2), now - timedelta(minutes=1)])
+            for sensor_id in sensor_ids
+        }
+    )
+    agent, event_bus = _agent(crud)
+
+    events = [_event("s1", now), _event("s2", now), _event("s1", now + timedelta(seconds=5))]
+    await agent._process_batch(events)
+
+    crud.get_recent_readings_for_sensors.assert_awaited_once()
+    kwargs = crud.get_recent_readings_for_sensors.await_args.kwargs
+    assert kwargs["sensor_ids"] == ["s1", "s2"]
+    assert kwargs["end_times"]["s1"] == now + timedelta(seconds=5)
+    assert kwargs["limit_per_sensor"] == 2 * agent.historical_check_limit
+    # Every event, including the second s1 event, is served from the one query
+    crud.fetch_series.assert_not_awaited()
+    assert event_bus.publish.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_prefetch_slices_each_event_window_and_falls_back_when_truncated():
+    start = datetime(2026, 1, 1)
+    timestamps = [start + timedelta(minutes=i) for i in range(6)]
+    crud = Mock()
+    crud.get_recent_readings_for_sensors = AsyncMock(return_value={"s1": _history("s1", timestamps)})
+    agent, _ = _agent(crud, historical_check_limit=3)
+
+    events = [
+        _event("s1", timestamps[5]),
+        _event("s1", timestamps[3]),
+        _event("s1", timestamps[0] - timedelta(seconds=1)),
+    ]
+    prefetched = await agent._prefetch_batch_histories(events)
+
+    assert crud.get_recent_readings_for_sensors.await_args.kwargs["limit_per_sensor"] == 9
+    assert prefetched[0].timestamps == timestamps[3:6]
+    assert prefetched[1].timestamps == timestamps[1:4]
+    # Fewer rows than requested came back, so nothing older exists: an empty window is exact
+    assert len(prefetched[2]) == 0
+
+    dense = [timestamps[3] + timedelta(seconds=20 * i) for i in range(9)]
+    crud.get_recent_readings_for_sensors.return_value = {"s1": _history("s1", dense)}
+    truncated = await agent._prefetch_batch_histories(events)
+    assert set(truncated) == {0}
+
+
+def test_historical_analysis_reads_columnar_histories_newest_first():
+    start = datetime(2026, 1, 1)
+    history = _history("s1", [start + timedelta(minutes=i) for i in range(6)])
+    history.values = np.full(6, 20.0)
+    history.quality = np.array([0.5, 0.5, np.nan, 0.6, 0.5, 0.5])
+    agent, _ = _agent(Mock())
+    alert = Mock(sensor_id="s1")
+
+    adjustment, reasons = agent._analyze_historical_patterns(alert, Mock(value=35.0), history, "cid")
+
+    assert any("stable baseline" in reason for reason in reasons)
+    assert "Low historical data quality (avg: 0.52)" in reasons
+    assert agent._analyze_historical_patterns(alert, Mock(value=35.0), SensorHistory(sensor_id="s1"), "cid")[0] == 0.0
+
+
+def test_vectorized_batch_analysis_matches_per_alert_analysis():
+    start = datetime(2026, 1, 1)
+    stamps = [start + timedelta(minutes=i) for i in range(8)]
+    stable = _history("s1", stamps)
+    stable.values = np.full(8, 20.0)
+    volatile = _history("s2", stamps)
+    volatile.values = np.array([10.0, 30.0, 5.0, 40.0, 12.0, 35.0, 8.0, 50.0])
+    volatile.quality = np.array([0.2, np.nan, 0.4, 0.5, 0.6, 0.3, 0.5, 0.4])
+    short = _history("s3", stamps[:2])
+    windows = [stable, volatile, short, SensorHistory(sensor_id="s4"), stable.to_readings()]
+    current_values = [35.0, 20.0, 21.0, 21.0, 20.001]
+    agent, _ = _agent(Mock())
+
+    batch = agent._analyze_history_windows(current_values, windows)
+
+    assert batch == [agent._analyze_history_windows([value], [window])[0] for value, window in zip(current_values, windows)]
+    assert batch[0][1][0].startswith("Significant deviation from stable baseline")
+    assert any("Recurring anomaly pattern" in reason for reason in batch[1][1])
+    assert any("Low historical data quality" in reason for reason in batch[1][1])
+    assert batch[3] == (0.0, ["No historical readings available for context"])
+    assert batch[4][1] == ["Minor deviation from stable baseline"]
+
+
+@pytest.mark.asyncio
+async def test_batch_analyzes_all_prefetched_events_in_one_pass():
+    now = datetime.utcnow()
+    crud = Mock()
+    crud.fetch_series = AsyncMock(return_value=SensorHistory(sensor_id="s1"))
+    crud.get_recent_readings_for_sensors = AsyncMock(
+        side_effect=lambda db, sensor_ids, limit_per_sensor, end_times: {
+            sensor_id: _history(sensor_id, [now - timedelta(minutes=m) for m in range(6, 0, -1)])
+            for sensor_id in sensor_ids
+        }
+    )
+    agent, event_bus = _agent(crud)
+    analyze = Mock(wraps=agent._analyze_history_windows)
+    agent._analyze_history_windows = analyze
+
+    await agent._process_batch([_event("s1", now), _event("s2", now), _event("s1", now)])
+
+    analyze.assert_called_once()
+    assert len(analyze.call_args.args[1]) == 3
+    assert event_bus.publish.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_evaluates_rules_in_one_call():
+    now = datetime.utcnow()
+    crud = Mock()
+    crud.fetch_series = AsyncMock(return_value=SensorHistory(sensor_id="s1"))
+    agent, event_bus = _agent(crud)
+    agent.rule_engine.evaluate_rules_batch = AsyncMock(
+        side_effect=lambda pairs: [(-0.1, [f"rule hit for {alert.sensor_id}"]) for alert, _ in pairs]
+    )
+
+    await agent._process_batch([_event("s1", now), _event("s2", now)])
+
+    agent.rule_engine.evaluate_rules_batch.assert_awaited_once()
+    agent.rule_engine.evaluate_rules.assert_not_awaited()
+    published = [call.args[0] for call in event_bus.publish.await_args_list]
+    assert all(
+        any(reason.startswith("rule hit for") for reason in event.validation_reasons) for event in published
+    )
@@ -0,0 +1,84 @@
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+from apps.agents.decision import chart_rendering
+from apps.agents.decision.chart_rendering import ChartRenderer, decimate, prepare_chart_data
+
+LINE_CHART = {
+    "chart_type": "line",
+    "title": "Anomaly Trends",
+    "dates": [f"2024-01-{day:02d}" for day in range(1, 11)],
+    "anomaly_counts": [1, 0, 3, 4, 2, 2, 5, 1, 0, 2],
+}
+
+
+def test_decimation_keeps_endpoints_and_extremes():
+    values = np.sin(np.linspace(0, 20, 10_000))
+    values[4321] = 50.0  # a spike must survive
+
+    keep = decimate(values, 500)
+
+    assert len(keep) == 500 and keep[0] == 0 and keep[-1] == 9_999
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+    assert len(decimate(values[:100], 500)) == 100
+
+
+def test_prepare_chart_data_decimates_long_line_series_only():
+    long_chart = {**LINE_CHART, "dates": list(range(5_000)), "anomaly_counts": list(range(5_000))}
+
+    prepared = prepare_chart_data(long_chart, 200)
+
+    assert len(prepared["dates"]) == len(prepared["anomaly_counts"]) == 200
+    assert prepare_chart_data(LINE_CHART, 200) is LINE_CHART
+    bar_chart = {"chart_type": "bar", "categories": list(range(5_000)), "values": list(range(5_000))}
+    assert prepare_chart_data(bar_chart, 200) is bar_chart
+
+
+def test_repeated_charts_are_served_from_the_cache():
+    renderer = ChartRenderer(workers=0, cache_max_entries=1)
+
+    with patch.object(chart_rendering, "render_chart", wraps=chart_rendering.render_chart) as render:
+        png = renderer.render(LINE_CHART)
+        assert png.startswith(b"\x89PNG")
+        assert renderer.render(dict(LINE_CHART)) == png
+        assert renderer.render(LINE_CHART, "svg").lstrip().startswith(b"<?xml")
+        assert renderer.render(LINE_CHART) == png  # evicted by the SVG, rendered again
+
+    assert render.call_count == 3
+    stats = renderer.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["cached_charts"]) == (1, 3, 2, 1)
+
+
+def test_concurrent_requests_for_one_chart_share_a_render():
+    renderer = ChartRenderer(workers=0)
+    started = threading.Event()
+
+    def slow_render(chart_data, fmt):
+        started.set()
+        time.sleep(0.2)
+        return b"image"
+
+    with patch.object(chart_rendering, "render_chart", side_effect=slow_render) as render:
+        results = []
+        first = threading.Thread(target=lambda: results.append(renderer.render(LINE_CHART)))
+        first.start()
+        started.wait()
+        results.append(renderer.render(LINE_CHART))
+        first.join()
+
+    assert results == [b"image", b"image"]
+    assert render.call_count == 1
+    assert renderer.get_stats()["shared"] == 1
+
+
+def test_charts_render_in_worker_processes():
+    renderer = ChartRenderer(workers=1)
+    try:
+        assert renderer.render(LINE_CHART).startswith(b"\x89PNG")
+        assert renderer.get_stats()["rendered"] == 1
+    finally:
+        renderer.shutdown()
@@ -5,6 +5,8 @@ Tests cover all major functionality including data preparation, Prophet modeling
 prediction generation, and event publishing.
 """
 
+import asyncio
+import time
 import unittest
 from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from datetime import datetime, timedelta
@@ -14,6 +16,8 @@ from typing import List, Dict, Any
 import pandas as pd
 
 from apps.agents.decision.prediction_agent import PredictionAgent
+from core.database.crud.crud_sensor_reading import SensorHistory
+from core.events.event_bus import EventBus
 from core.events.event_models import AnomalyValidatedEvent, MaintenancePredictedEvent
 from data.schemas import SensorReading, SensorType
 
@@ -38,7 +42,8 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
             "min_historical_points": 10,
             "prediction_horizon_days": 30,
             "historical_data_limit": 100,
-            "prediction_confidence_threshold": 0.6
+            "prediction_confidence_threshold": 0.6,
+            "prediction_debounce_seconds": 0.0
         }
 
         self.agent = PredictionAgent(
@@ -98,6 +103,10 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         
         return readings
 
+    def _create_mock_sensor_history(self, count: int = 50) -> SensorHistory:
+        """Create a columnar history like CRUDSensorReading.fetch_series returns."""
+        return SensorHistory.from_readings("test_sensor_001", self._create_mock_sensor_readings(count))
+
     # Tests for initialization and configuration
 
     def test_agent_initialization(self):
@@ -258,8 +267,10 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
             ) for i in range(20)
         ]
         
-        # Mock the get_sensor_readings_as_pydantic method
-        self.mock_crud_sensor_reading.get_sensor_readings_as_pydantic.return_value = mock_readings
+        # Mock the columnar fetch_series method
+        self.mock_crud_sensor_reading.fetch_series.return_value = SensorHistory.from_readings(
+            "test_sensor", mock_readings
+        )
         
         readings, error = await self.agent._fetch_historical_data_for_prediction(
             sensor_id="test_sensor", limit=100
@@ -267,7 +278,7 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         
         self.assertEqual(len(readings), 20)
         self.assertIsNone(error)
-        self.mock_crud_sensor_reading.get_sensor_readings_as_pydantic.assert_called_once()
+        self.mock_crud_sensor_reading.fetch_series.assert_called_once()
         self.mock_db_session.close.assert_called_once()
 
     async def test_fetch_historical_data_no_session_factory(self):
@@ -287,7 +298,7 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
 
     async def test_fetch_historical_data_database_error(self):
         """Test historical data fetching with database error."""
-        self.mock_crud_sensor_reading.get_sensor_readings_as_pydantic.side_effect = Exception("DB Error")
+        self.mock_crud_sensor_reading.fetch_series.side_effect = Exception("DB Error")
         
         readings, error = await self.agent._fetch_historical_data_for_prediction("test_sensor")
         
@@ -332,6 +343,39 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         self.assertIn('recommended_actions', result)
         self.assertIn('model_metrics', result)
 
+    @patch('apps.agents.decision.prediction_agent.Prophet')
+    async def test_generate_prediction_reuses_and_warm_starts_cached_fits(self, mock_prophet_class):
+        """Repeated predictions reuse the sensor's fit; refits start from its parameters."""
+        mock_model = MagicMock()
+        mock_prophet_class.return_value = mock_model
+        mock_model.predict.return_value = pd.DataFrame({
+            'ds': pd.date_range(start=datetime.utcnow(), periods=30, freq='D'),
+            'yhat': [25.0 + i * 0.1 for i in range(30)],
+            'yhat_lower': [20.0 + i * 0.1 for i in range(30)],
+            'yhat_upper': [30.0 + i * 0.1 for i in range(30)]
+        })
+        mock_model.params = {
+            'k': [[0.1]], 'm': [[0.5]], 'sigma_obs': [[0.05]], 'delta': [[0.0] * 3], 'beta': [[0.0] * 2]
+        }
+        self.agent.fit_cache.refit_after_points = 5
+        history = pd.DataFrame({
+            'ds': pd.date_range(start=datetime.utcnow() - timedelta(days=40), periods=40, freq='D'),
+            'y': [25.0 + i * 0.05 for i in range(40)]
+        })
+
+        await self.agent._generate_prediction(history[:30], "test_sensor")
+        await self.agent._generate_prediction(history[:33], "test_sensor")
+        self.assertEqual(mock_model.fit.call_count, 1)
+        self.assertNotIn('init', mock_model.fit.call_args.kwargs)
+
+        await self.agent._generate_prediction(history, "test_sensor")
+        self.assertEqual(mock_model.fit.call_count, 2)
+        self.assertEqual(mock_model.fit.call_args.kwargs['init']['k'], 0.1)
+        self.assertEqual(
+            self.agent.fit_cache.get_stats(),
+            {"hits": 1, "warm_refits": 1, "cold_fits": 1, "evictions": 0, "sensors": 1},
+        )
+
     @patch('apps.agents.decision.prediction_agent.Prophet')
     async def test_generate_prediction_prophet_error(self, mock_prophet_class):
         """Test prediction generation with Prophet error."""
@@ -343,9 +387,35 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         })
         
         result = await self.agent._generate_prediction(test_data, "test_sensor")
-        
+
         self.assertIsNone(result)
 
+    @patch('apps.agents.decision.prediction_agent.Prophet')
+    async def test_fast_path_answers_stable_trends_without_prophet(self, mock_prophet_class):
+        """A confident, distant threshold crossing is published from the trend fast path."""
+        self.mock_crud_sensor_reading.fetch_series.return_value = self._create_mock_sensor_history(50)
+
+        await self.agent.process(self._create_anomaly_validated_event())
+        await self.agent.wait_for_predictions()
+
+        mock_prophet_class.assert_not_called()
+        published_event = self.mock_event_bus.publish.call_args.args[0]
+        self.assertEqual(published_event.prediction_method, 'trend_fast_path')
+        self.assertEqual(published_event.maintenance_type, 'inspection')
+        self.assertGreaterEqual(published_event.prediction_confidence, self.agent.fast_path_min_confidence)
+
+    def test_fast_path_escalates_near_threshold_and_uncertain_trends(self):
+        """Steep or noisy trends are left to Prophet."""
+        days = pd.date_range(start=datetime.utcnow() - timedelta(days=40), periods=40, freq='D')
+        steep = pd.DataFrame({'ds': days, 'y': [2.0 * i - 60.0 for i in range(40)]})  # doubles in 9 days
+        noisy = pd.DataFrame({'ds': days, 'y': [25.0 + (30.0 if i % 2 else -20.0) for i in range(40)]})
+
+        self.assertIsNone(self.agent._fast_path_prediction(steep, "test_sensor"))
+        self.assertIsNone(self.agent._fast_path_prediction(noisy, "test_sensor"))
+        self.agent.fast_path_enabled = False
+        flat = pd.DataFrame({'ds': days, 'y': [25.0] * 40})
+        self.assertIsNone(self.agent._fast_path_prediction(flat, "test_sensor"))
+
     # Tests for maintenance recommendation generation
 
     def test_generate_maintenance_recommendations_urgent(self):
@@ -383,11 +453,8 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
 
     # Tests for model metrics calculation
 
-    @patch('apps.agents.decision.prediction_agent.Prophet')
-    def test_calculate_model_metrics(self, mock_prophet_class):
+    def test_calculate_model_metrics(self):
         """Test model metrics calculation."""
-        mock_model = Mock()
-        
         historical_data = pd.DataFrame({
             'ds': pd.date_range(start=datetime.utcnow() - timedelta(days=10), periods=10, freq='D'),
             'y': [25.0, 26.0, 24.0, 27.0, 25.5, 26.5, 24.5, 27.5, 25.2, 26.8]
@@ -399,7 +466,7 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         }
         forecast = pd.DataFrame(forecast_data)
         
-        metrics = self.agent._calculate_model_metrics(mock_model, historical_data, forecast)
+        metrics = self.agent._calculate_model_metrics(historical_data, forecast)
         
         self.assertIn('mae', metrics)
         self.assertIn('rmse', metrics)
@@ -475,8 +542,7 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
     async def test_process_full_pipeline_success(self, mock_prophet_class):
         """Test the complete processing pipeline."""
         # Setup mocks - use the correct method that returns Pydantic objects
-        mock_readings = self._create_mock_sensor_readings(50)
-        self.mock_crud_sensor_reading.get_sensor_readings_as_pydantic.return_value = mock_readings
+        self.mock_crud_sensor_reading.fetch_series.return_value = self._create_mock_sensor_history(50)
         
         # Setup Prophet mock
         mock_model = MagicMock()
@@ -494,20 +560,92 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         # Process event
         event = self._create_anomaly_validated_event()
         await self.agent.process(event)
+        await self.agent.wait_for_predictions()
         
         # Verify event was published
         self.mock_event_bus.publish.assert_called_once()
         published_event = self.mock_event_bus.publish.call_args.args[0]
         self.assertIsInstance(published_event, MaintenancePredictedEvent)
 
+    async def test_process_coalesces_trigger_bursts_per_sensor(self):
+        """Triggers within the debounce window collapse into one run with the latest event."""
+        self.agent.debounce_seconds = 0.05
+        self.agent._predict_for_event = AsyncMock()
+        burst = [self._create_anomaly_validated_event() for _ in range(3)]
+        other_sensor = self._create_anomaly_validated_event(sensor_id="test_sensor_002")
+
+        await asyncio.gather(*(self.agent.process(event) for event in burst + [other_sensor]))
+        await self.agent.wait_for_predictions()
+
+        self.assertEqual(
+            [call.args[0] for call in self.agent._predict_for_event.call_args_list], [burst[-1], other_sensor]
+        )
+        self.assertEqual(self.agent.trigger_stats, {"triggers": 4, "runs": 2, "coalesced": 2})
+
+    async def test_process_keeps_one_prediction_in_flight_per_sensor(self):
+        """Triggers arriving during a run are served by a single follow-up run."""
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_prediction(event, equipment_id, sensor_id):
+            calls.append(event)
+            await release.wait()
+
+        self.agent._predict_for_event = slow_prediction
+        first, second, third = (self._create_anomaly_validated_event() for _ in range(3))
+        await self.agent.process(first)
+        await asyncio.sleep(0)  # let the scheduled run start
+        await self.agent.process(second)
+        await self.agent.process(third)
+        self.assertEqual(calls, [first])
+
+        release.set()
+        await self.agent.wait_for_predictions()
+        self.assertEqual(calls, [first, third])
+        self.assertEqual(self.agent._active_keys, set())
+
+    async def test_back_to_back_publishes_coalesce_without_waiting_for_the_debounce(self):
+        """One publisher's burst returns immediately and yields a single prediction."""
+        event_bus = EventBus()
+        agent = PredictionAgent(
+            agent_id="test_prediction_agent_bus",
+            event_bus=event_bus,
+            crud_sensor_reading=self.mock_crud_sensor_reading,
+            db_session_factory=self.mock_db_session_factory,
+            specific_settings={**self.test_settings, "prediction_debounce_seconds": 0.2},
+        )
+        agent._predict_for_event = AsyncMock()
+        await agent.start()
+        burst = [self._create_anomaly_validated_event() for _ in range(5)]
+
+        started = time.monotonic()
+        for event in burst:
+            await event_bus.publish(event)
+        self.assertLess(time.monotonic() - started, agent.debounce_seconds)
+
+        await agent.wait_for_predictions()
+        self.assertEqual([call.args[0] for call in agent._predict_for_event.call_args_list], [burst[-1]])
+        await agent.stop()
+
+    async def test_stop_cancels_pending_predictions(self):
+        """Runs still waiting out the debounce window are cancelled on stop."""
+        self.agent.debounce_seconds = 60
+        self.agent._predict_for_event = AsyncMock()
+        await self.agent.process(self._create_anomaly_validated_event())
+
+        await self.agent.stop()
+
+        self.assertEqual(self.agent._prediction_runs, set())
+        self.agent._predict_for_event.assert_not_called()
+
     async def test_process_insufficient_data(self):
         """Test processing with insufficient historical data."""
         # Setup minimal data (less than min_historical_points)
-        mock_readings = self._create_mock_sensor_readings(5)
-        self.mock_crud_sensor_reading.get_sensor_readings_as_pydantic.return_value = mock_readings
+        self.mock_crud_sensor_reading.fetch_series.return_value = self._create_mock_sensor_history(5)
         
         event = self._create_anomaly_validated_event()
         await self.agent.process(event)
+        await self.agent.wait_for_predictions()
         
         # Should not publish any event due to insufficient data
         self.mock_event_bus.publish.assert_not_called()
@@ -522,7 +660,7 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         await self.agent.process(event)
         
         # Should not proceed with prediction
-        self.mock_crud_sensor_reading.get_sensor_readings_by_sensor_id.assert_not_called()
+        self.mock_crud_sensor_reading.fetch_series.assert_not_called()
         self.mock_event_bus.publish.assert_not_called()
 
     async def test_process_no_sensor_id(self):
@@ -534,7 +672,7 @@ class TestPredictionAgent(unittest.IsolatedAsyncioTestCase):
         await self.agent.process(event)
         
         # Should not proceed with prediction
-        self.mock_crud_sensor_reading.get_sensor_readings_by_sensor_id.assert_not_called()
+        self.mock_crud_sensor_reading.fetch_series.assert_not_called()
         self.mock_event_bus.publish.assert_not_called()
 
 
@@ -9,19 +9,44 @@ import base64
 import json
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timedelta
-from io import BytesIO
+from datetime import datetime, timedelta, timezone
 
-from apps.agents.decision.reporting_agent import ReportingAgent, AnalyticsEngine
+from matplotlib.axes import Axes
+
+from apps.agents.decision.chart_rendering import ChartRenderer
+from apps.agents.decision.reporting_agent import ReportingAgent, AnalyticsEngine, _sync_database_url
 from data.schemas import ReportRequest, ReportResult
 
 
+def _days(start, count):
+    return [start + timedelta(days=i) for i in range(count)]
+
+
+# Canned rows per query, as TimescaleDB would return them
+AGGREGATE_ROWS = {
+    "anomaly_series": [{"bucket": day, "anomalies": count} for day, count in zip(_days(datetime(2024, 1, 1), 4), [1, 0, 3, 4])],
+    "anomaly_totals": [{"sensors_affected": 3, "false_positives": 2, "alerts": 8}],
+    "task_totals": [{"total": 10, "completed": 6, "pending": 3, "overdue": 1, "avg_completion_hours": 3.456, "equipment": 4}],
+    "log_totals": [{"mttr_hours": 2.5, "hours_logged": 15.0, "technicians": 2, "equipment": 3}],
+    "sensor_series": [{"bucket": day, "reporting_sensors": count} for day, count in zip(_days(datetime(2024, 1, 1), 2), [4, 2])],
+    "sensor_totals": [{"sensors": 4, "active_sensors": 3, "data_quality": 0.9, "ingestion_latency_ms": 120.0}],
+    "alert_totals": [{"alerts": 8, "critical_alerts": 1}],
+}
+
+
 class TestAnalyticsEngine:
     """Test cases for the AnalyticsEngine class."""
 
     def setup_method(self):
         """Set up test fixtures."""
-        self.analytics_engine = AnalyticsEngine()
+        self.analytics_engine = AnalyticsEngine(engine=MagicMock())
+        self.queries = []
+
+        def rows(connection, query, **params):
+            self.queries.append((query, params))
+            return AGGREGATE_ROWS[query]
+
+        self.analytics_engine._rows = rows
 
     def test_init(self):
         """Test AnalyticsEngine initialization."""
@@ -39,39 +64,50 @@ class TestAnalyticsEngine:
         
         result = self.analytics_engine.analyze(request)
         
-        # Check required fields are present
-        assert "total_anomalies" in result
-        assert "avg_anomalies_per_day" in result
-        assert "chart_data" in result
-        assert "sensors_affected" in result
-        assert "false_positive_rate" in result
+        assert result["total_anomalies"] == 8
+        assert result["avg_anomalies_per_day"] == 2.0
+        assert result["peak_anomaly_day"] == 4
+        assert result["anomaly_trend"] == "increasing"
+        assert result["sensors_affected"] == 3
+        assert result["false_positive_rate"] == 0.25
         
         # Check chart data structure
         chart_data = result["chart_data"]
-        assert "dates" in chart_data
-        assert "anomaly_counts" in chart_data
+        assert chart_data["dates"] == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+        assert chart_data["anomaly_counts"] == [1, 0, 3, 4]
         assert chart_data["chart_type"] == "line"
         assert chart_data["title"] == "Anomalies Over Time"
 
+        # Naive bounds are UTC and passed to the database as parameters
+        assert [query for query, _ in self.queries] == ["anomaly_series", "anomaly_totals"]
+        assert self.queries[0][1] == {
+            "start": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "end": datetime(2024, 1, 31, tzinfo=timezone.utc),
+        }
+
     def test_analyze_maintenance_overview(self):
         """Test analyze method with maintenance_overview report type."""
         request = ReportRequest(
             report_type="maintenance_overview",
-            format="json"
+            format="json",
+            time_range_start=datetime(2024, 1, 1),
+            time_range_end=datetime(2024, 1, 8)  # 5 working days
         )
         
         result = self.analytics_engine.analyze(request)
         
-        # Check required fields
-        assert "total_maintenance_tasks" in result
-        assert "completed_tasks" in result
-        assert "chart_data" in result
+        assert result["total_maintenance_tasks"] == 10
+        assert result["completed_tasks"] == 6
+        assert result["avg_completion_time"] == 3.46
+        assert result["mttr_hours"] == 2.5
+        assert result["technician_utilization"] == 0.15  # 15h of 2 x 50 working hours
+        assert result["equipment_uptime"] == round(1 - 15.0 / (4 * 168), 3)
         
         # Check chart data for bar chart
         chart_data = result["chart_data"]
         assert chart_data["chart_type"] == "bar"
-        assert "categories" in chart_data
-        assert "values" in chart_data
+        assert chart_data["categories"] == ["Completed", "Pending", "Overdue"]
+        assert chart_data["values"] == [6, 3, 1]
 
     def test_analyze_system_health(self):
         """Test analyze method with system_health report type."""
@@ -82,15 +118,39 @@ class TestAnalyticsEngine:
         
         result = self.analytics_engine.analyze(request)
         
-        # Check required fields
-        assert "overall_system_health" in result
-        assert "active_sensors" in result
-        assert "chart_data" in result
+        assert result["active_sensors"] == 3
+        assert result["inactive_sensors"] == 1
+        assert result["data_quality_score"] == 0.9
+        assert result["avg_response_time_ms"] == 120.0
+        assert result["overall_system_health"] == round(0.5 * 75.0 + 45.0, 2)
+        assert result["critical_alerts"] == 1
         
         # Check chart data
         chart_data = result["chart_data"]
         assert chart_data["chart_type"] == "line"
-        assert "uptime_percentages" in chart_data
+        assert chart_data["uptime_percentages"] == [100.0, 50.0]
+        # The uptime chart covers at most the last 14 days
+        series_params = dict(self.queries)["sensor_series"]
+        assert series_params["end"] - series_params["start"] == timedelta(days=14)
+
+    def test_analyze_empty_range(self):
+        """Empty tables give zero KPIs instead of errors."""
+        self.analytics_engine._rows = lambda connection, query, **params: (
+            [] if query.endswith("series") else [dict.fromkeys(AGGREGATE_ROWS[query][0])]
+        )
+
+        anomalies = self.analytics_engine.analyze(ReportRequest(report_type="anomaly_summary"))
+        maintenance = self.analytics_engine.analyze(ReportRequest(report_type="maintenance_overview"))
+
+        assert anomalies["total_anomalies"] == 0 and anomalies["false_positive_rate"] == 0.0
+        assert anomalies["anomaly_trend"] == "stable"
+        assert maintenance["total_maintenance_tasks"] == 0
+        assert maintenance["technician_utilization"] is None and maintenance["mttr_hours"] is None
+
+    def test_sync_database_url(self):
+        """Analytics always use the declared psycopg2 driver."""
+        assert _sync_database_url("postgresql://u:p@db:5432/x") == "postgresql+psycopg2://u:p@db:5432/x"
+        assert _sync_database_url("postgresql+asyncpg://u:p@db/x?ssl=require") == "postgresql+psycopg2://u:p@db/x?ssl=require"
 
     def test_analyze_unknown_report_type(self):
         """Test analyze method with unknown report type."""
@@ -105,6 +165,7 @@ class TestAnalyticsEngine:
         assert "data_points" in result
         assert "chart_data" in result
         assert result["chart_data"]["chart_type"] == "none"
+        assert self.queries == []
 
 
 class TestReportingAgent:
@@ -113,7 +174,9 @@ class TestReportingAgent:
     def setup_method(self):
         """Set up test fixtures."""
         self.mock_event_bus = Mock()
-        self.agent = ReportingAgent("test-reporting-agent", self.mock_event_bus)
+        self.agent = ReportingAgent(
+            "test-reporting-agent", self.mock_event_bus, chart_renderer=ChartRenderer(workers=0)
+        )
 
     @pytest.mark.asyncio
     async def test_init(self):
@@ -336,75 +399,46 @@ class TestReportingAgent:
         assert "Active Sensors: 45" in content
         assert "Sensor Availability: 93.8%" in content
 
-    @patch('matplotlib.pyplot.subplots')
-    @patch('matplotlib.pyplot.savefig')
-    @patch('matplotlib.pyplot.close')
-    @patch('matplotlib.pyplot.tight_layout')
-    @patch('matplotlib.pyplot.xticks')
-    def test_generate_chart_line_chart(self, mock_xticks, mock_tight_layout, 
-                                      mock_close, mock_savefig, mock_subplots):
+    def test_generate_chart_line_chart(self):
         """Test _generate_chart for line chart generation."""
-        # Setup mocks
-        mock_fig = MagicMock()
-        mock_ax = MagicMock()
-        mock_subplots.return_value = (mock_fig, mock_ax)
-        
-        # Mock BytesIO
-        mock_buffer = MagicMock()
-        mock_buffer.getvalue.return_value = b"fake_image_data"
-        
-        with patch('io.BytesIO', return_value=mock_buffer):
-            with patch('base64.b64encode') as mock_b64encode:
-                mock_b64encode.return_value = b"encoded_chart_data"
-                
-                chart_data = {
-                    "chart_type": "line",
-                    "title": "Test Chart",
-                    "xlabel": "X Label",
-                    "ylabel": "Y Label",
-                    "dates": ["2024-01-01", "2024-01-02"],
-                    "anomaly_counts": [5, 8]
-                }
-                
-                result = self.agent._generate_chart(chart_data)
-                
-                assert result == "encoded_chart_data"
-                mock_subplots.assert_called_once_with(figsize=(10, 6))
-                mock_ax.plot.assert_called_once()
-                mock_ax.set_title.assert_called_once_with("Test Chart", fontsize=14, fontweight='bold')
-                mock_savefig.assert_called_once()
-                mock_close.assert_called_once()
-
-    @patch('matplotlib.pyplot.subplots')
-    @patch('matplotlib.pyplot.savefig')
-    @patch('matplotlib.pyplot.close')
-    @patch('matplotlib.pyplot.tight_layout')
-    def test_generate_chart_bar_chart(self, mock_tight_layout, mock_close, 
-                                     mock_savefig, mock_subplots):
+        chart_data = {
+            "chart_type": "line",
+            "title": "Test Chart",
+            "xlabel": "X Label",
+            "ylabel": "Y Label",
+            "dates": ["2024-01-01", "2024-01-02"],
+            "anomaly_counts": [5, 8]
+        }
+
+        with patch('matplotlib.axes.Axes.plot', autospec=True, side_effect=Axes.plot) as mock_plot:
+            result = self.agent._generate_chart(chart_data)
+
+        assert base64.b64decode(result).startswith(b"\x89PNG")
+        assert mock_plot.call_args.args[1:] == (["2024-01-01", "2024-01-02"], [5, 8])
+
+    def test_generate_chart_bar_chart(self):
         """Test _generate_chart for bar chart generation."""
-        # Setup mocks
-        mock_fig = MagicMock()
-        mock_ax = MagicMock()
-        mock_subplots.return_value = (mock_fig, mock_ax)
-        
-        mock_buffer = MagicMock()
-        mock_buffer.getvalue.return_value = b"fake_bar_chart_data"
-        
-        with patch('io.BytesIO', return_value=mock_buffer):
-            with patch('base64.b64encode') as mock_b64encode:
-                mock_b64encode.return_value = b"encoded_bar_chart"
-                
-                chart_data = {
-                    "chart_type": "bar",
-                    "title": "Bar Chart",
-                    "categories": ["A", "B", "C"],
-                    "values": [10, 15, 8]
-                }
-                
-                result = self.agent._generate_chart(chart_data)
-                
-                assert result == "encoded_bar_chart"
-                mock_ax.bar.assert_called_once_with(["A", "B", "C"], [10, 15, 8])
+        chart_data = {
+            "chart_type": "bar",
+            "title": "Bar Chart",
+            "categories": ["A", "B", "C"],
+            "values": [10, 15, 8]
+        }
+
+        with patch('matplotlib.axes.Axes.bar', autospec=True, side_effect=Axes.bar) as mock_bar:
+            result = self.agent._generate_chart(chart_data)
+
+        assert base64.b64decode(result).startswith(b"\x89PNG")
+        assert mock_bar.call_args.args[1:] == (["A", "B", "C"], [10, 15, 8])
+
+    def test_generate_chart_svg_and_cache(self):
+        """Test SVG output and that repeated charts come from the cache."""
+        chart_data = {"chart_type": "bar", "title": "Bar Chart", "categories": ["A"], "values": [1]}
+
+        svg = self.agent._generate_chart(chart_data, "svg")
+        assert b"<svg" in base64.b64decode(svg)
+        assert self.agent._generate_chart(chart_data, "svg") == svg
+        assert self.agent.chart_renderer.get_stats()["hits"] == 1
 
     def test_generate_chart_no_data(self):
         """Test _generate_chart with no chart data."""
@@ -414,11 +448,10 @@ class TestReportingAgent:
         result = self.agent._generate_chart({"chart_type": "none"})
         assert result is None
 
-    @patch('matplotlib.pyplot.subplots')
-    @patch('matplotlib.pyplot.close')
-    def test_generate_chart_exception_handling(self, mock_close, mock_subplots):
+    @patch('apps.agents.decision.chart_rendering.render_chart')
+    def test_generate_chart_exception_handling(self, mock_render):
         """Test _generate_chart handles exceptions gracefully."""
-        mock_subplots.side_effect = Exception("Matplotlib error")
+        mock_render.side_effect = Exception("Matplotlib error")
         
         chart_data = {
             "chart_type": "line",
@@ -430,7 +463,7 @@ class TestReportingAgent:
         result = self.agent._generate_chart(chart_data)
         
         assert result is None
-        mock_close.assert_called_once_with('all')
+        assert self.agent.chart_renderer.get_stats()["failed"] == 1
 
     def test_report_id_generation(self):
         """Test that report_id is generated when not provided."""
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from apps.agents.decision.schedule_optimizer import STABILITY_BONUS, WorkingTimeGrid, build_task, cp_model, solve_window
+
+pytestmark = pytest.mark.skipif(cp_model is None, reason="OR-Tools not installed")
+
+FRIDAY_NOON = datetime(2026, 1, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def test_grid_maps_working_time_and_skips_weekends():
+    grid = WorkingTimeGrid(FRIDAY_NOON, horizon_days=7)
+
+    assert len(grid.days) == 5  # Fri + Mon-Thu
+    assert grid.first_slot == 16  # Friday 12:00 is 4h after opening
+    assert grid.slot_start(grid.first_slot) == FRIDAY_NOON
+    # Saturday maps to Monday's opening; a task ending at Friday's close ends at 18:00
+    assert grid.slot_at_or_after(datetime(2026, 1, 3, 9, 0)) == 40
+    assert grid.slot_start(40) == datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc)
+    assert grid.slot_end(40) == datetime(2026, 1, 2, 18, 0, tzinfo=timezone.utc)
+    assert grid.boundary_at_or_before(datetime(2026, 1, 5, 9, 10)) == 44
+
+
+def test_build_task_reports_unplaceable_requests_and_relaxes_missed_windows():
+    grid = WorkingTimeGrid(FRIDAY_NOON, horizon_days=7)
+
+    assert build_task(grid, "r1", 1, 11.0, {"t1": 0})[1] == "duration_exceeds_working_day"
+    assert build_task(grid, "r2", 1, 2.0, {"t1": 0}, earliest=datetime(2026, 2, 1))[1] == "outside_scheduling_horizon"
+    task, _ = build_task(grid, "r3", 1, 4.0, {"t1": 0}, latest_end=datetime(2026, 1, 2, 13, 0))
+    assert task.window_relaxed and task.latest_end_slot == grid.horizon
+
+
+def test_window_is_solved_jointly_around_existing_bookings():
+    grid = WorkingTimeGrid(FRIDAY_NOON, horizon_days=7)
+    tasks = [build_task(grid, f"r{i}", 3, 2.0, {"t1": 5})[0] for i in range(3)]
+
+    solution = solve_window(grid, tasks, busy={"t1": [(16, 24)]}, workers=2, time_limit_seconds=5.0)
+
+    assert solution.status == "OPTIMAL"
+    spans = sorted((a.start_slot, a.end_slot) for a in solution.assignments.values())
+    assert spans == [(24, 32), (32, 40), (40, 48)]  # after the booking, never across the weekend
+
+
+def test_urgent_requests_win_when_capacity_runs_out():
+    grid = WorkingTimeGrid(FRIDAY_NOON, horizon_days=1)  # Friday afternoon only: room for 3 two-hour tasks
+    tasks = [build_task(grid, f"low{i}", 5, 2.0, {"t1": 10})[0] for i in range(3)]
+    tasks.append(build_task(grid, "urgent", 1, 2.0, {"t1": 0})[0])
+
+    solution = solve_window(grid, tasks, busy={}, hints={"low0": ("t1", 16)}, workers=2, time_limit_seconds=5.0)
+
+    assert set(solution.assignments) >= {"urgent"} and len(solution.assignments) == 3
+    assert solution.assignments["urgent"].start_slot == 16
+
+
+def test_stability_bonus_keeps_hinted_tasks_in_place():
+    grid = WorkingTimeGrid(FRIDAY_NOON, horizon_days=7)
+    task, _ = build_task(grid, "booked", 3, 2.0, {"t1": 5, "t2": 5})
+
+    hinted = {"booked": ("t2", 24)}
+    assert solve_window(grid, [task], busy={}, hints=hinted, workers=2).assignments["booked"].start_slot == 16
+    kept = solve_window(grid, [task], busy={}, hints=hinted, workers=2, stability_bonus=STABILITY_BONUS)
+    assert (kept.assignments["booked"].technician_id, kept.assignments["booked"].start_slot) == ("t2", 24)
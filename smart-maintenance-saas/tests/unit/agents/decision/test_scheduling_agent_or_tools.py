@@ -7,13 +7,13 @@ separate from the existing greedy algorithm tests to avoid breaking current func
 
 import pytest
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch, AsyncMock
 from uuid import uuid4
 
-from apps.agents.decision.scheduling_agent import SchedulingAgent
+from apps.agents.decision.scheduling_agent import SchedulingAgent, cp_model
 from data.schemas import MaintenanceRequest, ScheduleStatus, OptimizedSchedule
-from core.events.event_models import MaintenancePredictedEvent
+from core.events.event_models import MaintenancePredictedEvent, MaintenanceScheduleChangedEvent
 
 
 class TestSchedulingAgentORTools:
@@ -267,3 +267,131 @@ class TestSchedulingAgentORTools:
             # Both should be schedulable since we have multiple technicians
             assert result1.status in [ScheduleStatus.SCHEDULED, ScheduleStatus.FAILED_TO_SCHEDULE]
             assert result2.status in [ScheduleStatus.SCHEDULED, ScheduleStatus.FAILED_TO_SCHEDULE]
+
+
+def _prediction_event(equipment_id: str, days_to_failure: float = 20.0) -> MaintenancePredictedEvent:
+    now = datetime.now(timezone.utc)
+    return MaintenancePredictedEvent(
+        original_anomaly_event_id=uuid4(),
+        equipment_id=equipment_id,
+        predicted_failure_date=now + timedelta(days=days_to_failure),
+        confidence_interval_lower=now + timedelta(days=days_to_failure - 1),
+        confidence_interval_upper=now + timedelta(days=days_to_failure + 1),
+        prediction_confidence=0.9,
+        time_to_failure_days=days_to_failure,
+        maintenance_type="preventive",
+        prediction_method="prophet",
+        historical_data_points=100,
+        agent_id="prediction_agent",
+    )
+
+
+@pytest.mark.skipif(cp_model is None, reason="OR-Tools not installed")
+class TestSchedulingWindow:
+    """Requests collected in a scheduling window are solved in one model."""
+
+    @pytest.mark.asyncio
+    async def test_full_window_is_solved_jointly(self):
+        event_bus = AsyncMock()
+        agent = SchedulingAgent("window_scheduling_agent", event_bus)
+        agent.window_max_requests = 3
+        with patch('core.config.settings.settings.USE_OR_TOOLS_SCHEDULER', True), \
+                patch.object(agent, '_schedule_window', wraps=agent._schedule_window) as schedule_window:
+            for index in range(3):
+                await agent.handle_maintenance_predicted_event(_prediction_event(f"PUMP_{index}"))
+
+        schedule_window.assert_awaited_once()
+        assert len(schedule_window.await_args.args[0]) == 3
+        published = [call.args[0] for call in event_bus.publish.await_args_list]
+        assert len(published) == 3
+        assert {event.scheduling_method for event in published} == {"or_tools_window"}
+        by_technician = {}
+        for event in published:
+            by_technician.setdefault(event.assigned_technician_id, []).append(
+                (event.scheduled_start_time, event.scheduled_end_time)
+            )
+        for spans in by_technician.values():
+            spans.sort()
+            assert all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+        assert len(agent.current_schedule) == 3
+
+    @pytest.mark.asyncio
+    async def test_window_is_flushed_after_its_timeout_and_on_stop(self):
+        event_bus = AsyncMock()
+        agent = SchedulingAgent("window_scheduling_agent", event_bus)
+        agent.window_seconds = 0.01
+        with patch('core.config.settings.settings.USE_OR_TOOLS_SCHEDULER', True):
+            await agent.handle_maintenance_predicted_event(_prediction_event("PUMP_1"))
+            event_bus.publish.assert_not_awaited()
+            await asyncio.sleep(0.5)
+            assert event_bus.publish.await_count == 1
+
+            agent.window_seconds = 60.0
+            await agent.handle_maintenance_predicted_event(_prediction_event("PUMP_2"))
+            await agent.stop()
+
+        assert event_bus.publish.await_count == 2
+        assert agent.window_stats == {"requests": 2, "windows": 2, "scheduled": 2}
+
+
+def _electrical_request(request_id: str, priority: int, **windows) -> MaintenanceRequest:
+    # Only tech_001 has electrical skills
+    return MaintenanceRequest(
+        id=request_id, equipment_id=f"EQ_{request_id}", maintenance_type="repair", priority=priority,
+        estimated_duration_hours=2.0, required_skills=["electrical"], **windows
+    )
+
+
+@pytest.mark.skipif(cp_model is None, reason="OR-Tools not installed")
+class TestScheduleReoptimization:
+    """Booked work of affected technicians is re-solved around new requests."""
+
+    @pytest.mark.asyncio
+    async def test_urgent_request_displaces_booked_work_and_publishes_the_diff(self):
+        event_bus = AsyncMock()
+        agent = SchedulingAgent("reoptimizing_agent", event_bus)
+        [booked] = await agent._schedule_window([_electrical_request("low", 5)])
+
+        # The urgent request must finish by the end of the existing booking
+        [urgent] = await agent._schedule_window(
+            [_electrical_request("urgent", 1, preferred_time_window_end=booked.scheduled_end_time)]
+        )
+
+        assert urgent.status == ScheduleStatus.SCHEDULED
+        assert urgent.scheduled_start_time == booked.scheduled_start_time
+        moved = agent.current_schedule["low"]
+        assert moved.scheduled_start_time >= urgent.scheduled_end_time
+        [change] = [call.args[0] for call in event_bus.publish.await_args_list]
+        assert isinstance(change, MaintenanceScheduleChangedEvent)
+        assert (change.request_id, change.change_type, change.triggering_request_ids) == ("low", "rescheduled", ["urgent"])
+        assert change.previous_start_time == booked.scheduled_start_time
+        assert change.scheduled_start_time == moved.scheduled_start_time
+        assert agent.calendar_service.index.get_stats()["active_bookings"] == 2
+        assert agent.reoptimization_stats == {"reopened": 1, "moved": 1, "unscheduled": 0}
+
+    @pytest.mark.asyncio
+    async def test_booked_work_stays_put_without_a_reason_to_move(self):
+        event_bus = AsyncMock()
+        agent = SchedulingAgent("reoptimizing_agent", event_bus)
+        [first] = await agent._schedule_window([_electrical_request("first", 3)])
+
+        [second] = await agent._schedule_window([_electrical_request("second", 3)])
+
+        assert agent.current_schedule["first"] == first
+        assert second.scheduled_start_time >= first.scheduled_end_time
+        event_bus.publish.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_bookings_are_pinned_when_reoptimization_is_disabled(self):
+        event_bus = AsyncMock()
+        agent = SchedulingAgent("reoptimizing_agent", event_bus)
+        with patch('core.config.settings.settings.SCHEDULING_REOPTIMIZATION_HORIZON_HOURS', 0):
+            [booked] = await agent._schedule_window([_electrical_request("low", 5)])
+            [urgent] = await agent._schedule_window(
+                [_electrical_request("urgent", 1, preferred_time_window_end=booked.scheduled_end_time)]
+            )
+
+        assert urgent.status == ScheduleStatus.FAILED_TO_SCHEDULE
+        assert urgent.constraints_violated == ["insufficient_technician_capacity"]
+        assert agent.current_schedule["low"] == booked
+        event_bus.publish.assert_not_awaited()
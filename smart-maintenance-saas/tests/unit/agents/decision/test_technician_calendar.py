@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+from apps.agents.decision.technician_calendar import (
+    TechnicianCalendarIndex,
+    from_working_seconds,
+    to_working_seconds,
+)
+
+UTC = timezone.utc
+THURSDAY = datetime(2026, 1, 1, 8, 0, tzinfo=UTC)
+
+
+def at(day: int, hour: float) -> datetime:
+    return datetime(2026, 1, day, tzinfo=UTC) + timedelta(hours=hour)
+
+
+def test_working_seconds_skip_nights_and_weekends():
+    friday_close = to_working_seconds(at(2, 18))
+
+    assert to_working_seconds(at(3, 11)) == friday_close  # Saturday maps to Monday's opening
+    assert to_working_seconds(at(5, 8)) == friday_close
+    assert to_working_seconds(at(2, 6)) == to_working_seconds(at(1, 18))
+    assert from_working_seconds(friday_close) == at(5, 8)
+    assert from_working_seconds(to_working_seconds(at(2, 9.25))) == at(2, 9.25)
+
+
+def test_earliest_slot_hops_over_bookings_and_closing_time():
+    index = TechnicianCalendarIndex()
+    assert index.book("t1", at(1, 8), at(1, 10), "r1")
+    assert index.book("t1", at(1, 10.5), at(1, 15), "r2")
+
+    # 30 minutes between the bookings are too short; 15:00-18:00 fits
+    assert index.earliest_free_slot("t1", timedelta(hours=2), THURSDAY) == (at(1, 15), at(1, 17))
+    assert index.earliest_free_slot("t1", timedelta(minutes=30), THURSDAY) == (at(1, 10), at(1, 10.5))
+    # Four hours do not fit before Thursday's close
+    assert index.earliest_free_slot("t1", timedelta(hours=4), THURSDAY) == (at(2, 8), at(2, 12))
+    assert index.earliest_free_slot("t1", timedelta(hours=4), THURSDAY, before=at(2, 11)) is None
+    assert index.earliest_free_slot("t2", timedelta(hours=4), THURSDAY) == (THURSDAY, at(1, 12))
+    assert index.earliest_free_slot("t1", timedelta(hours=11), THURSDAY) is None
+
+
+def test_fully_booked_days_are_one_block():
+    index = TechnicianCalendarIndex()
+    for day in (1, 2, 5, 6):  # Thursday, Friday, Monday, Tuesday
+        for hour in range(8, 18, 2):
+            assert index.book("t1", at(day, hour), at(day, hour + 2), f"r{day}-{hour}")
+
+    assert index.get_stats()["busy_blocks"] == 1
+    searches = index.get_stats()["probes"]
+    assert index.earliest_free_slot("t1", timedelta(hours=1), THURSDAY) == (at(7, 8), at(7, 9))
+    assert index.get_stats()["probes"] - searches == 2
+
+
+def test_booking_is_atomic_and_rebooking_moves_the_request():
+    index = TechnicianCalendarIndex()
+    assert index.book("t1", at(1, 9), at(1, 11), "r1")
+    assert not index.book("t1", at(1, 10), at(1, 12), "r2")
+    assert index.is_free("t1", at(1, 11), at(1, 12))
+    assert not index.is_free("t1", at(1, 8), at(1, 9.5))
+
+    assert index.book("t1", at(1, 10), at(1, 12), "r1")  # moving onto its own old slot is fine
+    assert index.bookings("t1") == [(at(1, 10), at(1, 12))]
+    assert index.book("t1", at(1, 12), at(1, 14), "r2")
+    assert not index.book("t1", at(1, 11), at(1, 13), "r1")
+    assert index.bookings("t1") == [(at(1, 10), at(1, 14))]  # a failed move keeps the old slot
+
+    assert index.release("r1")
+    assert not index.release("r1")
+    assert index.bookings("t1") == [(at(1, 12), at(1, 14))]
+    assert index.get_stats()["active_bookings"] == 1
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from apps.api.routers import ml_endpoints
+from core.database.crud.crud_sensor_reading import SensorHistory
+from data.schemas import SensorReading
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+class _Native:
+    def __init__(self):
+        self.decision_calls = 0
+
+    def decision_function(self, matrix):
+        self.decision_calls += 1
+        # Rows whose value_scaled exceeds 0.9 look anomalous
+        return np.where(matrix[:, 5] > 0.9, -2.0, 2.0)
+
+
+class _Model:
+    n_features_in_ = 7
+
+    def __init__(self):
+        self._model_impl = _Native()
+        self.predict_calls = 0
+
+    def predict(self, frame):
+        self.predict_calls += 1
+        return np.ones(len(frame))
+
+
+def _reading(sensor_id, value, minutes, quality=1.0):
+    return SensorReading(
+        sensor_id=sensor_id,
+        sensor_type="temperature",
+        value=value,
+        unit="C",
+        timestamp=NOW + timedelta(minutes=minutes),
+        quality=quality,
+    )
+
+
+def test_feature_matrix_uses_only_prior_history_for_lags():
+    history = SensorHistory(
+        sensor_id="s1",
+        timestamps=[NOW + timedelta(minutes=m) for m in (-3, -2, -1, 1)],
+        values=np.array([20.0, 21.0, 22.0, 99.0]),
+        quality=np.array([0.8, np.nan, 0.9, 0.2]),
+    )
+    readings = [_reading("s1", 50.0, 0, quality=0.5), _reading("s2", 30.0, 0)]
+
+    indices, matrix, current, _ = ml_endpoints._build_anomaly_feature_matrix(
+        readings, {"s1": history}, ml_endpoints.ANOMALY_DEFAULT_FEATURE_ORDER
+    )
+
+    assert indices == [0, 1]
+    np.testing.assert_allclose(matrix[0, :5], [22.0, 21.0, 20.0, 20.0, 20.0])
+    np.testing.assert_allclose(matrix[1, :5], [30.0] * 5)  # no history: lags repeat the reading
+    baselines = ml_endpoints.ANOMALY_SCALE_BASELINES
+    expected_value_scaled = (50.0 - baselines["value"]["min"]) / (baselines["value"]["max"] - baselines["value"]["min"])
+    assert matrix[0, 5] == pytest.approx(expected_value_scaled)
+    assert matrix[0, 6] == pytest.approx(0.5)  # quality range includes all history quality scores
+    np.testing.assert_allclose(current, [50.0, 30.0])
+
+
+def test_analysis_makes_one_predict_and_one_score_call():
+    model = _Model()
+    readings = [_reading(f"s{i % 3}", 20.0 + i, i) for i in range(9)] + [_reading("s0", 500.0, 20)]
+
+    anomalies = ml_endpoints.analyze_sensor_readings_for_anomalies(readings, model, sensitivity=0.7)
+
+    assert model.predict_calls == 1
+    assert model._model_impl.decision_calls == 1
+    assert [alert.evidence["sensor_value"] for alert in anomalies] == [500.0]
+    assert anomalies[0].confidence == pytest.approx(1.0 / (1.0 + np.exp(-2.0)))
+    assert list(anomalies[0].evidence["feature_vector"]) == ml_endpoints.ANOMALY_DEFAULT_FEATURE_ORDER
+
+
+def test_analysis_accepts_reading_lists_as_history():
+    model = _Model()
+    history = [_reading("s1", 10.0 + i, -i - 1) for i in range(5)]
+
+    anomalies = ml_endpoints.analyze_sensor_readings_for_anomalies(
+        [_reading("s1", 100.0, 0)], model, sensitivity=0.7, sensor_histories={"s1": history}
+    )
+
+    assert len(anomalies) == 1
+    assert anomalies[0].evidence["feature_vector"]["value_lag_1"] == 10.0
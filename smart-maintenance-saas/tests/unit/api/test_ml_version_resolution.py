@@ -79,3 +79,18 @@ async def test_predict_raises_when_mlflow_disabled(monkeypatch):
 
     assert exc_info.value.status_code == module.status.HTTP_503_SERVICE_UNAVAILABLE
     assert "MLflow" in exc_info.value.detail
+
+
+def test_resolve_model_version_uses_registry_mirror(monkeypatch):
+    from apps.ml.registry_mirror import RegistrySnapshot
+
+    module = _reload_ml_endpoints(monkeypatch)
+    monkeypatch.setattr(module, "mlflow_disabled", lambda: False, raising=False)
+    snapshot = RegistrySnapshot(
+        models={"demo_model": {}},
+        versions={"demo_model": [{"version": "9", "current_stage": "None"}]},
+    )
+    monkeypatch.setattr(module, "get_registry_mirror", lambda: type("M", (), {"peek": lambda self: snapshot})())
+    monkeypatch.setattr(module, "MlflowClient", lambda: pytest.fail("registry should not be queried"), raising=False)
+
+    assert module._resolve_model_version("demo_model", "auto") == "9"
@@ -0,0 +1,131 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+from apps.api.routers import ml_endpoints
+from apps.ml import model_loader, serving
+
+FEATURES = ["a", "b", "c"]
+
+
+class _CountingModel:
+    """Wraps an estimator and records how many times it is called."""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+        self.feature_names_in_ = estimator.feature_names_in_
+        self.predict_calls = 0
+        self.proba_calls = 0
+
+    def predict(self, matrix):
+        self.predict_calls += 1
+        return self.estimator.predict(matrix)
+
+    def predict_proba(self, matrix):
+        self.proba_calls += 1
+        return self.estimator.predict_proba(matrix)
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(rng.normal(size=(60, 3)), columns=FEATURES)
+    labels = (frame["a"] > 0).astype(int)
+    return _CountingModel(RandomForestClassifier(n_estimators=5, random_state=0).fit(frame, labels))
+
+
+@pytest.fixture
+def client(monkeypatch, model):
+    server = serving.ModelServer(load_workers=1, inference_workers=1, default_timeout_seconds=5)
+    monkeypatch.setattr(ml_endpoints, "get_model_server", lambda: server)
+    monkeypatch.setattr(ml_endpoints, "_ensure_mlflow_enabled", lambda: None)
+    monkeypatch.setattr(ml_endpoints, "_resolve_model_version", lambda name, version: "2")
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda *_: (model, FEATURES))
+
+    ml_endpoints.get_explainer_cache().invalidate("demo:2")
+
+    app = FastAPI()
+    app.include_router(ml_endpoints.router)
+    yield TestClient(app)
+    server.shutdown()
+    ml_endpoints.get_explainer_cache().invalidate("demo:2")
+
+
+def test_prepare_feature_matrix_reports_missing_columns_and_bad_rows(model):
+    with pytest.raises(HTTPException) as missing:
+        ml_endpoints.prepare_feature_matrix(pd.DataFrame([{"a": 1, "b": 2}]), model, "demo", FEATURES)
+    assert missing.value.status_code == 400
+    assert "c" in missing.value.detail
+
+    frame = pd.DataFrame([{"a": 1, "b": 2, "c": 3}, {"a": "x", "b": 2, "c": 3}, {"a": 1, "b": None, "c": 3}])
+    with pytest.raises(HTTPException) as invalid:
+        ml_endpoints.prepare_feature_matrix(frame, model, "demo", FEATURES)
+    assert "[1, 2]" in invalid.value.detail
+
+
+def test_predict_batch_scores_all_rows_with_one_call(client, model):
+    rows = [{"c": 0.1 * i, "a": (-1) ** i, "b": 0.5} for i in range(6)]
+    response = client.post(
+        "/predict_batch",
+        json={"model_name": "demo", "rows": rows, "sensor_ids": [f"s{i}" for i in range(6)]},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["row_count"] == 6
+    assert body["feature_names"] == FEATURES
+    assert len(body["predictions"]) == 6 and len(body["confidence"]) == 6
+    assert body["sensor_ids"][-1] == "s5"
+    assert body["model_info"]["model_version"] == "2"
+    assert model.predict_calls == 1 and model.proba_calls == 1
+
+
+def test_predict_batch_accepts_arrow_stream(client, model):
+    pa = pytest.importorskip("pyarrow")
+    # Scored traffic forms the SHAP background before anything is explained
+    rng = np.random.default_rng(5)
+    rows = [dict(zip(FEATURES, values)) for values in rng.normal(size=(12, 3))]
+    assert client.post("/predict_batch", json={"model_name": "demo", "rows": rows}).status_code == 200
+
+    table = pa.table({"a": [1.0, -1.0], "b": [0.2, 0.3], "c": [0.0, 1.0], "sensor_id": ["s1", "s2"]})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post(
+        "/predict_batch?model_name=demo&explain=true",
+        content=sink.getvalue(),
+        headers={"content-type": "application/vnd.apache.arrow.stream"},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["sensor_ids"] == ["s1", "s2"]
+    assert set(body["shap_values"]) == set(FEATURES)
+    assert len(body["shap_values"]["a"]) == 2
+    assert body["explanation_status"] is None
+
+
+def test_predict_batch_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr(ml_endpoints.settings, "ML_PREDICT_BATCH_MAX_ROWS", 2)
+    rows = [{"a": 1, "b": 2, "c": 3}] * 3
+
+    response = client.post("/predict_batch", json={"model_name": "demo", "rows": rows})
+
+    assert response.status_code == 413
+
+
+def test_predict_batch_reports_background_not_ready(client):
+    rows = [{"a": float(i), "b": 0.5, "c": 1.0} for i in range(4)]
+
+    response = client.post("/predict_batch", json={"model_name": "demo", "rows": rows, "explain": True})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["shap_values"] is None
+    assert response.json()["explanation_status"] == "background_not_ready"
+    assert len(ml_endpoints.get_explainer_cache()._backgrounds["demo:2"].rows) == 4
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.database.crud.crud_sensor_reading import CRUDSensorReading, SensorHistory
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result(self.rows)
+
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_recent_readings_for_sensors_uses_one_ranked_query():
+    rows = [
+        ("s1", BASE_TIME, 1.0, None, "temperature", "C"),
+        ("s1", BASE_TIME + timedelta(minutes=1), 2.0, 0.9, "temperature", "C"),
+        ("s2", BASE_TIME, 10.0, 1.0, "vibration", "mm/s"),
+    ]
+    session = _RecordingSession(rows)
+
+    histories = await CRUDSensorReading().get_recent_readings_for_sensors(
+        session, sensor_ids=["s1", "s2", "s1", "s3"], limit_per_sensor=5
+    )
+
+    assert len(session.statements) == 1
+    assert "row_number() OVER (PARTITION BY sensor_readings.sensor_id" in session.statements[0]
+    assert set(histories) == {"s1", "s2", "s3"}
+    np.testing.assert_array_equal(histories["s1"].values, [1.0, 2.0])
+    assert np.isnan(histories["s1"].quality[0])
+    assert histories["s2"].unit == "mm/s"
+    assert len(histories["s3"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_recent_readings_for_sensors_joins_per_sensor_cutoffs():
+    session = _RecordingSession([])
+
+    await CRUDSensorReading().get_recent_readings_for_sensors(
+        session, sensor_ids=["s1", "s2"], limit_per_sensor=3, end_times={"s1": BASE_TIME}
+    )
+
+    assert "VALUES" in session.statements[0]
+    assert "cutoffs.cutoff IS NULL OR sensor_readings.timestamp <= cutoffs.cutoff" in session.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_recent_readings_for_sensors_skips_query_without_sensors():
+    session = _RecordingSession([])
+
+    assert await CRUDSensorReading().get_recent_readings_for_sensors(session, sensor_ids=[]) == {}
+    assert session.statements == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_series_selects_only_needed_columns_oldest_first():
+    rows = [(BASE_TIME + timedelta(minutes=1), 2.0, None), (BASE_TIME, 1.0, 0.5)]  # newest first, like the query
+    session = _RecordingSession(rows)
+
+    history = await CRUDSensorReading().fetch_series(session, sensor_id="s1", limit=2, end_time=BASE_TIME)
+
+    statement = session.statements[0]
+    assert statement.startswith(
+        "SELECT sensor_readings.timestamp, sensor_readings.value, sensor_readings.quality \nFROM"
+    )
+    assert "ORDER BY sensor_readings.timestamp DESC" in statement
+    assert history.timestamps == [BASE_TIME, BASE_TIME + timedelta(minutes=1)]
+    np.testing.assert_array_equal(history.values, [1.0, 2.0])
+    assert history.quality[0] == 0.5 and np.isnan(history.quality[1])
+    assert len(await CRUDSensorReading().fetch_series(_RecordingSession([]), sensor_id="s1")) == 0
+
+
+def test_sensor_history_round_trips_readings_newest_first():
+    history = SensorHistory(
+        sensor_id="s1",
+        timestamps=[BASE_TIME, BASE_TIME + timedelta(minutes=1)],
+        values=np.array([1.0, 2.0]),
+        quality=np.array([np.nan, 0.5]),
+        sensor_type="temperature",
+        unit="C",
+    )
+
+    readings = history.to_readings()
+
+    assert [reading.value for reading in readings] == [2.0, 1.0]
+    assert readings[0].quality == 0.5 and readings[1].quality == 1.0
+    rebuilt = SensorHistory.from_readings("s1", readings)
+    np.testing.assert_array_equal(rebuilt.values, history.values)
+
+
+def test_sensor_history_window_is_inclusive_and_limited():
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    history = SensorHistory(
+        sensor_id="s1",
+        timestamps=[start + timedelta(minutes=i) for i in range(5)],
+        values=np.arange(5, dtype=float),
+        quality=np.full(5, np.nan),
+    )
+
+    window = history.window(start + timedelta(minutes=3), limit=2)
+    assert list(window.values) == [2.0, 3.0]
+    # Naive cutoffs are read as UTC
+    assert len(history.window(datetime(2026, 1, 1, 0, 1), limit=10)) == 2
+
+
+class _ScalarSession:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def scalar(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return self.results.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_sensor_watermark_counts_only_when_the_watermark_moved():
+    unchanged = _ScalarSession(BASE_TIME)
+    assert await CRUDSensorReading().get_sensor_watermark(unchanged, sensor_id="s1", since=BASE_TIME) == (BASE_TIME, 0)
+    assert len(unchanged.statements) == 1
+    assert "max(sensor_readings.timestamp)" in unchanged.statements[0]
+    assert "count" not in unchanged.statements[0]
+
+    moved = _ScalarSession(BASE_TIME + timedelta(minutes=5), 3)
+    assert await CRUDSensorReading().get_sensor_watermark(moved, sensor_id="s1", since=BASE_TIME) == (
+        BASE_TIME + timedelta(minutes=5),
+        3,
+    )
+    assert "count(*)" in moved.statements[1]
+    assert "sensor_readings.timestamp >" in moved.statements[1]
@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from apps.ml import artifact_cache
+
+
+def _writer(files, calls=None):
+    """Downloader that materializes ``files`` as an MLflow-style ``model`` directory."""
+
+    def download(destination):
+        if calls is not None:
+            calls.append(destination)
+        model_dir = Path(destination) / "model"
+        model_dir.mkdir(parents=True)
+        for name, content in files.items():
+            (model_dir / name).write_bytes(content)
+        return str(model_dir)
+
+    return download
+
+
+def test_sha256_file_matches_hashlib(tmp_path):
+    import hashlib
+
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"x" * 5000)
+
+    assert artifact_cache.sha256_file(path, chunk_size=64) == hashlib.sha256(b"x" * 5000).hexdigest()
+
+
+def test_fetch_downloads_once_and_serves_from_disk(tmp_path):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+    calls = []
+
+    first = cache.fetch("models:/demo/1", _writer({"model.pkl": b"abc", "MLmodel": b"flavors"}, calls))
+    second = cache.fetch("models:/demo/1", _writer({"model.pkl": b"zzz"}, calls))
+
+    assert len(calls) == 1
+    assert first.digest == second.digest
+    assert (Path(second.path) / "model.pkl").read_bytes() == b"abc"
+    assert not list((tmp_path / "tmp").iterdir())  # staging cleaned up
+
+
+def test_identical_artifacts_are_stored_once(tmp_path):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+
+    a = cache.fetch("models:/demo/1", _writer({"model.pkl": b"same"}))
+    b = cache.fetch("s3://bucket/run/artifacts/model", _writer({"model.pkl": b"same"}))
+
+    assert a.digest == b.digest
+    assert len(list((tmp_path / "objects").iterdir())) == 1
+
+
+def test_corrupted_object_is_discarded_and_redownloaded(tmp_path):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+    stored = cache.fetch("models:/demo/1", _writer({"model.pkl": b"good"}))
+    (Path(stored.path) / "model.pkl").write_bytes(b"tampered")
+
+    fresh_process = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+    assert fresh_process.get("models:/demo/1") is None
+    assert fresh_process.stats["corrupted"] == 1
+
+    calls = []
+    fresh_process.fetch("models:/demo/1", _writer({"model.pkl": b"good"}, calls))
+    assert len(calls) == 1
+
+
+def test_least_recently_used_objects_are_evicted(tmp_path):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=250)
+    cache.fetch("models:/a/1", _writer({"model.pkl": b"a" * 100}))
+    cache.fetch("models:/b/1", _writer({"model.pkl": b"b" * 100}))
+    os.utime(Path(tmp_path) / "objects" / cache.get("models:/b/1").digest / "manifest.json", (1, 1))
+    cache.get("models:/a/1")
+
+    cache.fetch("models:/c/1", _writer({"model.pkl": b"c" * 100}))
+
+    assert cache.get("models:/b/1") is None
+    assert cache.get("models:/a/1") is not None and cache.get("models:/c/1") is not None
+    assert cache.stats["evictions"] == 1
+
+
+def test_moving_reference_falls_back_to_cached_copy_when_offline(tmp_path, monkeypatch):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+    monkeypatch.setattr(artifact_cache, "get_artifact_cache", lambda: cache)
+    cache.fetch("models:/demo/Production", _writer({"model.pkl": b"v1"}), immutable=False)
+    cache.annotate("models:/demo/Production", feature_names=["a", "b"])
+
+    def _offline(_uri):
+        def download(_destination):
+            raise ConnectionError("registry unreachable")
+
+        return download
+
+    monkeypatch.setattr(artifact_cache, "_download_with_mlflow", _offline)
+    local_path = artifact_cache.localize_model_uri("models:/demo/Production", immutable=False)
+
+    assert (Path(local_path) / "model.pkl").read_bytes() == b"v1"
+    assert cache.get("models:/demo/Production").metadata["feature_names"] == ["a", "b"]
+
+
+def test_localize_without_cache_returns_remote_uri(monkeypatch):
+    monkeypatch.setattr(artifact_cache, "get_artifact_cache", lambda: None)
+
+    assert artifact_cache.localize_model_uri("models:/demo/1") == "models:/demo/1"
+
+
+def test_failed_download_without_cached_copy_raises(tmp_path, monkeypatch):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+    monkeypatch.setattr(artifact_cache, "get_artifact_cache", lambda: cache)
+
+    def _broken(_destination):
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        cache.fetch("models:/demo/2", _broken)
+    assert not list((tmp_path / "tmp").iterdir())
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression
+
+from apps.ml import explainability
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(7)
+    features = rng.normal(size=(80, 3))
+    labels = (features[:, 0] + features[:, 1] > 0).astype(int)
+    return features, labels
+
+
+def test_tree_explainer_is_cached_and_explains_batches(training_data):
+    features, labels = training_data
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(features, labels)
+    cache = explainability.ExplainerCache(max_entries=2, background_size=10)
+
+    first = explainability.explain_rows(model, features[:4], ["a", "b", "c"], cache_key="rf:1", cache=cache)
+    second = explainability.explain_rows(model, features[4:6], ["a", "b", "c"], cache_key="rf:1", cache=cache)
+
+    assert len(first) == 4 and len(second) == 2
+    assert set(first[0]["shap_values"]) == {"a", "b", "c"}
+    assert first[0]["explainer_type"] == "TreeExplainer"
+    assert cache.stats["builds"] == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_kernel_explainer_upgrades_provisional_background(training_data):
+    features, _ = training_data
+    model = LinearRegression().fit(features, features[:, 0] * 2.0)
+    cache = explainability.ExplainerCache(max_entries=2, background_size=5, min_background_rows=2)
+
+    cache.observe("lin:1", features[:3])
+    explanation = explainability.explain_rows(model, features[10:11], cache_key="lin:1", cache=cache)
+    provisional = cache.get_explainer("lin:1", model, features[:1])
+    assert provisional.provisional is True
+    assert any(value != 0.0 for value in explanation[0]["shap_values"].values())
+
+    cache.observe("lin:1", features[3:10])
+    upgraded = cache.get_explainer("lin:1", model, features[:1])
+
+    assert upgraded.provisional is False
+    assert upgraded.background_rows == 5
+    assert upgraded.explainer_type == "KernelExplainer"
+
+
+def test_kernel_explanation_waits_for_scored_background(training_data):
+    features, _ = training_data
+    model = LinearRegression().fit(features, features[:, 0] * 2.0)
+    cache = explainability.ExplainerCache(max_entries=2, background_size=5, min_background_rows=3)
+
+    with pytest.raises(explainability.BackgroundNotReadyError):
+        explainability.explain_rows(model, features[:4], cache_key="lin:1", cache=cache)
+    with pytest.raises(explainability.BackgroundNotReadyError):
+        explainability.explain_rows(model, features[:1], cache=cache)
+
+    cache.observe("lin:1", features[:1])
+    with pytest.raises(explainability.BackgroundNotReadyError, match="1 of 3"):
+        explainability.explain_rows(model, features[:1], cache_key="lin:1", cache=cache)
+
+
+def test_large_batches_are_sampled_into_the_reservoir(training_data):
+    features, _ = training_data
+    cache = explainability.ExplainerCache(max_entries=2, background_size=5)
+
+    cache.observe("lin:1", features)
+
+    reservoir = cache._backgrounds["lin:1"]
+    assert len(reservoir.rows) == 5 and reservoir.seen == len(features)
+
+
+def test_explainer_cache_evicts_least_recently_used(training_data):
+    features, labels = training_data
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(features, labels)
+    cache = explainability.ExplainerCache(max_entries=1, background_size=5)
+
+    cache.get_explainer("a:1", model, features)
+    cache.get_explainer("b:1", model, features)
+
+    assert cache.get_stats()["entries"] == 1
+    cache.get_explainer("a:1", model, features)
+    assert cache.stats["builds"] == 3
+
+
+@pytest.mark.asyncio
+async def test_job_store_falls_back_to_local_storage(monkeypatch):
+    async def _no_redis():
+        raise RuntimeError("redis down")
+
+    monkeypatch.setattr("core.redis_client.get_redis_client", _no_redis)
+    store = explainability.ExplanationJobStore(ttl_seconds=60, local_limit=2)
+
+    job = store.create("demo_model", "3")
+    job.update(status="completed", shap_values={"a": 0.1})
+    await store.save(job)
+
+    assert (await store.get(job["job_id"]))["status"] == "completed"
+    assert await store.get("missing") is None
+
+    store.create("demo_model", "3")
+    store.create("demo_model", "3")
+    assert await store.get(job["job_id"]) is None
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.routers import ml_endpoints
+from apps.ml import forecast_cache, model_loader, serving
+from core.database.crud.crud_sensor_reading import SensorHistory
+from core.database.session import get_async_db
+
+T0 = datetime(2026, 1, 1, 12, 0)
+KEY = forecast_cache.forecast_cache_key("s1", "prophet", "3", 12, 288)
+
+
+def test_fresh_entries_are_served_without_revalidation():
+    cache = forecast_cache.ForecastCache(recheck_seconds=60)
+    cache.store(KEY, "forecast", watermark=T0)
+
+    assert cache.lookup(KEY) == ("forecast", None)
+    assert cache.lookup(forecast_cache.forecast_cache_key("s1", "prophet", "4", 12, 288)) == (None, None)
+
+
+def test_stale_check_revalidates_against_the_watermark():
+    cache = forecast_cache.ForecastCache(recheck_seconds=0, invalidate_after_readings=3)
+    cache.store(KEY, "forecast", watermark=T0)
+
+    assert cache.lookup(KEY) == (None, T0)
+    assert cache.revalidate(KEY, T0, 0) == "forecast"
+    assert cache.revalidate(KEY, T0 + timedelta(minutes=10), 2) == "forecast"  # below threshold
+    assert cache.revalidate(KEY, T0 + timedelta(minutes=15), 3) is None
+    assert cache.lookup(KEY) == (None, None)
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_ingested_readings_invalidate_only_that_sensor():
+    cache = forecast_cache.ForecastCache(recheck_seconds=60, invalidate_after_readings=2)
+    other = forecast_cache.forecast_cache_key("s2", "prophet", "3", 12, 288)
+    cache.store(KEY, "s1 forecast", watermark=T0)
+    cache.store(other, "s2 forecast", watermark=T0)
+
+    cache.note_readings("s1")
+    assert cache.lookup(KEY)[0] == "s1 forecast"
+    cache.note_readings("s1")
+
+    assert cache.lookup(KEY) == (None, None)
+    assert cache.lookup(other)[0] == "s2 forecast"
+
+
+def test_lru_bound_evicts_oldest_entries():
+    cache = forecast_cache.ForecastCache(max_entries=2, recheck_seconds=60)
+    for version in ("1", "2", "3"):
+        cache.store(forecast_cache.forecast_cache_key("s1", "m", version, 1, 10), version, watermark=T0)
+
+    assert cache.lookup(forecast_cache.forecast_cache_key("s1", "m", "1", 1, 10)) == (None, None)
+    assert cache.get_stats()["evictions"] == 1
+
+
+class _Forecaster:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, frame):
+        self.calls += 1
+        return pd.DataFrame({"ds": frame["ds"], "yhat": range(len(frame))})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    readings = [
+        SimpleNamespace(timestamp=T0 + timedelta(minutes=5 * i), value=float(i), quality=1.0) for i in range(20)
+    ]
+    state = {"latest": readings[-1].timestamp, "newer": 0, "history_calls": 0}
+
+    async def _history(db, *, sensor_id, limit):
+        state["history_calls"] += 1
+        return SensorHistory(
+            sensor_id=sensor_id,
+            timestamps=[reading.timestamp for reading in readings],
+            values=np.array([reading.value for reading in readings]),
+            quality=np.array([reading.quality for reading in readings]),
+        )
+
+    async def _watermark(db, *, sensor_id, since):
+        return state["latest"], state["newer"]
+
+    model = _Forecaster()
+    server = serving.ModelServer(load_workers=1, inference_workers=1, default_timeout_seconds=5)
+    monkeypatch.setattr(ml_endpoints, "get_model_server", lambda: server)
+    monkeypatch.setattr(ml_endpoints, "_ensure_mlflow_enabled", lambda: None)
+    monkeypatch.setattr(ml_endpoints, "_resolve_model_version", lambda name, version: "3")
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda *_: (model, None))
+    monkeypatch.setattr(ml_endpoints.crud_sensor_reading, "fetch_series", _history)
+    monkeypatch.setattr(ml_endpoints.crud_sensor_reading, "get_sensor_watermark", _watermark)
+    cache = forecast_cache.ForecastCache(recheck_seconds=0)
+    monkeypatch.setattr(ml_endpoints, "get_forecast_cache", lambda: cache)
+
+    app = FastAPI()
+    app.include_router(ml_endpoints.router)
+    app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(app), model, state
+    server.shutdown()
+
+
+def test_forecast_endpoint_reuses_results_until_new_readings_arrive(client):
+    test_client, model, state = client
+    payload = {"sensor_id": "s1", "model_name": "prophet", "horizon_steps": 4}
+
+    first = test_client.post("/forecast", json=payload)
+    second = test_client.post("/forecast", json=payload)
+
+    assert first.status_code == 200, first.text
+    assert second.json() == first.json()
+    assert model.calls == 1 and state["history_calls"] == 1
+
+    state["latest"], state["newer"] = T0 + timedelta(hours=2), 1
+    third = test_client.post("/forecast", json=payload)
+
+    assert third.status_code == 200
+    assert model.calls == 2 and state["history_calls"] == 2
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.routers import ml_endpoints
+from apps.ml import forecast_cache, forecasting, model_loader, serving
+from core.database.crud.crud_sensor_reading import SensorHistory
+from core.database.session import get_async_db
+
+T0 = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_history_frame_sorts_strips_timezone_and_drops_missing_values():
+    frame = forecasting.history_frame([T0 + timedelta(minutes=10), T0, None], [2.0, None, 5.0])
+
+    assert list(frame["value"]) == [2.0]
+    assert frame["timestamp"].iloc[0].tzinfo is None
+
+
+def test_cadence_is_inferred_from_median_spacing():
+    timestamps = [T0 + timedelta(minutes=15 * i) for i in range(6)]
+    frame = forecasting.history_frame(timestamps, range(6))
+
+    assert forecasting.infer_cadence_minutes(frame) == 15
+    assert forecasting.infer_cadence_minutes(frame, override=60) == 60
+    assert forecasting.infer_cadence_minutes(frame.head(1)) == forecasting.DEFAULT_CADENCE_MINUTES
+
+
+def _worker_cache_budget():
+    from apps.ml.model_cache import get_model_cache
+
+    return get_model_cache().max_bytes
+
+
+@pytest.mark.asyncio
+async def test_process_pool_runs_tasks_and_recycles_workers_after_timeouts():
+    pool = forecasting.ForecastPool(workers=1, use_processes=True, task_timeout_seconds=0.2)
+    try:
+        assert await pool.run(pow, 2, 10, timeout_seconds=60) == 1024
+        stuck_executor = pool.executor
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 30)
+        assert pool.get_stats()["timeouts"] == 1 and pool.get_stats()["recycles"] == 1
+        assert pool.executor is not stuck_executor
+        assert await pool.run(pow, 3, 2, timeout_seconds=60) == 9
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_workers_split_the_model_cache_budget(monkeypatch):
+    monkeypatch.setattr(forecasting.settings, "ML_MODEL_CACHE_MAX_MB", 1024)
+    monkeypatch.setattr(forecasting.settings, "ML_FORECAST_WORKER_CACHE_MAX_MB", 0)
+    pool = forecasting.ForecastPool(workers=4, use_processes=True)
+    try:
+        assert pool.worker_cache_max_mb == 256
+        assert await pool.run(_worker_cache_budget, timeout_seconds=60) == 256 * 1024 * 1024
+    finally:
+        pool.shutdown()
+
+
+class _Forecaster:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def predict(self, frame):
+        time.sleep(self.delay)
+        return np.arange(len(frame), dtype=float)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    histories = {
+        sensor_id: SensorHistory(
+            sensor_id=sensor_id,
+            timestamps=[T0 + timedelta(minutes=5 * i) for i in range(12)],
+            values=np.arange(12, dtype=float),
+            quality=np.ones(12),
+        )
+        for sensor_id in ("s1", "s2", "slow")
+    }
+    queries = []
+
+    async def _recent(db, *, sensor_ids, limit_per_sensor):
+        queries.append(list(sensor_ids))
+        return {sensor_id: histories.get(sensor_id, SensorHistory(sensor_id=sensor_id)) for sensor_id in sensor_ids}
+
+    models = {"fast": _Forecaster(), "slow": _Forecaster(delay=0.5)}
+    server = serving.ModelServer(load_workers=1, inference_workers=4, default_timeout_seconds=5)
+    pool = forecasting.ForecastPool(workers=4, use_processes=False, task_timeout_seconds=0.2)
+    cache = forecast_cache.ForecastCache(recheck_seconds=60)
+    monkeypatch.setattr(ml_endpoints, "get_model_server", lambda: server)
+    monkeypatch.setattr(ml_endpoints, "get_forecast_pool", lambda: pool)
+    monkeypatch.setattr(ml_endpoints, "get_forecast_cache", lambda: cache)
+    monkeypatch.setattr(serving, "get_model_server", lambda: server)
+    monkeypatch.setattr(ml_endpoints, "_ensure_mlflow_enabled", lambda: None)
+    monkeypatch.setattr(ml_endpoints, "_resolve_model_version", lambda name, version: "1")
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda name, version: (models.get(name), None))
+    monkeypatch.setattr(ml_endpoints.crud_sensor_reading, "get_recent_readings_for_sensors", _recent)
+
+    app = FastAPI()
+    app.include_router(ml_endpoints.router)
+    app.dependency_overrides[get_async_db] = lambda: None
+    yield TestClient(app), queries
+    server.shutdown()
+
+
+def _lines(response):
+    return {item["sensor_id"]: item for item in map(json.loads, response.text.strip().splitlines())}
+
+
+def test_forecast_batch_streams_one_line_per_sensor(client):
+    test_client, queries = client
+    payload = {
+        "sensor_ids": ["s1", "s2", "slow", "unknown"],
+        "model_name": "fast",
+        "model_names": {"slow": "slow"},
+        "horizon_steps": 3,
+    }
+
+    response = test_client.post("/forecast_batch", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = _lines(response)
+    assert queries == [["s1", "s2", "slow", "unknown"]]  # one history query for the fleet
+    assert results["s1"]["status"] == "ok" and len(results["s1"]["forecast"]["forecast"]) == 3
+    assert results["s1"]["forecast"]["cadence_minutes"] == 5
+    assert results["slow"]["status"] == "timeout"
+    assert results["unknown"]["status"] == "error"
+
+    again = _lines(test_client.post("/forecast_batch", json=payload))
+    assert again["s2"]["cached"] is True
+
+
+def test_forecast_batch_rejects_sensors_without_a_model(client):
+    test_client, _ = client
+
+    response = test_client.post("/forecast_batch", json={"sensor_ids": ["s1"]})
+
+    assert response.status_code == 400
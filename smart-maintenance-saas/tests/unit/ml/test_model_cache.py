@@ -0,0 +1,136 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from apps.ml import model_cache, model_loader
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_estimate_size_counts_numpy_buffers():
+    small = model_cache.estimate_size({"weights": np.zeros(10)})
+    large = model_cache.estimate_size({"weights": np.zeros(100_000)})
+
+    assert large - small >= 100_000 * 8 - 10 * 8
+
+
+def test_evicts_least_recently_used_entries_to_fit_budget():
+    cache = model_cache.ModelCache(max_bytes=250, policy="lru")
+    cache.set("a", "A", size_bytes=100)
+    cache.set("b", "B", size_bytes=100)
+    assert cache.get("a") == "A"  # "b" becomes least recently used
+
+    cache.set("c", "C", size_bytes=100)
+
+    assert "b" not in cache
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1 and stats["evicted_bytes"] == 100
+    assert stats["bytes"] == 200 and stats["entries"] == 2
+
+
+def test_lfu_policy_keeps_frequently_used_entries():
+    cache = model_cache.ModelCache(max_bytes=200, policy="lfu")
+    cache.set("hot", 1, size_bytes=100)
+    cache.set("cold", 2, size_bytes=100)
+    for _ in range(3):
+        cache.get("hot")
+    cache.get("cold")
+
+    cache.set("new", 3, size_bytes=100)
+
+    assert "hot" in cache and "cold" not in cache
+
+
+def test_oversized_model_is_kept_alone():
+    cache = model_cache.ModelCache(max_bytes=100)
+    cache.set("small", 1, size_bytes=50)
+
+    cache.set("huge", 2, size_bytes=500)
+
+    assert len(cache) == 1 and cache.get("huge") == 2
+    assert cache.get_stats()["oversized"] == 1
+
+
+def test_stale_entries_are_served_while_refreshing_in_background():
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return ("model-v2", ["f"])
+
+    cache = model_cache.ModelCache(max_bytes=10_000, refresh_ahead_ratio=0.0)
+    cache.set("m:latest", ("model-v1", ["f"]), loader=loader, ttl_seconds=60, size_bytes=10)
+
+    # Both reads return immediately with the cached model; only one reload runs.
+    assert cache.get("m:latest")[0] == "model-v1"
+    assert cache.get("m:latest")[0] == "model-v1"
+    release.set()
+
+    assert _wait_for(lambda: cache.get_stats()["refreshes"] == 1)
+    assert cache.get("m:latest")[0] == "model-v2"
+    assert len(calls) >= 1
+    cache.shutdown()
+
+
+def test_failed_refresh_keeps_serving_previous_model():
+    def loader():
+        raise RuntimeError("registry down")
+
+    cache = model_cache.ModelCache(max_bytes=10_000, refresh_ahead_ratio=0.0)
+    cache.set("m:latest", "model-v1", loader=loader, ttl_seconds=60, size_bytes=10)
+
+    assert cache.get("m:latest") == "model-v1"
+    assert _wait_for(lambda: cache.get_stats()["refresh_failures"] == 1)
+    assert cache.get("m:latest") == "model-v1"
+    cache.shutdown()
+
+
+def test_invalidate_by_prefix():
+    cache = model_cache.ModelCache(max_bytes=1_000)
+    cache.set("sensor-loader:a", 1, size_bytes=1)
+    cache.set("api:b", 2, size_bytes=1)
+
+    assert cache.invalidate(prefix="sensor-loader:") == 1
+    assert "api:b" in cache and cache.get_stats()["bytes"] == 1
+
+
+def test_api_loader_caches_through_shared_cache(monkeypatch):
+    cache = model_cache.ModelCache(max_bytes=10_000_000)
+    monkeypatch.setattr(model_loader, "get_model_cache", lambda: cache)
+    monkeypatch.setattr(model_loader, "mlflow_disabled", lambda: False)
+    loads = []
+
+    def fake_load(name, version):
+        loads.append((name, version))
+        return {"model": name}, ["a"]
+
+    monkeypatch.setattr(model_loader, "_load_model_uncached", fake_load)
+
+    assert model_loader.load_model("demo", "3") == ({"model": "demo"}, ["a"])
+    assert model_loader.load_model("demo", "3") == ({"model": "demo"}, ["a"])
+    assert model_loader.get_cached_model("demo", "3") is not None
+    assert loads == [("demo", "3")]
+
+    model_loader.load_model("demo", "Production")
+    assert cache._entries["demo:3"].loader is None  # pinned versions never refresh
+    assert cache._entries["demo:Production"].loader is not None
+
+
+@pytest.mark.parametrize(
+    "name,version,expected",
+    [("demo", "4", False), ("demo", "latest", True), ("models:/demo/Staging", "1", True), ("runs:/abc/model", "1", False)],
+)
+def test_moving_reference_detection(name, version, expected):
+    assert model_loader._tracks_moving_reference(name, version) is expected
@@ -0,0 +1,164 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier, RandomForestRegressor
+
+from apps.ml import artifact_cache, model_loader
+from apps.ml.packed_forest import PackedForest, PackedForestModel, can_pack, explainable_estimator, pack_estimator
+
+FEATURES = ["a", "b", "c"]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(200, 3)), columns=FEATURES)
+
+
+@pytest.fixture
+def sample(frame):
+    rows = frame.sample(50, random_state=1).to_numpy().copy()
+    rows[::7, 1] = np.nan
+    return pd.DataFrame(rows, columns=FEATURES)
+
+
+def test_classifier_matches_sklearn_exactly(tmp_path, frame, sample):
+    clf = RandomForestClassifier(n_estimators=12, random_state=0).fit(frame, (frame["a"] + frame["b"] > 0).astype(int))
+
+    assert pack_estimator(clf, tmp_path)
+    packed = PackedForest(tmp_path)
+
+    assert np.array_equal(packed.predict_proba(sample), clf.predict_proba(sample))
+    assert np.array_equal(packed.predict(sample), clf.predict(sample))
+    # Columns are reordered by name like scikit-learn does for DataFrames
+    assert np.array_equal(packed.predict_proba(sample[FEATURES[::-1]]), clf.predict_proba(sample))
+
+
+def test_isolation_forest_and_regressor_match_sklearn_exactly(tmp_path, frame, sample):
+    iso = IsolationForest(n_estimators=20, random_state=0).fit(frame.to_numpy())
+    reg = RandomForestRegressor(n_estimators=8, random_state=0).fit(frame, frame["c"] * 2)
+
+    assert pack_estimator(iso, tmp_path / "iso") and pack_estimator(reg, tmp_path / "reg")
+    packed_iso, packed_reg = PackedForest(tmp_path / "iso"), PackedForest(tmp_path / "reg")
+    dense = frame.to_numpy()[:40]
+
+    assert np.array_equal(packed_iso.score_samples(dense), iso.score_samples(dense))
+    assert np.array_equal(packed_iso.decision_function(dense), iso.decision_function(dense))
+    assert np.array_equal(packed_iso.predict(dense), iso.predict(dense))
+    assert np.array_equal(packed_reg.predict(sample), reg.predict(sample))
+
+
+def test_packed_arrays_are_memory_mapped_and_pickle_by_path(tmp_path, frame):
+    clf = RandomForestClassifier(n_estimators=3, random_state=0).fit(frame, frame["a"] > 0)
+    pack_estimator(clf, tmp_path)
+    packed = PackedForest(tmp_path)
+
+    assert isinstance(packed._threshold, np.memmap)
+    assert len(pickle.dumps(packed)) < 1024
+    assert pickle.loads(pickle.dumps(packed)).n_features_in_ == 3
+
+
+def test_unsupported_estimators_are_not_packed(tmp_path, frame):
+    multi = RandomForestRegressor(n_estimators=2, random_state=0).fit(frame, frame[["a", "b"]])
+
+    assert not can_pack(multi) and not can_pack(object())
+    assert pack_estimator(multi, tmp_path) is False
+
+
+def test_derived_format_is_verified_on_read(tmp_path):
+    cache = artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000)
+
+    def _download(destination):
+        model_dir = Path(destination) / "model"
+        model_dir.mkdir(parents=True)
+        (model_dir / "model.pkl").write_bytes(b"abc")
+        return str(model_dir)
+
+    stored = cache.fetch("models:/demo/1", _download)
+
+    def _build(directory):
+        (directory / "left.npy").write_bytes(b"packed")
+        return True
+
+    path = cache.store_derived(stored.digest, "packed", _build)
+    assert cache.get_derived(stored.digest, "packed") == path
+    assert cache.store_derived(stored.digest, "abandoned", lambda _directory: False) is None
+    assert cache.get_derived(stored.digest, "abandoned") is None
+
+    (path / "left.npy").write_bytes(b"tampered")
+    assert artifact_cache.ArtifactCache(tmp_path, max_bytes=10_000).get_derived(stored.digest, "packed") is None
+
+
+def test_loader_packs_tree_models_and_prefers_the_packed_copy(tmp_path, monkeypatch, frame):
+    import mlflow
+
+    clf = RandomForestClassifier(n_estimators=4, random_state=0).fit(frame, frame["a"] > 0)
+    cache = artifact_cache.ArtifactCache(tmp_path / "store", max_bytes=10_000_000)
+
+    def _download(destination):
+        model_dir = Path(destination) / "model"
+        model_dir.mkdir(parents=True)
+        (model_dir / "model.pkl").write_bytes(pickle.dumps(clf))
+        return str(model_dir)
+
+    stored = cache.fetch("models:/clf/1", _download)
+
+    class _Pyfunc:
+        def __init__(self, estimator):
+            self._model_impl = type("Impl", (), {"sklearn_model": estimator})()
+
+    loads = []
+
+    def _load(path):
+        loads.append(path)
+        return _Pyfunc(pickle.loads((Path(path) / "model.pkl").read_bytes()))
+
+    monkeypatch.setattr(model_loader, "get_artifact_cache", lambda: cache)
+    monkeypatch.setattr(mlflow.pyfunc, "load_model", _load)
+
+    first = model_loader._load_artifact_model(stored)
+    second = model_loader._load_artifact_model(stored)
+
+    assert isinstance(first, PackedForestModel) and isinstance(second, PackedForestModel)
+    assert len(loads) == 1  # the second worker maps the packed arrays instead of unpickling
+    assert np.array_equal(second.predict(frame), clf.predict(frame))
+
+    monkeypatch.setattr("mlflow.sklearn.load_model", lambda path: clf)
+    assert explainable_estimator(second._model_impl) is clf
+
+
+def test_large_batches_are_routed_to_the_native_estimator(tmp_path, monkeypatch, frame):
+    clf = RandomForestClassifier(n_estimators=4, random_state=0).fit(frame, frame["a"] > 0)
+    pack_estimator(clf, tmp_path / "packed")
+    loads = []
+    monkeypatch.setattr("mlflow.sklearn.load_model", lambda path: loads.append(path) or clf)
+    model = PackedForestModel(PackedForest(tmp_path / "packed"), source_path=str(tmp_path), native_batch_rows=50)
+
+    assert np.array_equal(model.predict(frame[:50]), clf.predict(frame[:50]))
+    assert loads == []
+
+    assert np.array_equal(model.predict(frame), clf.predict(frame))
+    # Plain arrays get the fitted column names, so scikit-learn does not warn
+    assert np.array_equal(model._model_impl.predict_proba(frame.to_numpy()), clf.predict_proba(frame))
+    assert loads == [str(tmp_path)]
+
+
+def test_packed_model_enforces_the_signature_input_schema(tmp_path, frame):
+    import mlflow.sklearn
+    from mlflow.exceptions import MlflowException
+    from mlflow.models import infer_signature
+
+    clf = RandomForestClassifier(n_estimators=3, random_state=0).fit(frame, frame["a"] > 0)
+    model_dir = tmp_path / "model"
+    mlflow.sklearn.save_model(clf, str(model_dir), signature=infer_signature(frame, clf.predict(frame)))
+    pack_estimator(clf, tmp_path / "packed")
+    model = PackedForestModel(PackedForest(tmp_path / "packed"), source_path=str(model_dir))
+
+    assert np.array_equal(model.predict(frame[FEATURES[::-1]]), clf.predict(frame))
+    with pytest.raises(MlflowException, match="missing inputs"):
+        model.predict(frame[["a", "b"]])
+    with pytest.raises(MlflowException):
+        model.predict(frame.assign(a="high"))
@@ -0,0 +1,40 @@
+import time
+
+import pandas as pd
+
+from apps.ml.prophet_cache import ProphetFitCache
+
+
+def _history(periods):
+    return pd.DataFrame({"ds": pd.date_range("2026-01-01", periods=periods, freq="h"), "y": range(periods)})
+
+
+def test_fit_stays_current_until_enough_new_points():
+    cache = ProphetFitCache(refit_after_points=3, refit_interval_seconds=0)
+    cache.store("s1", _history(10), forecast=pd.DataFrame(), init={"k": 0.1}, warm=False)
+    fit = cache.lookup("s1")
+
+    assert cache.is_current(fit, _history(12))
+    assert not cache.is_current(fit, _history(13))
+    assert cache.warm_start_params(fit) == {"k": 0.1}
+    assert cache.lookup("unknown") is None
+
+
+def test_fit_expires_after_the_refit_interval(monkeypatch):
+    cache = ProphetFitCache(refit_after_points=100, refit_interval_seconds=60)
+    cache.store("s1", _history(10), forecast=pd.DataFrame(), init=None, warm=False)
+    fit = cache.lookup("s1")
+
+    assert cache.is_current(fit, _history(10))
+    monkeypatch.setattr(time, "monotonic", lambda: fit.fitted_at + 61)
+    assert not cache.is_current(fit, _history(10))
+
+
+def test_cache_is_bounded_and_counts_fit_kinds():
+    cache = ProphetFitCache(max_sensors=2, warm_start=False)
+    for sensor_id in ("s1", "s2", "s3"):
+        cache.store(sensor_id, _history(5), forecast=pd.DataFrame(), init={"k": 1.0}, warm=sensor_id == "s3")
+
+    assert cache.lookup("s1") is None
+    assert cache.warm_start_params(cache.lookup("s3")) is None
+    assert cache.get_stats() == {"hits": 0, "warm_refits": 1, "cold_fits": 2, "evictions": 1, "sensors": 2}
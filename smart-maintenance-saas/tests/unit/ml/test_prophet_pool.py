@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+
+from apps.ml import prophet_pool
+
+
+def _crash_once(marker_path):
+    """Kill the worker on the first call, succeed afterwards."""
+    if not os.path.exists(marker_path):
+        open(marker_path, "w").close()
+        os._exit(1)
+    return "recovered"
+
+
+@pytest.fixture
+def pool():
+    bounded = prophet_pool.ProphetProcessPool(workers=1, max_concurrency=2, timeout_seconds=5, initializer=None)
+    yield bounded
+    bounded.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_running_job_past_timeout_recycles_the_workers(pool):
+    pool.timeout_seconds = 0.5
+    await pool.start()
+    first_executor = pool.executor
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.submit(time.sleep, 30)
+
+    stats = pool.get_stats()
+    assert stats["timeouts"] == 1 and stats["recycles"] == 1
+    assert pool.executor is not first_executor
+    pool.timeout_seconds = 30
+    assert await pool.submit(pow, 2, 5) == 32
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_job_never_runs(pool):
+    running = asyncio.create_task(pool.submit(time.sleep, 1))
+    await asyncio.sleep(0.5)
+    queued = asyncio.create_task(pool.submit(pow, 2, 3))
+    await asyncio.sleep(0.1)
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    await running
+
+    assert pool.get_stats()["cancelled"] == 1
+    assert pool.get_stats()["recycles"] == 0
+
+
+@pytest.mark.asyncio
+async def test_job_interrupted_by_a_broken_pool_is_retried_once(pool, tmp_path):
+    result = await pool.submit(_crash_once, str(tmp_path / "crashed"))
+
+    assert result == "recovered"
+    assert pool.get_stats()["completed"] == 1 and pool.get_stats()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_crash_is_reported(pool, monkeypatch):
+    async def _always_broken(*_args):
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(pool, "_run", _always_broken)
+
+    with pytest.raises(BrokenProcessPool):
+        await pool.submit(pow, 2, 2)
+    assert pool.get_stats()["failed"] == 1
+
+
+def test_fit_and_forecast_uses_shared_params_and_trims_columns():
+    created = {}
+
+    class _FakeProphet:
+        def __init__(self, **params):
+            created.update(params)
+
+        def fit(self, history):
+            self.history = history
+
+        def make_future_dataframe(self, periods, freq):
+            return pd.DataFrame({"ds": pd.date_range("2026-01-01", periods=len(self.history) + periods, freq=freq)})
+
+        def predict(self, future):
+            return future.assign(yhat=1.0, yhat_lower=0.5, yhat_upper=1.5, trend=0.0)
+
+    history = pd.DataFrame({"ds": pd.date_range("2025-12-01", periods=5, freq="D"), "y": range(5)})
+    forecast = prophet_pool.fit_and_forecast(history, 3, prophet_class=_FakeProphet)
+
+    assert created == prophet_pool.PROPHET_PARAMS
+    assert list(forecast.columns) == prophet_pool.FORECAST_COLUMNS and len(forecast) == 8
+
+
+def test_refit_starts_from_the_previous_fit():
+    pytest.importorskip("prophet")
+    history = pd.DataFrame(
+        {"ds": pd.date_range("2026-01-01", periods=60, freq="D"), "y": [float(i % 7) + 0.1 * i for i in range(60)]}
+    )
+    params = {"weekly_seasonality": True, "daily_seasonality": False, "yearly_seasonality": False}
+
+    _, init = prophet_pool.fit_and_forecast_warm(history[:50], 5, params=params)
+    assert set(init) == {"k", "m", "sigma_obs", "delta", "beta"}
+
+    forecast, refit = prophet_pool.fit_and_forecast_warm(history, 5, init=init, params=params)
+    assert len(forecast) == 65 and refit is not None
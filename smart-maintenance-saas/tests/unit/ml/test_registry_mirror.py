@@ -0,0 +1,120 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from apps.ml import model_utils, registry_mirror
+
+
+class _Page(list):
+    def __init__(self, items, token=None):
+        super().__init__(items)
+        self.token = token
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.models = [
+            SimpleNamespace(name="vibration_anomaly_isolationforest", description="", creation_timestamp=1,
+                            last_updated_timestamp=5, tags={}, aliases={"champion": "2"}),
+            SimpleNamespace(name="anomaly_detector_refined_v2", description="", creation_timestamp=1,
+                            last_updated_timestamp=7, tags={"sensor_type": "general"}, aliases={}),
+        ]
+        self.versions = [
+            SimpleNamespace(name="vibration_anomaly_isolationforest", version="1", current_stage="None",
+                            status="READY", creation_timestamp=1, run_id="r1", tags={}, aliases=[]),
+            SimpleNamespace(name="vibration_anomaly_isolationforest", version="2", current_stage="Production",
+                            status="READY", creation_timestamp=2, run_id="r2", tags={}, aliases=["champion"]),
+            SimpleNamespace(name="anomaly_detector_refined_v2", version="10", current_stage="None",
+                            status="READY", creation_timestamp=3, run_id="r3", tags={}, aliases=[]),
+        ]
+
+    def search_registered_models(self, max_results=100, page_token=None):
+        self.calls.append(("models", page_token))
+        if page_token is None:
+            return _Page(self.models[:1], token="next")
+        return _Page(self.models[1:])
+
+    def search_model_versions(self, page_token=None):
+        self.calls.append(("versions", page_token))
+        return _Page(self.versions)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(model_utils.settings, "DISABLE_MLFLOW_MODEL_LOADING", False, raising=False)
+    monkeypatch.setattr(model_utils, "_get_mlflow_client", lambda: client)
+    return client
+
+
+def test_snapshot_is_built_with_bulk_calls(fake_client):
+    snapshot = model_utils.fetch_registry_snapshot()
+
+    # Two pages of models plus one versions call -- independent of the number of models
+    assert [call[0] for call in fake_client.calls] == ["models", "models", "versions"]
+    assert snapshot.models["vibration_anomaly_isolationforest"]["latest_version"] == "2"
+    assert snapshot.latest_version("vibration_anomaly_isolationforest", stages=["None"]) == "1"
+    assert snapshot.latest_version("anomaly_detector_refined_v2") == "10"
+    assert snapshot.aliases["vibration_anomaly_isolationforest"] == {"champion": "2"}
+    assert snapshot.sensor_type_mapping == {
+        "vibration": ["vibration_anomaly_isolationforest"],
+        "general": ["anomaly_detector_refined_v2"],
+    }
+
+
+def test_model_utils_read_from_mirror(fake_client, monkeypatch):
+    mirror = registry_mirror.RegistryMirror(model_utils.fetch_registry_snapshot, refresh_interval_seconds=3600)
+    monkeypatch.setattr(model_utils, "get_registry_mirror", lambda: mirror)
+
+    assert len(model_utils.get_all_registered_models()) == 2
+    assert model_utils.get_model_recommendations("vibration")[0] == "vibration_anomaly_isolationforest"
+    assert model_utils.get_model_details("anomaly_detector_refined_v2")["latest_version"] == "10"
+    assert len(fake_client.calls) == 3  # only the cold-start refresh touched the registry
+
+
+def test_failed_refresh_keeps_previous_snapshot():
+    outcomes = [registry_mirror.RegistrySnapshot(models={"m": {}}, fingerprint=("a",)), RuntimeError("down")]
+
+    def builder():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    mirror = registry_mirror.RegistryMirror(builder, refresh_interval_seconds=60)
+    first = mirror.refresh()
+
+    assert mirror.refresh() is first
+    assert mirror.stats["refresh_failures"] == 1
+    assert mirror.stats["changes"] == 1
+
+
+def test_reads_never_start_background_refreshes():
+    calls = []
+
+    def builder():
+        calls.append(threading.current_thread().name)
+        return registry_mirror.RegistrySnapshot(models={"m": {}}, refreshed_at=0.0)
+
+    mirror = registry_mirror.RegistryMirror(builder, refresh_interval_seconds=60)
+
+    assert mirror.peek() is None and mirror.latest_version("m") is None
+    mirror.request_refresh()
+    assert calls == []
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("registry-mirror")]
+    # Only an explicit read loads the snapshot, in the caller's thread; a stale one is reloaded there too
+    mirror.snapshot()
+    mirror.snapshot()
+    assert calls == [threading.current_thread().name] * 2
+    assert not mirror.get_stats()["background_refresh"]
+
+
+def test_start_is_a_no_op_when_mlflow_loading_is_disabled(monkeypatch):
+    monkeypatch.setattr(registry_mirror.settings, "DISABLE_MLFLOW_MODEL_LOADING", True, raising=False)
+    mirror = registry_mirror.RegistryMirror(lambda: pytest.fail("registry contacted"), refresh_interval_seconds=60)
+
+    mirror.start()
+
+    assert not mirror.get_stats()["background_refresh"]
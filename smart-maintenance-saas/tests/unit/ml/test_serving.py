@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from apps.ml import model_loader, serving
+
+
+@pytest.fixture
+def server():
+    instance = serving.ModelServer(load_workers=2, inference_workers=2, default_timeout_seconds=5)
+    yield instance
+    instance.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced(monkeypatch, server):
+    calls = []
+    release = threading.Event()
+
+    def fake_load(model_name, model_version):
+        calls.append((model_name, model_version))
+        release.wait(timeout=2)
+        return ("model", ["a", "b"])
+
+    monkeypatch.setattr(model_loader, "load_model", fake_load)
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda *_: None)
+
+    tasks = [asyncio.create_task(server.load_model("demo", "1")) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == [("demo", "1")]
+    assert all(result == ("model", ["a", "b"]) for result in results)
+    assert server.stats["loads_coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cached_model_skips_executor(monkeypatch, server):
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda *_: ("cached", None))
+    monkeypatch.setattr(
+        model_loader, "load_model", lambda *_: pytest.fail("load_model should not be called")
+    )
+
+    assert await server.load_model("demo", "1") == ("cached", None)
+    assert server.stats["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_enforces_deadline(server):
+    deadline = server.deadline(0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await server.run(time.sleep, 0.5, deadline=deadline)
+
+    assert server.stats["timeouts"] == 1
+    with pytest.raises(asyncio.TimeoutError):
+        await server.run(lambda: "late", deadline=deadline)
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_slow_load(monkeypatch, server):
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda *_: None)
+    monkeypatch.setattr(model_loader, "load_model", lambda *_: (time.sleep(0.3), None))
+
+    load_task = asyncio.create_task(server.load_model("slow", "1"))
+    started = time.monotonic()
+    await asyncio.sleep(0.01)
+    assert time.monotonic() - started < 0.2
+    await load_task
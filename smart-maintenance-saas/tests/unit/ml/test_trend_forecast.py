@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from apps.ml import trend_forecast
+
+
+def _series(slope, noise=0.0, points=60, seed=0):
+    rng = np.random.default_rng(seed)
+    days = np.arange(points, dtype=float)
+    return days, 10.0 + slope * days + rng.normal(0.0, noise, points)
+
+
+def test_theil_sen_fits_many_sensors_at_once_and_ignores_outliers():
+    days, rising = _series(0.5, noise=0.05)
+    rising[10] = 500.0  # a single spike must not move the robust fit
+    _, flat = _series(0.0, noise=0.05, seed=1)
+    t, y = trend_forecast.stack_series([(days, rising), (days[:20], flat[:20])], window=64)
+
+    estimate = trend_forecast.theil_sen(t, y)
+
+    assert t.shape == (2, 64)
+    assert estimate.slope == pytest.approx([0.5, 0.0], abs=0.02)
+    assert estimate.level[0] == pytest.approx(10.0 + 0.5 * 59, abs=0.2)
+    assert list(estimate.n_points) == [60, 20]
+
+
+def test_short_series_have_no_fit_and_zero_confidence():
+    t, y = trend_forecast.stack_series([(np.array([0.0, 1.0]), np.array([1.0, 2.0]))], window=8)
+
+    estimate = trend_forecast.theil_sen(t, y)
+    crossing = trend_forecast.threshold_crossing(estimate, np.array([4.0]), horizon_days=30)
+
+    assert np.isnan(estimate.slope[0])
+    assert crossing.confidence[0] == 0.0
+
+
+def test_threshold_crossing_brackets_the_estimate():
+    series = [_series(0.5, noise=0.1), _series(-0.2, noise=0.1, points=30, seed=2), _series(0.5, noise=8.0, seed=3)]
+    estimate = trend_forecast.theil_sen(*trend_forecast.stack_series(series, window=64))
+    thresholds = 2.0 * estimate.level
+
+    crossing = trend_forecast.threshold_crossing(estimate, thresholds, horizon_days=90)
+
+    assert crossing.days[0] == pytest.approx(estimate.level[0] / 0.5, rel=0.05)
+    assert crossing.lower_days[0] < crossing.days[0] < crossing.upper_days[0]
+    assert np.isinf(crossing.days[1])  # falling trend never reaches an upper threshold
+    assert crossing.confidence[0] > 0.9
+    assert crossing.confidence[2] < crossing.confidence[0]  # noisy series are less certain
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+from apps.api.routers import ml_endpoints
+from apps.ml import explainability, model_loader, serving, warmup
+
+FEATURES = ["a", "b"]
+
+
+@pytest.fixture
+def server():
+    model_server = serving.ModelServer(load_workers=2, inference_workers=1, default_timeout_seconds=5)
+    yield model_server
+    model_server.shutdown()
+
+
+@pytest.fixture
+def forest():
+    frame = pd.DataFrame(np.random.default_rng(0).normal(size=(40, 2)), columns=FEATURES)
+    return RandomForestClassifier(n_estimators=3, random_state=0).fit(frame, (frame["a"] > 0).astype(int))
+
+
+def test_parse_warmup_targets_defaults_to_auto():
+    assert warmup.parse_warmup_targets(" clf:3, anomaly ,") == [("clf", "3"), ("anomaly", "auto")]
+
+
+@pytest.mark.asyncio
+async def test_warmup_loads_runs_inference_and_builds_explainers(monkeypatch, server, forest):
+    loaded = {"clf:7": (forest, FEATURES)}
+    monkeypatch.setattr(model_loader, "get_cached_model", lambda name, version: loaded.get(f"{name}:{version}"))
+    monkeypatch.setattr(model_loader, "load_model", lambda name, version: (None, None))
+    cache = explainability.ExplainerCache(max_entries=4, background_size=5)
+    monkeypatch.setattr(warmup, "get_explainer_cache", lambda: cache)
+
+    tracker = warmup.ModelWarmup([("clf", "auto"), ("missing", "1")])
+    assert tracker.get_status()["ready"] is False
+
+    results = await tracker.run(lambda name, version: "7" if version == "auto" else version, server=server)
+
+    assert tracker.is_ready and tracker.status == warmup.READY
+    assert results["clf"].resolved_version == "7"
+    assert results["clf"].loaded and results["clf"].inference_ok and results["clf"].explainer_built
+    assert cache.get_stats()["entries"] == 1  # keyed like the request path ("clf:7")
+    assert results["missing"].loaded is False and results["missing"].error
+
+
+@pytest.mark.asyncio
+async def test_warmup_reports_timeouts(monkeypatch, server):
+    import time
+
+    def slow_resolve(name, version):
+        time.sleep(0.5)
+        return "1"
+
+    tracker = warmup.ModelWarmup([("slow", "auto")])
+    results = await tracker.run(slow_resolve, server=server, timeout_seconds=0.05)
+
+    assert tracker.is_ready
+    assert results["slow"].error == "warm-up timed out"
+
+
+def test_ml_health_does_not_load_models(monkeypatch):
+    tracker = warmup.ModelWarmup([("clf", "1")])
+    tracker.results["clf"] = warmup.ModelWarmupResult("clf", "1", resolved_version="1", loaded=True)
+    tracker.status = warmup.READY
+
+    class _Mirror:
+        def peek(self):
+            return None
+
+        def get_stats(self):
+            return {"refreshes": 1, "last_error": None}
+
+    def _fail_load(*_args, **_kwargs):
+        raise AssertionError("health probes must not load models")
+
+    monkeypatch.setattr(ml_endpoints, "_ensure_mlflow_enabled", lambda: None)
+    monkeypatch.setattr(ml_endpoints, "get_registry_mirror", lambda: _Mirror())
+    monkeypatch.setattr(ml_endpoints, "get_model_warmup", lambda: tracker)
+    monkeypatch.setattr(model_loader, "load_model", _fail_load)
+    app = FastAPI()
+    app.include_router(ml_endpoints.router)
+
+    response = TestClient(app).get("/health")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "healthy" and body["models_loaded"] == ["clf"]
+    assert body["warmup_status"] == "ready"
+
+
+def test_ml_health_stays_live_on_cold_start(monkeypatch):
+    class _ColdMirror:
+        def peek(self):
+            return None
+
+        def get_stats(self):
+            return {"refreshes": 0, "last_error": None, "age_seconds": None}
+
+    monkeypatch.setattr(ml_endpoints, "_ensure_mlflow_enabled", lambda: None)
+    monkeypatch.setattr(ml_endpoints, "get_registry_mirror", lambda: _ColdMirror())
+    monkeypatch.setattr(ml_endpoints, "get_model_warmup", lambda: warmup.ModelWarmup([("clf", "1")]))
+    monkeypatch.setattr(ml_endpoints, "get_model_cache", lambda: SimpleNamespace(get_stats=lambda: {"entries": 0}))
+    app = FastAPI()
+    app.include_router(ml_endpoints.router)
+
+    response = TestClient(app).get("/health")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["registry_mirror"]["state"] == "pending"
+    assert body["test_model_loaded"] is False
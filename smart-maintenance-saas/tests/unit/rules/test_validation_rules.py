@@ -1,8 +1,11 @@
+import json
+import os
 import pytest
 from datetime import datetime, timezone
 import uuid
 
 from apps.rules.validation_rules import RuleEngine
+from data.exceptions import ConfigurationError
 from data.schemas import AnomalyAlert, SensorReading, SensorType, AnomalyType, AnomalyStatus # Added AnomalyType and AnomalyStatus
 
 
@@ -594,3 +597,90 @@ async def test_temp_spike_not_spike_anomaly_not_triggered(
         f"that is not considered extremely high (< 40°C)."
     )
     assert reason_not_expected not in reasons
+
+
+@pytest.mark.asyncio
+async def test_batch_evaluation_matches_single_evaluation_and_counts_hits(
+    anomaly_alert_factory, sensor_reading_factory, rule_engine
+):
+    pairs = [
+        (anomaly_alert_factory(confidence=0.2, anomaly_type=AnomalyType.SPIKE), sensor_reading_factory(quality=0.4, value=30.0)),
+        (anomaly_alert_factory(confidence=0.9, anomaly_type=AnomalyType.LOW_VALUE), sensor_reading_factory(value=5.0)),
+        (anomaly_alert_factory(confidence=0.9, anomaly_type=AnomalyType.DRIFT), sensor_reading_factory()),
+    ]
+
+    batch = await rule_engine.evaluate_rules_batch(pairs)
+
+    assert batch == [await rule_engine.evaluate_rules(alert, reading) for alert, reading in pairs]
+    assert batch[0][0] == pytest.approx(-0.35)
+    assert batch[2] == (0.0, ["No rule-based adjustments applied."])
+    stats = rule_engine.get_stats()
+    assert stats["rules"] == 4
+    assert stats["rule_hits"]["poor_data_quality"] == 2
+    assert stats["rule_hits"]["temperature_low_value_not_critical"] == 2
+
+
+@pytest.mark.asyncio
+async def test_membership_conditions_and_disabled_rules(anomaly_alert_factory, sensor_reading_factory):
+    engine = RuleEngine(rule_definitions=[
+        {
+            "name": "site_a_vibration",
+            "when": [
+                {"field": "alert.sensor_id", "op": "in", "value": ["pump-1", "pump-2"]},
+                {"field": "reading.sensor_type", "op": "not_in", "value": ["temperature"]},
+                {"field": "alert.severity", "op": "ge", "value": 4},
+            ],
+            "adjustment": 0.1,
+            "reason": "Known critical asset {alert.sensor_id} (severity {alert.severity}).",
+        },
+        {"name": "disabled", "enabled": False, "when": [], "adjustment": -1.0},
+    ])
+    pairs = [
+        (anomaly_alert_factory(confidence=0.5, sensor_id="pump-1", severity=5), sensor_reading_factory(sensor_type=SensorType.VIBRATION)),
+        (anomaly_alert_factory(confidence=0.5, sensor_id="pump-1", severity=5), sensor_reading_factory()),
+        (anomaly_alert_factory(confidence=0.5, sensor_id="fan-9", severity=5), sensor_reading_factory(sensor_type=SensorType.VIBRATION)),
+    ]
+
+    results = await engine.evaluate_rules_batch(pairs)
+
+    assert results[0] == (pytest.approx(0.1), ["Known critical asset pump-1 (severity 5)."])
+    assert [adjustment for adjustment, _ in results[1:]] == [0.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        {"name": "r", "when": [{"field": "alert.missing", "op": "lt", "value": 1}], "adjustment": 0.1},
+        {"name": "r", "when": [{"field": "reading.value", "op": "between", "value": 1}], "adjustment": 0.1},
+        {"name": "r", "when": [{"field": "reading.value", "op": "lt", "value": "high"}], "adjustment": 0.1},
+        {"name": "r", "when": [{"field": "reading.value", "op": "lt", "value": 1}], "adjustment": 0.1,
+         "reason": "{equipment.name}"},
+        {"name": "r", "when": [], "adjustment": 0.1},
+    ],
+)
+def test_invalid_rule_definitions_are_rejected(definition):
+    with pytest.raises(ConfigurationError):
+        RuleEngine(rule_definitions=[definition])
+
+
+@pytest.mark.asyncio
+async def test_rule_file_is_hot_reloaded_and_bad_edits_keep_active_rules(
+    tmp_path, anomaly_alert_factory, sensor_reading_factory
+):
+    rule = {"name": "low_quality", "when": [{"field": "reading.quality", "op": "lt", "value": 0.5}], "adjustment": -0.2}
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"rules": [rule]}))
+    engine = RuleEngine(rules_path=str(rules_file), reload_interval_seconds=1e-9)
+    alert, reading = anomaly_alert_factory(confidence=0.5), sensor_reading_factory(quality=0.3)
+    assert (await engine.evaluate_rules(alert, reading))[0] == pytest.approx(-0.2)
+
+    rule["adjustment"] = -0.4
+    rules_file.write_text(json.dumps({"rules": [rule]}))
+    os.utime(rules_file, (1, 1))
+    assert (await engine.evaluate_rules(alert, reading))[0] == pytest.approx(-0.4)
+
+    rules_file.write_text("{not json")
+    os.utime(rules_file, (2, 2))
+    assert (await engine.evaluate_rules(alert, reading))[0] == pytest.approx(-0.4)
+    assert engine.get_stats()["reloads"] == 1
+    assert engine.get_stats()["reload_errors"] == 1